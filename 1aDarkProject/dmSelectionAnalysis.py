@@ -3,6 +3,7 @@ import numpy as np
 import ROOT as rt
 
 from darkCuts import particleTallies, protonCut, muonCut, pionCut, electronCut, cleverPhotonCut, trueParticleTallies, trueProtonCut, trueMuonCut, truePionCut, truePhotonCut
+from helpers.potService import sumPOT, cosmicPOT
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-d", "--darkFile", type=str, required=True, help="darkNu input ntuple filepath")
@@ -29,17 +30,13 @@ cosmicTree = cosmic_file.Get("EventTree")
 targetPOT = 6.67e+20
 targetPOTstring = "6.67e+20"
 darkPOTsum, stdPOTsum = 0, 0
-cosmicPOTsum = 3.2974607516739725e+20
+cosmicPOTsum = cosmicPOT(cosmicTree, fallbackPOT=3.2974607516739725e+20)
 
 # Find darkNu POT sum
-for i in range(darkPotTree.GetEntries()):
-    darkPotTree.GetEntry(i)
-    darkPOTsum = darkPOTsum + darkPotTree.totGoodPOT
+darkPOTsum = sumPOT(darkPotTree)
 
 # Find standard POT sum
-for i in range(stdPotTree.GetEntries()):
-    stdPotTree.GetEntry(i)
-    stdPOTsum = stdPOTsum + stdPotTree.totGoodPOT
+stdPOTsum = sumPOT(stdPotTree)
 
 potSumList = [darkPOTsum, stdPOTsum, cosmicPOTsum]
 print(str(potSumList))
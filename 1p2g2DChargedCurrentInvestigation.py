@@ -3,6 +3,7 @@ import numpy as np
 import ROOT as rt
 
 from cuts import trueCCCut, recoCCCut, trueFiducialCut, recoFiducialCut, truePiPlusCut, recoPiPlusCut, trueProtonSelection, recoProtonSelection, truePhotonSelection, recoPhotonSelection, trueCCCutLoose, recoCCCutLoose
+from helpers.potService import sumPOT
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -20,9 +21,7 @@ targetPOTstring = "6.67e+20" #for plot axis titles
 
 # Calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-    potTree.GetEntry(i)
-    ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 # Define hists to be filled:
 trueNCTrackHist = rt.TH1F("nctracks", "True NC Events",60,0,50)
@@ -3,6 +3,9 @@ import numpy as np
 import ROOT as rt
 
 from cuts import trueCCCut, recoCCCut, trueFiducialCut, recoFiducialCut, truePiPlusCut, recoPiPlusCut, trueProtonSelection, recoProtonSelection, truePhotonSelection, recoPhotonSelection, histStackFill, trueCCCutLoose, recoCCCutLoose, recoInvariantMassCalculations
+from helpers.potService import sumPOT, cosmicPOT
+from selection_1p2g import run_1p2g_fused_loop, print_fused_loop_stats
+from ccClassifier import RecoCCClassifier
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -22,13 +25,11 @@ targetPOTstring = "4.4e+19" #for plot axis titles
 # Get relevant info from cosmic ntuple file
 cosmic_ntuple_file = rt.TFile(args.cosmicFile)
 cosmicTree = cosmic_ntuple_file.Get("EventTree")
-cosmicPOTsum = 5.28e+19
+cosmicPOTsum = cosmicPOT(cosmicTree, fallbackPOT=5.28e+19)
 
 # Calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-    potTree.GetEntry(i)
-    ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 # Define histograms to be filled through loop
 
@@ -69,30 +70,33 @@ fiducialWidth = 10
 
 recoNoVertex = 0
 trueTotalTally = 0
-#---------------- Efficiency Loop ----------------#
-#---------------- Efficiency Loop ----------------#
-for i in range(eventTree.GetEntries()):
-    eventTree.GetEntry(i)
+#---------------- Efficiency and Purity ----------------#
+# Both breakdowns are filled from one read of each entry; the truth and reco selections are evaluated once per entry
+# (see selection_1p2g.SelectionCache) and shared between the two passes
+
+#---------------- Efficiency Pass ----------------#
+def efficiencyPass(selections):
+    global recoNoVertex, trueTotalTally
 # True charged-current cut
-    if trueCCCut(eventTree):
-        continue
+    if selections.trueCC():
+        return
 # True fiducial cut
-    if trueFiducialCut(eventTree, fiducialWidth):
-        continue
+    if selections.trueOutsideFiducial():
+        return
 # True cosmic cut
     if eventTree.vtxFracHitsOnCosmic >= 1.:
-        continue
+        return
 # True pi+ cut
-    if truePiPlusCut(eventTree):
-        continue
+    if selections.truePiPlus():
+        return
 # True proton selection
-    nTrueProtons, trueProtonTID, trueProtonIndex = trueProtonSelection(eventTree)
+    nTrueProtons, trueProtonTID, trueProtonIndex = selections.trueProtons()
     if nTrueProtons != 1:
-        continue
+        return
 # True photon selection
-    truePhotonTIDList, trueLeadingPhotonEnergy, photonIndexList = truePhotonSelection(eventTree, fiducialWidth)
+    truePhotonTIDList, trueLeadingPhotonEnergy, photonIndexList = selections.truePhotons()
     if len(truePhotonTIDList) != 2:
-        continue
+        return
 
     trueTotalHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
     trueTotalTally += 1
@@ -102,72 +106,69 @@ for i in range(eventTree.GetEntries()):
     if eventTree.foundVertex == 0:
         recoNoVertexHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
         recoNoVertex += 1
-        continue
+        return
 # reco cc check
-    if recoCCCut(eventTree):
+    if selections.recoCC():
         recoCCHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # reco photon selection up top
-    recophotonTIDList, recoLeadingPhotonEnergy, recoPhotonIndexList = recoPhotonSelection(eventTree, fiducialWidth)
+    recophotonTIDList, recoLeadingPhotonEnergy, recoPhotonIndexList = selections.recoPhotons()
     if len(recophotonTIDList) == 0:
         recoNoPhotonHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
     if len(recophotonTIDList) == 1:
         recoOnePhotonHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
     if len(recophotonTIDList) >= 3:
         recoManyPhotonHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # reco fiducial check
-    if recoFiducialCut(eventTree, fiducialWidth):
+    if selections.recoOutsideFiducial():
         recoOutFiducialHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # reco pi+ check
-    if recoPiPlusCut(eventTree):
+    if selections.recoPiPlus():
         recoPiPlusHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # reco proton selection and filling
-    nRecoProtons, recoProtonTID, recoProtonIndex = recoProtonSelection(eventTree)
+    nRecoProtons, recoProtonTID, recoProtonIndex = selections.recoProtons()
     if nRecoProtons == 0:
         recoNoProtonHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
     if nRecoProtons >= 2:
         recoPluralProtonHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # uncomment below for proton tid-matching
 #    if recoProtonTID != trueProtonTID:
 #        recoWrongProtonHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-#        continue
+#        return
     recoSignalHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
 
-#------------------ Purity Loop ------------------#
-#------------------ Purity Loop ------------------#
-
-for i in range(eventTree.GetEntries()):
-    eventTree.GetEntry(i)
+#------------------ Purity Pass ------------------#
+def purityPass(selections):
 # start with whether vertex was found
     if eventTree.foundVertex == 0:
-        continue
+        return
 # Reco CC cut
-    if recoCCCut(eventTree):
-        continue
+    if selections.recoCC():
+        return
 # Reco fiducial cut
-    if recoFiducialCut(eventTree, fiducialWidth):
-        continue
+    if selections.recoOutsideFiducial():
+        return
 # Reco cosmic cut
     if eventTree.vtxFracHitsOnCosmic >= 1.:
-        continue
+        return
 # Reco pi+ cut
-    if recoPiPlusCut(eventTree):
-        continue
+    if selections.recoPiPlus():
+        return
 # Reco proton selection
-    nRecoProtons, recoProtonTID, recoProtonIndex = recoProtonSelection(eventTree)
+    nRecoProtons, recoProtonTID, recoProtonIndex = selections.recoProtons()
     if nRecoProtons != 1:
-        continue
+        return
 # Reco photon selection
-    recoPhotonTIDList, recoLeadingPhotonEnergy, recoPhotonIndexList = recoPhotonSelection(eventTree, fiducialWidth) 
+    recoPhotonTIDList, recoLeadingPhotonEnergy, recoPhotonIndexList = selections.recoPhotons()
     if len(recoPhotonTIDList) != 2:
-        continue
+        return
 # Reco invariant mass calc
     # recoProtonInv, recoPiZeroInv, recoDeltaInv = recoInvariantMassCalculations(eventTree, recoProtonIndex, recoPhotonIndexList)
 
@@ -175,47 +176,51 @@ for i in range(eventTree.GetEntries()):
 
 #------------ TruthMatching ------------#
 # true cc check
-    if trueCCCut(eventTree):
+    if selections.trueCC():
         trueCCHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 #true fiducial check
-    if trueFiducialCut(eventTree, fiducialWidth):
+    if selections.trueOutsideFiducial():
         trueOutFiducialHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # true pi+ check
-    if truePiPlusCut(eventTree):
+    if selections.truePiPlus():
         truePiPlusHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # true proton selection
-    nTrueProtons, trueProtonTID, trueProtonIndex = trueProtonSelection(eventTree)
+    nTrueProtons, trueProtonTID, trueProtonIndex = selections.trueProtons()
     if nTrueProtons == 0:
         trueNoProtonHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
     if nTrueProtons >= 2:
         truePluralProtonHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 # uncomment below for proton tid-matching
 #    if trueProtonTID != trueProtonTID:
 #        trueWrongProtonHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-#        continue    
+#        return
 # true photon selection up top
-    truePhotonTIDList, trueLeadingPhotonEnergy, truePhotonIndexList = truePhotonSelection(eventTree, fiducialWidth)
+    truePhotonTIDList, trueLeadingPhotonEnergy, truePhotonIndexList = selections.truePhotons()
     if len(truePhotonTIDList) == 0:
         trueNoPhotonHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
     if len(truePhotonTIDList) == 1:
         trueOnePhotonHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
     if len(truePhotonTIDList) >= 3:
         trueManyPhotonHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
-        continue
+        return
 
     trueSignalHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
 
+loopStats = run_1p2g_fused_loop(eventTree, fiducialWidth, [efficiencyPass, purityPass])
+print_fused_loop_stats(loopStats)
+
 #------------------ Cosmic Loop ------------------#
 #------------------ Cosmic Loop ------------------#
 # Perform reco cuts on cosmic data to determine number of cosmics to be tagged as signal
 cosmicEventsTally = 0
+cosmicCCClassifier = RecoCCClassifier(intimePixelSum=None)
 for i in range(cosmicTree.GetEntries()):
     cosmicTree.GetEntry(i)
 # Keep a tally of all cosmic events    
@@ -223,35 +228,8 @@ for i in range(cosmicTree.GetEntries()):
 # start with whether vertex was found
     if cosmicTree.foundVertex == 0:
         continue
-# Cosmic CC Cut:
-    recoPrimaryMuonTrackFound = False
-    recoPrimaryMuonShowerFound = False
-    recoPrimaryElectronTrackFound = False
-    recoPrimaryElectronShowerFound = False
-    cc = False
-    unclassifiedTracks = 0
-    for i in range(eventTree.nTracks):
-        if eventTree.trackClassified[i] == 0:
-            unclassifiedTracks += 1
-        if eventTree.trackIsSecondary[i] == 0:
-            if abs(eventTree.trackPID[i]) == 13:
-                recoPrimaryMuonTrackFound = True
-            elif abs(eventTree.trackPID[i]) == 11:
-                recoPrimaryElectronTrackFound = True
-    for i in range(eventTree.nShowers):
-        if eventTree.showerIsSecondary[i] == 0:
-            if abs(eventTree.showerPID[i]) == 11:
-                recoPrimaryElectronShowerFound == True
-            elif abs(eventTree.showerPID[i]) == 13:
-                recoPrimaryMuonShowerFound == True
-    if eventTree.nTracks != 0:
-        if unclassifiedTracks/eventTree.nTracks >= 0.55:
-            cc = True
-    if recoPrimaryMuonTrackFound or recoPrimaryMuonShowerFound or recoPrimaryElectronTrackFound or recoPrimaryElectronShowerFound:   
-        cc = True
-    if eventTree.nTracks >= 4:
-        cc = True
-    if cc == True:
+# Cosmic CC Cut (the recoCCCut tests without the in-time pixel sum):
+    if cosmicCCClassifier.isCC(cosmicTree):
         continue
 # Cosmic Fiducial Cut:
     if recoFiducialCut(cosmicTree, fiducialWidth):
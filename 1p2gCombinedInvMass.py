@@ -4,6 +4,8 @@ import ROOT as rt
 import math
 
 from cuts import trueCCCut, recoCCCut, trueFiducialCut, recoFiducialCut, truePiPlusCut, recoPiPlusCut, trueProtonSelection, recoProtonSelection, truePhotonSelection, recoPhotonSelection, recoPhotonSelectionInvMass
+from helpers.potService import sumPOT
+from selection_1p2g import run_1p2g_fused_loop, print_fused_loop_stats
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -21,9 +23,7 @@ targetPOTstring = "6.67e+20" #for plot axis titles
 
 # Calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-    potTree.GetEntry(i)
-    ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 # Define histograms to be filled through loop
 efficiencyXmax = 2000
@@ -63,33 +63,35 @@ diffMID = 0
 fiducialWidth = 10
 fiducialDict = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":10}
 
-#---------------- Efficiency Loop ----------------#
-#---------------- Efficiency Loop ----------------#
-for i in range(eventTree.GetEntries()):
-    eventTree.GetEntry(i)
+#---------------- Efficiency and Purity ----------------#
+# Both breakdowns are filled from one read of each entry; the truth and reco selections are evaluated once per entry
+# (see selection_1p2g.SelectionCache) and shared between the two passes
+
+#---------------- Efficiency Pass ----------------#
+def efficiencyPass(selections):
 # True charged-current cut
-    if trueCCCut(eventTree):
-        continue
+    if selections.trueCC():
+        return
 # True loose cc cut
 #    if trueCCCutLoose(eventTree):
-#        continue
+#        return
 # True fiducial cut
-    if trueFiducialCut(eventTree, fiducialWidth):
-        continue
+    if selections.trueOutsideFiducial():
+        return
 # True cosmic cut
     if eventTree.vtxFracHitsOnCosmic >= 1.:
-        continue
+        return
 # True pi+ cut
-    if truePiPlusCut(eventTree):
-        continue
+    if selections.truePiPlus():
+        return
 # True proton selection
-    nTrueProtons, trueProtonTID = trueProtonSelection(eventTree)
+    nTrueProtons, trueProtonTID = selections.trueProtons()[:2]
     if nTrueProtons != 1:
-        continue
+        return
 # True photon selection
-    truePhotonTIDList, trueLeadingPhotonEnergy = truePhotonSelection(eventTree, fiducialWidth)
+    truePhotonTIDList, trueLeadingPhotonEnergy = selections.truePhotons()[:2]
     if len(truePhotonTIDList) != 2:
-        continue
+        return
 
 # True Invariant Mass Calculation
     for i in range(eventTree.nTrueSimParts):
@@ -122,76 +124,73 @@ for i in range(eventTree.GetEntries()):
 # start with whether vertex was found
     if eventTree.foundVertex == 0:
         recoNoVertexHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
 
 # reco cc check
-    if recoCCCut(eventTree):
+    if selections.recoCC():
         recoCCHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
 
 # reco photon selection up top
-    recophotonTIDList, recoLeadingPhotonEnergy = recoPhotonSelection(eventTree, fiducialWidth)
+    recophotonTIDList, recoLeadingPhotonEnergy = selections.recoPhotons()[:2]
     if len(recophotonTIDList) == 0:
         recoNoPhotonHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
     if len(recophotonTIDList) == 1:
         recoOnePhotonHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
     if len(recophotonTIDList) >= 3:
         recoManyPhotonHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
 
 # reco loose cc check
 #    if recoCCCutLoose(eventTree):
 #        recoCCHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-#        continue
+#        return
 # reco fiducial check
-    if recoFiducialCut(eventTree, fiducialWidth):
+    if selections.recoOutsideFiducial():
         recoOutFiducialHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
 # reco pi+ check
-    if recoPiPlusCut(eventTree):
+    if selections.recoPiPlus():
         recoPiPlusHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
 # reco proton selection and filling
-    nRecoProtons, recoProtonTID = recoProtonSelection(eventTree)
+    nRecoProtons, recoProtonTID = selections.recoProtons()[:2]
     if nRecoProtons == 0:
         recoNoProtonHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
     if nRecoProtons >= 2:
         recoPluralProtonHist.Fill(invMass, eventTree.xsecWeight)
-        continue
+        return
 # uncomment below for proton tid-matching
 #    if recoProtonTID != trueProtonTID:
 #        recoWrongProtonHist.Fill(trueLeadingPhotonEnergy, eventTree.xsecWeight)
-#        continue
+#        return
     recoSignalHist.Fill(invMass, eventTree.xsecWeight)
 
-#------------------ Purity Loop ------------------#
-#------------------ Purity Loop ------------------#
-
-for i in range(eventTree.GetEntries()):
-    eventTree.GetEntry(i)
+#------------------ Purity Pass ------------------#
+def purityPass(selections):
 # Reco CC cut
-    if recoCCCut(eventTree):
-        continue
+    if selections.recoCC():
+        return
 # Reco fiducial cut
-    if recoFiducialCut(eventTree, fiducialWidth):
-        continue
+    if selections.recoOutsideFiducial():
+        return
 # Reco cosmic cut
     if eventTree.vtxFracHitsOnCosmic >= 1.:
-        continue
+        return
 # Reco pi+ cut
-    if recoPiPlusCut(eventTree):
-        continue
+    if selections.recoPiPlus():
+        return
 # Reco proton selection
-    nRecoProtons, recoProtonTID = recoProtonSelection(eventTree)
+    nRecoProtons, recoProtonTID = selections.recoProtons()[:2]
     if nRecoProtons != 1:
-        continue
+        return
 # Reco photon selection
-    recoPhotonTIDList, recoInvMasss = recoPhotonSelection(eventTree, fiducialWidth) 
+    recoPhotonTIDList, recoInvMasss = selections.recoPhotons()[:2] 
     if len(recoPhotonTIDList) != 2:
-        continue
+        return
 
     for i in range(eventTree.nTracks):
         if recoProtonTID == eventTree.trackTrueTID[i]:
@@ -229,42 +228,42 @@ for i in range(eventTree.GetEntries()):
 #------------ TruthMatching ------------#
 
 # true cc check
-    if trueCCCut(eventTree):
+    if selections.trueCC():
         trueCCHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
 #true fiducial check
-    if trueFiducialCut(eventTree, fiducialWidth):
+    if selections.trueOutsideFiducial():
         trueOutFiducialHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
 # true pi+ check
-    if truePiPlusCut(eventTree):
+    if selections.truePiPlus():
         truePiPlusHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
 # true proton selection
-    nTrueProtons, trueProtonTID = trueProtonSelection(eventTree)
+    nTrueProtons, trueProtonTID = selections.trueProtons()[:2]
     if nTrueProtons == 0:
         trueNoProtonHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
     if nTrueProtons >= 2:
         truePluralProtonHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
 
 # uncomment below for tid-matching
     if recoProtonTID != trueProtonTID:
         trueWrongProtonHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
 
 # true photon selection
-    truePhotonTIDList, trueLeadingPhotonEnergy = truePhotonSelection(eventTree, fiducialWidth)
+    truePhotonTIDList, trueLeadingPhotonEnergy = selections.truePhotons()[:2]
     if len(truePhotonTIDList) == 0:
         trueNoPhotonHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
     if len(truePhotonTIDList) == 1:
         trueOnePhotonHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
     if len(truePhotonTIDList) >= 3:
         trueManyPhotonHist.Fill(recoInvMass, eventTree.xsecWeight)
-        continue
+        return
 
 
     if recoPhotonTIDList[0] in truePhotonTIDList and recoPhotonTIDList[1] in truePhotonTIDList and recoPhotonTIDList[0] != recoPhotonTIDList[1]:
@@ -299,6 +298,10 @@ for i in range(eventTree.GetEntries()):
 #    invMass = np.sqrt(np.square(energy1 + energy2) - (((np.square(px))+(np.square(py))+np.square(pz))))
 #    trueSignalHist.Fill(invMass, eventTree.xsecWeight)
  
+
+loopStats = run_1p2g_fused_loop(eventTree, fiducialWidth, [efficiencyPass, purityPass])
+print_fused_loop_stats(loopStats)
+
 #------------------ End of Loops ------------------#
 
 efficiencyHistList = [recoSignalHist, recoNoVertexHist, recoCCHist, \
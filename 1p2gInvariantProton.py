@@ -4,6 +4,7 @@ import ROOT as rt
 import math
 
 from cuts import trueCCCut, recoCCCut, trueFiducialCut, recoFiducialCut, truePiPlusCut, recoPiPlusCut, trueProtonSelection, recoProtonSelection, truePhotonSelection, recoPhotonSelection, trueInvariantMassCalculations, recoInvariantMassCalculations
+from helpers.potService import sumPOT
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -21,9 +22,7 @@ targetPOTstring = "6.67e+20" #for plot axis titles
 
 # Calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-    potTree.GetEntry(i)
-    ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 # Define Histograms to be filled
 histMin = 750
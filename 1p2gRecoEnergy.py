@@ -3,6 +3,7 @@ import numpy as np
 import ROOT as rt
 
 from cuts import kineticEnergyCalculator, efficiencyPlot, histStackFill
+from helpers.potService import sumPOT
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -20,9 +21,7 @@ targetPOTstring = "6.67e+20" #for plot axis titles
 
 #calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-    potTree.GetEntry(i)
-    ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 #define histograms to fill
 trueSignalHist = rt.TH1F("trueSignalHist", "True NC 1 proton 2 gamma Events",60,0,1500)
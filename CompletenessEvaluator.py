@@ -7,6 +7,8 @@ rt.gROOT.SetBatch(True)
 from cuts import trueCutNC, trueCutFiducials,trueCutCosmic, truePhotonList, trueCutPionProton, histStack, recoNoVertex, recoFiducials, recoPhotonList, recoPionProton, recoNeutralCurrent, scaleRecoEnergy, scaleTrueEnergy, recoPion, recoProton, recoCutShowerFromChargeScore, recoCutLongTracks, recoPhotonListFiducial, recoCutPrimary, recoCutShortTracks, recoPhotonListTracks, recoCutFarShowers, trueCutMuons, trueCutElectrons, recoCutMuons, recoCutElectrons, recoCutManyTracks
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from helpers.potService import sumPOT, cosmicPOT
+from helpers.truthTable import EventTruth
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -31,11 +33,9 @@ targetPOT = 6.67e+20
 targetPOTstring = "6.67e+20"
 ntuplePOTsum = 0
 
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
-cosmicPOTsum = 3.2974607516739725e+20
+cosmicPOTsum = cosmicPOT(cosmicTree, fallbackPOT=3.2974607516739725e+20)
 
 #Hists created and organized here
 #TRACK HISTOGRAMS
@@ -325,148 +325,149 @@ for i in range(eventTree.GetEntries()):
   #  continue
 
   #Now we try to match reconstructed tracks to real ones
+  truth = EventTruth(eventTree)
+  trackTruthRows = truth.rows(eventTree.trackTrueTID)
+  showerTruthRows = truth.rows(eventTree.showerTrueTID)
   for x in range(eventTree.nTracks):
+    #Calculate particle energy using the truth-matched particle
+    y = int(trackTruthRows[x])
     particleEnergy = 0
-    for y in range(eventTree.nTrueSimParts):
-      #Calculate particle energy using the truth-matched particle
-      if eventTree.trackTrueTID[x] == eventTree.trueSimPartTID[y]:
-        particleEnergy = eventTree.trueSimPartE[y] - np.sqrt(abs(eventTree.trueSimPartE[y]**2 - (eventTree.trueSimPartPx[y]**2+eventTree.trueSimPartPy[y]**2+eventTree.trueSimPartPz[y]**2)))
-      #distxyz = np.sqrt((eventTree.trackStartPosX[x] - eventTree.trackEndPosX[x])**2 + (eventTree.trackStartPosY[x] - eventTree.trackEndPosY[x])**2 + (eventTree.trackStartPosZ[x] - eventTree.trackEndPosZ[x])**2)
-
-      #See if the track is a muon
-      if eventTree.trackTruePID[x] == 13:
-        #Get around a bug where the truth-matched particle only appears in truePrimParts
-        if particleEnergy == 0:
-          for y in range(len(eventTree.truePrimPartPDG)):
-            if eventTree.truePrimPartPDG[y] == 13:
-              particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
-              particleEnergy = particleEnergy/1000
-        #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
-        if eventTree.trackPID[x] == 13:
-          if particleEnergy > 100: 
-            addHistTracks(eventTree, x, UnderMuonHistList, histUnderMuonCompPurity, eventTree.xsecWeight)
-          else:
-            addHistTracks(eventTree, x, MuonHistList, histMuonCompPurity, eventTree.xsecWeight)
-
-        elif eventTree.trackPID[x] != 0:
-          if particleEnergy > 100:
-            addHistTracks(eventTree, x, DeadlyMuonHistList, histDeadlyMuonCompPurity, eventTree.xsecWeight)
-          else:
-            addHistTracks(eventTree, x, BenignMuonHistList, histBenignMuonCompPurity, eventTree.xsecWeight)
-
-
-      #See if the track is a pion
-      elif abs(eventTree.trackTruePID[x]) == 211:
-        #Get around a bug where the truth-matched particle only appears in truePrimParts
-        if particleEnergy == 0:
-          for y in range(len(eventTree.truePrimPartPDG)):
-            if abs(eventTree.truePrimPartPDG[y]) == 211:
-              particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
-              particleEnergy = particleEnergy/1000
-        #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
-        if eventTree.trackPID[x] == 211:
-          if particleEnergy >= 50: 
-            addHistTracks(eventTree, x, UnderPionHistList, histUnderPionCompPurity, eventTree.xsecWeight)
-          else:
-            addHistTracks(eventTree, x, PionHistList, histPionCompPurity, eventTree.xsecWeight)
-
-        elif eventTree.trackPID[x] != 0:
-          if particleEnergy >= 50:
-            addHistTracks(eventTree, x, DeadlyPionHistList, histDeadlyPionCompPurity, eventTree.xsecWeight)
-          else:
-            addHistTracks(eventTree, x, BenignPionHistList, histBenignPionCompPurity, eventTree.xsecWeight)
-
-      #See if the track is a proton
-      elif eventTree.trackTruePID[x] == 2212:
-        #Get around a bug where the truth-matched particle only appears in truePrimParts
-        if particleEnergy == 0:
-          for y in range(eventTree.nTruePrimParts):
-            if eventTree.truePrimPartPDG[y] == 2212:
-              particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
-              particleEnergy = particleEnergy/1000
-        #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
-        if eventTree.trackPID[x] == 2212:
-          if particleEnergy >= 100: 
-            addHistTracks(eventTree, x, UnderProtonHistList, histUnderProtonCompPurity, eventTree.xsecWeight)
-          else:
-            addHistTracks(eventTree, x, ProtonHistList, histProtonCompPurity, eventTree.xsecWeight)
-
-        elif eventTree.trackPID[x] != 0:
-          if particleEnergy >= 100:
-            addHistTracks(eventTree, x, DeadlyProtonHistList, histDeadlyProtonCompPurity, eventTree.xsecWeight)
-          else:
-            addHistTracks(eventTree, x, BenignProtonHistList, histBenignProtonCompPurity, eventTree.xsecWeight)
-      
-      #See if the track is just a figment of the reco's imagination
-      elif eventTree.trackTruePID[x] == 0: 
-        addHistTracks(eventTree, x, NotTrackHistList, histNotTrackCompPurity, eventTree.xsecWeight)
-
-      #Otherwise, it's something weird; we're just going to track the number of these, for now
-      else:
-        weirdEvent += 1
+    if y >= 0:
+      particleEnergy = eventTree.trueSimPartE[y] - np.sqrt(abs(eventTree.trueSimPartE[y]**2 - (eventTree.trueSimPartPx[y]**2+eventTree.trueSimPartPy[y]**2+eventTree.trueSimPartPz[y]**2)))
+    #distxyz = np.sqrt((eventTree.trackStartPosX[x] - eventTree.trackEndPosX[x])**2 + (eventTree.trackStartPosY[x] - eventTree.trackEndPosY[x])**2 + (eventTree.trackStartPosZ[x] - eventTree.trackEndPosZ[x])**2)
+
+    #See if the track is a muon
+    if eventTree.trackTruePID[x] == 13:
+      #Get around a bug where the truth-matched particle only appears in truePrimParts
+      if particleEnergy == 0:
+        for y in range(len(eventTree.truePrimPartPDG)):
+          if eventTree.truePrimPartPDG[y] == 13:
+            particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
+            particleEnergy = particleEnergy/1000
+      #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
+      if eventTree.trackPID[x] == 13:
+        if particleEnergy > 100: 
+          addHistTracks(eventTree, x, UnderMuonHistList, histUnderMuonCompPurity, eventTree.xsecWeight)
+        else:
+          addHistTracks(eventTree, x, MuonHistList, histMuonCompPurity, eventTree.xsecWeight)
+
+      elif eventTree.trackPID[x] != 0:
+        if particleEnergy > 100:
+          addHistTracks(eventTree, x, DeadlyMuonHistList, histDeadlyMuonCompPurity, eventTree.xsecWeight)
+        else:
+          addHistTracks(eventTree, x, BenignMuonHistList, histBenignMuonCompPurity, eventTree.xsecWeight)
+
+
+    #See if the track is a pion
+    elif abs(eventTree.trackTruePID[x]) == 211:
+      #Get around a bug where the truth-matched particle only appears in truePrimParts
+      if particleEnergy == 0:
+        for y in range(len(eventTree.truePrimPartPDG)):
+          if abs(eventTree.truePrimPartPDG[y]) == 211:
+            particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
+            particleEnergy = particleEnergy/1000
+      #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
+      if eventTree.trackPID[x] == 211:
+        if particleEnergy >= 50: 
+          addHistTracks(eventTree, x, UnderPionHistList, histUnderPionCompPurity, eventTree.xsecWeight)
+        else:
+          addHistTracks(eventTree, x, PionHistList, histPionCompPurity, eventTree.xsecWeight)
+
+      elif eventTree.trackPID[x] != 0:
+        if particleEnergy >= 50:
+          addHistTracks(eventTree, x, DeadlyPionHistList, histDeadlyPionCompPurity, eventTree.xsecWeight)
+        else:
+          addHistTracks(eventTree, x, BenignPionHistList, histBenignPionCompPurity, eventTree.xsecWeight)
+
+    #See if the track is a proton
+    elif eventTree.trackTruePID[x] == 2212:
+      #Get around a bug where the truth-matched particle only appears in truePrimParts
+      if particleEnergy == 0:
+        for y in range(eventTree.nTruePrimParts):
+          if eventTree.truePrimPartPDG[y] == 2212:
+            particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
+            particleEnergy = particleEnergy/1000
+      #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
+      if eventTree.trackPID[x] == 2212:
+        if particleEnergy >= 100: 
+          addHistTracks(eventTree, x, UnderProtonHistList, histUnderProtonCompPurity, eventTree.xsecWeight)
+        else:
+          addHistTracks(eventTree, x, ProtonHistList, histProtonCompPurity, eventTree.xsecWeight)
+
+      elif eventTree.trackPID[x] != 0:
+        if particleEnergy >= 100:
+          addHistTracks(eventTree, x, DeadlyProtonHistList, histDeadlyProtonCompPurity, eventTree.xsecWeight)
+        else:
+          addHistTracks(eventTree, x, BenignProtonHistList, histBenignProtonCompPurity, eventTree.xsecWeight)
+    
+    #See if the track is just a figment of the reco's imagination
+    elif eventTree.trackTruePID[x] == 0: 
+      addHistTracks(eventTree, x, NotTrackHistList, histNotTrackCompPurity, eventTree.xsecWeight)
+
+    #Otherwise, it's something weird; we're just going to track the number of these, for now
+    else:
+      weirdEvent += 1
 
 
-  #NOW WE ITERATE OVER SHOWERS
   for x in range(eventTree.nShowers):
+    y = int(showerTruthRows[x])
     particleEnergy = 0
-    for y in range(eventTree.nTrueSimParts):
-      #Calculate particle energy using the truth-matched particle
-      if eventTree.showerTrueTID[x] == eventTree.trueSimPartTID[y]:
-        particleEnergy = eventTree.trueSimPartE[y]
-      #distxyz = np.sqrt((eventTree.trackStartPosX[x] - eventTree.trackEndPosX[x])**2 + (eventTree.trackStartPosY[x] - eventTree.trackEndPosY[x])**2 + (eventTree.trackStartPosZ[x] - eventTree.trackEndPosZ[x])**2)
-
-      #See if the track is a photon
-      if eventTree.showerTruePID[x] == 22:
-        #Get around a bug where the truth-matched particle only appears in truePrimParts
-        if particleEnergy == 0:
-          for y in range(len(eventTree.truePrimPartPDG)):
-            if eventTree.truePrimPartPDG[y] == 22:
-              particleEnergy = eventTree.truePrimPartE[y]
-
-        #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
-        if eventTree.showerPID[x] == 22:
-          if particleEnergy >= 20: 
-            addHistShowers(eventTree, x, UnderPhotonHistList, histUnderPhotonCompPurity, eventTree.xsecWeight)
-          else:
-            addHistShowers(eventTree, x, PhotonHistList, histPhotonCompPurity, eventTree.xsecWeight)
-
-        elif eventTree.showerPID[x] != 0:
-          if particleEnergy >= 20:
-            addHistShowers(eventTree, x, DeadlyPhotonHistList, histDeadlyPhotonCompPurity, eventTree.xsecWeight)
-          else:
-            addHistShowers(eventTree, x, BenignPhotonHistList, histBenignPhotonCompPurity, eventTree.xsecWeight)
-
-
-      #See if the track is a electron
-      elif abs(eventTree.showerTruePID[x]) == 11:
-        #Get around a bug where the truth-matched particle only appears in truePrimParts
-        if particleEnergy == 0:
-          for y in range(len(eventTree.truePrimPartPDG)):
-            if abs(eventTree.truePrimPartPDG[y]) == 211:
-              particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
-              particleEnergy = particleEnergy/1000
-        
-        #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
-        if eventTree.showerPID[x] == 11:
-          if particleEnergy >= 10: 
-            addHistShowers(eventTree, x, UnderElectronHistList, histUnderElectronCompPurity, eventTree.xsecWeight)
-          else:
-            addHistShowers(eventTree, x, ElectronHistList, histElectronCompPurity, eventTree.xsecWeight)
-
-        elif eventTree.showerPID[x] != 0:
-          if particleEnergy >= 10:
-            addHistShowers(eventTree, x, DeadlyElectronHistList, histDeadlyElectronCompPurity, eventTree.xsecWeight)
-          else:
-            addHistShowers(eventTree, x, BenignElectronHistList, histBenignElectronCompPurity, eventTree.xsecWeight)
-
-
-      #See if the shower is just a figment of the reco's imagination
-      elif eventTree.showerTruePID[x] == 0: 
-        addHistShowers(eventTree, x, NotShowerHistList, histNotShowerCompPurity, eventTree.xsecWeight)
-
-      #Otherwise, it's something weird; we're just going to track the number of these, for now
-      else:
-        weirdEvent += 1
+    if y >= 0:
+      particleEnergy = eventTree.trueSimPartE[y]
+    #distxyz = np.sqrt((eventTree.trackStartPosX[x] - eventTree.trackEndPosX[x])**2 + (eventTree.trackStartPosY[x] - eventTree.trackEndPosY[x])**2 + (eventTree.trackStartPosZ[x] - eventTree.trackEndPosZ[x])**2)
+
+    #See if the track is a photon
+    if eventTree.showerTruePID[x] == 22:
+      #Get around a bug where the truth-matched particle only appears in truePrimParts
+      if particleEnergy == 0:
+        for y in range(len(eventTree.truePrimPartPDG)):
+          if eventTree.truePrimPartPDG[y] == 22:
+            particleEnergy = eventTree.truePrimPartE[y]
+
+      #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
+      if eventTree.showerPID[x] == 22:
+        if particleEnergy >= 20: 
+          addHistShowers(eventTree, x, UnderPhotonHistList, histUnderPhotonCompPurity, eventTree.xsecWeight)
+        else:
+          addHistShowers(eventTree, x, PhotonHistList, histPhotonCompPurity, eventTree.xsecWeight)
+
+      elif eventTree.showerPID[x] != 0:
+        if particleEnergy >= 20:
+          addHistShowers(eventTree, x, DeadlyPhotonHistList, histDeadlyPhotonCompPurity, eventTree.xsecWeight)
+        else:
+          addHistShowers(eventTree, x, BenignPhotonHistList, histBenignPhotonCompPurity, eventTree.xsecWeight)
+
+
+    #See if the track is a electron
+    elif abs(eventTree.showerTruePID[x]) == 11:
+      #Get around a bug where the truth-matched particle only appears in truePrimParts
+      if particleEnergy == 0:
+        for y in range(len(eventTree.truePrimPartPDG)):
+          if abs(eventTree.truePrimPartPDG[y]) == 211:
+            particleEnergy = eventTree.truePrimPartE[y] - np.sqrt(abs(eventTree.truePrimPartE[y]**2 - (eventTree.truePrimPartPx[y]**2+eventTree.truePrimPartPy[y]**2+eventTree.truePrimPartPz[y]**2)))
+            particleEnergy = particleEnergy/1000
+      
+      #See if Reco was able to identify it correctly, and if so, if it got the energy right (to the extent that it matters)
+      if eventTree.showerPID[x] == 11:
+        if particleEnergy >= 10: 
+          addHistShowers(eventTree, x, UnderElectronHistList, histUnderElectronCompPurity, eventTree.xsecWeight)
+        else:
+          addHistShowers(eventTree, x, ElectronHistList, histElectronCompPurity, eventTree.xsecWeight)
+
+      elif eventTree.showerPID[x] != 0:
+        if particleEnergy >= 10:
+          addHistShowers(eventTree, x, DeadlyElectronHistList, histDeadlyElectronCompPurity, eventTree.xsecWeight)
+        else:
+          addHistShowers(eventTree, x, BenignElectronHistList, histBenignElectronCompPurity, eventTree.xsecWeight)
+
+
+    #See if the shower is just a figment of the reco's imagination
+    elif eventTree.showerTruePID[x] == 0: 
+      addHistShowers(eventTree, x, NotShowerHistList, histNotShowerCompPurity, eventTree.xsecWeight)
+
+    #Otherwise, it's something weird; we're just going to track the number of these, for now
+    else:
+      weirdEvent += 1
 
 
 
@@ -0,0 +1,2 @@
+#Analysis plugins for helpers/analysisRunner.py; importing the package registers every plugin in analysisRegistry
+from analyses import ncPiZero, cutFlow1g1p, darkSurvey, npNgReco, combined1p2g
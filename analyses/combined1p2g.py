@@ -0,0 +1,176 @@
+#1p2g efficiency and purity breakdowns (maxPrograms/1p2gCombined.py) as a runner plugin
+#The script read the ntuple twice, once per breakdown; here both passes share one SelectionCache per entry
+import ROOT as rt
+
+from cuts import histStackFill
+from selection_1p2g import SelectionCache
+from helpers.histograms import Histogram1D
+from helpers.analysisRunner import Analysis, registerAnalysis
+
+
+@registerAnalysis
+class Combined1p2gAnalysis(Analysis):
+  name = "combined1p2g"
+  defaultOutfile = "1p2gCombinedOutputNewPhoton.root"
+  branches = ["xsecWeight", "foundVertex", "trueNuCCNC", "trueVtxX", "trueVtxY", "trueVtxZ", "vtxX", "vtxY", "vtxZ", "vtxFracHitsOnCosmic", "vtxMaxIntimePixelSum",
+              "truePrimPartPDG", "truePrimPartE", "truePrimPartPx", "truePrimPartPy", "truePrimPartPz",
+              "nTrueSimParts", "trueSimPartTID", "trueSimPartPDG", "trueSimPartProcess", "trueSimPartE",
+              "trueSimPartPx", "trueSimPartPy", "trueSimPartPz", "trueSimPartX", "trueSimPartY", "trueSimPartZ",
+              "trueSimPartEDepX", "trueSimPartEDepY", "trueSimPartEDepZ", "trueSimPartPixelSumYplane",
+              "nTracks", "trackClassified", "trackIsSecondary", "trackPID", "trackRecoE", "trackTrueTID",
+              "nShowers", "showerIsSecondary", "showerPID", "showerRecoE", "showerTrueTID", "showerStartPosX", "showerStartPosY", "showerStartPosZ"]
+
+  def begin(self, context):
+    self.fiducialWidth = self.options.get("fiducialWidth", 10)
+    xMax = 1500
+    self.trueTotalHist = Histogram1D("trueTotalHist", "All True Signal Events", 60, 0, xMax)
+    self.recoNoVertexHist = Histogram1D("NoVertexFound", "Vertex not reconstructed", 60, 0, xMax)
+    self.recoOutFiducialHist = Histogram1D("outsideFiducial", "Vertex reconstructed outside fiducial volume", 60, 0, xMax)
+    self.recoCCHist = Histogram1D("recoCC", "Event reconstructed as charged-current", 60, 0, xMax)
+    self.recoPiPlusHist = Histogram1D("recoPiPlus", "Charged pion reconstructed", 60, 0, xMax)
+    self.recoNoProtonHist = Histogram1D("recoNoProton", "No proton reconstructed", 60, 0, xMax)
+    self.recoPluralProtonHist = Histogram1D("recoPluralProton", "2+ protons reconstructed", 60, 0, xMax)
+    self.recoNoPhotonHist = Histogram1D("recoNoPhoton", "No photon reconstructed", 60, 0, xMax)
+    self.recoOnePhotonHist = Histogram1D("recoOnePhoton", "One photon reconstructed", 60, 0, xMax)
+    self.recoManyPhotonHist = Histogram1D("recoManyPhoton", "3+ photons reconstructed", 60, 0, xMax)
+    self.recoSignalHist = Histogram1D("recoSignal", "1p2g successfully reconstructed", 60, 0, xMax)
+
+    self.recoTotalHist = Histogram1D("recoTotalHist", "All Reco Signal Events", 60, 0, xMax)
+    self.trueOutFiducialHist = Histogram1D("trueOutsideFiducial", "True vertex outside fiducial volume", 60, 0, xMax)
+    self.trueCCHist = Histogram1D("trueCC", "True event charged-current", 60, 0, xMax)
+    self.truePiPlusHist = Histogram1D("truePiPlus", "True charged pion", 60, 0, xMax)
+    self.trueNoProtonHist = Histogram1D("trueNoProton", "No true proton", 60, 0, xMax)
+    self.truePluralProtonHist = Histogram1D("truePluralProton", "2+ true protons", 60, 0, xMax)
+    self.trueNoPhotonHist = Histogram1D("trueNoPhoton", "No true photon", 60, 0, xMax)
+    self.trueOnePhotonHist = Histogram1D("trueOnePhoton", "One true photon", 60, 0, xMax)
+    self.trueManyPhotonHist = Histogram1D("trueManyPhoton", "3+ true photons", 60, 0, xMax)
+    self.trueSignalHist = Histogram1D("trueSignal", "1p2g successfully reconstructed", 60, 0, xMax)
+
+  def processEntry(self, eventTree):
+    selections = SelectionCache(eventTree, self.fiducialWidth)
+    self.efficiencyPass(selections)
+    self.purityPass(selections)
+
+  def efficiencyPass(self, selections):
+    eventTree = selections.eventTree
+    if selections.trueCC():
+      return
+    if selections.trueOutsideFiducial():
+      return
+    if eventTree.vtxFracHitsOnCosmic >= 1.:
+      return
+    if selections.truePiPlus():
+      return
+    nTrueProtons = selections.trueProtons()[0]
+    if nTrueProtons != 1:
+      return
+    truePhotonTIDList, trueLeadingPhotonEnergy = selections.truePhotons()[:2]
+    if len(truePhotonTIDList) != 2:
+      return
+
+    weight = eventTree.xsecWeight
+    self.trueTotalHist.Fill(trueLeadingPhotonEnergy, weight)
+
+    #Reco matching
+    if eventTree.foundVertex == 0:
+      self.recoNoVertexHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    recoPhotonTIDList = selections.recoPhotons()[0]
+    if len(recoPhotonTIDList) == 0:
+      self.recoNoPhotonHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    if len(recoPhotonTIDList) == 1:
+      self.recoOnePhotonHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    if len(recoPhotonTIDList) >= 3:
+      self.recoManyPhotonHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    if selections.recoCC():
+      self.recoCCHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    if selections.recoOutsideFiducial():
+      self.recoOutFiducialHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    if selections.recoPiPlus():
+      self.recoPiPlusHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    nRecoProtons = selections.recoProtons()[0]
+    if nRecoProtons == 0:
+      self.recoNoProtonHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    if nRecoProtons >= 2:
+      self.recoPluralProtonHist.Fill(trueLeadingPhotonEnergy, weight)
+      return
+    self.recoSignalHist.Fill(trueLeadingPhotonEnergy, weight)
+
+  def purityPass(self, selections):
+    eventTree = selections.eventTree
+    if selections.recoCC():
+      return
+    if selections.recoOutsideFiducial():
+      return
+    if eventTree.vtxFracHitsOnCosmic >= 1.:
+      return
+    if selections.recoPiPlus():
+      return
+    nRecoProtons = selections.recoProtons()[0]
+    if nRecoProtons != 1:
+      return
+    recoPhotonTIDList, recoLeadingPhotonEnergy = selections.recoPhotons()[:2]
+    if len(recoPhotonTIDList) != 2:
+      return
+
+    weight = eventTree.xsecWeight
+    self.recoTotalHist.Fill(recoLeadingPhotonEnergy, weight)
+
+    #Truth matching
+    truePhotonTIDList = selections.truePhotons()[0]
+    if len(truePhotonTIDList) == 0:
+      self.trueNoPhotonHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    if len(truePhotonTIDList) == 1:
+      self.trueOnePhotonHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    if len(truePhotonTIDList) >= 3:
+      self.trueManyPhotonHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    if selections.trueCC():
+      self.trueCCHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    if selections.trueOutsideFiducial():
+      self.trueOutFiducialHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    if selections.truePiPlus():
+      self.truePiPlusHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    nTrueProtons = selections.trueProtons()[0]
+    if nTrueProtons == 0:
+      self.trueNoProtonHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    if nTrueProtons >= 2:
+      self.truePluralProtonHist.Fill(recoLeadingPhotonEnergy, weight)
+      return
+    self.trueSignalHist.Fill(recoLeadingPhotonEnergy, weight)
+
+  def finish(self, context):
+    ntuplePOTsum = context["ntuplePOT"]
+    trueTotalInt = self.trueTotalHist.Integral(1, 60)
+    recoTotalInt = self.recoTotalHist.Integral(1, 60)
+    if trueTotalInt > 0:
+      print("Efficiency: " + str(self.recoSignalHist.Integral(1, 60) / trueTotalInt * 100) + "%")
+    if recoTotalInt > 0:
+      print("Purity: " + str(self.trueSignalHist.Integral(1, 60) / recoTotalInt * 100) + "%")
+
+    efficiencyHistList = [self.recoSignalHist, self.recoNoVertexHist, self.recoNoPhotonHist, self.recoOnePhotonHist, self.recoManyPhotonHist, self.recoCCHist,
+                          self.recoOutFiducialHist, self.recoPiPlusHist, self.recoNoProtonHist, self.recoPluralProtonHist]
+    purityHistList = [self.trueSignalHist, self.trueNoPhotonHist, self.trueOnePhotonHist, self.trueManyPhotonHist, self.trueCCHist,
+                      self.trueOutFiducialHist, self.truePiPlusHist, self.trueNoProtonHist, self.truePluralProtonHist]
+    efficiencyCanvas, efficiencyStack, efficiencyLegend, efficiencyInt = \
+      histStackFill("Reconstruction of True NC 1p2g Events", efficiencyHistList, "Total Truth Signal: (", "True Leading Photon Energy (MeV)", "Events per 6.67e+20 POT", ntuplePOTsum)
+    purityCanvas, purityStack, purityLegend, purityInt = \
+      histStackFill("Truth-Matching of Reconstructed NC 1p2g Events", purityHistList, "Total Reconstruction Signal: (", "Reconstructed Leading Photon Energy (MeV)", "Events per 6.67e+20 POT", ntuplePOTsum)
+
+    outFile = rt.TFile(self.outfile, "RECREATE")
+    efficiencyCanvas.Write("EfficiencyHist")
+    purityCanvas.Write("PurityHist")
+    outFile.Close()
@@ -0,0 +1,41 @@
+#Weighted cut flow and N-1 table of the 1g1p reco selection (selection_1g1p.py), filled batch by batch
+import ROOT as rt
+
+from selection_1g1p import reco_1g1p_cutflow
+from helpers.analysisRunner import BatchAnalysis, registerAnalysis
+from helpers.cutFlow import CutFlowTable
+
+
+@registerAnalysis
+class CutFlow1g1pAnalysis(BatchAnalysis):
+  name = "cutFlow1g1p"
+  defaultOutfile = "cutFlow1g1p.root"
+  branches = ["xsecWeight", "foundVertex", "vtxX", "vtxY", "vtxZ", "vtxFracHitsOnCosmic", "vtxMaxIntimePixelSum",
+              "nTracks", "trackClassified", "trackProcess", "trackPID", "trackRecoE", "trackSize", "trackComp", "trackFromChargedScore", "trackPrimaryScore",
+              "trackStartPosX", "trackStartPosY", "trackStartPosZ", "trackEndPosX", "trackEndPosY", "trackEndPosZ",
+              "nShowers", "showerClassified", "showerProcess", "showerPID", "showerRecoE", "showerSize", "showerComp", "showerFromChargedScore", "showerPrimaryScore",
+              "showerStartPosX", "showerStartPosY", "showerStartPosZ"]
+
+  def begin(self, context):
+    fiducialData = self.options.get("fiducialData", {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":15, "photonWidth":3})
+    self.cutflow = reco_1g1p_cutflow(self.options.get("classificationThreshold", 0), fiducialData)
+    self.table = CutFlowTable(self.cutflow.cutNames(), "1g1p reco")
+
+  def processBatch(self, batch):
+    self.table.fill(self.cutflow.runBatch(batch, batch["xsecWeight"]))
+
+  def finish(self, context):
+    self.table.printTable()
+    cutNames = ["all events"] + self.table.cutNames
+    flowHist = rt.TH1D("cutFlow1g1p", "1g1p reco cut flow;;weighted events", len(cutNames), 0, len(cutNames))
+    nMinusOneHist = rt.TH1D("nMinusOne1g1p", "1g1p reco N-1;;weighted events passing all other cuts", len(cutNames)-1, 0, len(cutNames)-1)
+    for i, name in enumerate(cutNames):
+      flowHist.SetBinContent(i+1, self.table.weightedFlow[i])
+      flowHist.GetXaxis().SetBinLabel(i+1, name)
+    for i, name in enumerate(self.table.cutNames):
+      nMinusOneHist.SetBinContent(i+1, self.table.weightedNMinusOne[i])
+      nMinusOneHist.GetXaxis().SetBinLabel(i+1, name)
+    outFile = rt.TFile(self.outfile, "RECREATE")
+    flowHist.Write()
+    nMinusOneHist.Write()
+    outFile.Close()
@@ -0,0 +1,72 @@
+#Particle multiplicity survey (darkSurvey.py) as a runner plugin: how many events hold none, one, two or three or more
+#true and reco electrons, photons, muons, pions and protons, plus the hit count of every reco shower
+import ROOT as rt
+
+from helpers.histograms import Histogram1D
+from helpers.analysisRunner import Analysis, registerAnalysis
+
+#(singular, plural, |PDG code|) in the order the tallies are printed
+particleTypes = [("electron", "electrons", 11), ("photon", "photons", 22), ("muon", "muons", 13), ("pion", "pions", 211), ("proton", "protons", 2212)]
+
+
+def tallyLine(counts, verb, singular, plural):
+  #print() arguments for one row of the summary: counts[0] verb no plural, counts[1] verb one singular, ...
+  return [counts[0], verb, "no " + plural + ",", counts[1], verb, "one " + singular + ",",
+          counts[2], verb, "two " + plural + ", and", counts[3], verb, "three or more " + plural + "."]
+
+
+@registerAnalysis
+class DarkSurveyAnalysis(Analysis):
+  name = "darkSurvey"
+  defaultOutfile = "example_ntuple_analysis_script_output.root"
+  branches = ["foundVertex", "nTrueSimParts", "trueSimPartPDG", "nShowers", "showerClassified", "showerPID", "showerNHits", "nTracks", "trackPID"]
+
+  def begin(self, context):
+    self.showerHits = Histogram1D("showerHits", "ShowerNHits Values", 60, 0, 4000)
+    #Number of events with 0, 1, 2 and 3+ particles of each type
+    self.trueCounts = dict((pdg, [0, 0, 0, 0]) for singular, plural, pdg in particleTypes)
+    self.recoCounts = dict((pdg, [0, 0, 0, 0]) for singular, plural, pdg in particleTypes)
+    self.vertexFound = 0
+    self.showerClassified = 0
+
+  def processEntry(self, eventTree):
+    if eventTree.foundVertex == 1:
+      self.vertexFound += 1
+
+    trueCount = dict((pdg, 0) for singular, plural, pdg in particleTypes)
+    recoCount = dict((pdg, 0) for singular, plural, pdg in particleTypes)
+    for x in range(eventTree.nTrueSimParts):
+      pdg = abs(eventTree.trueSimPartPDG[x])
+      if pdg in trueCount:
+        trueCount[pdg] += 1
+
+    for x in range(eventTree.nShowers):
+      if eventTree.showerClassified[x] != 0:
+        self.showerClassified += 1
+        print(eventTree.showerPID[x])
+      self.showerHits.Fill(eventTree.showerNHits[x], 1)
+      pdg = abs(eventTree.showerPID[x])
+      if pdg in recoCount:
+        recoCount[pdg] += 1
+
+    for x in range(eventTree.nTracks):
+      pdg = abs(eventTree.trackPID[x])
+      if pdg in recoCount:
+        recoCount[pdg] += 1
+
+    for pdg in trueCount:
+      self.trueCounts[pdg][min(trueCount[pdg], 3)] += 1
+      self.recoCounts[pdg][min(recoCount[pdg], 3)] += 1
+
+  def finish(self, context):
+    print("There were", context["nEntries"], "events. We found vertices for", self.vertexFound, "of them")
+    for i, (singular, plural, pdg) in enumerate(particleTypes):
+      print(*((["Of these,"] if i == 0 else []) + tallyLine(self.trueCounts[pdg], "contained", singular, plural)))
+    print("In terms of Reco:")
+    for singular, plural, pdg in particleTypes:
+      print(*tallyLine(self.recoCounts[pdg], "were reconstructed with", singular, plural))
+    print("There were", self.showerClassified, "Classified showers")
+
+    outFile = rt.TFile(self.outfile, "RECREATE")
+    self.showerHits.Write()
+    outFile.Close()
@@ -0,0 +1,105 @@
+#NC pi0 efficiency counts and purity breakdown (NCPiZero.py) as a runner plugin
+import ROOT as rt
+
+from cuts import truePhotonSelectionPiZero, histStackFill
+from selection_1p2g import SelectionCache
+from helpers.histograms import Histogram1D
+from helpers.analysisRunner import Analysis, registerAnalysis
+
+
+@registerAnalysis
+class NCPiZeroAnalysis(Analysis):
+  name = "ncPiZero"
+  defaultOutfile = "NCPiZeroSignal.root"
+  branches = ["xsecWeight", "trueNuCCNC", "trueVtxX", "trueVtxY", "trueVtxZ", "vtxX", "vtxY", "vtxZ", "vtxFracHitsOnCosmic", "vtxMaxIntimePixelSum",
+              "nTrueSimParts", "trueSimPartTID", "trueSimPartMID", "trueSimPartPDG", "trueSimPartProcess", "trueSimPartE",
+              "trueSimPartPx", "trueSimPartPy", "trueSimPartPz", "trueSimPartX", "trueSimPartY", "trueSimPartZ",
+              "trueSimPartEDepX", "trueSimPartEDepY", "trueSimPartEDepZ", "trueSimPartPixelSumYplane",
+              "nTracks", "trackClassified", "trackIsSecondary", "trackPID", "trackRecoE", "trackTrueTID",
+              "nShowers", "showerIsSecondary", "showerPID", "showerRecoE", "showerTrueTID", "showerStartPosX", "showerStartPosY", "showerStartPosZ"]
+
+  def begin(self, context):
+    self.fiducialWidth = self.options.get("fiducialWidth", 10)
+    self.targetPOT = 6.67e+20
+    purityxMax = 1500
+    self.recoTotalHist = Histogram1D("recoTotalHist", "All Reco Signal Events", 60, 0, purityxMax)
+    self.trueOutFiducialHist = Histogram1D("trueOutsideFiducial", "True vertex outside fiducial volume", 60, 0, purityxMax)
+    self.trueCCHist = Histogram1D("trueCC", "True event charged-current", 60, 0, purityxMax)
+    self.trueNoPhotonHist = Histogram1D("trueNoPhoton", "No true photon", 60, 0, purityxMax)
+    self.trueSignalHist = Histogram1D("trueSignal", "1p2g successfully reconstructed", 60, 0, purityxMax)
+    self.trueSignal = 0
+    self.final0p1g, self.final1p1g, self.final0p2g, self.final1p2g = 0, 0, 0, 0
+
+  def processEntry(self, eventTree):
+    selections = SelectionCache(eventTree, self.fiducialWidth, truePhotonFunction=truePhotonSelectionPiZero)
+    self.efficiencyPass(selections)
+    self.purityPass(selections)
+
+  def efficiencyPass(self, selections):
+    if selections.trueCC():
+      return
+    if selections.trueOutsideFiducial():
+      return
+    truePhotonTIDList, trueLeadingPhotonEnergy = selections.truePhotons()
+    if len(truePhotonTIDList) == 0:
+      return
+
+    nTrueProtons, trueProtonTID = selections.trueProtons()[:2]
+    self.trueSignal += 1
+    if len(truePhotonTIDList) == 1 and nTrueProtons == 0:
+      self.final0p1g += 1
+    if len(truePhotonTIDList) == 1 and nTrueProtons == 1:
+      self.final1p1g += 1
+    if len(truePhotonTIDList) == 2 and nTrueProtons == 0:
+      self.final0p2g += 1
+    if len(truePhotonTIDList) == 2 and nTrueProtons == 1:
+      self.final1p2g += 1
+
+  def purityPass(self, selections):
+    eventTree = selections.eventTree
+    if selections.recoCC():
+      return
+    if selections.recoOutsideFiducial():
+      return
+    if eventTree.vtxFracHitsOnCosmic >= 1.:
+      return
+    if selections.recoPiPlus():
+      return
+    nRecoProtons, recoProtonTID = selections.recoProtons()[:2]
+    if nRecoProtons != 1:
+      return
+    recoPhotonTIDList, recoLeadingPhotonEnergy = selections.recoPhotons()[:2]
+    if len(recoPhotonTIDList) != 2:
+      return
+
+    self.recoTotalHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
+
+    #Truth matching
+    if selections.trueCC():
+      self.trueCCHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
+      return
+    if selections.trueOutsideFiducial():
+      self.trueOutFiducialHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
+      return
+    truePhotonTIDList, trueLeadingPhotonEnergy = selections.truePhotons()
+    if len(truePhotonTIDList) == 0:
+      self.trueNoPhotonHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
+      return
+    self.trueSignalHist.Fill(recoLeadingPhotonEnergy, eventTree.xsecWeight)
+
+  def finish(self, context):
+    ntuplePOTsum = context["ntuplePOT"]
+    purityHistList = [self.trueSignalHist, self.trueCCHist, self.trueOutFiducialHist, self.trueNoPhotonHist]
+    purityCanvas, purityStack, purityLegend, purityInt = \
+      histStackFill("Truth-Matching of Reconstructed NC 1p2g Events", purityHistList, "Total Reconstruction Signal: (", "Reconstructed Leading Photon Energy (MeV)", "Events per 6.67e+20 POT", ntuplePOTsum)
+
+    outFile = rt.TFile(self.outfile, "RECREATE")
+    purityCanvas.Write("PurityHist")
+    outFile.Close()
+
+    print(str(self.trueSignal * self.targetPOT/ntuplePOTsum) + " pi0 per 6.67e+20")
+    if self.trueSignal > 0:
+      print(str(self.final0p1g/self.trueSignal*100) + " percent 0p1g")
+      print(str(self.final0p2g/self.trueSignal*100) + " percent 0p2g")
+      print(str(self.final1p1g/self.trueSignal*100) + " percent 1p1g")
+      print(str(self.final1p2g/self.trueSignal*100) + " percent 1p2g")
@@ -0,0 +1,103 @@
+#Reco proton multiplicity of NC-like events with 1, 2 and 3+ reco photons (maxPrograms/NpNgReco.py) as a runner plugin
+#Options: nBins (24) of the 0-6 proton axis, energyThresholds (True: only pi+ tracks from 30 MeV and protons from 60 MeV
+#count), logy (True) and stackTitle; maxPrograms/NpNgRecoStacked.py runs it with 60 bins, no thresholds and a linear axis
+import ROOT as rt
+
+from helpers.histograms import Histogram1D
+from helpers.analysisRunner import Analysis, registerAnalysis
+
+xMin, xMax = 0, 256
+yMin, yMax = -116.5, 116.5
+zMin, zMax = 0, 1036
+
+
+@registerAnalysis
+class NpNgRecoAnalysis(Analysis):
+  name = "npNgReco"
+  defaultOutfile = "NpNgRecoLogged.root"
+  branches = ["xsecWeight", "foundVertex", "vtxX", "vtxY", "vtxZ", "vtxFracHitsOnCosmic",
+              "nTracks", "trackIsSecondary", "trackPID", "trackRecoE", "nShowers", "showerPID"]
+
+  def begin(self, context):
+    self.fiducialWidth = self.options.get("fiducialWidth", 10)
+    self.energyThresholds = self.options.get("energyThresholds", True)
+    self.targetPOT = 6.67e+20
+    nBins = self.options.get("nBins", 24)
+    self.photonHists = [Histogram1D("1Photon_nProtonHist", "Energy of NC events with N proton(s) and 1 photon", nBins, 0, 6),
+                        Histogram1D("2Photon_nProtonHist", "Energy of NC events with N proton(s) and 2 photons", nBins, 0, 6),
+                        Histogram1D("3Photon_nProtonHist", "Energy of NC events with N proton(s) and 3+ photons", nBins, 0, 6)]
+
+  def processEntry(self, eventTree):
+    if eventTree.foundVertex != 1:
+      return
+
+    #reco fiducial cut
+    width = self.fiducialWidth
+    if eventTree.vtxX <= (xMin + width) or eventTree.vtxX >= (xMax - width) or \
+       eventTree.vtxY <= (yMin + width) or eventTree.vtxY >= (yMax - width) or \
+       eventTree.vtxZ <= (zMin + width) or eventTree.vtxZ >= (zMax - width):
+      return
+
+    #reco cosmic cut
+    if eventTree.vtxFracHitsOnCosmic >= 1.:
+      return
+
+    #reco charged-current cut: non-secondary tracks identified as muons or electrons
+    #(the script also looped over primary electron showers, but compared instead of assigning, so that cut never fired)
+    for i in range(eventTree.nTracks):
+      if eventTree.trackIsSecondary[i] == 0 and abs(eventTree.trackPID[i]) in (13, 11):
+        return
+
+    #reco pi+ veto
+    for i in range(eventTree.nTracks):
+      if abs(eventTree.trackPID[i]) == 211 and (not self.energyThresholds or eventTree.trackRecoE[i] >= 30):
+        return
+
+    #reco protons
+    nProtons = 0
+    for i in range(eventTree.nTracks):
+      if abs(eventTree.trackPID[i]) == 2212 and (not self.energyThresholds or eventTree.trackRecoE[i] >= 60):
+        nProtons += 1
+    if nProtons == 0:
+      return
+
+    #reco photons
+    nPhotons = 0
+    for i in range(eventTree.nShowers):
+      if eventTree.showerPID[i] == 22:
+        nPhotons += 1
+    if nPhotons == 0:
+      return
+
+    self.photonHists[min(nPhotons, 3) - 1].Fill(nProtons, eventTree.xsecWeight)
+
+  def finish(self, context):
+    targetPOTstring = "6.67e+20"
+    stack = rt.THStack("stackedHist", self.options.get("stackTitle", "NC Events, N Gamma + N Proton"))
+    legend = rt.TLegend(0.5, 0.65, 0.9, 0.9)
+    labels = ["1 secondary photon,", "2 secondary photons,", "3+ secondary photons,"]
+    for hist, kColor, label in zip(self.photonHists, [rt.kRed, rt.kCyan, rt.kGreen], labels):
+      hist.scale(self.targetPOT/context["ntuplePOT"])
+      th1 = hist.toTH1()
+      th1.GetYaxis().SetTitle("events per " + targetPOTstring + " POT")
+      th1.GetXaxis().SetTitle("energy (GeV)")
+      th1.SetLineWidth(2)
+      th1.SetFillColor(kColor)
+      th1.SetMarkerStyle(21)
+      th1.SetMarkerColor(kColor)
+      stack.Add(th1)
+      integral = round(hist.Integral(0, hist.GetNbinsX()), 2)
+      legend.AddEntry(th1, "#splitline{" + label + "}" + "{" + str(integral) + " events per " + targetPOTstring + " POT}", "f")
+
+    histCanvas = rt.TCanvas()
+    stack.Draw("HIST")
+    stack.GetXaxis().SetTitle("Number of Protons")
+    stack.GetYaxis().SetTitle("events per " + targetPOTstring + " POT")
+    legend.Draw()
+    if self.options.get("logy", True):
+      rt.gPad.SetLogy(1)
+    rt.gPad.Update()
+
+    outFile = rt.TFile(self.outfile, "RECREATE")
+    histCanvas.Write()
+    outFile.Close()
@@ -0,0 +1,306 @@
+#Column-batch versions of the cuts.py functions
+#Each function takes an EventColumns batch (helpers/columnLoader.py) in place of ntuple and gives, for every event of the
+#batch at once, what the cuts.py function of the same name returns for that event: a boolean mask for the True/False
+#cuts, a count array for the counting functions, and a per-object JaggedArray mask in place of the index lists
+#Values are compared in double precision, as PyROOT hands them to the per-event functions
+import numpy as np
+
+from fiducial import insideFiducial, fiducialSpec
+from helpers.columnLoader import JaggedArray
+from helpers.truthTable import TruthTable
+
+
+def values(batch, name):
+  #Scalar branch, or the content of a per-object branch, as float64
+  column = batch[name]
+  if hasattr(column, "content"):
+    column = column.content
+  return np.asarray(column, dtype=np.float64)
+
+
+def perObject(batch, name, content):
+  #Wraps a per-object array (one value per track or shower) in the structure of the jagged branch name
+  return batch[name].withContent(content)
+
+
+def objectInside(batch, prefix, fiducial, width, bottomless=False):
+  return insideFiducial(values(batch, prefix+"X"), values(batch, prefix+"Y"), values(batch, prefix+"Z"), fiducial, width, bottomless)
+
+
+def objectSelected(batch, kind, threshold):
+  #The object preselection the reco cuts share: classified objects when threshold is 0, otherwise objects over threshold in size
+  if threshold == 0:
+    return batch[kind+"Classified"].content == 1
+  return batch[kind+"Size"].content > threshold
+
+
+def singleCandidateCut(showerList, trackList, showerValues, trackValues, fails):
+  #For the single-photon cuts: events with exactly one photon candidate (shower or track) fail when fails(value) holds
+  #for that candidate; events with any other number of candidates pass
+  nShowers, nTracks = showerList.countTrue(), trackList.countTrue()
+  showerFails = showerList.withContent(showerList.content & fails(showerValues)).any()
+  trackFails = trackList.withContent(trackList.content & fails(trackValues)).any()
+  single = (nShowers + nTracks) == 1
+  return ~(single & (((nShowers == 1) & showerFails) | ((nTracks == 1) & trackFails)))
+
+
+def selectObjects(jagged, mask):
+  #The elements of jagged where the per-object mask is True, keeping one (possibly empty) list per event
+  return JaggedArray.fromCounts(jagged.withContent(mask).countTrue(), jagged.content[mask])
+
+
+#TRUTH FUNCTIONS
+def trueCutCosmic(batch):
+  return values(batch, "vtxFracHitsOnCosmic") < 1
+
+
+#TRUTH PHOTONS
+#The truth photon functions of cuts.py differ only in which photons they start from, which pixel-sum test they apply and
+#which fiducial box the energy deposit has to be in. trueSimPartCandidates and truePhotonVisible give those pieces for a
+#whole batch, and truePhotonLeadingEnergy the leading energy of any per-particle mask; the functions named after the
+#cuts.py ones below put them together the same way as their per-entry versions
+def trueNearVertex(batch):
+  #Per-particle mask: the particle starts within 0.15 cm of the true vertex in x, y and z
+  tid = batch["trueSimPartTID"]
+  near = np.ones(len(tid.content), dtype=bool)
+  for axis in ["X", "Y", "Z"]:
+    near &= np.abs(values(batch, "trueSimPart"+axis) - tid.broadcast(values(batch, "trueVtx"+axis))) <= 0.15
+  return near
+
+
+def trueSimPartCandidates(batch, origin, process=None, truth=None):
+  #Per-particle mask of the photons a truth photon function starts from
+  #origin "secondary": the mother is a primary particle or the photon starts at the vertex (truePhotonList and friends)
+  #origin "vertex": the photon starts at the vertex (truePhotonSelection)
+  #origin "orphan": the photon starts at the vertex and its mother is not in the particle list (truePhotonSelectionPiZero)
+  #process, if given, is the trueSimPartProcess the photon must have
+  photon = batch["trueSimPartPDG"].content == 22
+  if process is not None:
+    photon = photon & (batch["trueSimPartProcess"].content == process)
+  if origin == "vertex":
+    return photon & trueNearVertex(batch)
+  if truth is None:
+    truth = TruthTable.fromBatch(batch)
+  if origin == "secondary":
+    return photon & (truth.motherIsPrimary().content | trueNearVertex(batch))
+  if origin == "orphan":
+    return photon & ~truth.hasMother().content & trueNearVertex(batch)
+  raise ValueError("unknown photon origin '%s'" % origin)
+
+
+def truePlaneEnergies(batch):
+  #Per-particle pixel sums of the U, V and Y planes converted to MeV
+  return [values(batch, "trueSimPartPixelSum%splane" % plane)*0.0126 for plane in ["U", "V", "Y"]]
+
+
+def truePhotonVisible(batch, fiducial, width=None, bottomless=False, threshold=None, minPlanes=2, yPlaneEnergy=None):
+  #Per-particle mask: the energy deposit is inside the fiducial box (width defaults to fiducial["width"]) and the photon
+  #deposits more than threshold MeV on at least minPlanes of the three planes, and/or at least yPlaneEnergy MeV on the Y plane
+  visible = objectInside(batch, "trueSimPartEDep", fiducial, fiducial["width"] if width is None else width, bottomless)
+  planeEnergies = truePlaneEnergies(batch)
+  if threshold is not None:
+    visible = visible & (sum((energy > threshold).astype(np.int64) for energy in planeEnergies) >= minPlanes)
+  if yPlaneEnergy is not None:
+    visible = visible & (planeEnergies[2] >= yPlaneEnergy)
+  return visible
+
+
+def truePhotonLeadingEnergy(batch, photons):
+  #Largest trueSimPartE among the masked particles of each event, 0 when there are none (max([0] + energies))
+  energy = np.where(photons, values(batch, "trueSimPartE"), 0.)
+  return np.maximum(batch["trueSimPartE"].withContent(energy).max(empty=0.), 0.)
+
+
+def truePhotonList(batch, fiducial, threshold=5.0, minPlanes=2, truth=None):
+  #JaggedArray mask over trueSimParts, True for the photons cuts.truePhotonList would list
+  photons = trueSimPartCandidates(batch, "secondary", truth=truth)
+  photons = photons & truePhotonVisible(batch, fiducial, fiducial["photonWidth"], False, threshold, minPlanes)
+  return perObject(batch, "trueSimPartTID", photons)
+
+
+def trueBottomlessPhotonList(batch, fiducial, truth=None):
+  photons = trueSimPartCandidates(batch, "secondary", truth=truth) & truePhotonVisible(batch, fiducial, bottomless=True)
+  return perObject(batch, "trueSimPartTID", photons)
+
+
+def trueCutOverlapPhotonList(batch, fiducial, truth=None):
+  #cuts.trueCutOverlapPhotonList only adds a photon while comparing it with the photons already in its (initially
+  #empty) list, so it always returns an empty list
+  return perObject(batch, "trueSimPartTID", np.zeros(len(batch["trueSimPartTID"].content), dtype=bool))
+
+
+def truePhotonSelection(batch, fiducialWidth):
+  #(truePhotonTIDs, trueLeadingPhotonEnergy, photon mask) for every event: cuts.truePhotonSelection returns the same
+  #TIDs and leading energy, and the local indices where the mask is True as its photonIndexList
+  photons = trueSimPartCandidates(batch, "vertex", process=1)
+  photons = photons & truePhotonVisible(batch, fiducialSpec(fiducialWidth), yPlaneEnergy=20)
+  return selectObjects(batch["trueSimPartTID"], photons), truePhotonLeadingEnergy(batch, photons), perObject(batch, "trueSimPartTID", photons)
+
+
+def lastSelected(batch, name, selected):
+  #(count, value of branch name, local index) of the last selected object of each event, 0 for the value and index when
+  #there is none: what the selection loops of cuts.py leave behind when they keep overwriting their result
+  jagged = batch[name]
+  count = jagged.withContent(selected).countTrue()
+  last = jagged.withContent(np.where(selected, jagged.localIndex, -1)).max(empty=-1)
+  found = count > 0
+  index = np.where(found, last, 0)
+  rows = jagged.offsets[:-1] + index
+  value = np.zeros(len(jagged), dtype=jagged.content.dtype)
+  value[found] = jagged.content[rows[found]]
+  return count, value, index
+
+
+def trueProtonSelection(batch):
+  #(nTrueProtons, trueProtonTID, trueProtonIndex) arrays: primary protons with at least 60 MeV kinetic energy
+  E = values(batch, "trueSimPartE")
+  momentumVector = np.square(values(batch, "trueSimPartPx")) + np.square(values(batch, "trueSimPartPy")) + np.square(values(batch, "trueSimPartPz"))
+  with np.errstate(invalid="ignore"):
+    kineticMeV = E - np.sqrt(np.square(E) - momentumVector)
+  proton = (batch["trueSimPartProcess"].content == 0) & (batch["trueSimPartPDG"].content == 2212) & (kineticMeV >= 60)
+  return lastSelected(batch, "trueSimPartTID", proton)
+
+
+def legacyPhotonTIDs(batch, candidates, inside):
+  #cuts.truePhotonSelectionPiZero and truePhotonSelectionOldNtuple list trueSimPartTID[k] for the k-th photon candidate
+  #that passes the fiducial test, rather than the candidate's own TID; this gives the same lists
+  tid = batch["trueSimPartTID"]
+  rank = selectObjects(tid, candidates).localIndex
+  rows = tid.offsets[tid.parents[candidates]] + rank
+  passed = inside[candidates]
+  return JaggedArray.fromCounts(tid.withContent(candidates & inside).countTrue(), tid.content[rows[passed]])
+
+
+def truePhotonSelectionPiZero(batch, fiducialWidth, truth=None):
+  #(truePhotonTIDs, trueLeadingPhotonEnergy) as cuts.truePhotonSelectionPiZero gives them; the leading energy is over all
+  #candidates, whether or not they deposit inside the fiducial volume
+  candidates = trueSimPartCandidates(batch, "orphan", process=1, truth=truth)
+  candidates = candidates & (truePlaneEnergies(batch)[2] >= 20)
+  inside = truePhotonVisible(batch, fiducialSpec(fiducialWidth))
+  return legacyPhotonTIDs(batch, candidates, inside), truePhotonLeadingEnergy(batch, candidates)
+
+
+def truePhotonSelectionOldNtuple(batch, fiducialWidth, truth=None):
+  #(truePhotonTIDs, trueLeadingPhotonEnergy) as cuts.truePhotonSelectionOldNtuple gives them
+  candidates = trueSimPartCandidates(batch, "secondary", truth=truth)
+  inside = truePhotonVisible(batch, fiducialSpec(fiducialWidth))
+  return legacyPhotonTIDs(batch, candidates, inside), truePhotonLeadingEnergy(batch, candidates)
+
+
+#RECO FUNCTIONS
+def recoNoVertex(batch):
+  return np.asarray(batch["foundVertex"]) == 1
+
+
+def recoFiducials(batch, fiducial):
+  #cuts.recoFiducials returns None (which never compares equal to False) for events without a vertex, so they pass here
+  inside = insideFiducial(values(batch, "vtxX"), values(batch, "vtxY"), values(batch, "vtxZ"), fiducial, bottomless=False)
+  return inside | ~recoNoVertex(batch)
+
+
+def primaryParticle(batch, kind, threshold, pid, energy):
+  #Per-object mask of primary (process 0) tracks or showers with the given PID above energy
+  selected = objectSelected(batch, kind, threshold) & (batch[kind+"Process"].content == 0)
+  found = selected & (batch[kind+"PID"].content == pid) & (values(batch, kind+"RecoE") > energy)
+  return perObject(batch, kind+"PID", found)
+
+
+def recoCutMuons(batch, threshold = 0):
+  return ~(primaryParticle(batch, "track", threshold, 13, 100).any() | primaryParticle(batch, "shower", threshold, 13, 100).any())
+
+
+def recoCutElectrons(batch, threshold = 0):
+  return ~(primaryParticle(batch, "track", threshold, 11, 10).any() | primaryParticle(batch, "shower", threshold, 11, 10).any())
+
+
+def recoPion(batch, threshold = 0):
+  pionFound = np.zeros(len(batch), dtype=bool)
+  for kind in ["track", "shower"]:
+    pion = (np.abs(batch[kind+"PID"].content) == 211) & (values(batch, kind+"RecoE") >= 50)
+    if threshold != 0:
+      pion = pion & (batch[kind+"Size"].content >= threshold)
+    pionFound |= perObject(batch, kind+"PID", pion).any()
+  return ~pionFound
+
+
+def recoProton(batch, threshold = 0):
+  #Number of protons above 50 MeV
+  proton = (batch["trackPID"].content == 2212) & (values(batch, "trackRecoE") > 50)
+  if threshold != 0:
+    proton = proton & (batch["trackSize"].content >= threshold)
+  return perObject(batch, "trackPID", proton).countTrue()
+
+
+def recoPhotonListFiducial(fiducial, batch, threshold = 0):
+  #JaggedArray mask over showers, True for the showers cuts.recoPhotonListFiducial would list
+  if threshold == 0:
+    photon = (batch["showerClassified"].content == 1) & (batch["showerPID"].content == 22)
+  else:
+    photon = (values(batch, "showerRecoE") > threshold) & (batch["showerPID"].content == 22)
+  photon = photon & objectInside(batch, "showerStartPos", fiducial, fiducial["photonWidth"])
+  return perObject(batch, "showerPID", photon)
+
+
+def recoPhotonListTracks(fiducial, batch, threshold = 0):
+  #JaggedArray mask over tracks, True for the tracks cuts.recoPhotonListTracks would list
+  photon = objectSelected(batch, "track", threshold) & (batch["trackPID"].content == 22)
+  photon = photon & objectInside(batch, "trackStartPos", fiducial, fiducial["photonWidth"])
+  return perObject(batch, "trackPID", photon)
+
+
+def recoCutShowerFromChargeScore(batch, recoPhotons, recoPhotons2):
+  return singleCandidateCut(recoPhotons, recoPhotons2, values(batch, "showerFromChargedScore"), values(batch, "trackFromChargedScore"), lambda score: np.abs(score) < 5)
+
+
+def recoCutPrimary(batch, recoPhotons, recoPhotons2):
+  return singleCandidateCut(recoPhotons, recoPhotons2, values(batch, "showerPrimaryScore"), values(batch, "trackPrimaryScore"), lambda score: np.abs(score) < 1.4)
+
+
+def recoCutCompleteness(batch, recoPhotons, recoPhotons2, completeness_threshold=0.7):
+  return singleCandidateCut(recoPhotons, recoPhotons2, values(batch, "showerComp"), values(batch, "trackComp"), lambda comp: comp < completeness_threshold)
+
+
+def recoLongTrackParts(batch, fiducial):
+  #The two per-track tests of recoCutLongTracks, for the tracks it looks at (all but protons): the track length (0 for
+  #protons) and whether the track ends near a wall, using the same box test as cuts.recoCutLongTracks, including its
+  #comparison of trackEndPosX with zMax
+  dx = values(batch, "trackStartPosX") - values(batch, "trackEndPosX")
+  dy = values(batch, "trackStartPosY") - values(batch, "trackEndPosY")
+  dz = values(batch, "trackStartPosZ") - values(batch, "trackEndPosZ")
+  endX, endY, endZ = values(batch, "trackEndPosX"), values(batch, "trackEndPosY"), values(batch, "trackEndPosZ")
+  nearWall = (endX > (fiducial["xMax"] - 5)) | (endX < (fiducial["xMin"] + 5)) | (endY > (fiducial["yMax"] - 5)) \
+    | (endY < (fiducial["yMin"] + 5)) | (endX > (fiducial["zMax"] - 5)) | (endZ < (fiducial["zMin"] + 5))
+  nonProton = batch["trackPID"].content != 2212
+  length = np.where(nonProton, np.sqrt(dx**2 + dy**2 + dz**2), 0.)
+  return perObject(batch, "trackPID", length), perObject(batch, "trackPID", nonProton & nearWall)
+
+
+def recoCutLongTracks(batch, fiducial):
+  length, nearWall = recoLongTrackParts(batch, fiducial)
+  return ~(length.withContent(length.content > 25).any() | nearWall.any())
+
+
+def recoCutMuonCompleteness(batch):
+  bad = perObject(batch, "trackPID", (batch["trackPID"].content == 13) & (values(batch, "trackComp") < 0.5)).any()
+  bad |= perObject(batch, "showerPID", (batch["showerPID"].content == 13) & (values(batch, "showerComp") < 0.5)).any()
+  return ~bad
+
+
+def recoCutMaxInTime(batch, protonNo):
+  pixelSum = values(batch, "vtxMaxIntimePixelSum")
+  protonNo = np.asarray(protonNo)
+  return ~(((protonNo == 0) & (pixelSum*0.0126 > 200.0)) | ((protonNo == 1) & (pixelSum > 40000)))
+
+
+def recoProtonSelection(batch):
+  #(nRecoProtons, recoProtonTID, recoProtonIndex) arrays
+  proton = (batch["trackPID"].content == 2212) & (values(batch, "trackRecoE") >= 60)
+  return lastSelected(batch, "trackTrueTID", proton)
+
+
+def recoPhotonSelection(batch, fiducialWidth):
+  #(recoPhotonTIDs, recoLeadingPhotonEnergy, photon mask over showers) as cuts.recoPhotonSelection gives them
+  photons = (batch["showerPID"].content == 22) & objectInside(batch, "showerStartPos", fiducialSpec(fiducialWidth), fiducialWidth)
+  energy = np.where(photons, values(batch, "showerRecoE"), 0.)
+  leading = np.maximum(batch["showerRecoE"].withContent(energy).max(empty=0.), 0.)
+  return selectObjects(batch["showerTrueTID"], photons), leading, perObject(batch, "showerPID", photons)
@@ -0,0 +1,158 @@
+#Reco charged-current classifier for column batches
+#recoCCCut and recoCCCutLoose in cuts.py tag an event as CC when it has a primary muon or electron (track or shower), too
+#large a fraction of unclassified tracks, too many tracks or a large in-time pixel sum at the vertex. RecoCCClassifier
+#applies the same tests to a whole EventColumns batch with the thresholds as settings, and records which of them fired
+#regression() runs the per-event function alongside and lists the entries where the two disagree (see ccRegression.py)
+import numpy as np
+
+import batchCuts
+from cuts import recoCCCut, recoCCCutLoose
+from helpers.columnLoader import ColumnTree
+
+ccBranches = ["nTracks", "nShowers", "trackClassified", "trackIsSecondary", "trackPID", "trackRecoE",
+              "showerIsSecondary", "showerPID", "showerRecoE", "vtxMaxIntimePixelSum"]
+
+
+class RecoCCClassifier:
+  #Thresholds set to None switch that test off
+  #leptonEnergy: minimum reco energy (MeV) of a primary muon/electron, None for any energy
+  #unclassifiedFraction: CC when at least this fraction of the tracks is unclassified
+  #maxTracks: CC when there are at least this many tracks
+  #intimePixelSum: CC when vtxMaxIntimePixelSum is at least this
+  #showerLeptons: count primary muon/electron showers as well as tracks
+  reasonNames = ["primaryMuonTrack", "primaryElectronTrack", "primaryMuonShower", "primaryElectronShower",
+                 "unclassifiedTracks", "manyTracks", "intimePixels"]
+
+  def __init__(self, leptonEnergy=None, unclassifiedFraction=0.55, maxTracks=4, intimePixelSum=35000., showerLeptons=True, legacyFunction=recoCCCut):
+    self.leptonEnergy = leptonEnergy
+    self.unclassifiedFraction = unclassifiedFraction
+    self.maxTracks = maxTracks
+    self.intimePixelSum = intimePixelSum
+    self.showerLeptons = showerLeptons
+    self.legacyFunction = legacyFunction
+
+  @classmethod
+  def standard(cls):
+    #The tests of cuts.recoCCCut
+    return cls()
+
+  @classmethod
+  def loose(cls):
+    #The tests of cuts.recoCCCutLoose: only primary muons and electrons of 100 MeV or more
+    return cls(leptonEnergy=100, unclassifiedFraction=None, maxTracks=None, intimePixelSum=None, legacyFunction=recoCCCutLoose)
+
+  def primaryLepton(self, batch, kind, pid):
+    found = (batch[kind+"IsSecondary"].content == 0) & (np.abs(batch[kind+"PID"].content) == pid)
+    if self.leptonEnergy is not None:
+      found = found & (batchCuts.values(batch, kind+"RecoE") >= self.leptonEnergy)
+    return batchCuts.perObject(batch, kind+"PID", found).any()
+
+  def classify(self, batch):
+    #CCResult with the CC flag of every event of the batch and the tests that fired
+    nEvents = len(batch)
+    never = np.zeros(nEvents, dtype=bool)
+    reasons = {}
+    reasons["primaryMuonTrack"] = self.primaryLepton(batch, "track", 13)
+    reasons["primaryElectronTrack"] = self.primaryLepton(batch, "track", 11)
+    reasons["primaryMuonShower"] = self.primaryLepton(batch, "shower", 13) if self.showerLeptons else never
+    reasons["primaryElectronShower"] = self.primaryLepton(batch, "shower", 11) if self.showerLeptons else never
+    nTracks = np.asarray(batch["nTracks"], dtype=np.int64)
+    if self.unclassifiedFraction is not None:
+      unclassified = batchCuts.perObject(batch, "trackClassified", batch["trackClassified"].content == 0).countTrue()
+      reasons["unclassifiedTracks"] = (nTracks != 0) & (unclassified/np.maximum(nTracks, 1) >= self.unclassifiedFraction)
+    else:
+      reasons["unclassifiedTracks"] = never
+    reasons["manyTracks"] = nTracks >= self.maxTracks if self.maxTracks is not None else never
+    if self.intimePixelSum is not None:
+      reasons["intimePixels"] = batchCuts.values(batch, "vtxMaxIntimePixelSum") >= self.intimePixelSum
+    else:
+      reasons["intimePixels"] = never
+    return CCResult(reasons, self.reasonNames)
+
+  def isCC(self, ntuple):
+    #Per-entry flag for scripts that loop over a PyROOT tree, with the same settings
+    return self.classifyEntry(ntuple)[0]
+
+  def classifyEntry(self, ntuple):
+    #(cc, reasons) for the current entry of ntuple
+    found = set()
+    for kind, n in [("track", ntuple.nTracks), ("shower", ntuple.nShowers if self.showerLeptons else 0)]:
+      isSecondary, pid, recoE = getattr(ntuple, kind+"IsSecondary"), getattr(ntuple, kind+"PID"), getattr(ntuple, kind+"RecoE")
+      for i in range(n):
+        if isSecondary[i] == 0 and (self.leptonEnergy is None or recoE[i] >= self.leptonEnergy):
+          if abs(pid[i]) == 13:
+            found.add("primaryMuon" + kind.capitalize())
+          elif abs(pid[i]) == 11:
+            found.add("primaryElectron" + kind.capitalize())
+    if self.unclassifiedFraction is not None and ntuple.nTracks != 0:
+      unclassified = sum(1 for i in range(ntuple.nTracks) if ntuple.trackClassified[i] == 0)
+      if unclassified/ntuple.nTracks >= self.unclassifiedFraction:
+        found.add("unclassifiedTracks")
+    if self.maxTracks is not None and ntuple.nTracks >= self.maxTracks:
+      found.add("manyTracks")
+    if self.intimePixelSum is not None and ntuple.vtxMaxIntimePixelSum >= self.intimePixelSum:
+      found.add("intimePixels")
+    reasons = [name for name in self.reasonNames if name in found]
+    return len(reasons) > 0, reasons
+
+  def regression(self, batch, legacyFunction=None):
+    #Runs the per-event function (legacyFunction, default the cuts.py function these settings follow) on every entry of the
+    #batch and returns a RegressionReport of the entries where it and the batch classifier disagree
+    legacyFunction = self.legacyFunction if legacyFunction is None else legacyFunction
+    result = self.classify(batch)
+    tree = ColumnTree(batch)
+    legacy = np.zeros(len(batch), dtype=bool)
+    for i in range(tree.GetEntries()):
+      tree.GetEntry(i)
+      legacy[i] = bool(legacyFunction(tree))
+    return RegressionReport(result, legacy, batch.entryStart, getattr(legacyFunction, "__name__", "legacy"))
+
+
+class CCResult:
+  #Outcome of RecoCCClassifier.classify: reasons[name] says which events that test tags as CC
+
+  def __init__(self, reasons, reasonNames):
+    self.reasonNames = reasonNames
+    self.reasons = reasons
+    self.reasonMatrix = np.stack([reasons[name] for name in reasonNames])
+    self.cc = self.reasonMatrix.any(axis=0)
+
+  def __len__(self):
+    return len(self.cc)
+
+  def reasonsFor(self, index):
+    #Names of the tests that fired for event index of the batch
+    return [name for i, name in enumerate(self.reasonNames) if self.reasonMatrix[i, index]]
+
+  def reasonCounts(self, weights=None):
+    #Summed weight of the events each test tags, and of those it alone tags
+    weights = np.ones(len(self)) if weights is None else np.asarray(weights, dtype=np.float64)
+    alone = self.reasonMatrix & (self.reasonMatrix.sum(axis=0) == 1)[None, :]
+    return dict((name, (self.reasonMatrix[i] @ weights, alone[i] @ weights)) for i, name in enumerate(self.reasonNames))
+
+
+class RegressionReport:
+  #Entries where the batch classifier and the per-event function disagree
+
+  def __init__(self, result, legacy, entryStart=0, legacyName="legacy"):
+    self.result = result
+    self.legacy = legacy
+    self.entryStart = entryStart
+    self.legacyName = legacyName
+    self.differences = np.nonzero(result.cc != legacy)[0]
+
+  def __len__(self):
+    return len(self.differences)
+
+  def rows(self):
+    #One row per differing entry: entry number, both flags and the tests the classifier says fired
+    return [{"entry": self.entryStart + index, "legacy": bool(self.legacy[index]), "classifier": bool(self.result.cc[index]),
+             "reasons": self.result.reasonsFor(index)} for index in self.differences]
+
+  def printReport(self, maxRows=20):
+    print("[ccRegression]", len(self.result), "entries:", int(self.result.cc.sum()), "CC by the classifier,", int(self.legacy.sum()), "by", self.legacyName)
+    print("[ccRegression]", len(self), "entries differ")
+    for row in self.rows()[:maxRows]:
+      print("[ccRegression]   entry %d: %s=%s classifier=%s reasons=%s" % (row["entry"], self.legacyName, row["legacy"], row["classifier"], ",".join(row["reasons"])))
+    if len(self) > maxRows:
+      print("[ccRegression]   ...", len(self) - maxRows, "more")
@@ -0,0 +1,37 @@
+import sys, argparse
+import ROOT as rt
+rt.PyConfig.IgnoreCommandLineOptions = True
+rt.gROOT.SetBatch(True)
+
+from ccClassifier import RecoCCClassifier, ccBranches
+from helpers.columnLoader import openTree, iterateBatches
+
+parser = argparse.ArgumentParser("Compare the batch reco CC classifier with the per-event recoCCCut / recoCCCutLoose")
+parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
+parser.add_argument("--loose", action="store_true", help="compare the recoCCCutLoose settings instead of recoCCCut")
+parser.add_argument("--noShowerLeptons", action="store_true", help="ignore primary muon/electron showers, as the cuts.py functions did before their shower tests were fixed")
+parser.add_argument("-n", "--nEntries", type=int, default=None, help="only check the first n entries")
+parser.add_argument("-bs", "--batchSize", type=int, default=100000, help="entries read per batch")
+parser.add_argument("--maxRows", type=int, default=20, help="differing entries to print per batch")
+args = parser.parse_args()
+
+classifier = RecoCCClassifier.loose() if args.loose else RecoCCClassifier.standard()
+classifier.showerLeptons = not args.noShowerLeptons
+ntuple_file, eventTree = openTree(args.infile)
+
+nDifferent = 0
+reasonCounts = {}
+for batch in iterateBatches(eventTree, ccBranches, args.batchSize, 0, args.nEntries):
+  report = classifier.regression(batch)
+  report.printReport(args.maxRows)
+  nDifferent += len(report)
+  for name, (tagged, alone) in report.result.reasonCounts().items():
+    previous = reasonCounts.get(name, (0, 0))
+    reasonCounts[name] = (previous[0] + tagged, previous[1] + alone)
+
+print("[ccRegression] events tagged by each test (and by that test alone):")
+for name in classifier.reasonNames:
+  tagged, alone = reasonCounts.get(name, (0, 0))
+  print("[ccRegression]   %-22s %10d %10d" % (name, tagged, alone))
+print("[ccRegression] %d entries differ from %s" % (nDifferent, classifier.legacyFunction.__name__))
+sys.exit(1 if nDifferent > 0 else 0)
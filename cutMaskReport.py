@@ -0,0 +1,61 @@
+import argparse
+import ROOT as rt
+rt.PyConfig.IgnoreCommandLineOptions = True
+rt.gROOT.SetBatch(True)
+
+from helpers.cutMaskStore import CutMaskStore
+from helpers.cutFlow import CutFlowTable
+
+parser = argparse.ArgumentParser("Cut-flow tables, efficiency/purity and event lists from a per-event cut mask store")
+parser.add_argument("-i", "--infile", type=str, required=True, help="cut mask store of the overlay (.cutmask.npz, from separateEvaluator.py --cutMasks)")
+parser.add_argument("-c", "--cosmicFile", type=str, default=None, help="cut mask store of the cosmic/EXT sample")
+parser.add_argument("-t", "--targetPOT", type=float, default=4.4e+19, help="POT the event counts are scaled to")
+parser.add_argument("--reco", type=str, default="AllCuts", help="comma-separated reco cuts an event has to pass to count as selected")
+parser.add_argument("--truth", type=str, default="AllCuts", help="comma-separated truth cuts an event has to pass to count as signal")
+parser.add_argument("-l", "--eventList", type=str, default=None, help="write run subrun event fileid of the selected overlay events here")
+parser.add_argument("-o", "--outfile", type=str, default=None, help="ROOT file for the leading photon energy histograms")
+args = parser.parse_args()
+
+store = CutMaskStore(args.infile)
+recoNames = args.reco.split(",")
+truthNames = args.truth.split(",")
+if store.returnOnFail:
+  print("[cutMaskReport] %s was made with return_on_fail: cuts after the first failure read False, N-1 counts are not meaningful" % args.infile)
+
+mcScale = args.targetPOT/store.pot if store.pot else 1.0
+signal = store.select(truth=truthNames)
+selected = store.select(reco=recoNames)
+
+table = CutFlowTable([name for name in store.recoCutNames if name != "AllCuts"], "all events")
+table.fill(store.cutFlowResult(), mcScale)
+table.printTable()
+signalTable = CutFlowTable(table.cutNames, "true signal")
+signalTable.fill(store.cutFlowResult(select=signal), mcScale)
+signalTable.printTable()
+
+selectedSignal = mcScale*store.weight[selected & signal].sum()
+selectedBackground = mcScale*store.weight[selected & ~signal].sum()
+totalSignal = mcScale*store.weight[signal].sum()
+selectedCosmic = 0.
+if args.cosmicFile is not None:
+  cosmicStore = CutMaskStore(args.cosmicFile)
+  cosmicSelected = cosmicStore.select(reco=recoNames)
+  selectedCosmic = cosmicStore.weight[cosmicSelected].sum()*args.targetPOT/cosmicStore.pot
+
+print("[cutMaskReport] per %.3g POT: signal %.2f, MC background %.2f, cosmic %.2f" % (args.targetPOT, selectedSignal, selectedBackground, selectedCosmic))
+if totalSignal > 0:
+  print("[cutMaskReport] efficiency %.4f" % (selectedSignal/totalSignal))
+if selectedSignal + selectedBackground + selectedCosmic > 0:
+  print("[cutMaskReport] purity %.4f" % (selectedSignal/(selectedSignal + selectedBackground + selectedCosmic)))
+
+if args.eventList is not None:
+  store.writeEventList(args.eventList, selected)
+  print("[cutMaskReport] wrote %d events to %s" % (selected.sum(), args.eventList))
+
+if args.outfile is not None:
+  outFile = rt.TFile(args.outfile, "RECREATE")
+  store.histogram(selected & signal, "selectedSignal", "Selected true signal", 60, 0, 2, scale=mcScale).Write()
+  store.histogram(selected & ~signal, "selectedBackground", "Selected MC background", 60, 0, 2, scale=mcScale).Write()
+  store.histogram(signal, "trueSignal", "True signal", 60, 0, 2, "trueLeadingPhotonE", mcScale).Write()
+  store.histogram(selected & signal, "selectedSignalTrueE", "Selected true signal", 60, 0, 2, "trueLeadingPhotonE", mcScale).Write()
+  outFile.Close()
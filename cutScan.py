@@ -0,0 +1,261 @@
+#Threshold scan for the tunable cuts of the 1g1p reco selection
+#The single-photon cuts of selection_1g1p (shower-from-charged score, primary score, completeness, the in-time pixel sum
+#at the vertex and the long-track veto) use hand-picked thresholds. ScanSample runs the rest of the cut flow once and
+#keeps, for the events that pass it, the values those cuts test along with the event weight and whether the event is
+#true 1g signal (truthdef_1gamma_cuts). ThresholdGrid then gives the selected signal / background weight at every point
+#of a grid of thresholds at once: every event is sorted into the grid cell of its values with one bincount, and a
+#cumulative sum along each axis turns the cell contents into "passes at these thresholds" sums
+#ScanResult has the efficiency, purity and s/sqrt(b) (cosmics scaled by POT) of every grid point, their Pareto front
+#and the best working points. cutScanner.py is the command-line front end
+import numpy as np
+
+import batchCuts
+from selection_1g1p import reco_1g1p_cutflow
+from truthdef import truthdef_1gamma_cuts
+from helpers.columnLoader import ColumnTree
+from helpers.eventCache import CachedTree
+
+
+class ScanCut:
+  #One scanned threshold. direction "min": an event passes when its value is at least the threshold, "max": at most
+  #An event the cut does not apply to holds -inf ("max") or +inf ("min"), so it passes everywhere
+
+  def __init__(self, name, direction, nominal, grid, description):
+    self.name = name
+    self.direction = direction
+    self.nominal = nominal
+    self.grid = grid
+    self.description = description
+
+
+inf = float("inf")
+scanCuts = [
+  ScanCut("showerFromCharged", "min", 5.0, [0., 1., 2., 3., 4., 5., 6., 7., 8., 10.], "|FromChargedScore| of the photon candidate"),
+  ScanCut("primaryScore", "min", 1.4, [0., 0.6, 1.0, 1.4, 1.8, 2.2, 3.0], "|PrimaryScore| of the photon candidate"),
+  ScanCut("completeness", "min", 0.7, [0., 0.3, 0.5, 0.6, 0.7, 0.8, 0.9], "Comp of the photon candidate"),
+  ScanCut("electronScore", "min", 0., [0., 1., 2., 3., 4.], "|ElScore| of the photon candidate (recoCutElectronScore, not in the selection: 0 is off)"),
+  ScanCut("intimeEnergy0p", "max", 200., [100., 150., 200., 250., 300., 400., inf], "vtxMaxIntimePixelSum*0.0126 (MeV), events with no reco proton"),
+  ScanCut("intimePixels1p", "max", 40000., [20000., 30000., 40000., 50000., inf], "vtxMaxIntimePixelSum, events with one reco proton"),
+  ScanCut("longTrack", "max", 25., [15., 20., 25., 30., 40., inf], "length (cm) of the longest non-proton track"),
+]
+scanCutsByName = dict((cut.name, cut) for cut in scanCuts)
+
+#The cuts of reco_1g1p_cutflow that the scanned thresholds replace; every other cut is applied as it is
+replacedCuts = ["showerFromCharge", "primaryScore", "cutLongTracks", "maxVertexIntimePixels", "cutShowerCompleteness"]
+
+
+def candidateValue(showerList, trackList, showerValues, trackValues):
+  #Per event, the value of its photon candidate for events with exactly one (shower or track); the sum over the
+  #candidates otherwise, which only matters for events the only1Photon cut removes
+  return showerList.withContent(np.where(showerList.content, showerValues, 0.)).sum() \
+    + trackList.withContent(np.where(trackList.content, trackValues, 0.)).sum()
+
+
+def scanVariables(batch, result, fiducialData):
+  #{scan cut name: per-event value} for every event of the batch, from the cut-flow result of that batch
+  values = batchCuts.values
+  recoList, recoTrackList = result.values["recoList"], result.values["recoTrackList"]
+  candidate = lambda showerName, trackName: candidateValue(recoList, recoTrackList, values(batch, showerName), values(batch, trackName))
+  protonCount = np.asarray(result.values["recoProtonCount"])
+  pixelSum = values(batch, "vtxMaxIntimePixelSum")
+  length = batchCuts.recoLongTrackParts(batch, fiducialData)[0]
+  return {"showerFromCharged": np.abs(candidate("showerFromChargedScore", "trackFromChargedScore")),
+          "primaryScore": np.abs(candidate("showerPrimaryScore", "trackPrimaryScore")),
+          "completeness": candidate("showerComp", "trackComp"),
+          "electronScore": np.abs(candidate("showerElScore", "trackElScore")),
+          "intimeEnergy0p": np.where(protonCount == 0, pixelSum*0.0126, -inf),
+          "intimePixels1p": np.where(protonCount == 1, pixelSum, -inf),
+          "longTrack": length.max(empty=0.)}
+
+
+def fixedCuts(batch, result, fiducialData):
+  #Events passing every cut that is not scanned; the wall test of recoCutLongTracks stays fixed, only its length is scanned
+  passes = np.ones(len(result), dtype=bool)
+  for name in result.cutNames:
+    if name not in replacedCuts:
+      passes &= result.masks[name]
+  return passes & ~batchCuts.recoLongTrackParts(batch, fiducialData)[1].any()
+
+
+class ScanSample:
+  #The scan variables, weight and signal flag of the events passing the fixed cuts, and the total signal weight
+  #(all events, for the efficiency). pot is what the weights correspond to: the ntuple POT, or the POT-equivalent of a
+  #cosmic sample
+  fields = ["weight", "signal"] + [cut.name for cut in scanCuts]
+
+  def __init__(self, columns, totalSignal, nEvents, pot):
+    self.columns = columns
+    self.totalSignal = totalSignal
+    self.nEvents = nEvents
+    self.pot = pot
+
+  def __len__(self):
+    return len(self.columns["weight"])
+
+  def __getitem__(self, name):
+    return self.columns[name]
+
+  @classmethod
+  def fromBatches(cls, batches, pot, classificationThreshold, fiducialData, photonEDepThreshold=10.0, truth=True, weightBranch="xsecWeight"):
+    #batches: EventColumns batches (helpers.columnLoader.iterateBatches). truth=False for samples without truth
+    #information (cosmic/EXT), which count as background with weight 1
+    cutflow = reco_1g1p_cutflow(classificationThreshold, fiducialData)
+    parts = dict((name, []) for name in cls.fields)
+    totalSignal, nEvents = 0., 0
+    for batch in batches:
+      result = cutflow.runBatch(batch)
+      weights = batchCuts.values(batch, weightBranch) if truth else np.ones(len(batch))
+      signal = np.zeros(len(batch), dtype=bool)
+      if truth:
+        tree = CachedTree(ColumnTree(batch))
+        for i in range(len(batch)):
+          tree.GetEntry(i)
+          signal[i] = truthdef_1gamma_cuts(tree, photonEDepThreshold, fiducialData)[0]
+        totalSignal += weights[signal].sum()
+      keep = fixedCuts(batch, result, fiducialData)
+      parts["weight"].append(weights[keep])
+      parts["signal"].append(signal[keep])
+      for name, column in scanVariables(batch, result, fiducialData).items():
+        parts[name].append(column[keep])
+      nEvents += len(batch)
+    columns = dict((name, np.concatenate(arrays) if len(arrays) > 0 else np.zeros(0)) for name, arrays in parts.items())
+    columns["signal"] = columns["signal"].astype(bool)
+    return cls(columns, totalSignal, nEvents, pot)
+
+  def save(self, path):
+    np.savez(path, totalSignal=self.totalSignal, nEvents=self.nEvents, pot=self.pot, **self.columns)
+
+  @classmethod
+  def load(cls, path):
+    stored = np.load(path)
+    columns = dict((name, stored[name]) for name in cls.fields)
+    return cls(columns, float(stored["totalSignal"]), int(stored["nEvents"]), float(stored["pot"]))
+
+
+class ThresholdGrid:
+  #thresholds: {scan cut name: threshold values}; cuts left out are fixed at their nominal threshold
+
+  def __init__(self, thresholds=None):
+    thresholds = {} if thresholds is None else thresholds
+    for name in thresholds:
+      if name not in scanCutsByName:
+        raise ValueError("no scan cut named '%s' (known: %s)" % (name, ", ".join(scanCutsByName)))
+    self.cuts = scanCuts
+    self.thresholds = [np.unique(np.asarray(thresholds.get(cut.name, [cut.nominal]), dtype=np.float64)) for cut in self.cuts]
+    self.shape = tuple(len(t) for t in self.thresholds)
+
+  @classmethod
+  def default(cls):
+    return cls(dict((cut.name, cut.grid) for cut in scanCuts))
+
+  def __len__(self):
+    return int(np.prod(self.shape))
+
+  def point(self, flatIndex):
+    #{scan cut name: threshold} of a grid point
+    index = np.unravel_index(flatIndex, self.shape)
+    return dict((cut.name, t[i]) for cut, t, i in zip(self.cuts, self.thresholds, index))
+
+  def nominalIndex(self):
+    #Flat index of the nominal thresholds, None if they are not on the grid
+    index = []
+    for cut, t in zip(self.cuts, self.thresholds):
+      found = np.nonzero(t == cut.nominal)[0]
+      if len(found) == 0:
+        return None
+      index.append(found[0])
+    return int(np.ravel_multi_index(index, self.shape))
+
+  def passedWeight(self, sample, select=None):
+    #Sum of the weights of the events of sample passing at each grid point, as an array of the grid shape
+    #select: optional mask of the events to count (e.g. sample["signal"])
+    weights = sample["weight"] if select is None else np.where(select, sample["weight"], 0.)
+    #Cell of each event: along a "min" axis the number of thresholds at or below its value (it passes those before it),
+    #along a "max" axis the number of thresholds below its value (it passes those from there on)
+    index = []
+    for cut, t in zip(self.cuts, self.thresholds):
+      index.append(np.searchsorted(t, sample[cut.name], side="right" if cut.direction == "min" else "left"))
+    cellShape = tuple(n + 1 for n in self.shape)
+    cells = np.bincount(np.ravel_multi_index(index, cellShape), weights=weights, minlength=int(np.prod(cellShape))).reshape(cellShape)
+    for axis, cut in enumerate(self.cuts):
+      if cut.direction == "min":
+        cells = np.flip(np.cumsum(np.flip(cells, axis), axis), axis)
+        cells = np.delete(cells, 0, axis)
+      else:
+        cells = np.cumsum(cells, axis)
+        cells = np.delete(cells, -1, axis)
+    return cells
+
+
+class ScanResult:
+  #Selected signal, MC background and cosmic weight at every grid point, scaled to targetPOT
+
+  def __init__(self, grid, mc, cosmic=None, targetPOT=4.4e+19):
+    self.grid = grid
+    self.targetPOT = targetPOT
+    mcScale = targetPOT/mc.pot
+    self.signal = mcScale*grid.passedWeight(mc, mc["signal"])
+    self.background = mcScale*grid.passedWeight(mc, ~mc["signal"])
+    self.cosmic = np.zeros(grid.shape) if cosmic is None else (targetPOT/cosmic.pot)*grid.passedWeight(cosmic)
+    self.totalSignal = mcScale*mc.totalSignal
+
+  @property
+  def efficiency(self):
+    return self.signal/self.totalSignal if self.totalSignal > 0 else np.zeros(self.grid.shape)
+
+  @property
+  def purity(self):
+    selected = self.signal + self.background + self.cosmic
+    return np.divide(self.signal, selected, out=np.zeros(self.grid.shape), where=selected > 0)
+
+  @property
+  def significance(self):
+    #s/sqrt(b) with b the MC background plus the cosmics; 0 where nothing is selected
+    background = self.background + self.cosmic
+    return np.divide(self.signal, np.sqrt(background), out=np.zeros(self.grid.shape), where=background > 0)
+
+  def paretoFront(self):
+    #Flat indices of the points no other point beats in both efficiency and purity, by decreasing efficiency
+    efficiency, purity = self.efficiency.ravel(), self.purity.ravel()
+    order = np.lexsort((-purity, -efficiency))
+    order = order[efficiency[order] > 0]
+    best = np.maximum.accumulate(purity[order])
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = purity[order][1:] > best[:-1]
+    return order[keep]
+
+  def best(self, metric, minEfficiency=0.):
+    #Flat index of the point with the largest value of metric ("significance", "purity", "efficiency" or
+    #"efficiencyPurity") among those with at least minEfficiency, None if there are none
+    if metric == "efficiencyPurity":
+      values = self.efficiency*self.purity
+    else:
+      values = getattr(self, metric)
+    values = np.where(self.efficiency >= minEfficiency, values, -inf).ravel()
+    index = int(np.argmax(values))
+    return index if values[index] > -inf else None
+
+  def row(self, flatIndex):
+    point = self.grid.point(flatIndex)
+    point.update({"efficiency": self.efficiency.ravel()[flatIndex], "purity": self.purity.ravel()[flatIndex],
+                  "significance": self.significance.ravel()[flatIndex], "signal": self.signal.ravel()[flatIndex],
+                  "background": self.background.ravel()[flatIndex], "cosmic": self.cosmic.ravel()[flatIndex]})
+    return point
+
+  def columnNames(self):
+    return [cut.name for cut in self.grid.cuts] + ["efficiency", "purity", "significance", "signal", "background", "cosmic"]
+
+  def printRows(self, indices, label="cutScan"):
+    names = self.columnNames()
+    print("[%s] " % label + " ".join("%12s" % name[:12] for name in names))
+    for index in indices:
+      row = self.row(index)
+      print("[%s] " % label + " ".join("%12.4g" % row[name] for name in names))
+
+  def writeCSV(self, path, indices):
+    names = self.columnNames()
+    with open(path, "w") as csvFile:
+      csvFile.write(",".join(names) + "\n")
+      for index in indices:
+        row = self.row(index)
+        csvFile.write(",".join(repr(float(row[name])) for name in names) + "\n")
@@ -0,0 +1,85 @@
+import sys, os, argparse
+import numpy as np
+import ROOT as rt
+rt.PyConfig.IgnoreCommandLineOptions = True
+rt.gROOT.SetBatch(True)
+
+from cutScan import ScanSample, ThresholdGrid, ScanResult, scanCuts
+from helpers.columnLoader import openTree, iterateBatches
+from helpers.potService import sumPOT, cosmicPOT
+
+parser = argparse.ArgumentParser("Scan the thresholds of the 1g1p single-photon cuts for efficiency, purity and s/sqrt(b)")
+parser.add_argument("-i", "--infile", type=str, required=True, help="input overlay ntuple file")
+parser.add_argument("-c", "--cosmicFile", type=str, default=None, help="input cosmic/EXT ntuple file")
+parser.add_argument("-t", "--targetPOT", type=float, default=4.4e+19, help="POT the selected events are scaled to")
+parser.add_argument("--grid", type=str, action="append", default=[], help="thresholds of one cut: name=a,b,c or name=start:stop:step (repeatable; names: %s)" % ", ".join(cut.name for cut in scanCuts))
+parser.add_argument("--nominalOnly", action="store_true", help="start from the nominal thresholds instead of the default grid")
+parser.add_argument("--cache", type=str, default=None, help="prefix of the .npz files the scan variables are kept in; read back if they exist")
+parser.add_argument("--rebuild", action="store_true", help="recompute the scan variables even if the cache files exist")
+parser.add_argument("--minEfficiency", type=float, default=0.0, help="smallest efficiency a best working point may have")
+parser.add_argument("--maxRows", type=int, default=20, help="Pareto points to print")
+parser.add_argument("-o", "--outfile", type=str, default=None, help="CSV file for the Pareto front")
+parser.add_argument("-bs", "--batchSize", type=int, default=100000, help="entries read per batch")
+args = parser.parse_args()
+
+fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":15, "photonWidth":3}
+classificationThreshold = 0
+photonEDepThreshold = 10.0
+
+
+def parseThresholds(text):
+  name, _, spec = text.partition("=")
+  if ":" in spec:
+    start, stop, step = [float(part) for part in spec.split(":")]
+    return name, np.arange(start, stop + 0.5*step, step)
+  return name, [float(part) for part in spec.split(",")]
+
+
+def readSample(path, cachePath, truth):
+  if cachePath is not None and os.path.exists(cachePath) and not args.rebuild:
+    print("[cutScanner] reading scan variables from", cachePath)
+    return ScanSample.load(cachePath)
+  rootFile, eventTree = openTree(path)
+  if truth:
+    pot = sumPOT(rootFile.Get("potTree"))
+  else:
+    pot = cosmicPOT(eventTree, fallbackPOT=1.1e20)
+  sample = ScanSample.fromBatches(iterateBatches(eventTree, None, args.batchSize), pot, classificationThreshold, fiducialData, photonEDepThreshold, truth)
+  print("[cutScanner] %s: %d of %d events pass the fixed cuts" % (path, len(sample), sample.nEvents))
+  if cachePath is not None:
+    sample.save(cachePath)
+  return sample
+
+
+mcSample = readSample(args.infile, None if args.cache is None else args.cache + "_mc.npz", True)
+cosmicSample = None
+if args.cosmicFile is not None:
+  cosmicSample = readSample(args.cosmicFile, None if args.cache is None else args.cache + "_cosmic.npz", False)
+
+if args.nominalOnly:
+  thresholds = {}
+else:
+  thresholds = dict((cut.name, cut.grid) for cut in scanCuts)
+thresholds.update(dict(parseThresholds(text) for text in args.grid))
+grid = ThresholdGrid(thresholds)
+print("[cutScanner] scanning %d threshold combinations" % len(grid))
+result = ScanResult(grid, mcSample, cosmicSample, args.targetPOT)
+
+front = result.paretoFront()
+print("[cutScanner] Pareto front (efficiency vs purity): %d points, events per %.3g POT" % (len(front), args.targetPOT))
+result.printRows(front[:args.maxRows], "cutScanner")
+if args.outfile is not None:
+  result.writeCSV(args.outfile, front)
+  print("[cutScanner] wrote the Pareto front to", args.outfile)
+
+for label, metric in [("largest s/sqrt(b)", "significance"), ("largest efficiency x purity", "efficiencyPurity"), ("largest purity", "purity")]:
+  best = result.best(metric, args.minEfficiency)
+  print("[cutScanner]", label, "with efficiency >= %g:" % args.minEfficiency)
+  if best is None:
+    print("[cutScanner]   no grid point")
+  else:
+    result.printRows([best], "cutScanner")
+nominal = grid.nominalIndex()
+if nominal is not None:
+  print("[cutScanner] nominal thresholds:")
+  result.printRows([nominal], "cutScanner")
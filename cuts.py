@@ -6,6 +6,11 @@ import ROOT as rt
 import math
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from fiducial import insideFiducial, fiducialSpec
+from helpers.truthTable import EventTruth
+from helpers.eventCache import eventCached
+from helpers.histograms import toTH1, scaleHist
+from kinematics import deltaKinematics, openingAngle, recoProtonFourVector, recoPhotonFourVector
 
 
 def trueParticleTallies(ntuple):
@@ -110,17 +115,11 @@ def trueCutProtonInclusive(ntuple):
 
 def trueCutFiducials(ntuple, fiducialData):
 #Filter by determining if the event vertex falls within the fiducial width using truth  - True if it's not within the radius, false if it is
-  if ntuple.trueVtxX <= (fiducialData["xMin"] + fiducialData["width"]) or ntuple.trueVtxX >= (fiducialData["xMax"] - fiducialData["width"]) or ntuple.trueVtxY <= (fiducialData["yMin"] + fiducialData["width"]) or ntuple.trueVtxY >= (fiducialData["yMax"] - fiducialData["width"]) or ntuple.trueVtxZ <= (fiducialData["zMin"] + fiducialData["width"]) or ntuple.trueVtxZ >= (fiducialData["zMax"] - fiducialData["width"]):
-    return False
-  else:
-    return True
+  return bool(insideFiducial(ntuple.trueVtxX, ntuple.trueVtxY, ntuple.trueVtxZ, fiducialData, bottomless=False))
 
 def trueCutBottomlessFiducial(ntuple, fiducialData):
 #Filter by determining if the event vertex falls within the fiducial width using truth, excluding the lower y-axis cut  - True if it's not within the radius, false if it is
-  if ntuple.trueVtxX <= (fiducialData["xMin"] + fiducialData["width"]) or ntuple.trueVtxX >= (fiducialData["xMax"] - fiducialData["width"]) or ntuple.trueVtxY >= (fiducialData["yMax"] - fiducialData["width"]) or ntuple.trueVtxZ <= (fiducialData["zMin"] + fiducialData["width"]) or ntuple.trueVtxZ >= (fiducialData["zMax"] - fiducialData["width"]):
-    return False
-  else:
-    return True
+  return bool(insideFiducial(ntuple.trueVtxX, ntuple.trueVtxY, ntuple.trueVtxZ, fiducialData, bottomless=True))
 
 def trueCutCosmic(ntuple):
   #skip events where all hits overlap with tagged cosmic rays
@@ -149,15 +148,13 @@ def trueCheckPionKaon(ntuple):
 def trueCheckParentTracker(ntuple):
 #Creates a list of primary particle TIDs, then checks the photons to see if they have them as parents. If so, returns true, otherwise returns false
   photonInSecondary = False
-  #Create a list of prime particle Track IDs
-  for x in range(len(ntuple.trueSimPartTID)):
-    if ntuple.trueSimPartTID[x] == ntuple.trueSimPartMID[x]:
-      primList.append(ntuple.trueSimPartTID[x])
+  #Index the prime particle Track IDs
+  truth = EventTruth(ntuple)
   #Iterate through to find photons
   for x in range(len(ntuple.trueSimPartPDG)):
     if ntuple.trueSimPartPDG[x] == 22:
       #Check for parent particle in the primary list
-      if ntuple.trueSimPartMID[x] in primList:
+      if truth.motherIsPrimary(x):
         photonInSecondary = True
   if photonInSecondary == False:
     return False
@@ -191,28 +188,27 @@ def trueCutEDep(ntuple, fiducialInfo):
     return True
 
 
-def truePhotonList(ntuple, fiducial, threshold=5.0):
+@eventCached
+def truePhotonList(ntuple, fiducial, threshold=5.0, minPlanes=2):
 #Uses truth to create a list of photons that pass the vertex and deposit tests
+#A photon has to deposit more than threshold MeV on at least minPlanes of the three wire planes
   list1 = []
   secondaryList = []
-  primList = []
-  for x in range(len(ntuple.trueSimPartTID)):
-    if ntuple.trueSimPartTID[x] == ntuple.trueSimPartMID[x]:
-      primList.append(ntuple.trueSimPartTID[x])
+  truth = EventTruth(ntuple)
   for x in range(ntuple.nTrueSimParts):
     if ntuple.trueSimPartPDG[x] == 22:
-      if ntuple.trueSimPartMID[x] in primList:
+      if truth.motherIsPrimary(x):
         secondaryList.append(x)
       elif abs(ntuple.trueSimPartX[x] - ntuple.trueVtxX) <= 0.15 and abs(ntuple.trueSimPartY[x] - ntuple.trueVtxY) <= 0.15 and abs(ntuple.trueSimPartZ[x] - ntuple.trueVtxZ) <= 0.15:
         secondaryList.append(x)
   for x in secondaryList:
-    if ntuple.trueSimPartEDepX[x] > (fiducial["xMin"] + fiducial["photonWidth"]) and ntuple.trueSimPartEDepX[x] < (fiducial["xMax"] - fiducial["photonWidth"]) and ntuple.trueSimPartEDepY[x] > (fiducial["yMin"] + fiducial["photonWidth"]) and ntuple.trueSimPartEDepY[x] < (fiducial["yMax"] - fiducial["photonWidth"]) and ntuple.trueSimPartEDepZ[x] > (fiducial["zMin"] + fiducial["photonWidth"]) and ntuple.trueSimPartEDepZ[x] < (fiducial["zMax"] - fiducial["photonWidth"]):        
+    if insideFiducial(ntuple.trueSimPartEDepX[x], ntuple.trueSimPartEDepY[x], ntuple.trueSimPartEDepZ[x], fiducial, width=fiducial["photonWidth"], bottomless=False):
         pixelList = [ntuple.trueSimPartPixelSumUplane[x], ntuple.trueSimPartPixelSumVplane[x], ntuple.trueSimPartPixelSumYplane[x]]
         nplanes = 0
         for pixsum in pixelList:
           if pixsum*0.0126>threshold:
               nplanes += 1
-        if nplanes>=2:
+        if nplanes>=minPlanes:
             list1.append(x)
   return list1
 
@@ -220,39 +216,33 @@ def trueBottomlessPhotonList(ntuple, fiducial):
 #Uses truth to create a list of photons that pass the vertex and deposit tests
   list1 = []
   secondaryList = []
-  primList = []
-  for x in range(len(ntuple.trueSimPartTID)):
-    if ntuple.trueSimPartTID[x] == ntuple.trueSimPartMID[x]:
-      primList.append(ntuple.trueSimPartTID[x])
+  truth = EventTruth(ntuple)
   for x in range(ntuple.nTrueSimParts):
     if ntuple.trueSimPartPDG[x] == 22:
-      if ntuple.trueSimPartMID[x] in primList:
+      if truth.motherIsPrimary(x):
         secondaryList.append(x)
       elif abs(ntuple.trueSimPartX[x] - ntuple.trueVtxX) <= 0.15 and abs(ntuple.trueSimPartY[x] - ntuple.trueVtxY) <= 0.15 and abs(ntuple.trueSimPartZ[x] - ntuple.trueVtxZ) <= 0.15:
         secondaryList.append(x)
   for x in secondaryList:
-    if ntuple.trueSimPartEDepX[x] > (fiducial["xMin"] + fiducial["width"]) and ntuple.trueSimPartEDepX[x] < (fiducial["xMax"] - fiducial["width"]) and ntuple.trueSimPartEDepY[x] < (fiducial["yMax"] - fiducial["width"]) and ntuple.trueSimPartEDepZ[x] > (fiducial["zMin"] + fiducial["width"]) and ntuple.trueSimPartEDepZ[x] < (fiducial["zMax"] - fiducial["width"]):
+    if insideFiducial(ntuple.trueSimPartEDepX[x], ntuple.trueSimPartEDepY[x], ntuple.trueSimPartEDepZ[x], fiducial, bottomless=True):
       list1.append(x)
   return list1
 
 def trueCutOverlapPhotonList(ntuple, fiducial):
   list1 = []
   secondaryList = []
-  primList = []
   #Check directly to see if the photon is secondary (won't catch pi0 photons)
-  for x in range(len(ntuple.trueSimPartTID)):
-    if ntuple.trueSimPartTID[x] == ntuple.trueSimPartMID[x]:
-      primList.append(ntuple.trueSimPartTID[x])
+  truth = EventTruth(ntuple)
   #Check somewhat less directly
   for x in range(ntuple.nTrueSimParts):
     if ntuple.trueSimPartPDG[x] == 22:
-      if ntuple.trueSimPartMID[x] in primList:
+      if truth.motherIsPrimary(x):
         secondaryList.append(x)
       elif abs(ntuple.trueSimPartX[x] - ntuple.trueVtxX) <= 0.15 and abs(ntuple.trueSimPartY[x] - ntuple.trueVtxY) <= 0.15 and abs(ntuple.trueSimPartZ[x] - ntuple.trueVtxZ) <= 0.15:
         secondaryList.append(x)
   #Check for fiducial
   for x in secondaryList:
-    if ntuple.trueSimPartEDepX[x] > (fiducial["xMin"] + fiducial["width"]) and ntuple.trueSimPartEDepX[x] < (fiducial["xMax"] - fiducial["width"]) and ntuple.trueSimPartEDepY[x] > (fiducial["yMin"] + fiducial["width"]) and ntuple.trueSimPartEDepY[x] < (fiducial["yMax"] - fiducial["width"]) and ntuple.trueSimPartEDepZ[x] > (fiducial["zMin"] + fiducial["width"]) and ntuple.trueSimPartEDepZ[x] < (fiducial["zMax"] - fiducial["width"]):
+    if insideFiducial(ntuple.trueSimPartEDepX[x], ntuple.trueSimPartEDepY[x], ntuple.trueSimPartEDepZ[x], fiducial, bottomless=False):
       #Now check to see if this photon could have overlapped with another (for our purposes, if they fell within 13 degrees of each other)
       goodPhoton = True
       for y in list1:
@@ -283,22 +273,9 @@ def trueCutMaxProtons(ntuple):
     return False
 
 def trueTwoPhotonOpeningAngle( eventTree, simpartindex1, simpartindex2 ):
-    id1 = simpartindex1
-    id2 = simpartindex2
-    pgamma1 = [eventTree.trueSimPartPx[id1],eventTree.trueSimPartPy[id1],eventTree.trueSimPartPz[id1]]
-    pgamma2 = [eventTree.trueSimPartPx[id2],eventTree.trueSimPartPy[id2],eventTree.trueSimPartPz[id2]]
-    norm1 = 0.0
-    norm2 = 0.0
-    cosOpen = 0.0
-    for vv in range(3):
-      norm1 += pgamma1[vv]*pgamma1[vv]
-      norm2 += pgamma2[vv]*pgamma2[vv]
-      cosOpen += pgamma1[vv]*pgamma2[vv]
-    cosnorm = norm1*norm2
-    if cosnorm>0:
-      cosOpen = cosOpen/np.sqrt(cosnorm)
-    trueOpeningAngle = np.arccos(cosOpen)*180.0/3.14159
-    return trueOpeningAngle
+    pgamma1 = (eventTree.trueSimPartE[simpartindex1], eventTree.trueSimPartPx[simpartindex1], eventTree.trueSimPartPy[simpartindex1], eventTree.trueSimPartPz[simpartindex1])
+    pgamma2 = (eventTree.trueSimPartE[simpartindex2], eventTree.trueSimPartPx[simpartindex2], eventTree.trueSimPartPy[simpartindex2], eventTree.trueSimPartPz[simpartindex2])
+    return openingAngle(pgamma1, pgamma2)
 
 
 #HISTOGRAM FUNCTIONS
@@ -308,17 +285,17 @@ def trueTwoPhotonOpeningAngle( eventTree, simpartindex1, simpartindex2 ):
 
 def histStack(histName, title, histList, POTSum, axisLabel="Photon Energy (GeV)"):
   #Takes a list of histograms and converts them into one properly formatted stacked histogram. Returns the canvas on which the histogram is written
+  POTTarget = 4.4e+19
+  histList = [scaleHist(hist, POTTarget/POTSum) for hist in histList]
   stack = rt.THStack(str("Histname"), str(title))
   legend = rt.TLegend(0.5, 0.5, 0.9, 0.9)
   colors = [rt. kBlue,  rt. kOrange+1, rt.kRed, rt.kCyan, rt.kMagenta, rt.kYellow+1, rt.kBlack, rt.kViolet]
-  POTTarget = 4.4e+19
   histIntTotal = 0
   #Adds the histograms to the stack
   for x in range(len(histList)):
     hist = histList[x]
     bins = hist.GetNbinsX()
     hist.SetLineWidth(2)
-    hist.Scale(POTTarget/POTSum)
     #Make sure signal is the only one with green, for easy identification
     if x == 0:
       hist.SetLineColor(rt.kGreen+2)
@@ -353,6 +330,7 @@ def histStack(histName, title, histList, POTSum, axisLabel="Photon Energy (GeV)"
 
 def histStackDark(title, histList, POTSum, axisLabel="Photon Energy (GeV)"):
   #Takes a list of histograms and converts them into one properly formatted stacked histogram. Returns the canvas on which the histogram is written
+  histList = [toTH1(hist) for hist in histList]
   stack = rt.THStack("PhotonStack", str(title))
   legend = rt.TLegend(0.5, 0.5, 0.9, 0.9)
   colors = [rt.kGreen, rt. kBlue,  rt. kOrange+1, rt.kViolet+3, rt.kRed, rt.kCyan, rt.kMagenta, rt.kYellow+1, rt.kBlack, rt.kViolet]
@@ -387,6 +365,8 @@ def histStackDark(title, histList, POTSum, axisLabel="Photon Energy (GeV)"):
 
 def histStackTwoSignal(title, histList, POTSum, POTTarget, beamHist):
   #Takes a list of histograms and converts them into one properly formatted stacked histogram. Returns the canvas on which the histogram is written
+  histList = [scaleHist(hist, POTTarget/POTSum) for hist in histList]
+  beamHist = toTH1(beamHist)
   #POTTarget = 4.4e+19    
   stack = rt.THStack("PhotonStack", str(title))
   legend = rt.TLegend(0.5, 0.5, 0.9, 0.9)
@@ -397,7 +377,6 @@ def histStackTwoSignal(title, histList, POTSum, POTTarget, beamHist):
     hist = histList[x]
     bins = hist.GetNbinsX()
     hist.SetLineWidth(2)    
-    hist.Scale(POTTarget/POTSum)
     #Make sure the signals are the only ones with green, for easy identification
     if x == 0:
       hist.SetLineColor(rt.kGreen)
@@ -455,6 +434,7 @@ def histStackTwoSignal(title, histList, POTSum, POTTarget, beamHist):
 def histStackNoScale(title, histList, POTSum):
   #Takes a list of histograms and converts them into one properly formatted stacked histogram. Returns the canvas on which the histogram is written. 
   #This one is designed for 1 Gamma + 0 and 1 Gamma + 1P data, so no scaling is implimented
+  histList = [toTH1(hist) for hist in histList]
   stack = rt.THStack("PhotonStack", str(title))
   legend = rt.TLegend(0.5, 0.5, 0.9, 0.9)
   colors = [rt. kBlue, rt.kRed, rt.kCyan, rt.kMagenta, rt.kYellow+2, rt.kBlack, rt.kYellow, rt.kViolet, rt. kOrange+1]
@@ -505,16 +485,16 @@ def histStackNoScale(title, histList, POTSum):
 
 def histStackFill(title, histList, legendTitle, xTitle, yTitle, ntuplePOTSum):
   #Takes a list of histograms and converts them into one properly formatted stacked histogram. Returns the canvas on which the histogram is written
+  targetPOT = 4.4e+19
+  histList = [scaleHist(hist, targetPOT/ntuplePOTSum) for hist in histList]
   stack = rt.THStack("PhotonStack", str(title))
   legend = rt.TLegend(0.35, 0.5, 0.9, 0.9)
   colors = [rt.kRed, rt.kOrange, rt.kYellow+2, rt.kCyan, rt. kBlue, rt.kMagenta, rt.kViolet, rt.kBlack]
-  targetPOT = 4.4e+19
   integralSum = 0
   sum = 0
   for x in range(len(histList)):
     hist = histList[x]
     bins = hist.GetNbinsX()
-    hist.Scale(targetPOT/ntuplePOTSum)
     histInt = hist.Integral(1, int(bins))
     sum += histInt
   for x in range(len(histList)):
@@ -550,8 +530,8 @@ def sStackFillS(title, hist, kColor, canvasTitle ):
   legend = rt.TLegend(0.45, 0.8, 0.9, 0.9)
   targetPOT = 6.67e+20
   ntuplePOTSum = 4.675690535431973e+20
+  hist = scaleHist(hist, targetPOT/ntuplePOTSum)
   bins = hist.GetNbinsX()
-  hist.Scale(targetPOT/ntuplePOTSum)
   hist.SetFillColor(kColor)
   hist.SetMarkerStyle(21)
   hist.SetMarkerColor(kColor)
@@ -570,6 +550,7 @@ def sStackFillS(title, hist, kColor, canvasTitle ):
 
 def sStackFillNS(title, hist, kColor, canvasTitle ):
 #Same as above, except doesn't scale (designed to be used after the input histogram has already been scaled in the program)
+  hist = toTH1(hist)
   stack = rt.THStack("PhotonStack", str(title))
   legend = rt.TLegend(0.45, 0.8, 0.9, 0.9)
   bins = hist.GetNbinsX()
@@ -593,9 +574,9 @@ def sStackFillNS(title, hist, kColor, canvasTitle ):
 #takes a total event space histogram, signal histogram, blank hist to be filled with the ratio of signal to total
 #returns an efficiency plot of the event reconstruction
 def efficiencyPlot(totalHist, signalHist, ratioHist, title, xTitle):
-  totalHist.Scale(6.67e+20/4.675690535431973e+20)
-  signalHist.Scale(6.67e+20/4.675690535431973e+20)
-  ratioHist.Scale(6.67e+20/4.675690535431973e+20)
+  totalHist = scaleHist(totalHist, 6.67e+20/4.675690535431973e+20)
+  signalHist = scaleHist(signalHist, 6.67e+20/4.675690535431973e+20)
+  ratioHist = scaleHist(ratioHist, 6.67e+20/4.675690535431973e+20)
   ratioHist = (signalHist)/(totalHist)
   efficiencyStack = rt.THStack("EfficiencyStack", str(title))
   ratioHist.SetFillColor(rt.kGreen+2)
@@ -608,6 +589,7 @@ def efficiencyPlot(totalHist, signalHist, ratioHist, title, xTitle):
 
   return efficiencyCanvas, efficiencyStack  
 
+@eventCached
 def scaleRecoEnergy(ntuple, recoIDs, recoIDs2):
   #Uses reconstructed variables to return scaled energy and invariant mass (if the photon count is not two, the invariant mass defaults to -1)
   scaledEnergy = []
@@ -628,6 +610,7 @@ def scaleRecoEnergy(ntuple, recoIDs, recoIDs2):
   return highestPhoton
 
 
+@eventCached
 def scaleTrueEnergy(ntuple, trueIDs):
   scaledEnergy = []
 #  invariantMass = -1
@@ -661,19 +644,13 @@ def recoNoVertex(ntuple):
 def recoFiducials(ntuple, fiducial):
   #Checks to see if the reconstructed event vertex is within the fiducial volume
   if ntuple.foundVertex == 1:
-    if ntuple.vtxX > (fiducial["xMin"] + fiducial["width"]) and ntuple.vtxX < (fiducial["xMax"] - fiducial["width"]) and ntuple.vtxY > (fiducial["yMin"] + fiducial["width"]) and ntuple.vtxY < (fiducial["yMax"] - fiducial["width"]) and ntuple.vtxZ > (fiducial["zMin"] + fiducial["width"]) and ntuple.vtxZ < (fiducial["zMax"] - fiducial["width"]):
-      return True
-    else:
-      return False
+    return bool(insideFiducial(ntuple.vtxX, ntuple.vtxY, ntuple.vtxZ, fiducial, bottomless=False))
 
 
 def recoBottomlessFiducials(ntuple, fiducial):
   #Checks to see if the reconstructed event vertex is within the fiducial volume, excluding the lower side
   if ntuple.foundVertex == 1:
-    if ntuple.vtxX > (fiducial["xMin"] + fiducial["width"]) and ntuple.vtxX < (fiducial["xMax"] - fiducial["width"]) and ntuple.vtxY < (fiducial["yMax"] - fiducial["width"]) and ntuple.vtxZ > (fiducial["zMin"] + fiducial["width"]) and ntuple.vtxZ < (fiducial["zMax"] - fiducial["width"]):
-      return True
-    else:
-      return False
+    return bool(insideFiducial(ntuple.vtxX, ntuple.vtxY, ntuple.vtxZ, fiducial, bottomless=True))
 
 
 def recoPhotonList(ntuple, threshold = 0):
@@ -708,6 +685,7 @@ def recoPionProton(ntuple):
     return True
 
 
+@eventCached
 def recoProton(ntuple, threshold = 0):
   protonsFound = 0
   #Go through tracks to see if we can find sufficiently energetic protons
@@ -982,6 +960,7 @@ def recoCutManyTracks(ntuple, threshold = 0):
     return True
 
 
+@eventCached
 def recoPhotonListFiducial(fiducial, ntuple, threshold = 0):
   #Creates a list of photons based on the showers in the event
   recoIDs = []
@@ -989,22 +968,12 @@ def recoPhotonListFiducial(fiducial, ntuple, threshold = 0):
     if threshold == 0:
       if ntuple.showerClassified[x] == 1:
         if ntuple.showerPID[x] == 22:
-          if ( ntuple.showerStartPosX[x] > (fiducial["xMin"] + fiducial["photonWidth"])
-               and ntuple.showerStartPosX[x] < (fiducial["xMax"] - fiducial["photonWidth"])
-               and ntuple.showerStartPosY[x] > (fiducial["yMin"] + fiducial["photonWidth"])
-               and ntuple.showerStartPosY[x] < (fiducial["yMax"] - fiducial["photonWidth"])
-               and ntuple.showerStartPosZ[x] > (fiducial["zMin"] + fiducial["photonWidth"])
-               and ntuple.showerStartPosZ[x] < (fiducial["zMax"] - fiducial["photonWidth"])):
+          if insideFiducial(ntuple.showerStartPosX[x], ntuple.showerStartPosY[x], ntuple.showerStartPosZ[x], fiducial, width=fiducial["photonWidth"], bottomless=False):
             recoIDs.append(x)
     elif ntuple.showerRecoE[x] > threshold:
       if ntuple.showerPID[x] == 22:
         #Extra check to ensure photons deposit in fiducial volume
-        if ( ntuple.showerStartPosX[x] > (fiducial["xMin"] + fiducial["photonWidth"])
-             and ntuple.showerStartPosX[x] < (fiducial["xMax"] - fiducial["photonWidth"])
-             and ntuple.showerStartPosY[x] > (fiducial["yMin"] + fiducial["photonWidth"])
-             and ntuple.showerStartPosY[x] < (fiducial["yMax"] - fiducial["photonWidth"])
-             and ntuple.showerStartPosZ[x] > (fiducial["zMin"] + fiducial["photonWidth"])
-             and ntuple.showerStartPosZ[x] < (fiducial["zMax"] - fiducial["photonWidth"]) ):
+        if insideFiducial(ntuple.showerStartPosX[x], ntuple.showerStartPosY[x], ntuple.showerStartPosZ[x], fiducial, width=fiducial["photonWidth"], bottomless=False):
           recoIDs.append(x)
   return recoIDs
 
@@ -1023,6 +992,7 @@ def recoCutMaxInTime(ntuple, protonNo):
 
   return goodEvent
 
+@eventCached
 def recoPhotonListTracks(fiducial, ntuple, threshold = 0):
   #Creates a list of photons based on the tracks in the event
   recoIDs = []
@@ -1031,22 +1001,12 @@ def recoPhotonListTracks(fiducial, ntuple, threshold = 0):
       if ntuple.trackClassified[x] == 1:
         if ntuple.trackPID[x] == 22:
             #Extra check to ensure photons deposit in fiducial volume (with a 5 cm margin of error)
-          if (ntuple.trackStartPosX[x] > (fiducial["xMin"] + fiducial["photonWidth"])
-              and ntuple.trackStartPosX[x] < (fiducial["xMax"] - fiducial["photonWidth"])
-              and ntuple.trackStartPosY[x] > (fiducial["yMin"] + fiducial["photonWidth"])
-              and ntuple.trackStartPosY[x] < (fiducial["yMax"] - fiducial["photonWidth"])
-              and ntuple.trackStartPosZ[x] > (fiducial["zMin"] + fiducial["photonWidth"])
-              and ntuple.trackStartPosZ[x] < (fiducial["zMax"] - fiducial["photonWidth"])):
+          if insideFiducial(ntuple.trackStartPosX[x], ntuple.trackStartPosY[x], ntuple.trackStartPosZ[x], fiducial, width=fiducial["photonWidth"], bottomless=False):
             recoIDs.append(x)
     elif ntuple.trackSize[x] > threshold:
       if ntuple.trackPID[x] == 22:
         #Extra check to ensure photons deposit in fiducial volume (with a 5 cm margin of error)
-        if (ntuple.trackStartPosX[x] > (fiducial["xMin"] + fiducial["photonWidth"])
-            and ntuple.trackStartPosX[x] < (fiducial["xMax"] - fiducial["photonWidth"])
-            and ntuple.trackStartPosY[x] > (fiducial["yMin"] + fiducial["photonWidth"])
-            and ntuple.trackStartPosY[x] < (fiducial["yMax"] - fiducial["photonWidth"])
-            and ntuple.trackStartPosZ[x] > (fiducial["zMin"] + fiducial["photonWidth"])
-            and ntuple.trackStartPosZ[x] < (fiducial["zMax"] - fiducial["photonWidth"])):
+        if insideFiducial(ntuple.trackStartPosX[x], ntuple.trackStartPosY[x], ntuple.trackStartPosZ[x], fiducial, width=fiducial["photonWidth"], bottomless=False):
           recoIDs.append(x)
   return recoIDs
 
@@ -1190,9 +1150,9 @@ def recoCCCut(eventTree):
   for i in range(eventTree.nShowers):
     if eventTree.showerIsSecondary[i] == 0:
       if abs(eventTree.showerPID[i]) == 11:
-        recoPrimaryElectronShowerFound == True
+        recoPrimaryElectronShowerFound = True
       elif abs(eventTree.showerPID[i]) == 13:
-        recoPrimaryMuonShowerFound == True
+        recoPrimaryMuonShowerFound = True
   if eventTree.nTracks != 0:
     if unclassifiedTracks/eventTree.nTracks >= 0.55:
       cc = True
@@ -1210,27 +1170,11 @@ def recoCCCut(eventTree):
 
 # Takes ntuple and fiducial width, returns true if vtx is outside of fiducial volume
 def trueFiducialCut(eventTree, fiducialWidth):
-  xMin, xMax = 0, 256
-  yMin, yMax = -116.5, 116.5
-  zMin, zMax = 0, 1036
-  outFiducial = False
-  if eventTree.trueVtxX <= (xMin + fiducialWidth) or eventTree.trueVtxX >= (xMax - fiducialWidth) or \
-    eventTree.trueVtxY <= (yMin + fiducialWidth) or eventTree.trueVtxY >= (yMax - fiducialWidth) or \
-      eventTree.trueVtxZ <= (zMin + fiducialWidth) or eventTree.trueVtxZ >= (zMax - fiducialWidth):
-    outFiducial = True
-  return outFiducial
+  return not insideFiducial(eventTree.trueVtxX, eventTree.trueVtxY, eventTree.trueVtxZ, fiducialSpec(fiducialWidth))
 
 # Takes ntuple and fiducial width, returns true if vtx is outside of fiducial volume
 def recoFiducialCut(eventTree, fiducialWidth):
-  xMin, xMax = 0, 256
-  yMin, yMax = -116.5, 116.5
-  zMin, zMax = 0, 1036
-  outFiducial = False
-  if eventTree.vtxX <= (xMin + fiducialWidth) or eventTree.vtxX >= (xMax - fiducialWidth) or \
-    eventTree.vtxY <= (yMin + fiducialWidth) or eventTree.vtxY >= (yMax - fiducialWidth) or \
-      eventTree.vtxZ <= (zMin + fiducialWidth) or eventTree.vtxZ >= (zMax - fiducialWidth):
-      outFiducial = True
-  return outFiducial
+  return not insideFiducial(eventTree.vtxX, eventTree.vtxY, eventTree.vtxZ, fiducialSpec(fiducialWidth))
 
 # true pi+ cut: exclude any pi+ above 30MeV
 def truePiPlusCut(eventTree):
@@ -1254,6 +1198,7 @@ def recoPiPlusCut(eventTree):
   return recoPiPlusPresent
 
 # True proton selection: takes ntuple, returns count of all primary protons and float of TID (will match correctly if nprotons = 1)
+@eventCached
 def trueProtonSelection(eventTree):
   nTrueProtons = 0
   trueProtonTID = 0
@@ -1269,6 +1214,7 @@ def trueProtonSelection(eventTree):
   return nTrueProtons, trueProtonTID, trueProtonIndex
 
 # reco proton selection: returns tid as well for matching later
+@eventCached
 def recoProtonSelection(eventTree):
   nRecoProtons = 0
   recoProtonTID = 0
@@ -1284,22 +1230,19 @@ def recoProtonSelection(eventTree):
 # Find all secondary photons using Edep Sum
 # then only count those that edep in detector
 # then compute leading photon energy
+@eventCached
 def truePhotonSelection(eventTree, fiducialWidth):
   photonInSecondary = False
   photonIndexList = []
   truePhotonTIDList = []
   photonEDepOutsideFiducial = 0
-  xMin, xMax = 0, 256
-  yMin, yMax = -116.5, 116.5
-  zMin, zMax = 0, 1036
+  fiducialData = fiducialSpec(fiducialWidth)
   for i in range(eventTree.nTrueSimParts):
     if eventTree.trueSimPartPDG[i] == 22 and eventTree.trueSimPartProcess[i] == 1:
       if abs(eventTree.trueSimPartX[i] - eventTree.trueVtxX) <= 0.15 and abs(eventTree.trueSimPartY[i] - eventTree.trueVtxY) <= 0.15 and abs(eventTree.trueSimPartZ[i] -eventTree.trueVtxZ) <= 0.15:
         pixelEnergy = eventTree.trueSimPartPixelSumYplane[i]*0.0126
         if pixelEnergy >= 20:
-          if eventTree.trueSimPartEDepX[i] <= (xMin + fiducialWidth) or eventTree.trueSimPartEDepX[i] >= (xMax - fiducialWidth)\
-            or eventTree.trueSimPartEDepY[i] <= (yMin + fiducialWidth) or eventTree.trueSimPartEDepY[i] >= (yMax - fiducialWidth)\
-              or eventTree.trueSimPartEDepZ[i] <= (zMin + fiducialWidth) or eventTree.trueSimPartEDepZ[i] >= (zMax - fiducialWidth):
+          if not insideFiducial(eventTree.trueSimPartEDepX[i], eventTree.trueSimPartEDepY[i], eventTree.trueSimPartEDepZ[i], fiducialData):
             photonEDepOutsideFiducial += 1
           else:
             truePhotonTIDList.append(eventTree.trueSimPartTID[i])
@@ -1319,23 +1262,20 @@ def truePhotonSelectionPiZero(eventTree, fiducialWidth):
   photonIndexList = []
   truePhotonTIDList = []
   photonEDepOutsideFiducial = 0
+  truth = EventTruth(eventTree)
   for i in range(eventTree.nTrueSimParts):
     if eventTree.trueSimPartPDG[i] == 22 and eventTree.trueSimPartProcess[i] == 1:
-      if eventTree.trueSimPartMID[i] not in eventTree.trueSimPartTID:
+      if not truth.hasMother(i):
         if abs(eventTree.trueSimPartX[i] - eventTree.trueVtxX) <= 0.15 and abs(eventTree.trueSimPartY[i] - eventTree.trueVtxY) <= 0.15 and abs(eventTree.trueSimPartZ[i] -eventTree.trueVtxZ) <= 0.15:
           pixelEnergy = eventTree.trueSimPartPixelSumYplane[i]*0.0126
           if pixelEnergy >= 20:
             photonIndexList.append(i)
             photonInSecondary = True
 
-  xMin, xMax = 0, 256
-  yMin, yMax = -116.5, 116.5
-  zMin, zMax = 0, 1036
+  fiducialData = fiducialSpec(fiducialWidth)
   if photonInSecondary == True:
     for i in range(len(photonIndexList)):
-      if eventTree.trueSimPartEDepX[photonIndexList[i]] <= (xMin + fiducialWidth) or eventTree.trueSimPartEDepX[photonIndexList[i]] >= (xMax - fiducialWidth)\
-        or eventTree.trueSimPartEDepY[photonIndexList[i]] <= (yMin + fiducialWidth) or eventTree.trueSimPartEDepY[photonIndexList[i]] >= (yMax - fiducialWidth)\
-        or eventTree.trueSimPartEDepZ[photonIndexList[i]] <= (zMin + fiducialWidth) or eventTree.trueSimPartEDepZ[photonIndexList[i]] >= (zMax - fiducialWidth):
+      if not insideFiducial(eventTree.trueSimPartEDepX[photonIndexList[i]], eventTree.trueSimPartEDepY[photonIndexList[i]], eventTree.trueSimPartEDepZ[photonIndexList[i]], fiducialData):
           photonEDepOutsideFiducial += 1
       else:
         truePhotonTIDList.append(eventTree.trueSimPartTID[i])
@@ -1355,30 +1295,23 @@ def truePhotonSelectionPiZero(eventTree, fiducialWidth):
 # but no edep pixel sum
 def truePhotonSelectionOldNtuple(eventTree, fiducialWidth):
   photonInSecondary = False
-  primList = []
   photonIndexList = []
   truePhotonTIDList = []
   photonEDepOutsideFiducial = 0
-  for i in range(len(eventTree.trueSimPartTID)):
-    if eventTree.trueSimPartTID[i] == eventTree.trueSimPartMID[i]:
-      primList.append(eventTree.trueSimPartTID[i])
+  truth = EventTruth(eventTree)
   for i in range(len(eventTree.trueSimPartPDG)):
     if eventTree.trueSimPartPDG[i] == 22:
-      if eventTree.trueSimPartMID[i] in primList:
+      if truth.motherIsPrimary(i):
         photonIndexList.append(i)
         photonInSecondary = True
       elif abs(eventTree.trueSimPartX[i] - eventTree.trueVtxX) <= 0.15 and abs(eventTree.trueSimPartY[i] - eventTree.trueVtxY) <= 0.15 and abs(eventTree.trueSimPartZ[i] -eventTree.trueVtxZ) <= 0.15:
         photonIndexList.append(i)
         photonInSecondary = True
 
-  xMin, xMax = 0, 256
-  yMin, yMax = -116.5, 116.5
-  zMin, zMax = 0, 1036
+  fiducialData = fiducialSpec(fiducialWidth)
   if photonInSecondary == True:
     for i in range(len(photonIndexList)):
-      if eventTree.trueSimPartEDepX[photonIndexList[i]] <= (xMin + fiducialWidth) or eventTree.trueSimPartEDepX[photonIndexList[i]] >= (xMax - fiducialWidth)\
-        or eventTree.trueSimPartEDepY[photonIndexList[i]] <= (yMin + fiducialWidth) or eventTree.trueSimPartEDepY[photonIndexList[i]] >= (yMax - fiducialWidth)\
-        or eventTree.trueSimPartEDepZ[photonIndexList[i]] <= (zMin + fiducialWidth) or eventTree.trueSimPartEDepZ[photonIndexList[i]] >= (zMax - fiducialWidth):
+      if not insideFiducial(eventTree.trueSimPartEDepX[photonIndexList[i]], eventTree.trueSimPartEDepY[photonIndexList[i]], eventTree.trueSimPartEDepZ[photonIndexList[i]], fiducialData):
           photonEDepOutsideFiducial += 1
       else:
         truePhotonTIDList.append(eventTree.trueSimPartTID[i])
@@ -1394,18 +1327,15 @@ def truePhotonSelectionOldNtuple(eventTree, fiducialWidth):
 
 # reco photon process:
 # finds all, checks edep within fiducial, calcs leading photon energy, returns both 
+@eventCached
 def recoPhotonSelection(eventTree, fiducialWidth):
   reco = 0
   recoPhotonTIDList = []
   recoPhotonIndexList = []
-  xMin, xMax = 0, 256
-  yMin, yMax = -116.5, 116.5
-  zMin, zMax = 0, 1036
+  fiducialData = fiducialSpec(fiducialWidth)
   for i in range(eventTree.nShowers):
     if eventTree.showerPID[i] == 22:
-      if eventTree.showerStartPosX[i] <= (xMin + fiducialWidth) or eventTree.showerStartPosX[i] >= (xMax - fiducialWidth) or \
-        eventTree.showerStartPosY[i] <= (yMin + fiducialWidth) or eventTree.showerStartPosY[i] >= (yMax - fiducialWidth) or \
-          eventTree.showerStartPosZ[i] <= (zMin + fiducialWidth) or eventTree.showerStartPosZ[i] >= (zMax - fiducialWidth):
+      if not insideFiducial(eventTree.showerStartPosX[i], eventTree.showerStartPosY[i], eventTree.showerStartPosZ[i], fiducialData):
             reco += 1
       else:
         recoPhotonTIDList.append(eventTree.showerTrueTID[i])
@@ -1429,13 +1359,9 @@ def recoPhotonSelectionInvMass(eventTree, fiducialWidth):
     if eventTree.showerPID[i] == 22:
       recoPhotonIndexList.append(i)
   
-  xMin, xMax = 0, 256
-  yMin, yMax = -116.5, 116.5
-  zMin, zMax = 0, 1036
+  fiducialData = fiducialSpec(fiducialWidth)
   for i in range(len(recoPhotonIndexList)):
-    if eventTree.showerStartPosX[i] <= (xMin + fiducialWidth) or eventTree.showerStartPosX[i] >= (xMax - fiducialWidth) or \
-    eventTree.showerStartPosY[i] <= (yMin + fiducialWidth) or eventTree.showerStartPosY[i] >= (yMax - fiducialWidth) or \
-      eventTree.showerStartPosZ[i] <= (zMin + fiducialWidth) or eventTree.showerStartPosZ[i] >= (zMax - fiducialWidth):
+    if not insideFiducial(eventTree.showerStartPosX[i], eventTree.showerStartPosY[i], eventTree.showerStartPosZ[i], fiducialData):
           reco += 1
     else:
       recoPhotonTIDList.append(eventTree.showerTrueTID[i])
@@ -1481,52 +1407,29 @@ def recoCCCutLoose(eventTree):
   for i in range(eventTree.nShowers):
     if eventTree.showerIsSecondary[i] == 0:
       if abs(eventTree.showerPID[i]) == 11 and eventTree.showerRecoE[i] >= 100:
-        recoPrimaryElectronShowerFound == True
+        recoPrimaryElectronShowerFound = True
       elif abs(eventTree.showerPID[i]) == 13 and eventTree.showerRecoE[i] >= 100:
-        recoPrimaryMuonShowerFound == True
+        recoPrimaryMuonShowerFound = True
   if recoPrimaryMuonTrackFound or recoPrimaryMuonShowerFound or recoPrimaryElectronTrackFound or recoPrimaryElectronShowerFound:   
     return True
   else:
     return False 
 
 # function takes the ntuple, true proton index, and list of photon indices, and returns invariant mass calculations
+# (kinematics.trueDeltaKinematics does the same for a whole batch)
 def trueInvariantMassCalculations(eventTree, pi, truePhotonIndexList):
-  # Create variables for photon indices
-  gi1, gi2 = truePhotonIndexList[0], truePhotonIndexList[1]
-  # Obtain proton, photon energies
-  pE = eventTree.trueSimPartE[pi]
-  gE1, gE2 = eventTree.trueSimPartE[gi1], eventTree.trueSimPartE[gi2]
-
-  # Obtain momentum component variables 
-  pPx, pPy, pPz = eventTree.trueSimPartPx[pi], eventTree.trueSimPartPy[pi], eventTree.trueSimPartPz[pi]
-  gPx1, gPy1, gPz1 = eventTree.trueSimPartPx[gi1], eventTree.trueSimPartPy[gi1], eventTree.trueSimPartPz[gi1]
-  gPx2, gPy2, gPz2 = eventTree.trueSimPartPx[gi2], eventTree.trueSimPartPy[gi2], eventTree.trueSimPartPz[gi2]
-
+  # obtain four-vectors of the proton and the first two photons
+  proton, photon1, photon2 = [(eventTree.trueSimPartE[i], eventTree.trueSimPartPx[i], eventTree.trueSimPartPy[i], eventTree.trueSimPartPz[i]) for i in [pi, truePhotonIndexList[0], truePhotonIndexList[1]]]
   # compute final quantities
-  trueProtonInv = np.sqrt( np.square(pE) - ( np.square(pPx) + np.square(pPy) + np.square(pPz)))
-  truePiZeroInv = np.sqrt( np.square(gE1 + gE2) - ( np.square(gPx1 + gPx2) + np.square(gPy1 + gPy2) + np.square(gPz1 + gPz2)))
-  trueDeltaInv = np.sqrt( np.square(pE + gE1 + gE2) - ( np.square(pPx + gPx1 + gPx2) + np.square(pPy + gPy1 + gPy2) + np.square(pPz + gPz1 + gPz2)))
-
-  return trueProtonInv, truePiZeroInv, trueDeltaInv
+  masses = deltaKinematics(proton, photon1, photon2)
+  return masses["protonMass"], masses["piZeroMass"], masses["deltaMass"]
 
 def recoInvariantMassCalculations(eventTree, recoProtonIndex, recoPhotonIndexList):
-  pMass = 938.272089
-  # obtain indices 
+  # proton: start direction unit vector and momentum norm from the kinetic energy
   pi = recoProtonIndex
-  gi1, gi2 = recoPhotonIndexList[0], recoPhotonIndexList[1]
-  # obtain energies
-  pEtot = eventTree.trackRecoE[pi] + pMass
-  gE1, gE2 = eventTree.showerRecoE[gi1], eventTree.showerRecoE[gi2]
-  # proton: obtain start direction unit vector and momentum norm to create momentum vector
-  nx, ny, nz = eventTree.trackStartDirX[pi], eventTree.trackStartDirY[pi], eventTree.trackStartDirZ[pi]
-  pNorm = np.sqrt(np.square(pEtot) - np.square(pMass))
-  pPx, pPy, pPz = pNorm * nx, pNorm * ny, pNorm * nz
-  # obtain photon momentum vectors
-  gPx1, gPy1, gPz1 = gE1 * eventTree.showerStartDirX[gi1], gE1 * eventTree.showerStartDirY[gi1], gE1 * eventTree.showerStartDirZ[gi1]
-  gPx2, gPy2, gPz2 = gE2 * eventTree.showerStartDirX[gi2], gE2 * eventTree.showerStartDirY[gi2], gE2 * eventTree.showerStartDirZ[gi2]
+  proton = recoProtonFourVector(eventTree.trackRecoE[pi], eventTree.trackStartDirX[pi], eventTree.trackStartDirY[pi], eventTree.trackStartDirZ[pi])
+  # photon momentum vectors along the shower directions
+  photon1, photon2 = [recoPhotonFourVector(eventTree.showerRecoE[i], eventTree.showerStartDirX[i], eventTree.showerStartDirY[i], eventTree.showerStartDirZ[i]) for i in recoPhotonIndexList[:2]]
   # final computations
-  recoProtonInv = np.sqrt(np.square(pEtot) - (np.square(pPx) + np.square(pPy) + np.square(pPz)))
-  recoPiZeroInv = np.sqrt(np.square(gE1 + gE2) - (np.square(gPx1 + gPx2)+(np.square(gPy1 + gPy2))+np.square(gPz1 + gPz2)))
-  recoDeltaInv = np.sqrt( np.square(pEtot + gE1 + gE2) - ( np.square(pPx + gPx1 + gPx2) + np.square(pPy + gPy1 + gPy2) + np.square(pPz + gPz1 + gPz2)))
-
-  return recoProtonInv, recoPiZeroInv, recoDeltaInv
+  masses = deltaKinematics(proton, photon1, photon2)
+  return masses["protonMass"], masses["piZeroMass"], masses["deltaMass"]
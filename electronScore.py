@@ -7,6 +7,7 @@ rt.gROOT.SetBatch(True)
 from cuts import trueCutNC, trueCutFiducials, trueCutCosmic, truePhotonList, trueCutPionProton, histStack, recoNoVertex, recoFiducials, recoPhotonList, recoPionProton, recoNeutralCurrent, scaleRecoEnergy, scaleTrueEnergy, recoCutLowEnergy, recoPion, recoProton, CCSeeker
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from helpers.potService import sumPOT, cosmicPOT
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -31,11 +32,9 @@ targetPOT = 6.67e+20
 targetPOTstring = "6.67e+20"
 ntuplePOTsum = 0
 
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
-cosmicPOTsum = 3.2974607516739725e+20
+cosmicPOTsum = cosmicPOT(cosmicTree, fallbackPOT=3.2974607516739725e+20)
 
 #Hists created and organized here
 #PURITY HISTOGRAMS
@@ -7,6 +7,8 @@ rt.gROOT.SetBatch(True)
 from cuts import trueCutNC, trueCutFiducials,trueCutCosmic, truePhotonList, trueCutPionProton, histStack, recoNoVertex, recoFiducials, recoPhotonList, recoPionProton, recoNeutralCurrent, scaleRecoEnergy, scaleTrueEnergy, recoPion, recoProton, recoCutElectronScore, recoCutShowerFromChargeScore, recoCutLongTracks, recoPhotonListFiducial, recoCutPrimary, recoCutShortTracks, recoPhotonListTracks, recoCutFarShowers, recoCutMuons, trueCutMuons, recoCutElectrons, trueCutElectrons, histStackTwoSignal
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from helpers.potService import sumPOT, cosmicPOT
+from helpers.shardRunner import ShardRunner
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -14,28 +16,32 @@ parser.add_argument("-c", "--cosmicFile", type=str, required=True, help="cosmic
 parser.add_argument("-o", "--outfile", type=str, default="example_ntuple_analysis_script_output.root", help="output root file name")
 parser.add_argument("-fc", "--fullyContained", action="store_true", help="only consider fully contained events")
 parser.add_argument("-ncc", "--noCosmicCuts", action="store_true", help="don't apply cosmic rejection cuts")
+parser.add_argument("-w", "--workers", type=int, default=1, help="split each event loop by entry range over this many processes (same output as one process)")
 
 args = parser.parse_args()
 
 #open input file and get event and POT trees
-ntuple_file = rt.TFile(args.infile)
-eventTree = ntuple_file.Get("EventTree")
-potTree = ntuple_file.Get("potTree")
+def openInputs():
+  #With --workers every worker calls this again, so each process reads through its own TFile
+  global ntuple_file, eventTree, potTree, cosmic_file, cosmicTree, cosmicPotTree
+  ntuple_file = rt.TFile(args.infile)
+  eventTree = ntuple_file.Get("EventTree")
+  potTree = ntuple_file.Get("potTree")
 
-cosmic_file = rt.TFile(args.cosmicFile)
-cosmicTree = cosmic_file.Get("EventTree")
-cosmicPotTree = ntuple_file.Get("cosmicPotTree")
+  cosmic_file = rt.TFile(args.cosmicFile)
+  cosmicTree = cosmic_file.Get("EventTree")
+  cosmicPotTree = ntuple_file.Get("cosmicPotTree")
+
+openInputs()
 
 #we will scale histograms to expected event counts from POT in runs 1-3: 6.67e+20
 targetPOT = 6.67e+20
 targetPOTstring = "6.67e+20"
 ntuplePOTsum = 0
 
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
-cosmicPOTsum = 3.2974607516739725e+20
+cosmicPOTsum = cosmicPOT(cosmicTree, fallbackPOT=3.2974607516739725e+20)
 
 #Hists created and organized here
 #PURITY HISTOGRAMS
@@ -439,8 +445,18 @@ emptyList = []
 fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":30}
 
 
+#With --workers the loops below run over entry ranges in separate processes; their counters are added up and their
+#histogram fills replayed in entry order afterwards, so the output matches a single-process run
+shards = ShardRunner(args.workers, globals(),
+                     counters=["initialCount", "vertexCount", "NCCount", "fiducialCount", "noPionCount", "recoCount",
+                               "onePhoton", "twoPhotons", "threePhotons", "count", "totalCosmics", "vertexCosmics", "NCCosmics",
+                               "MattProofCosmics", "fiducialCosmics", "pionlessCosmics", "photonCosmics", "uncutCosmics",
+                               "untrackedCosmics", "passTruth", "hasVertex", "hasNC", "inFiducial", "pionProtonFine",
+                               "survivesCuts", "noEffPhotons", "oneEffPhoton", "twoEffPhotons", "manyEffPhotons"],
+                     reopen=openInputs)
+
 #BEGINNING EVENT LOOP FOR DEFAULT PURITY
-for i in range(eventTree.GetEntries()):
+for i in shards.entries(eventTree.GetEntries()):
   eventTree.GetEntry(i)
 
   #Selecting events with reco
@@ -557,7 +573,7 @@ for i in range(eventTree.GetEntries()):
     threePhotons += 1
 
 #BEGINNING EVENT LOOP FOR COSMICS
-for i in range(cosmicTree.GetEntries()):
+for i in shards.entries(cosmicTree.GetEntries()):
   cosmicTree.GetEntry(i)
 
   #COSMICS - SELECTING EVENTS BASED ON RECO
@@ -623,7 +639,7 @@ for i in range(cosmicTree.GetEntries()):
   addHist(cosmicTree, recoList, recoTrackList, cosmicList, cosmicProtonList, recoProtonCount, leadingPhoton, 1)
 
 #BEGINNING EVENT LOOP FOR EFFICIENCY
-for i in range(eventTree.GetEntries()):
+for i in shards.entries(eventTree.GetEntries()):
   eventTree.GetEntry(i)
 
   #Selecting events using truth
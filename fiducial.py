@@ -0,0 +1,193 @@
+#Fiducial volume engine shared by every fiducial cut in cuts.py
+#insideFiducial works on single values (one event, as the cuts.py functions use it) and on whole NumPy arrays
+#(every vertex or shower start in a file at once) with the same code, returning a bool or a boolean mask
+import numpy as np
+
+#TPC box used by all of the fiducial cuts (cm)
+detectorBounds = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036}
+
+
+def fiducialSpec(width, photonWidth=None, bottomless=False):
+  #Builds a fiducialData dictionary of the kind the analysis scripts pass around
+  fiducialData = dict(detectorBounds)
+  fiducialData["width"] = width
+  fiducialData["photonWidth"] = photonWidth if photonWidth is not None else width
+  fiducialData["bottomless"] = bottomless
+  return fiducialData
+
+
+def insideFiducial(x, y, z, fiducialData, width=None, bottomless=None):
+  #True where the point lies strictly inside the box shrunk by width on every side (the bottom face is skipped when bottomless)
+  #width defaults to fiducialData["width"]; pass fiducialData["photonWidth"] for the photon deposit/start checks
+  if width is None:
+    width = fiducialData["width"]
+  if bottomless is None:
+    bottomless = fiducialData.get("bottomless", False)
+  inside = (x > (fiducialData["xMin"] + width)) & (x < (fiducialData["xMax"] - width)) \
+    & (y < (fiducialData["yMax"] - width)) \
+    & (z > (fiducialData["zMin"] + width)) & (z < (fiducialData["zMax"] - width))
+  if not bottomless:
+    inside = inside & (y > (fiducialData["yMin"] + width))
+  return inside
+
+
+def outsideFiducial(x, y, z, fiducialData, width=None, bottomless=None):
+  inside = insideFiducial(x, y, z, fiducialData, width, bottomless)
+  if np.ndim(inside) > 0:
+    return ~inside
+  return not inside
+
+
+#BATCH HELPERS
+#These take an EventColumns batch from helpers/columnLoader.py and return masks for the whole batch in one call
+
+def trueVertexInFiducial(batch, fiducialData, width=None, bottomless=None):
+  return insideFiducial(batch["trueVtxX"], batch["trueVtxY"], batch["trueVtxZ"], fiducialData, width, bottomless)
+
+
+def recoVertexInFiducial(batch, fiducialData, width=None, bottomless=None):
+  #Events without a reconstructed vertex are never inside
+  inside = insideFiducial(batch["vtxX"], batch["vtxY"], batch["vtxZ"], fiducialData, width, bottomless)
+  return inside & (batch["foundVertex"] == 1)
+
+
+def objectsInFiducial(batch, prefix, fiducialData, width=None, bottomless=None):
+  #Per-object mask for jagged position branches, e.g. prefix "showerStartPos", "trackStartPos" or "trueSimPartEDep"
+  #Returns a JaggedArray of bools with the same structure as batch[prefix + "X"]
+  xs, ys, zs = batch[prefix+"X"], batch[prefix+"Y"], batch[prefix+"Z"]
+  return xs.withContent(insideFiducial(xs.content, ys.content, zs.content, fiducialData, width, bottomless))
+
+
+#WIDTH SCAN
+#Every fiducial cut is "distance to the nearest wall > width", so scanning many widths only needs each event's distances once.
+#Counts for all widths then come from sorted cumulative sums (intervalCounts) rather than one event loop per width
+
+def wallDistance(x, y, z, fiducialData=detectorBounds, bottomless=False):
+  #Distance from the point to the nearest face of the box, negative outside it (the bottom face is skipped when bottomless)
+  #insideFiducial(x, y, z, fiducialData, width=w, bottomless=b) is the same test as wallDistance(x, y, z, fiducialData, b) > w
+  faces = [x - fiducialData["xMin"], fiducialData["xMax"] - x, fiducialData["yMax"] - y, z - fiducialData["zMin"], fiducialData["zMax"] - z]
+  if not bottomless:
+    faces.append(y - fiducialData["yMin"])
+  return np.minimum.reduce(faces)
+
+
+def objectWallDistances(batch, prefix, fiducialData=detectorBounds, bottomless=False):
+  #JaggedArray of wall distances for jagged position branches, with the same structure as batch[prefix + "X"]
+  xs, ys, zs = batch[prefix+"X"], batch[prefix+"Y"], batch[prefix+"Z"]
+  return xs.withContent(wallDistance(xs.content, ys.content, zs.content, fiducialData, bottomless))
+
+
+def sortedDescending(distances):
+  #Sorts the values of each entry of a JaggedArray from largest to smallest
+  order = np.lexsort((-distances.content, distances.parents))
+  return distances.withContent(distances.content[order])
+
+
+def nthLargest(distances, n, empty=-np.inf):
+  #Per-entry n-th largest value (n=1 is the largest) of a sortedDescending JaggedArray; empty where an entry has fewer than n
+  #n is a single number or one number per entry
+  n = np.broadcast_to(np.asarray(n, dtype=np.int64), (len(distances),))
+  out = np.full(len(distances), empty, dtype=np.float64)
+  present = (n >= 1) & (distances.counts >= n)
+  out[present] = distances.content[distances.offsets[:-1][present] + n[present] - 1]
+  return out
+
+
+def multiplicityRange(distances, n, atLeast=False):
+  #Widths w, as lo <= w < hi, at which exactly n (or at least n) of each entry's distances are above w
+  #distances must be sortedDescending; n is a single number or one number per entry
+  n = np.broadcast_to(np.asarray(n, dtype=np.int64), (len(distances),))
+  hi = np.where(n >= 1, nthLargest(distances, n), np.inf)
+  if atLeast:
+    lo = np.full(len(distances), -np.inf)
+  else:
+    lo = nthLargest(distances, n+1)
+  return lo, hi
+
+
+def _weightAtOrBelow(edges, weights, widths):
+  order = np.argsort(edges, kind="stable")
+  cumulative = np.concatenate(([0.], np.cumsum(weights[order])))
+  return cumulative[np.searchsorted(edges[order], widths, side="right")]
+
+
+def intervalCounts(lo, hi, widths, weights=None):
+  #For each width w, the summed weight of the entries whose range lo <= w < hi contains it
+  lo = np.asarray(lo, dtype=np.float64)
+  hi = np.maximum(np.asarray(hi, dtype=np.float64), lo)
+  weights = np.ones(len(lo)) if weights is None else np.asarray(weights, dtype=np.float64)
+  widths = np.asarray(widths, dtype=np.float64)
+  return _weightAtOrBelow(lo, weights, widths) - _weightAtOrBelow(hi, weights, widths)
+
+
+def multiplicityBin(nPhotons, nBins):
+  #0 for one photon, 1 for two, ..., nBins-1 for nBins or more
+  return np.minimum(np.asarray(nPhotons), nBins) - 1
+
+
+def scanPhotonWidths(widths, events, cosmics=None, nBins=3):
+  #Purity and efficiency of a photon-counting selection for every fiducial width at once
+  #The same width is used for the reco vertex, the true vertex and the true photon deposits
+  #events holds one array per overlay event, all made in a single pass over the tree:
+  #  "recoDistance"     wall distance of the reco vertex (-inf when there is no vertex)
+  #  "trueDistance"     wall distance of the true vertex
+  #  "photonDistances"  JaggedArray, wall distance of each true photon candidate's deposit (before any fiducial cut)
+  #  "nReco"            number of reco photons
+  #  "recoPass"         every other reco cut of the purity selection
+  #  "truePass"         every other truth cut of the purity signal definition
+  #  "effTruePass", "effRecoPass"  the same for the efficiency (default to truePass and recoPass)
+  #  "weight"           optional event weights
+  #cosmics holds "recoDistance", "nReco", "recoPass" and an optional "weight" for the cosmic sample
+  #Returns arrays of shape (nBins, len(widths)), binned by photon multiplicity as in the event-loop scripts:
+  #signal/background/cosmic (by reco photon count), effSignal/effBackground (by true photon count), purity and efficiency
+  widths = np.asarray(widths, dtype=np.float64)
+  nEvents = len(events["nReco"])
+  weights = np.asarray(events.get("weight", np.ones(nEvents)), dtype=np.float64)
+  recoDistance = np.asarray(events["recoDistance"], dtype=np.float64)
+  trueDistance = np.asarray(events["trueDistance"], dtype=np.float64)
+  nReco = np.asarray(events["nReco"], dtype=np.int64)
+  photons = sortedDescending(events["photonDistances"])
+  effTruePass = events.get("effTruePass", events["truePass"])
+  effRecoPass = events.get("effRecoPass", events["recoPass"])
+
+  #Signal needs as many true photons above the width as there are reco photons
+  matchLo, matchHi = multiplicityRange(photons, nReco)
+  matchHi = np.minimum(matchHi, np.minimum(recoDistance, trueDistance))
+
+  result = {}
+  for name in ["signal", "background", "cosmic", "effSignal", "effBackground"]:
+    result[name] = np.zeros((nBins, len(widths)))
+  recoBin = multiplicityBin(nReco, nBins)
+  for b in range(nBins):
+    #Purity: selected on reco, split by whether the truth agrees
+    selected = np.asarray(events["recoPass"], dtype=bool) & (nReco > 0) & (recoBin == b)
+    total = intervalCounts(np.full(selected.sum(), -np.inf), recoDistance[selected], widths, weights[selected])
+    isSignal = selected & np.asarray(events["truePass"], dtype=bool)
+    result["signal"][b] = intervalCounts(matchLo[isSignal], matchHi[isSignal], widths, weights[isSignal])
+    result["background"][b] = total - result["signal"][b]
+
+    #Efficiency: selected on truth (the true photon count, and so the bin, changes with width), split by the reco outcome
+    lo, hi = multiplicityRange(photons, b+1, atLeast=(b == nBins-1))
+    hi = np.minimum(hi, trueDistance)
+    trueSelected = np.asarray(effTruePass, dtype=bool)
+    total = intervalCounts(lo[trueSelected], hi[trueSelected], widths, weights[trueSelected])
+    isSignal = trueSelected & np.asarray(effRecoPass, dtype=bool) & (nReco > 0) & (recoBin == b)
+    result["effSignal"][b] = intervalCounts(matchLo[isSignal], matchHi[isSignal], widths, weights[isSignal])
+    result["effBackground"][b] = total - result["effSignal"][b]
+
+  if cosmics is not None:
+    cosmicNReco = np.asarray(cosmics["nReco"], dtype=np.int64)
+    cosmicWeights = np.asarray(cosmics.get("weight", np.ones(len(cosmicNReco))), dtype=np.float64)
+    cosmicDistance = np.asarray(cosmics["recoDistance"], dtype=np.float64)
+    cosmicBin = multiplicityBin(cosmicNReco, nBins)
+    for b in range(nBins):
+      selected = np.asarray(cosmics["recoPass"], dtype=bool) & (cosmicNReco > 0) & (cosmicBin == b)
+      result["cosmic"][b] = intervalCounts(np.full(selected.sum(), -np.inf), cosmicDistance[selected], widths, cosmicWeights[selected])
+
+  with np.errstate(divide="ignore", invalid="ignore"):
+    purityTotal = result["signal"] + result["background"] + result["cosmic"]
+    result["purity"] = np.where(purityTotal > 0, result["signal"]/purityTotal, 0.)
+    efficiencyTotal = result["effSignal"] + result["effBackground"]
+    result["efficiency"] = np.where(efficiencyTotal > 0, result["effSignal"]/efficiencyTotal, 0.)
+  result["widths"] = widths
+  return result
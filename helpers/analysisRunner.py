@@ -0,0 +1,125 @@
+#Fan-out runner: many analyses over one read of an ntuple
+#Each analysis is a plugin class registered with @registerAnalysis. The runner takes the union of the branches the
+#requested analyses read, reads EventTree once in column batches (or memory-maps it from the column cache) and hands every
+#batch to every analysis in turn. Each analysis books and fills its own histograms and writes its own output file in finish()
+#Typical use (see runAnalyses.py and the analyses/ package):
+#  timing = runAnalyses(args.infile, [analysisRegistry["ncPiZero"](outfile="NCPiZeroSignal.root")])
+#Only studies that read a single overlay ntuple fit this model. separateEvaluator.py, eventMetrics.py, evilEvaluator.py and
+#1p2gCombined.py also loop over a cosmic/EXT file and normalize it with its own POT, so they stay standalone scripts
+import abc
+import time
+import ROOT as rt
+
+from helpers.columnLoader import EventColumns, openTree, listBranches, iterateBatches, ColumnTree
+from helpers.columnCache import ColumnCache
+from helpers.potService import ntuplePOT
+from helpers.eventCache import CachedTree
+
+analysisRegistry = {}
+
+
+def registerAnalysis(cls):
+  #Class decorator: makes the analysis available to the runner under cls.name
+  if cls.name in analysisRegistry and analysisRegistry[cls.name] is not cls:
+    raise ValueError("an analysis named '%s' is already registered" % cls.name)
+  analysisRegistry[cls.name] = cls
+  return cls
+
+
+class Analysis(abc.ABC):
+  #Base class for runner plugins with per-entry code written against a PyROOT-style tree (the way the cuts.py functions
+  #are used): subclasses must implement processEntry. Columnar plugins that work on whole batches derive from BatchAnalysis
+  name = None
+  #Branches this analysis reads; None means every branch in the tree
+  branches = None
+  defaultOutfile = None
+
+  def __init__(self, outfile=None, **options):
+    self.outfile = outfile if outfile is not None else (self.defaultOutfile or self.name + ".root")
+    self.options = options
+
+  def begin(self, context):
+    #Book histograms and counters. context holds "infile", "nEntries" and "ntuplePOT"
+    pass
+
+  def processBatch(self, batch):
+    #The cuts.py helpers decorated with @eventCached run once per entry however often processEntry asks for them
+    tree = CachedTree(ColumnTree(batch))
+    for i in range(tree.GetEntries()):
+      tree.GetEntry(i)
+      self.processEntry(tree)
+
+  @abc.abstractmethod
+  def processEntry(self, tree):
+    pass
+
+  def finish(self, context):
+    #Make plots and write self.outfile
+    pass
+
+
+class BatchAnalysis(Analysis):
+  #Base class for columnar plugins: subclasses must implement processBatch, which gets every EventColumns batch whole
+  @abc.abstractmethod
+  def processBatch(self, batch):
+    pass
+
+  def processEntry(self, tree):
+    raise TypeError("%s works on whole batches; the runner calls processBatch" % type(self).__name__)
+
+
+def neededBranches(analyses, tree):
+  #Union of the branches the analyses read, in tree order
+  allBranches = listBranches(tree, activeOnly=False)
+  if any(analysis.branches is None for analysis in analyses):
+    return allBranches
+  wanted = set()
+  for analysis in analyses:
+    wanted.update(analysis.branches)
+  missing = wanted.difference(allBranches)
+  if len(missing) > 0:
+    raise ValueError("branches not in the tree: " + ", ".join(sorted(missing)))
+  return [name for name in allBranches if name in wanted]
+
+
+def runAnalyses(infile, analyses, treeName="EventTree", batchSize=100000, useColumnCache=False, entryStart=0, entryStop=None, verbose=True):
+  #Reads infile once and dispatches each batch to every analysis. Returns per-analysis processing times (seconds)
+  rootFile, tree = openTree(infile, treeName)
+  #Histograms stay with the analysis that booked them rather than the input file, so two analyses can use the same names
+  rt.TH1.AddDirectory(False)
+  branches = neededBranches(analyses, tree)
+  if entryStop is None or entryStop > tree.GetEntries():
+    entryStop = tree.GetEntries()
+  context = {"infile": infile, "nEntries": entryStop - entryStart, "ntuplePOT": ntuplePOT(infile)}
+  for analysis in analyses:
+    analysis.begin(context)
+
+  if useColumnCache:
+    #The cached columns are memory-mapped, so the whole range is handed over as one batch
+    cached = ColumnCache(infile, treeName, chunkSize=batchSize).get(branches, verbose)
+    columns = dict((name, cached[name][entryStart:entryStop]) for name in branches)
+    batches = [EventColumns(columns, entryStart, entryStop - entryStart)]
+  else:
+    batches = iterateBatches(tree, branches, batchSize, entryStart, entryStop)
+
+  timing = dict((analysis.name, 0.) for analysis in analyses)
+  readTime = 0.
+  start = time.time()
+  for batch in batches:
+    readTime += time.time() - start
+    for analysis in analyses:
+      analysisStart = time.time()
+      analysis.processBatch(batch)
+      timing[analysis.name] += time.time() - analysisStart
+    if verbose:
+      print("[runAnalyses] processed entries", batch.entryStart, "to", batch.entryStart + len(batch))
+    start = time.time()
+
+  for analysis in analyses:
+    analysis.finish(context)
+    if verbose:
+      print("[runAnalyses]", analysis.name, ": %.1f s, wrote %s" % (timing[analysis.name], analysis.outfile))
+  if verbose:
+    print("[runAnalyses] one read of", len(branches), "branches for", len(analyses), "analyses: %.1f s" % readTime)
+  rootFile.Close()
+  return timing
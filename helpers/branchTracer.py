@@ -0,0 +1,122 @@
+#Works out which EventTree branches a selection actually reads, then switches every other branch off
+#PyROOT decompresses every active branch on each GetEntry, so limiting the active set to what the cuts use is most of the I/O cost
+#Typical use:
+#  selections = [lambda t: run_1g1p_reco_selection_cuts(t, classificationThreshold, fiducialData, return_on_fail=False),
+#                lambda t: truthdef_1gamma_cuts(t, photonEDepThreshold, fiducialData, return_on_fail=False)]
+#  branches = traceBranches(eventTree, selections)
+#  printBranchReport(activateBranches(eventTree, branches))
+#  eventTree = BranchGuard(eventTree, branches)
+#Branches read only outside the traced selections are switched on by BranchGuard the first time they are read
+#Use return_on_fail=False while tracing so every cut gets evaluated, not just the ones before the first failure
+from helpers.columnLoader import listBranches
+
+
+class BranchTracer:
+  #Wraps a tree and records every attribute the wrapped code reads from it
+  def __init__(self, tree):
+    self.__dict__["_tree"] = tree
+    self.__dict__["accessed"] = set()
+
+  def __getattr__(self, name):
+    value = getattr(self.__dict__["_tree"], name)
+    self.__dict__["accessed"].add(name)
+    return value
+
+
+class BranchGuard:
+  #Wraps a tree whose inactive branches have been switched off. Reading a switched-off branch through PyROOT silently
+  #gives stale values, so the first read of one (code the traced selections did not reach, e.g. histogram filling) switches
+  #it back on, rereads the current entry and prints a warning naming it
+  def __init__(self, tree, branches):
+    self.__dict__["_tree"] = tree
+    self.__dict__["_allBranches"] = set(listBranches(tree, activeOnly=False))
+    self.__dict__["_active"] = set(branches)
+
+  def __getattr__(self, name):
+    if name in self.__dict__["_allBranches"] and name not in self.__dict__["_active"]:
+      self.switchOn(name)
+    return getattr(self.__dict__["_tree"], name)
+
+  def switchOn(self, name):
+    tree = self.__dict__["_tree"]
+    names = set([name]) | counterBranches(tree, [name])
+    for branch in names:
+      tree.SetBranchStatus(branch, 1)
+    self.__dict__["_active"].update(names)
+    print("[BranchGuard] warning: branch '%s' was not traced; switched it on" % name)
+    entry = tree.GetReadEntry()
+    if entry >= 0:
+      tree.GetEntry(entry)
+
+
+def counterBranches(tree, branches):
+  #Branches like trackPID[nTracks] need their counter branch (nTracks) active as well
+  counters = set()
+  for name in branches:
+    branch = tree.GetBranch(name)
+    if not branch:
+      continue
+    for leaf in branch.GetListOfLeaves():
+      leafCount = leaf.GetLeafCount()
+      if leafCount:
+        counters.add(leafCount.GetBranch().GetName())
+  return counters
+
+
+def traceBranches(tree, selections, nSample=1000, extraBranches=[]):
+  #Runs each selection function on nSample entries spread evenly through the tree and returns the branch names they read
+  tracer = BranchTracer(tree)
+  nEntries = tree.GetEntries()
+  step = max(1, nEntries // max(1, nSample))
+  for i in range(0, nEntries, step):
+    tree.GetEntry(i)
+    for selection in selections:
+      selection(tracer)
+
+  allBranches = set(listBranches(tree, activeOnly=False))
+  used = set(name for name in tracer.accessed if name in allBranches)
+  used.update(extraBranches)
+  used.update(counterBranches(tree, used))
+  return sorted(used)
+
+
+def branchBytes(tree, name):
+  branch = tree.GetBranch(name)
+  if not branch:
+    return 0, 0
+  return branch.GetTotBytes("*"), branch.GetZipBytes("*")
+
+
+def activateBranches(tree, branches):
+  #Turns off every branch except the given ones and returns a summary of what that saves per full pass
+  allBranches = listBranches(tree, activeOnly=False)
+  tree.SetBranchStatus("*", 0)
+  for name in branches:
+    tree.SetBranchStatus(name, 1)
+
+  report = {"nBranches": len(allBranches), "nActive": len(branches),
+            "totBytes": 0, "zipBytes": 0, "activeTotBytes": 0, "activeZipBytes": 0}
+  active = set(branches)
+  for name in allBranches:
+    totBytes, zipBytes = branchBytes(tree, name)
+    report["totBytes"] += totBytes
+    report["zipBytes"] += zipBytes
+    if name in active:
+      report["activeTotBytes"] += totBytes
+      report["activeZipBytes"] += zipBytes
+  report["savedTotBytes"] = report["totBytes"] - report["activeTotBytes"]
+  report["savedZipBytes"] = report["zipBytes"] - report["activeZipBytes"]
+  return report
+
+
+def printBranchReport(report, label="EventTree"):
+  def megabytes(nbytes):
+    return round(nbytes/1.0e6, 1)
+  savedFraction = 0.
+  if report["totBytes"] > 0:
+    savedFraction = 100.*report["savedTotBytes"]/report["totBytes"]
+  print("[", label, "] reading", report["nActive"], "of", report["nBranches"], "branches")
+  print("[", label, "] uncompressed:", megabytes(report["activeTotBytes"]), "of", megabytes(report["totBytes"]), "MB per pass,",
+        megabytes(report["savedTotBytes"]), "MB saved (", round(savedFraction, 1), "percent )")
+  print("[", label, "] on disk:", megabytes(report["activeZipBytes"]), "of", megabytes(report["zipBytes"]), "MB per pass,",
+        megabytes(report["savedZipBytes"]), "MB saved")
@@ -0,0 +1,143 @@
+#Checkpoint and resume of the event loops run through helpers.shardRunner.ShardRunner
+#Every so many entries (or seconds) the runner saves the state a loop has built up so far to a small side file: the
+#contents of the histograms among the script's globals (Histogram1D, CategoryHistogram, TH1), its named counters and
+#lists, the per-entry accumulators (anything with shardState/mergeShard, e.g. a CutMaskWriter) and the position: which
+#loop of the script, and the next entry in it. After each loop a checkpoint marks the loop as finished
+#A run started with resume=True puts that state back at its first loop, skips the loops already finished and continues the
+#interrupted one from the next entry, so the output is the same as an uninterrupted run
+#The saved position only moves forward: a resumed run does not save for the loops it skips, and never writes a position
+#before the one it loaded, so a run killed again before its next checkpoint resumes from the same place
+#The checkpoint carries a stamp (inputs, options) given by the script; resuming with a different stamp raises ValueError
+#Inside a loop the checkpoints are only taken with one worker; with several, a checkpoint is taken after each loop
+import os, time, pickle
+import numpy as np
+
+from helpers.histograms import Histogram1D, CategoryHistogram
+from helpers.shardRunner import isHistogram
+
+
+def histogramState(hist):
+  if isinstance(hist, CategoryHistogram):
+    #The Fill buffer is saved as it is: flushing it here would change when the later fills are added up, and with it the
+    #rounding of the bin contents
+    return {"sumw": hist._sumw.copy(), "sumw2": hist._sumw2.copy(), "entries": hist._entries.copy(),
+            "pending": tuple(list(column) for column in hist._pending)}
+  if isinstance(hist, Histogram1D):
+    hist._sync()
+    return {"sumw": hist.sumw.copy(), "sumw2": hist.sumw2.copy(), "entries": hist.entries}
+  nBins = hist.GetNbinsX()
+  return {"sumw": np.array([hist.GetBinContent(i) for i in range(nBins + 2)]),
+          "sumw2": np.array([hist.GetBinError(i)**2 for i in range(nBins + 2)]),
+          "entries": hist.GetEntries()}
+
+
+def restoreHistogram(hist, state):
+  #In place: the Histogram1D views of a CategoryHistogram share its arrays
+  if isinstance(hist, CategoryHistogram):
+    hist._sumw[:] = state["sumw"]
+    hist._sumw2[:] = state["sumw2"]
+    hist._entries[:] = state["entries"]
+    hist._pending = state["pending"]
+    hist._updated()
+  elif isinstance(hist, Histogram1D):
+    hist.sumw[:] = state["sumw"]
+    hist.sumw2[:] = state["sumw2"]
+    hist.entries = state["entries"]
+    hist._stale = True
+  else:
+    for i in range(len(state["sumw"])):
+      hist.SetBinContent(i, state["sumw"][i])
+      hist.SetBinError(i, np.sqrt(state["sumw2"][i]))
+    hist.SetEntries(state["entries"])
+
+
+def parseInterval(text):
+  #"100000" -> (100000 entries, None); "15m", "900s", "2h" -> (None, seconds)
+  units = {"s": 1, "m": 60, "h": 3600}
+  if text[-1] in units:
+    return None, float(text[:-1])*units[text[-1]]
+  return int(text), None
+
+
+class Checkpoint:
+  #path: the side file; everyEntries / everySeconds: how often to save inside a loop (either or both)
+  #stamp: anything comparable that identifies the run (input files, options); resume: load path at the first loop
+
+  def __init__(self, path, everyEntries=None, everySeconds=None, stamp=None, resume=False):
+    self.path = path
+    self.everyEntries = everyEntries
+    self.everySeconds = everySeconds
+    self.stamp = stamp
+    self.resume = resume
+    self.position = None
+    self.lastSave = time.time()
+
+  def startLoop(self, runner, loop, nEntries):
+    #First entry to process in loop number loop (nEntries if the loop was finished before the restart)
+    if self.resume and loop == 0:
+      self.load(runner)
+    if self.position is None:
+      return 0
+    savedLoop, nextEntry = self.position
+    if loop < savedLoop:
+      return nEntries
+    if loop == savedLoop:
+      return nextEntry
+    return 0
+
+  def entryDone(self, runner, loop, entry):
+    if (self.everyEntries is not None and (entry + 1) % self.everyEntries == 0) or \
+       (self.everySeconds is not None and time.time() - self.lastSave >= self.everySeconds):
+      self.save(runner, loop, entry + 1)
+
+  def loopDone(self, runner, loop):
+    #A loop skipped on resume was finished before, and the checkpoint already holds a later position
+    if self.position is not None and (loop + 1, 0) <= self.position:
+      return
+    self.save(runner, loop + 1, 0)
+
+  def save(self, runner, loop, nextEntry):
+    #The state in memory is at least as far as the position on file; an earlier position would repeat entries on resume
+    if self.position is not None and (loop, nextEntry) < self.position:
+      return
+    namespace = runner.namespace
+    state = {"stamp": self.stamp, "position": (loop, nextEntry),
+             "histograms": dict((name, histogramState(value)) for name, value in namespace.items() if isSaved(value)),
+             "counters": dict((name, namespace[name]) for name in runner.counters),
+             "lists": dict((name, list(namespace[name])) for name in runner.lists),
+             "accumulators": dict((name, value.shardState(0, len(value))) for name, value in namespace.items() if isAccumulator(value))}
+    tmpPath = self.path + ".tmp"
+    with open(tmpPath, "wb") as checkpointFile:
+      pickle.dump(state, checkpointFile, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmpPath, self.path)
+    self.position = (loop, nextEntry)
+    self.lastSave = time.time()
+
+  def load(self, runner):
+    if not os.path.exists(self.path):
+      print("[checkpoint] no checkpoint at %s, starting from the beginning" % self.path)
+      return
+    with open(self.path, "rb") as checkpointFile:
+      state = pickle.load(checkpointFile)
+    if state["stamp"] != self.stamp:
+      raise ValueError("checkpoint %s was made for %s, not %s" % (self.path, state["stamp"], self.stamp))
+    namespace = runner.namespace
+    for name, histState in state["histograms"].items():
+      restoreHistogram(namespace[name], histState)
+    for name, value in state["counters"].items():
+      namespace[name] = value
+    for name, items in state["lists"].items():
+      namespace[name][:] = items
+    for name, accumulatorState in state["accumulators"].items():
+      namespace[name].mergeShard(0, len(namespace[name]), accumulatorState)
+    self.position = tuple(state["position"])
+    print("[checkpoint] resuming from %s: loop %d, entry %d" % (self.path, self.position[0], self.position[1]))
+
+
+def isSaved(value):
+  #Histograms, but not the Histogram1D views of a CategoryHistogram (saved with it)
+  return isHistogram(value) and not (isinstance(value, Histogram1D) and value.source is not None)
+
+
+def isAccumulator(value):
+  return hasattr(value, "shardState") and hasattr(value, "mergeShard") and not isinstance(value, type)
@@ -0,0 +1,163 @@
+#On-disk cache of ntuple branches as memory-mapped .npy column files
+#The first read of a branch goes through ROOT (helpers/columnLoader.iterateBatches) and is written out; every later read of
+#that branch from the same file memory-maps the .npy instead of touching ROOT I/O. Missing branches are read and written
+#chunkSize entries at a time, so building the cache of a large file only ever holds one chunk in memory
+#Layout: <cacheDir>/<key>/meta.json plus, per branch, <branch>.npy (scalar) or <branch>.offsets.npy + <branch>.content.npy (jagged)
+#The key is built from the absolute input path, tree name, file size and mtime, so rewriting the ntuple invalidates its cache
+import os, json, hashlib, shutil
+import numpy as np
+
+from helpers.columnLoader import JaggedArray, EventColumns, loadColumns, iterateBatches, openTree
+
+defaultCacheDir = os.environ.get("UBPHOTON_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ubphoton"))
+defaultChunkSize = 100000
+
+
+def sourceStamp(path):
+  info = os.stat(path)
+  return {"path": os.path.abspath(path), "size": info.st_size, "mtime": info.st_mtime}
+
+
+def cacheKey(stamp, treeName):
+  text = "%s|%s|%d|%r" % (stamp["path"], treeName, stamp["size"], stamp["mtime"])
+  return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def pathPrefix(stamp, treeName):
+  #Every cache directory made from the same input path and tree starts with this, whatever the mtime was
+  base = os.path.basename(stamp["path"]).replace(".root", "")
+  return "%s_%s_%s_" % (base, treeName, hashlib.sha1(stamp["path"].encode()).hexdigest()[:8])
+
+
+class ColumnWriter:
+  #Builds one .npy file from the pieces of a column as they arrive: the raw values go to a side file, and finish() puts
+  #the .npy header in front of them once the length is known
+
+  def __init__(self, path):
+    self.path = path
+    self.rawPath = path + ".raw.tmp"
+    self.rawFile = open(self.rawPath, "wb")
+    self.dtype = None
+    self.length = 0
+
+  def append(self, array):
+    array = np.ascontiguousarray(array)
+    if self.dtype is None:
+      self.dtype = array.dtype
+    array.astype(self.dtype, copy=False).tofile(self.rawFile)
+    self.length += len(array)
+
+  def finish(self):
+    self.rawFile.close()
+    tmpPath = self.path + ".tmp.npy"
+    header = {"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.length,)}
+    with open(tmpPath, "wb") as npyFile:
+      np.lib.format.write_array_header_1_0(npyFile, header)
+      with open(self.rawPath, "rb") as rawFile:
+        shutil.copyfileobj(rawFile, npyFile, 1 << 24)
+    os.remove(self.rawPath)
+    os.replace(tmpPath, self.path)
+
+
+class ColumnCache:
+  #Cache for one (input file, tree) pair
+
+  def __init__(self, path, treeName="EventTree", cacheDir=None, chunkSize=defaultChunkSize):
+    self.path = path
+    self.treeName = treeName
+    self.chunkSize = chunkSize
+    self.cacheDir = cacheDir if cacheDir is not None else defaultCacheDir
+    self.stamp = sourceStamp(path)
+    prefix = pathPrefix(self.stamp, treeName)
+    self.directory = os.path.join(self.cacheDir, prefix + cacheKey(self.stamp, treeName))
+    self.removeStale(prefix)
+    self.meta = self.readMeta()
+
+  def removeStale(self, prefix):
+    #Drop caches built from an older version of the same input file
+    if not os.path.isdir(self.cacheDir):
+      return
+    for name in os.listdir(self.cacheDir):
+      fullPath = os.path.join(self.cacheDir, name)
+      if name.startswith(prefix) and fullPath != self.directory:
+        shutil.rmtree(fullPath, ignore_errors=True)
+
+  def readMeta(self):
+    metaPath = os.path.join(self.directory, "meta.json")
+    if os.path.exists(metaPath):
+      with open(metaPath) as metaFile:
+        meta = json.load(metaFile)
+      if meta["source"] == self.stamp:
+        return meta
+    return {"source": self.stamp, "treeName": self.treeName, "nEntries": None, "branches": {}}
+
+  def writeMeta(self):
+    tmpPath = os.path.join(self.directory, "meta.json.tmp")
+    with open(tmpPath, "w") as metaFile:
+      json.dump(self.meta, metaFile, indent=1, sort_keys=True)
+    os.replace(tmpPath, os.path.join(self.directory, "meta.json"))
+
+  def cachedBranches(self):
+    return list(self.meta["branches"].keys())
+
+  def loadArray(self, fileName):
+    return np.load(os.path.join(self.directory, fileName + ".npy"), mmap_mode="r")
+
+  def store(self, batches, nEntries):
+    #Add every column of consecutive EventColumns batches, which together cover the whole tree, to the cache. Each batch
+    #is written out before the next one is read; jagged offsets are shifted to count from the start of the tree
+    os.makedirs(self.directory, exist_ok=True)
+    writers = {}
+    contentLength = {}
+    for batch in batches:
+      for name, column in batch.columns.items():
+        if isinstance(column, JaggedArray):
+          if name not in writers:
+            writers[name] = [ColumnWriter(os.path.join(self.directory, name + ".offsets.npy")),
+                             ColumnWriter(os.path.join(self.directory, name + ".content.npy"))]
+            writers[name][0].append(np.zeros(1, dtype=np.int64))
+            contentLength[name] = 0
+          offsets = column.offsets - column.offsets[0]
+          writers[name][0].append(offsets[1:] + contentLength[name])
+          writers[name][1].append(column.content[column.offsets[0]:column.offsets[-1]])
+          contentLength[name] += int(offsets[-1])
+        else:
+          if name not in writers:
+            writers[name] = [ColumnWriter(os.path.join(self.directory, name + ".npy"))]
+          writers[name][0].append(column)
+    for name, columnWriters in writers.items():
+      for writer in columnWriters:
+        writer.finish()
+      self.meta["branches"][name] = "jagged" if len(columnWriters) == 2 else "scalar"
+    self.meta["nEntries"] = nEntries
+    self.writeMeta()
+
+  def load(self, branches):
+    #Memory-maps the cached columns for the given branches
+    columns = {}
+    for name in branches:
+      if self.meta["branches"][name] == "jagged":
+        columns[name] = JaggedArray(self.loadArray(name + ".offsets"), self.loadArray(name + ".content"))
+      else:
+        columns[name] = self.loadArray(name)
+    return EventColumns(columns, 0, self.meta["nEntries"])
+
+  def get(self, branches, verbose=True):
+    #Returns all requested branches, reading (and caching) only the ones not already on disk
+    missing = [name for name in branches if name not in self.meta["branches"]]
+    if len(missing) > 0:
+      if verbose:
+        print("[ColumnCache]", os.path.basename(self.path), ": reading", len(missing), "branches through ROOT, memory-mapping", len(branches) - len(missing))
+      rootFile, tree = openTree(self.path, self.treeName)
+      nEntries = tree.GetEntries()
+      batches = iterateBatches(tree, missing, self.chunkSize) if nEntries > 0 else [loadColumns(tree, missing)]
+      self.store(batches, nEntries)
+      rootFile.Close()
+    elif verbose:
+      print("[ColumnCache]", os.path.basename(self.path), ": memory-mapping all", len(branches), "branches from", self.directory)
+    return self.load(branches)
+
+
+def loadCachedColumns(path, branches, treeName="EventTree", cacheDir=None):
+  #Convenience wrapper: EventColumns for the whole tree, backed by memory-mapped cache files
+  return ColumnCache(path, treeName, cacheDir).get(branches)
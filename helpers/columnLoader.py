@@ -0,0 +1,273 @@
+#Bulk (columnar) reading of the EventTree into NumPy arrays
+#Scalar branches (vtxX, xsecWeight, nTracks, ...) become flat arrays with one value per entry
+#Per-object branches (trackPID, showerRecoE, trueSimPartTID, ...) become JaggedArrays: one flat content array plus offsets
+#ColumnTree wraps a loaded batch so that the existing cuts.py functions (which expect ntuple.branch / ntuple.branch[x]) run on it unchanged
+import numpy as np
+import ROOT as rt
+
+
+class JaggedArray:
+  #Variable-length per-entry data: entry i owns content[offsets[i]:offsets[i+1]]
+
+  def __init__(self, offsets, content):
+    self.offsets = np.asarray(offsets, dtype=np.int64)
+    self.content = np.asarray(content)
+    self._parents = None
+
+  @classmethod
+  def fromCounts(cls, counts, content):
+    offsets = np.zeros(len(counts)+1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return cls(offsets, content)
+
+  @classmethod
+  def fromLists(cls, lists, dtype=None):
+    counts = [len(x) for x in lists]
+    if sum(counts) > 0:
+      content = np.concatenate([np.asarray(x, dtype=dtype) for x in lists if len(x) > 0])
+    else:
+      content = np.zeros(0, dtype=dtype if dtype is not None else np.float64)
+    return cls.fromCounts(counts, content)
+
+  def __len__(self):
+    return len(self.offsets) - 1
+
+  def __getitem__(self, index):
+    #An integer returns that entry's values as an array view; a slice, boolean mask or index array returns a new JaggedArray
+    if isinstance(index, (int, np.integer)):
+      if index < 0:
+        index += len(self)
+      return self.content[self.offsets[index]:self.offsets[index+1]]
+    if isinstance(index, slice):
+      start, stop, step = index.indices(len(self))
+      if step == 1:
+        offsets = self.offsets[start:max(start, stop)+1]
+        return JaggedArray(offsets - offsets[0], self.content[offsets[0]:offsets[-1]])
+      index = np.arange(start, stop, step)
+    index = np.asarray(index)
+    if index.dtype == bool:
+      index = np.nonzero(index)[0]
+    counts = self.counts[index]
+    starts = self.offsets[index]
+    #Gather the selected entries' elements in order
+    elementIndex = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(counts.sum())
+    return JaggedArray.fromCounts(counts, self.content[elementIndex])
+
+  @property
+  def counts(self):
+    return np.diff(self.offsets)
+
+  @property
+  def parents(self):
+    #Entry number (within this array) that each content element belongs to
+    if self._parents is None:
+      self._parents = np.repeat(np.arange(len(self)), self.counts)
+    return self._parents
+
+  @property
+  def localIndex(self):
+    #Position of each content element within its own entry (the x in ntuple.branch[x])
+    return np.arange(len(self.content)) - self.offsets[self.parents]
+
+  def withContent(self, content):
+    #New JaggedArray with the same structure but different values (e.g. a per-element boolean mask)
+    out = JaggedArray(self.offsets, content)
+    out._parents = self._parents
+    return out
+
+  def broadcast(self, perEntry):
+    #Repeat a per-entry array so there is one value per content element
+    return np.asarray(perEntry)[self.parents]
+
+  def sum(self):
+    return np.bincount(self.parents, weights=self.content, minlength=len(self))
+
+  def countTrue(self):
+    return np.bincount(self.parents[self.content.astype(bool)], minlength=len(self))
+
+  def any(self):
+    return self.countTrue() > 0
+
+  def all(self):
+    return self.countTrue() == self.counts
+
+  def max(self, empty=0):
+    #Per-entry maximum; entries with no elements get the value of empty
+    out = np.full(len(self), empty, dtype=np.result_type(self.content.dtype, type(empty)))
+    if len(self.content) > 0:
+      hasElements = self.counts > 0
+      out[hasElements] = np.maximum.reduceat(self.content, self.offsets[:-1][hasElements])
+    return out
+
+  def argmax(self):
+    #Per-entry local index of the largest element, -1 for empty entries
+    out = np.full(len(self), -1, dtype=np.int64)
+    if len(self.content) > 0:
+      order = np.lexsort((-self.content, self.parents))
+      hasElements = self.counts > 0
+      out[hasElements] = order[self.offsets[:-1][hasElements]] - self.offsets[:-1][hasElements]
+    return out
+
+  def tolist(self):
+    return [self[i].tolist() for i in range(len(self))]
+
+
+class EventColumns:
+  #One batch of entries from a tree, held as NumPy columns. Access a column as batch.vtxX or batch["trackPID"]
+
+  def __init__(self, columns, entryStart=0, nEntries=None):
+    self.columns = columns
+    self.entryStart = entryStart
+    if nEntries is None:
+      nEntries = len(next(iter(columns.values()))) if columns else 0
+    self.nEntries = nEntries
+
+  def __len__(self):
+    return self.nEntries
+
+  def __contains__(self, name):
+    return name in self.columns
+
+  def __getitem__(self, name):
+    return self.columns[name]
+
+  def __getattr__(self, name):
+    columns = self.__dict__.get("columns")
+    if columns is not None and name in columns:
+      return columns[name]
+    raise AttributeError("branch '%s' was not loaded into this batch" % name)
+
+  def branches(self):
+    return list(self.columns.keys())
+
+  def entries(self):
+    #Global tree entry numbers covered by this batch
+    return np.arange(self.entryStart, self.entryStart + self.nEntries)
+
+  def select(self, mask):
+    #Keep only the entries where mask is True (entry numbers are kept in the "entry" column)
+    columns = {"entry": self.columns["entry"][mask] if "entry" in self.columns else self.entries()[mask]}
+    for name, column in self.columns.items():
+      if name != "entry":
+        columns[name] = column[mask]
+    return EventColumns(columns, self.entryStart, int(np.count_nonzero(mask)))
+
+
+class ColumnTree:
+  #Stand-in for a TTree built on an EventColumns batch: GetEntry(i) selects an entry, and attribute access returns
+  #the value (scalars) or an array (jagged branches) just like PyROOT, so the cuts.py functions need no changes
+  #Like a TTree, entries are numbered 0 to GetEntries() - 1 within the batch; entry i is entry batch.entryStart + i of
+  #the ntuple (GetNtupleEntry)
+
+  def __init__(self, batch):
+    self.__dict__["_batch"] = batch
+    self.__dict__["_index"] = 0
+
+  def GetEntries(self):
+    return len(self._batch)
+
+  def GetEntry(self, i):
+    if i < 0 or i >= len(self._batch):
+      raise IndexError("entry %d is outside the batch of %d entries" % (i, len(self._batch)))
+    self.__dict__["_index"] = i
+    return 1
+
+  def GetReadEntry(self):
+    return self._index
+
+  def GetNtupleEntry(self):
+    return self._batch.entryStart + self._index
+
+  def __getattr__(self, name):
+    batch = self.__dict__["_batch"]
+    if name not in batch:
+      raise AttributeError("branch '%s' was not loaded into this ColumnTree" % name)
+    return batch[name][self.__dict__["_index"]]
+
+
+def openTree(path, treeName="EventTree"):
+  #Returns the TFile along with the tree, since the tree is only valid while the file stays open
+  rootFile = rt.TFile(path)
+  tree = rootFile.Get(treeName)
+  if not tree:
+    raise ValueError("no tree named %s in %s" % (treeName, path))
+  return rootFile, tree
+
+
+def listBranches(tree, activeOnly=True):
+  names = []
+  for branch in tree.GetListOfBranches():
+    if activeOnly and tree.GetBranchStatus(branch.GetName()) == 0:
+      continue
+    names.append(branch.GetName())
+  return names
+
+
+def isJaggedType(typeName):
+  return "RVec" in typeName or "vector" in typeName
+
+
+#NumPy types of the element types vector branches come with, by their C++ and ROOT typedef names
+elementTypes = {"bool": np.bool_, "Bool_t": np.bool_,
+                "char": np.int8, "Char_t": np.int8, "unsigned char": np.uint8, "UChar_t": np.uint8,
+                "short": np.int16, "Short_t": np.int16, "unsigned short": np.uint16, "UShort_t": np.uint16,
+                "int": np.int32, "Int_t": np.int32, "unsigned int": np.uint32, "UInt_t": np.uint32,
+                "long": np.int64, "Long_t": np.int64, "long long": np.int64, "Long64_t": np.int64,
+                "unsigned long": np.uint64, "ULong_t": np.uint64, "unsigned long long": np.uint64, "ULong64_t": np.uint64,
+                "float": np.float32, "Float_t": np.float32, "double": np.float64, "Double_t": np.float64}
+
+
+def elementType(typeName):
+  #NumPy type of the elements of a vector column type ("ROOT::VecOps::RVec<float>", "vector<int>", ...); None if unknown
+  inner = typeName[typeName.find("<")+1:typeName.rfind(">")].strip()
+  return elementTypes.get(inner)
+
+
+def _flatten(column, counts, dtype=None):
+  #AsNumpy hands back one RVec per entry for vector branches; they expose the NumPy array interface, so a single
+  #concatenate joins them into the content array. dtype keeps the element type even when every entry is empty
+  if counts.sum() == 0:
+    return np.zeros(0, dtype=dtype if dtype is not None else np.float64)
+  return np.concatenate(column, dtype=dtype)
+
+
+def loadColumns(tree, branches=None, entryStart=0, entryStop=None):
+  #Reads the requested branches for entries [entryStart, entryStop) in bulk and returns an EventColumns batch
+  if branches is None:
+    branches = listBranches(tree)
+  if entryStop is None or entryStop > tree.GetEntries():
+    entryStop = tree.GetEntries()
+  frame = rt.RDataFrame(tree)
+  if entryStart != 0 or entryStop != tree.GetEntries():
+    frame = frame.Range(entryStart, entryStop)
+
+  jagged = []
+  scalars = []
+  dtypes = {}
+  for name in branches:
+    typeName = frame.GetColumnType(name)
+    if isJaggedType(typeName):
+      jagged.append(name)
+      dtypes[name] = elementType(typeName)
+      frame = frame.Define("__n_"+name, "(unsigned int)%s.size()" % name)
+    else:
+      scalars.append(name)
+
+  readColumns = scalars + jagged + ["__n_"+name for name in jagged]
+  arrays = frame.AsNumpy(readColumns)
+
+  columns = {}
+  for name in scalars:
+    columns[name] = arrays[name]
+  for name in jagged:
+    counts = arrays["__n_"+name].astype(np.int64)
+    columns[name] = JaggedArray.fromCounts(counts, _flatten(arrays[name], counts, dtypes[name]))
+  return EventColumns(columns, entryStart, entryStop - entryStart)
+
+
+def iterateBatches(tree, branches=None, batchSize=100000, entryStart=0, entryStop=None):
+  #Yields EventColumns batches of at most batchSize entries, so a full overlay file never has to sit in memory at once
+  if entryStop is None or entryStop > tree.GetEntries():
+    entryStop = tree.GetEntries()
+  for start in range(entryStart, entryStop, batchSize):
+    yield loadColumns(tree, branches, start, min(start + batchSize, entryStop))
@@ -0,0 +1,152 @@
+#Declarative cut flows: an ordered list of named cuts, plus the intermediate quantities they share, that runs either on one
+#PyROOT entry (stopping at the first failed cut when return_on_fail is set) or on a whole EventColumns batch at once
+#A batch run evaluates every cut on every event exactly once; the per-cut pass masks then give both return_on_fail
+#behaviours, the weighted cut-flow table and the N-1 table without re-evaluating anything
+import copy
+import numpy as np
+
+
+class Define:
+  #A per-event quantity that later cuts use (e.g. the list of photon candidates)
+  #default is what an event reports when return_on_fail stops it at a failed cut before this step is reached
+  isCut = False
+
+  def __init__(self, name, eventFunction, batchFunction, default=None):
+    self.name = name
+    self.eventFunction = eventFunction
+    self.batchFunction = batchFunction
+    self.default = default
+
+
+class Cut:
+  #eventFunction(ntuple, values) follows the cuts.py convention: the event fails only when the result == False
+  #batchFunction(batch, values) returns a boolean pass mask with one entry per event of the batch
+  #values holds the Define results computed so far
+  isCut = True
+
+  def __init__(self, name, eventFunction, batchFunction):
+    self.name = name
+    self.eventFunction = eventFunction
+    self.batchFunction = batchFunction
+
+
+class CutFlow:
+
+  def __init__(self, steps, allCutsName="AllCuts"):
+    self.steps = steps
+    self.allCutsName = allCutsName
+
+  def cutNames(self):
+    return [step.name for step in self.steps if step.isCut]
+
+  def defaults(self):
+    return dict((step.name, copy.copy(step.default)) for step in self.steps if not step.isCut)
+
+  def runEvent(self, ntuple, return_on_fail=True):
+    #Returns (passes, cutsPassed, values) for the current entry of ntuple
+    values = self.defaults()
+    cutsPassed = dict((name, True) for name in self.cutNames())
+    passes = True
+    for step in self.steps:
+      if not step.isCut:
+        values[step.name] = step.eventFunction(ntuple, values)
+      elif step.eventFunction(ntuple, values) == False:
+        cutsPassed[step.name] = False
+        passes = False
+        if return_on_fail:
+          break
+    cutsPassed[self.allCutsName] = passes
+    return passes, cutsPassed, values
+
+  def runBatch(self, batch, weights=None):
+    #Evaluates every step once over the whole batch
+    values = {}
+    masks = {}
+    for step in self.steps:
+      if step.isCut:
+        masks[step.name] = np.asarray(step.batchFunction(batch, values), dtype=bool)
+      else:
+        values[step.name] = step.batchFunction(batch, values)
+    return CutFlowResult(self, masks, values, weights)
+
+
+class CutFlowResult:
+  #Outcome of CutFlow.runBatch: masks[name] says which events pass that cut on its own
+
+  def __init__(self, cutFlow, masks, values, weights=None):
+    self.cutNames = cutFlow.cutNames()
+    self.allCutsName = cutFlow.allCutsName
+    self.masks = masks
+    self.values = values
+    self.passMatrix = np.stack([masks[name] for name in self.cutNames])
+    self.nEvents = self.passMatrix.shape[1]
+    self.weights = np.ones(self.nEvents) if weights is None else np.asarray(weights, dtype=np.float64)
+    self.passes = self.passMatrix.all(axis=0)
+    #Position of each event's first failed cut in cutNames, len(cutNames) for events that pass everything
+    failed = ~self.passMatrix
+    self.firstFailure = np.where(failed.any(axis=0), failed.argmax(axis=0), len(self.cutNames))
+
+  def __len__(self):
+    return self.nEvents
+
+  def cutsPassed(self, return_on_fail=True):
+    #Per-cut masks as CutFlow.runEvent reports them; with return_on_fail only an event's first failed cut is marked False
+    if return_on_fail:
+      cutsPassed = dict((name, self.firstFailure != i) for i, name in enumerate(self.cutNames))
+    else:
+      cutsPassed = dict(self.masks)
+    cutsPassed[self.allCutsName] = self.passes
+    return cutsPassed
+
+  def reached(self, cutName):
+    #Events that get as far as evaluating cutName when return_on_fail is set
+    return self.firstFailure >= self.cutNames.index(cutName)
+
+  def cutFlowCounts(self, weights=None):
+    #Summed weight of all events, then of the events surviving each cut in order
+    weights = self.weights if weights is None else weights
+    survived = np.logical_and.accumulate(self.passMatrix, axis=0)
+    return np.concatenate(([np.sum(weights)], survived.astype(np.float64) @ weights))
+
+  def nMinusOneCounts(self, weights=None):
+    #Summed weight of the events passing every cut except the one named (whatever they do on that one)
+    weights = self.weights if weights is None else weights
+    onlyFailure = (self.passMatrix.shape[0] - self.passMatrix.sum(axis=0)) == 1
+    passOthers = self.passes[None, :] | (onlyFailure[None, :] & ~self.passMatrix)
+    return passOthers.astype(np.float64) @ weights
+
+
+class CutFlowTable:
+  #Adds up the cut-flow and N-1 counts of CutFlowResults (one per batch, or per sample) and prints them
+
+  def __init__(self, cutNames, label="cut flow"):
+    self.cutNames = list(cutNames)
+    self.label = label
+    self.rawFlow = np.zeros(len(self.cutNames)+1)
+    self.weightedFlow = np.zeros(len(self.cutNames)+1)
+    self.rawNMinusOne = np.zeros(len(self.cutNames))
+    self.weightedNMinusOne = np.zeros(len(self.cutNames))
+
+  def fill(self, result, scale=1.0):
+    ones = np.ones(len(result))
+    self.rawFlow += result.cutFlowCounts(ones)
+    self.weightedFlow += scale*result.cutFlowCounts()
+    self.rawNMinusOne += result.nMinusOneCounts(ones)
+    self.weightedNMinusOne += scale*result.nMinusOneCounts()
+
+  def rows(self):
+    #One row per cut: events left after it (raw and weighted), fraction of the previous step and of the start kept,
+    #and the weighted N-1 count (events passing every other cut)
+    rows = []
+    for i, name in enumerate(self.cutNames):
+      before, after, start = self.weightedFlow[i], self.weightedFlow[i+1], self.weightedFlow[0]
+      rows.append({"cut": name, "raw": self.rawFlow[i+1], "weighted": after,
+                   "relative": after/before if before > 0 else 0., "cumulative": after/start if start > 0 else 0.,
+                   "rawNMinusOne": self.rawNMinusOne[i], "nMinusOne": self.weightedNMinusOne[i]})
+    return rows
+
+  def printTable(self):
+    print("[", self.label, "]", "%-24s %10s %12s %9s %11s %12s" % ("cut", "raw", "weighted", "relative", "cumulative", "N-1"))
+    print("[", self.label, "]", "%-24s %10d %12.2f" % ("all events", self.rawFlow[0], self.weightedFlow[0]))
+    for row in self.rows():
+      print("[", self.label, "]", "%-24s %10d %12.2f %9.3f %11.3f %12.2f" % (row["cut"], row["raw"], row["weighted"], row["relative"], row["cumulative"], row["nMinusOne"]))
@@ -0,0 +1,158 @@
+#Per-event cut bitmask store
+#A selection pass (run_1g1p_reco_selection_cuts, truthdef_1gamma_cuts) works out for every entry which named cuts it
+#passes. CutMaskWriter keeps that as one uint32 bitmask per event for the reco cuts and one for the truth cuts (bit k is
+#the k-th name), along with the leading reco/true photon energy, the weight and run/subrun/event/fileid, and saves it as a
+#small .npz next to the ntuple. CutMaskStore reads it back: pass masks for any combination of cuts, cut-flow tables,
+#event lists and leading-energy histograms, without opening the ntuple again
+#The bits hold what the cuts_passed / truthcuts dicts held, so they are complete only when the pass ran with
+#return_on_fail=False (recorded in the file); with return_on_fail=True every cut after the first failure reads False
+import os, json
+import numpy as np
+
+from helpers.cutFlow import CutFlow, Cut, CutFlowResult
+from helpers.histograms import Histogram1D
+
+eventIDFields = ["run", "subrun", "event", "fileid"]
+
+
+def storePath(ntuplePath, label="1g1p"):
+  #Where the store of an ntuple goes: next to it, as <ntuple name>.<label>.cutmask.npz
+  base = ntuplePath[:-len(".root")] if ntuplePath.endswith(".root") else ntuplePath
+  return "%s.%s.cutmask.npz" % (base, label)
+
+
+def packBits(names, passed):
+  #uint32 bitmask of the names whose entry in the passed dict is True
+  bits = 0
+  for bit, name in enumerate(names):
+    if passed.get(name, False):
+      bits |= 1 << bit
+  return bits
+
+
+class CutMaskWriter:
+  #Filled entry by entry (setReco / setTruth / setEvent with the entry number), then written with save()
+  #Entries that are never filled keep all bits off and NaN energies
+
+  def __init__(self, nEntries, recoCutNames, truthCutNames=None, returnOnFail=False):
+    self.recoCutNames = list(recoCutNames)
+    self.truthCutNames = [] if truthCutNames is None else list(truthCutNames)
+    if len(self.recoCutNames) > 32 or len(self.truthCutNames) > 32:
+      raise ValueError("a uint32 bitmask holds at most 32 cuts (%d reco, %d truth)" % (len(self.recoCutNames), len(self.truthCutNames)))
+    self.returnOnFail = returnOnFail
+    self.recoBits = np.zeros(nEntries, dtype=np.uint32)
+    self.truthBits = np.zeros(nEntries, dtype=np.uint32)
+    self.recoLeadingPhotonE = np.full(nEntries, np.nan, dtype=np.float32)
+    self.trueLeadingPhotonE = np.full(nEntries, np.nan, dtype=np.float32)
+    self.weight = np.ones(nEntries, dtype=np.float64)
+    self.ids = dict((name, np.full(nEntries, -1, dtype=np.int32)) for name in eventIDFields)
+
+  def __len__(self):
+    return len(self.recoBits)
+
+  def setReco(self, entry, cutsPassed, leadingPhotonE=None):
+    self.recoBits[entry] = packBits(self.recoCutNames, cutsPassed)
+    if leadingPhotonE is not None:
+      self.recoLeadingPhotonE[entry] = leadingPhotonE
+
+  def setTruth(self, entry, truthCuts, leadingPhotonE=None):
+    self.truthBits[entry] = packBits(self.truthCutNames, truthCuts)
+    if leadingPhotonE is not None:
+      self.trueLeadingPhotonE[entry] = leadingPhotonE
+
+  def setEvent(self, entry, eventTree, weight=1.0):
+    #Event ids (and weight) of the current entry of eventTree
+    for name in eventIDFields:
+      self.ids[name][entry] = getattr(eventTree, name)
+    self.weight[entry] = weight
+
+  def arrays(self):
+    arrays = {"recoBits": self.recoBits, "truthBits": self.truthBits, "recoLeadingPhotonE": self.recoLeadingPhotonE,
+              "trueLeadingPhotonE": self.trueLeadingPhotonE, "weight": self.weight}
+    arrays.update(self.ids)
+    return arrays
+
+  def shardState(self, start, stop):
+    #Entries [start, stop) as filled by a worker of helpers.shardRunner
+    return dict((name, array[start:stop]) for name, array in self.arrays().items())
+
+  def mergeShard(self, start, stop, state):
+    for name, array in self.arrays().items():
+      array[start:stop] = state[name]
+
+  def save(self, path, source=None, pot=None):
+    meta = {"recoCutNames": self.recoCutNames, "truthCutNames": self.truthCutNames, "returnOnFail": self.returnOnFail,
+            "source": source, "pot": pot}
+    np.savez(path, meta=json.dumps(meta), **self.arrays())
+    print("[cutMaskStore] wrote %d events to %s" % (len(self), path))
+
+
+class CutMaskStore:
+
+  def __init__(self, path):
+    stored = np.load(path)
+    meta = json.loads(str(stored["meta"]))
+    self.path = path
+    self.recoCutNames = meta["recoCutNames"]
+    self.truthCutNames = meta["truthCutNames"]
+    self.returnOnFail = meta["returnOnFail"]
+    self.source = meta["source"]
+    self.pot = meta["pot"]
+    self.recoBits = stored["recoBits"]
+    self.truthBits = stored["truthBits"]
+    self.recoLeadingPhotonE = stored["recoLeadingPhotonE"]
+    self.trueLeadingPhotonE = stored["trueLeadingPhotonE"]
+    self.weight = stored["weight"]
+    self.ids = dict((name, stored[name]) for name in eventIDFields)
+
+  def __len__(self):
+    return len(self.recoBits)
+
+  def recoPass(self, name):
+    return (self.recoBits & np.uint32(1 << self.recoCutNames.index(name))) != 0
+
+  def truthPass(self, name):
+    return (self.truthBits & np.uint32(1 << self.truthCutNames.index(name))) != 0
+
+  def select(self, reco=None, truth=None, failReco=None, failTruth=None):
+    #Events passing every cut named in reco and truth and failing every cut named in failReco and failTruth
+    passes = np.ones(len(self), dtype=bool)
+    for names, passFunction, wanted in [(reco, self.recoPass, True), (truth, self.truthPass, True),
+                                        (failReco, self.recoPass, False), (failTruth, self.truthPass, False)]:
+      for name in (names or []):
+        passes &= passFunction(name) == wanted
+    return passes
+
+  def cutFlowResult(self, names=None, truth=False, select=None):
+    #CutFlowResult over the named cuts (all reco cuts but the AllCuts bit by default) for the events in select, so
+    #helpers.cutFlow.CutFlowTable prints the cut-flow and N-1 tables from it
+    cutNames = self.truthCutNames if truth else self.recoCutNames
+    names = [name for name in cutNames if name != "AllCuts"] if names is None else names
+    passFunction = self.truthPass if truth else self.recoPass
+    select = np.ones(len(self), dtype=bool) if select is None else select
+    masks = dict((name, passFunction(name)[select]) for name in names)
+    return CutFlowResult(CutFlow([Cut(name, None, None) for name in names]), masks, {}, self.weight[select])
+
+  def eventList(self, select):
+    #(run, subrun, event, fileid) of the selected events
+    return list(zip(*[self.ids[name][select].tolist() for name in eventIDFields]))
+
+  def writeEventList(self, path, select):
+    with open(path, "w") as listFile:
+      for ids in self.eventList(select):
+        print(" ".join(str(value) for value in ids), file=listFile)
+
+  def histogram(self, select, name, title, nBins, low, high, energy="recoLeadingPhotonE", scale=1.0):
+    #Histogram1D of the leading photon energy (GeV, recoLeadingPhotonE or trueLeadingPhotonE) of the selected events
+    hist = Histogram1D(name, title, nBins, low, high)
+    hist.fill(getattr(self, energy)[select], self.weight[select])
+    if scale != 1.0:
+      hist.scale(scale)
+    return hist
+
+
+def loadStore(ntuplePath, label="1g1p"):
+  path = storePath(ntuplePath, label)
+  if not os.path.exists(path):
+    raise ValueError("no cut mask store %s (run separateEvaluator.py with --cutMasks first)" % path)
+  return CutMaskStore(path)
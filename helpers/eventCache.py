@@ -0,0 +1,108 @@
+#Per-entry memoization of the selection helpers
+#Scripts often call the same helper (recoProtonSelection, recoPhotonListFiducial, truePhotonList, ...) several times on one
+#entry: once in the selection, again when filling and again for the truth categories. Wrapping the tree in CachedTree makes
+#every cuts.py function decorated with @eventCached remember its result per (function, entry, arguments) until the next
+#GetEntry, so the repeats cost a dictionary lookup. On an unwrapped tree the decorated functions run exactly as before
+#Typical use:
+#  eventTree = CachedTree(ntuple_file.Get("EventTree"))
+#  ... event loop unchanged ...
+#  eventTree.eventCache.printStats("EventTree")
+import functools
+
+
+class EventCache:
+  #Results for the current entry, plus hit/miss counts per function over the whole run
+
+  def __init__(self):
+    self.results = {}
+    self.hits = {}
+    self.misses = {}
+
+  def clear(self):
+    self.results.clear()
+
+  def call(self, function, key, args, kwargs):
+    name = function.__name__
+    if key in self.results:
+      self.hits[name] = self.hits.get(name, 0) + 1
+    else:
+      self.misses[name] = self.misses.get(name, 0) + 1
+      self.results[key] = function(*args, **kwargs)
+    return _copyResult(self.results[key])
+
+  def stats(self):
+    #{function name: (hits, calls, hit rate)}
+    out = {}
+    for name in sorted(set(self.hits) | set(self.misses)):
+      hits, calls = self.hits.get(name, 0), self.hits.get(name, 0) + self.misses.get(name, 0)
+      out[name] = (hits, calls, float(hits)/calls if calls > 0 else 0.)
+    return out
+
+  def printStats(self, label="event cache"):
+    totalHits, totalCalls = 0, 0
+    for name, (hits, calls, rate) in self.stats().items():
+      print("[", label, "]", "%-28s %10d calls %10d cached (%.1f percent)" % (name, calls, hits, 100.*rate))
+      totalHits += hits
+      totalCalls += calls
+    if totalCalls > 0:
+      print("[", label, "]", "%-28s %10d calls %10d cached (%.1f percent)" % ("all", totalCalls, totalHits, 100.*totalHits/totalCalls))
+
+
+class CachedTree:
+  #Wraps a tree (TTree, ColumnTree, BranchGuard, ...): attribute access goes to the tree, and GetEntry empties the cache
+
+  def __init__(self, tree):
+    self.__dict__["_tree"] = tree
+    self.__dict__["eventCache"] = EventCache()
+    self.__dict__["entry"] = -1
+
+  def GetEntry(self, i):
+    self.eventCache.clear()
+    self.__dict__["entry"] = i
+    return self.__dict__["_tree"].GetEntry(i)
+
+  def __getattr__(self, name):
+    return getattr(self.__dict__["_tree"], name)
+
+
+def _freeze(value):
+  #Hashable stand-in for an argument: lists and dicts (photon index lists, fiducialData) are compared by content
+  if isinstance(value, CachedTree):
+    return "<tree>"
+  if isinstance(value, dict):
+    return ("dict",) + tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+  if isinstance(value, (list, tuple)):
+    return (type(value).__name__,) + tuple(_freeze(item) for item in value)
+  hash(value)
+  return value
+
+
+def _copyResult(result):
+  #Callers may append to the lists they get back, so hand out copies rather than the cached objects
+  if isinstance(result, list):
+    return list(result)
+  if isinstance(result, tuple):
+    return tuple(_copyResult(item) for item in result)
+  if isinstance(result, dict):
+    return dict(result)
+  return result
+
+
+def eventCached(function):
+  #Decorator for helpers that depend only on the current entry of the tree they are given and on their arguments
+  @functools.wraps(function)
+  def cached(*args, **kwargs):
+    tree = None
+    for arg in args:
+      if isinstance(arg, CachedTree):
+        tree = arg
+        break
+    if tree is None:
+      return function(*args, **kwargs)
+    try:
+      key = (function, tree.entry, _freeze(args), _freeze(kwargs))
+    except TypeError:
+      #An argument that cannot be compared by value; run the helper uncached
+      return function(*args, **kwargs)
+    return tree.eventCache.call(function, key, args, kwargs)
+  return cached
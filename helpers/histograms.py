@@ -0,0 +1,240 @@
+#NumPy histogram backend
+#Histogram1D keeps the sum of weights and the sum of squared weights of every bin (underflow and overflow included) in NumPy
+#arrays. fill() adds a whole column of values with one bincount, so a batch costs one call instead of one TH1.Fill per event
+#Fill(x, w) is kept for per-entry code, so a script can swap rt.TH1F(...) for Histogram1D(...) without touching its loop
+#toTH1() builds the ROOT histogram (Sumw2 set, errors from sumw2) when the output is written; the cuts.py plotting helpers
+#(histStack, histStackFill, efficiencyPlot, ...) call it themselves, so they accept either kind of histogram, and apply
+#their POT scaling with scaleHist
+#CategoryHistogram holds a whole family of such histograms (one per truth/reco outcome category) in one category x bin array
+import numpy as np
+import ROOT as rt
+
+
+def binIndex(values, nBins, low, high):
+  #ROOT's TAxis::FindBin for a fixed-width axis: underflow below low, overflow at or above high (and for NaN)
+  values = np.asarray(values, dtype=np.float64)
+  index = np.full(values.shape, nBins + 1, dtype=np.int64)
+  index[values < low] = 0
+  inside = (values >= low) & (values < high)
+  index[inside] = 1 + (nBins*(values[inside] - low)/(high - low)).astype(np.int64)
+  return index
+
+
+def _weights(weights, n):
+  if weights is None:
+    return np.ones(n)
+  return np.broadcast_to(np.asarray(weights, dtype=np.float64), (n,))
+
+
+class Histogram1D:
+
+  def __init__(self, name, title, nBins, low, high, rootClass="TH1F"):
+    self.name = name
+    self.title = title
+    self.nBins = int(nBins)
+    self.low = float(low)
+    self.high = float(high)
+    self.rootClass = rootClass
+    #Index 0 is the underflow and nBins+1 the overflow, as in ROOT
+    self.sumw = np.zeros(self.nBins + 2)
+    self.sumw2 = np.zeros(self.nBins + 2)
+    self.entries = 0
+    #Set by CategoryHistogram for its per-category views, so events it still holds are added before the contents are read
+    self.source = None
+    self._th1 = None
+    self._stale = True
+
+  def binIndex(self, values):
+    return binIndex(values, self.nBins, self.low, self.high)
+
+  def fill(self, values, weights=None):
+    #Adds every value of an array (weights: one per value, a single number, or None for 1)
+    values = np.ravel(np.asarray(values, dtype=np.float64))
+    weights = _weights(weights, len(values))
+    index = self.binIndex(values)
+    self.sumw += np.bincount(index, weights=weights, minlength=self.nBins + 2)
+    self.sumw2 += np.bincount(index, weights=weights*weights, minlength=self.nBins + 2)
+    self.entries += len(values)
+    self._stale = True
+
+  def Fill(self, x, w=1.):
+    #Single value, same call as TH1.Fill
+    index = self.binIndex([x])[0]
+    self.sumw[index] += w
+    self.sumw2[index] += w*w
+    self.entries += 1
+    self._stale = True
+
+  def _sync(self):
+    if self.source is not None:
+      self.source.flush()
+
+  def scale(self, factor):
+    self._sync()
+    self.sumw *= factor
+    self.sumw2 *= factor*factor
+    self._stale = True
+
+  def add(self, other, factor=1.):
+    if (other.nBins, other.low, other.high) != (self.nBins, self.low, self.high):
+      raise ValueError("cannot add histogram '%s' to '%s': different binning" % (other.name, self.name))
+    self._sync()
+    other._sync()
+    self.sumw += factor*other.sumw
+    self.sumw2 += factor*factor*other.sumw2
+    self.entries += other.entries
+    self._stale = True
+
+  def GetNbinsX(self):
+    return self.nBins
+
+  def GetName(self):
+    return self.name
+
+  def GetTitle(self):
+    return self.title
+
+  def Integral(self, first=1, last=None):
+    self._sync()
+    last = self.nBins if last is None else last
+    return self.sumw[first:last+1].sum()
+
+  def errors(self):
+    self._sync()
+    return np.sqrt(self.sumw2)
+
+  def toTH1(self):
+    #The ROOT histogram with these contents. The same object is returned on every call, refreshed if filled since, so
+    #styling done on it by the plotting helpers carries through to the file it is written to. A refresh overwrites the
+    #contents, so scale the Histogram1D itself (scale(), or scaleHist below), never the ROOT histogram it returns
+    self._sync()
+    if self._th1 is None:
+      self._th1 = getattr(rt, self.rootClass)(self.name, self.title, self.nBins, self.low, self.high)
+      self._th1.Sumw2()
+    if self._stale:
+      for i in range(self.nBins + 2):
+        self._th1.SetBinContent(i, self.sumw[i])
+        self._th1.SetBinError(i, np.sqrt(self.sumw2[i]))
+      self._th1.SetEntries(self.entries)
+      self._stale = False
+    return self._th1
+
+  def Write(self, *args):
+    return self.toTH1().Write(*args)
+
+
+def toTH1(hist):
+  #ROOT histogram for either a Histogram1D or something that already is one
+  if isinstance(hist, Histogram1D):
+    return hist.toTH1()
+  return hist
+
+
+def scaleHist(hist, factor):
+  #Scales either kind of histogram and returns the ROOT one. A Histogram1D is scaled in its own arrays, so the scaling
+  #is still there when toTH1 refreshes the ROOT histogram after later fills
+  if isinstance(hist, Histogram1D):
+    hist.scale(factor)
+    return hist.toTH1()
+  hist.Scale(factor)
+  return hist
+
+
+class CategoryHistogram:
+  #Histograms of one variable split by outcome category, stored as one (category, bin) array of weights
+  #categories is a list of (key, name, title): key is what the filling code uses, name and title those of the histogram
+  #Events are filled by category code (the position of the key in categories, -1 for none) with one scatter-add per call
+  #of fill(); Fill(key, x, w) collects single events and adds them the same way once the contents are needed
+  #histogram(key) is a Histogram1D that reads and writes the row of that category, so the stacking helpers take it as is
+
+  def __init__(self, categories, nBins, low, high, rootClass="TH1F"):
+    self.keys = [key for key, name, title in categories]
+    self.names = dict((key, name) for key, name, title in categories)
+    self.titles = dict((key, title) for key, name, title in categories)
+    self.codes = dict((key, code) for code, key in enumerate(self.keys))
+    if len(self.codes) != len(self.keys):
+      raise ValueError("category keys must be unique")
+    self.nBins = int(nBins)
+    self.low = float(low)
+    self.high = float(high)
+    self.rootClass = rootClass
+    self._sumw = np.zeros((len(self.keys), self.nBins + 2))
+    self._sumw2 = np.zeros((len(self.keys), self.nBins + 2))
+    self._entries = np.zeros(len(self.keys), dtype=np.int64)
+    self._pending = ([], [], [])
+    self._histograms = {}
+
+  def code(self, key):
+    return self.codes[key]
+
+  def fill(self, codes, values, weights=None):
+    #codes, values (and weights) hold one entry per event; events with code -1 are skipped
+    codes = np.ravel(np.asarray(codes, dtype=np.int64))
+    values = np.ravel(np.asarray(values, dtype=np.float64))
+    weights = _weights(weights, len(values))
+    keep = codes >= 0
+    if (codes >= len(self.keys)).any():
+      raise ValueError("category code out of range (%d categories)" % len(self.keys))
+    codes, values, weights = codes[keep], values[keep], weights[keep]
+    flat = codes*(self.nBins + 2) + binIndex(values, self.nBins, self.low, self.high)
+    size = len(self.keys)*(self.nBins + 2)
+    self._sumw += np.bincount(flat, weights=weights, minlength=size).reshape(self._sumw.shape)
+    self._sumw2 += np.bincount(flat, weights=weights*weights, minlength=size).reshape(self._sumw2.shape)
+    self._entries += np.bincount(codes, minlength=len(self.keys))
+    self._updated()
+
+  def Fill(self, key, x, w=1.):
+    codes, values, weights = self._pending
+    codes.append(self.codes[key])
+    values.append(x)
+    weights.append(w)
+    if len(codes) >= 100000:
+      self.flush()
+
+  def flush(self):
+    codes, values, weights = self._pending
+    if len(codes) > 0:
+      self._pending = ([], [], [])
+      self.fill(codes, values, weights)
+
+  def _updated(self):
+    for key, hist in self._histograms.items():
+      hist.entries = int(self._entries[self.codes[key]])
+      hist._stale = True
+
+  @property
+  def sumw(self):
+    self.flush()
+    return self._sumw
+
+  @property
+  def sumw2(self):
+    self.flush()
+    return self._sumw2
+
+  def scale(self, factor, keys=None):
+    #Scales every category, or only those in keys
+    self.flush()
+    rows = slice(None) if keys is None else [self.codes[key] for key in keys]
+    self._sumw[rows] *= factor
+    self._sumw2[rows] *= factor*factor
+    self._updated()
+
+  def histogram(self, key):
+    self.flush()
+    if key not in self._histograms:
+      code = self.codes[key]
+      hist = Histogram1D(self.names[key], self.titles[key], self.nBins, self.low, self.high, self.rootClass)
+      hist.sumw = self._sumw[code]
+      hist.sumw2 = self._sumw2[code]
+      hist.entries = int(self._entries[code])
+      hist.source = self
+      self._histograms[key] = hist
+    return self._histograms[key]
+
+  def histograms(self, keys=None):
+    #Histogram1D per key, in the order given (the stacking order of histStack and friends); all categories by default
+    return [self.histogram(key) for key in (self.keys if keys is None else keys)]
+
+  def toTH1List(self, keys=None):
+    return [hist.toTH1() for hist in self.histograms(keys)]
@@ -0,0 +1,250 @@
+#Batch job planning from the bookkeeping_files fileinfo tables
+#planUnits bin-packs the files of a table into work units of about equal event count (largest file first, each into the
+#currently lightest unit). A JobManifest in the work directory keeps the plan and the state of every unit, so a run that
+#stops half way (or has failed units) is restarted by running the same command again: units already done are skipped
+#Units run through an executor: LocalExecutor runs the unit commands in a pool of local processes, SlurmExecutor
+#submits one sbatch job per unit instead. A unit counts as done once its command exits with status 0 (SLURM jobs leave a
+#marker file that the manifest picks up on the next call)
+#A submitted unit whose job has left the queue without its marker (failed, cancelled, killed at the time limit, or lost
+#with its node) is found by SlurmExecutor.refresh on the next call and submitted again. Without squeue the unit is only
+#given up on once it has been submitted for longer than the timeout
+import os, json, time, heapq, shlex, getpass, subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from helpers.potService import readFileInfo, defaultExtFileInfo
+
+
+def planUnits(fileInfoPath=defaultExtFileInfo, nUnits=None, eventsPerUnit=None):
+  #Work units over the files of a fileinfo table: give either the number of units or the events wanted per unit
+  info = readFileInfo(fileInfoPath)
+  nEntries = info["nEntries"]
+  if nUnits is None:
+    if eventsPerUnit is None:
+      raise ValueError("planUnits needs nUnits or eventsPerUnit")
+    nUnits = -(-int(nEntries.sum())//eventsPerUnit)
+  nUnits = max(1, min(int(nUnits), len(nEntries)))
+  heap = [(0, k) for k in range(nUnits)]
+  members = [[] for k in range(nUnits)]
+  #Stable sort, so the same table always gives the same plan
+  for row in sorted(range(len(nEntries)), key=lambda row: -nEntries[row]):
+    load, k = heapq.heappop(heap)
+    members[k].append(row)
+    heapq.heappush(heap, (load + int(nEntries[row]), k))
+  units = []
+  for k, rows in enumerate(members):
+    rows.sort()
+    units.append({"unit": "unit_%04d" % k,
+                  "fileids": [int(info["fileid"][row]) for row in rows],
+                  "fileNames": [str(info["fileName"][row]) for row in rows],
+                  "nEntries": int(nEntries[rows].sum())})
+  return units
+
+
+def printPlan(units, label="jobPlanner"):
+  loads = [unit["nEntries"] for unit in units]
+  mean = sum(loads)/float(len(loads))
+  print("[%s] %d files in %d units: %d events, %.0f per unit (smallest %d, largest %d, largest/mean %.3f)"
+        % (label, sum(len(unit["fileNames"]) for unit in units), len(units), sum(loads), mean, min(loads), max(loads),
+           max(loads)/mean if mean > 0 else 1.0))
+
+
+class JobManifest:
+  #manifest.json in the work directory: the plan (table, settings, units) and per unit its state ("pending", "running",
+  #"submitted", "done", "failed"), exit status and time (and the SLURM job id of a submitted unit)
+
+  def __init__(self, workDir):
+    self.workDir = workDir
+    self.path = os.path.join(workDir, "manifest.json")
+    self.plan = None
+    self.units = []
+    self.states = {}
+    if os.path.exists(self.path):
+      with open(self.path) as manifestFile:
+        stored = json.load(manifestFile)
+      self.plan = stored["plan"]
+      self.units = stored["units"]
+      self.states = stored["states"]
+    self.collectMarkers()
+
+  def create(self, plan, units):
+    #Starts a new manifest, or checks that the existing one was made with the same plan
+    if self.plan is not None:
+      if self.plan != plan:
+        raise ValueError("%s was planned with %s, not %s (use a new work directory or --replan)" % (self.path, self.plan, plan))
+      return
+    self.plan = plan
+    self.units = units
+    self.states = dict((unit["unit"], {"state": "pending"}) for unit in units)
+    os.makedirs(self.workDir, exist_ok=True)
+    for unit in units:
+      self.writeFileList(unit)
+    self.save()
+
+  def fileListPath(self, unit):
+    return os.path.join(self.workDir, "filelists", unit["unit"] + ".txt")
+
+  def writeFileList(self, unit):
+    os.makedirs(os.path.dirname(self.fileListPath(unit)), exist_ok=True)
+    inputDir = self.plan.get("inputDir") or ""
+    with open(self.fileListPath(unit), "w") as listFile:
+      for fileName in unit["fileNames"]:
+        print(os.path.join(inputDir, fileName), file=listFile)
+
+  def markerPath(self, unit):
+    return os.path.join(self.workDir, "done", unit["unit"] + ".done")
+
+  def collectMarkers(self):
+    #Units finished by batch jobs since the manifest was last written
+    changed = False
+    for unit in self.units:
+      if self.states[unit["unit"]]["state"] != "done" and os.path.exists(self.markerPath(unit)):
+        self.states[unit["unit"]] = {"state": "done", "status": 0, "time": os.path.getmtime(self.markerPath(unit))}
+        changed = True
+    if changed:
+      self.save()
+
+  def setState(self, unit, state, status=None, jobId=None):
+    self.states[unit["unit"]] = {"state": state, "status": status, "time": time.time()}
+    if jobId is not None:
+      self.states[unit["unit"]]["jobId"] = jobId
+    self.save()
+
+  def pending(self, skip=("done",)):
+    #Units still to run: everything not done (failed units are tried again); skip=("done", "submitted") also leaves out
+    #the units with a batch job in the queue
+    return [unit for unit in self.units if self.states[unit["unit"]]["state"] not in skip]
+
+  def counts(self):
+    counts = {}
+    for state in self.states.values():
+      counts[state["state"]] = counts.get(state["state"], 0) + 1
+    return counts
+
+  def save(self):
+    tmpPath = self.path + ".tmp"
+    with open(tmpPath, "w") as manifestFile:
+      json.dump({"plan": self.plan, "units": self.units, "states": self.states}, manifestFile, indent=1)
+    os.replace(tmpPath, self.path)
+
+
+def unitCommand(template, manifest, unit):
+  #The shell command of a unit: template with {unit}, {filelist}, {files} (the input paths, space separated) and
+  #{workdir} filled in
+  inputDir = manifest.plan.get("inputDir") or ""
+  files = " ".join(shlex.quote(os.path.join(inputDir, fileName)) for fileName in unit["fileNames"])
+  return template.format(unit=unit["unit"], filelist=shlex.quote(manifest.fileListPath(unit)), files=files,
+                         workdir=shlex.quote(manifest.workDir))
+
+
+class LocalExecutor:
+  #Runs the unit commands as local processes, at most processes at a time, each with its output in logs/<unit>.log
+  #(threads only wait on the child processes; the manifest is written from this process alone)
+
+  def __init__(self, processes):
+    self.processes = processes
+
+  def run(self, manifest, units, template):
+    logDir = os.path.join(manifest.workDir, "logs")
+    os.makedirs(logDir, exist_ok=True)
+    def runUnit(unit):
+      with open(os.path.join(logDir, unit["unit"] + ".log"), "w") as logFile:
+        return subprocess.call(unitCommand(template, manifest, unit), shell=True, stdout=logFile, stderr=subprocess.STDOUT)
+    failed = 0
+    with ThreadPoolExecutor(max_workers=self.processes) as pool:
+      futures = {}
+      for unit in units:
+        manifest.setState(unit, "running")
+        futures[pool.submit(runUnit, unit)] = unit
+      for future in as_completed(futures):
+        unit = futures[future]
+        status = future.result()
+        manifest.setState(unit, "done" if status == 0 else "failed", status)
+        if status != 0:
+          failed += 1
+          print("[jobPlanner] %s failed with status %d (see logs/%s.log)" % (unit["unit"], status, unit["unit"]))
+        else:
+          print("[jobPlanner] %s done" % unit["unit"])
+    return failed
+
+
+def slurmQueue():
+  #{job id: state} of this user's jobs in the SLURM queue, or None if squeue cannot be run
+  try:
+    output = subprocess.run(["squeue", "-h", "-u", getpass.getuser(), "-o", "%i %T"], capture_output=True, text=True)
+  except OSError:
+    return None
+  if output.returncode != 0:
+    return None
+  return dict(line.split()[:2] for line in output.stdout.splitlines() if len(line.split()) >= 2)
+
+
+def slurmFinalState(jobId):
+  #State sacct recorded for a job that has left the queue ("FAILED", "TIMEOUT", ...), or "unknown"
+  try:
+    output = subprocess.run(["sacct", "-n", "-X", "-P", "-j", str(jobId), "-o", "State"], capture_output=True, text=True)
+  except OSError:
+    return "unknown"
+  states = output.stdout.split()
+  return states[0] if output.returncode == 0 and len(states) > 0 else "unknown"
+
+
+class SlurmExecutor:
+  #Writes one batch script per unit and submits it with sbatch; a job that succeeds leaves done/<unit>.done behind
+  #timeout: seconds after which a submitted unit is taken as lost when squeue cannot tell (None: never)
+
+  def __init__(self, sbatchOptions="", timeout=None):
+    self.sbatchOptions = sbatchOptions
+    self.timeout = timeout
+
+  def refresh(self, manifest):
+    #Marks the submitted units whose jobs are gone without a marker as failed, so they are submitted again;
+    #returns the number of units still in the queue
+    submitted = [unit for unit in manifest.units if manifest.states[unit["unit"]]["state"] == "submitted"]
+    if len(submitted) == 0:
+      return 0
+    queue = slurmQueue()
+    if queue is None:
+      print("[jobPlanner] squeue failed; submitted units are given up on after %s" % ("never" if self.timeout is None else "%.0f s" % self.timeout))
+    queued = 0
+    for unit in submitted:
+      state = manifest.states[unit["unit"]]
+      if queue is not None:
+        alive = str(state.get("jobId")) in queue
+      else:
+        alive = self.timeout is None or time.time() - state["time"] < self.timeout
+      if alive:
+        queued += 1
+        continue
+      #The job may have finished since the markers were read
+      manifest.collectMarkers()
+      if manifest.states[unit["unit"]]["state"] == "done":
+        continue
+      reason = slurmFinalState(state.get("jobId")) if queue is not None else "timed out"
+      print("[jobPlanner] job %s of %s left the queue without finishing (%s); submitting it again" % (state.get("jobId"), unit["unit"], reason))
+      manifest.setState(unit, "failed", reason, state.get("jobId"))
+    return queued
+
+  def run(self, manifest, units, template):
+    scriptDir = os.path.join(manifest.workDir, "slurm")
+    logDir = os.path.join(manifest.workDir, "logs")
+    os.makedirs(scriptDir, exist_ok=True)
+    os.makedirs(logDir, exist_ok=True)
+    os.makedirs(os.path.join(manifest.workDir, "done"), exist_ok=True)
+    failed = 0
+    for unit in units:
+      scriptPath = os.path.join(scriptDir, unit["unit"] + ".sh")
+      with open(scriptPath, "w") as script:
+        print("#!/bin/bash", file=script)
+        print("#SBATCH --job-name=%s" % unit["unit"], file=script)
+        print("#SBATCH --output=%s" % os.path.join(logDir, unit["unit"] + ".log"), file=script)
+        print("cd %s" % shlex.quote(os.getcwd()), file=script)
+        print("%s && touch %s" % (unitCommand(template, manifest, unit), shlex.quote(manifest.markerPath(unit))), file=script)
+      #--parsable prints the job id (";cluster" on multi-cluster setups), which refresh() looks up in the queue
+      output = subprocess.run("sbatch --parsable %s %s" % (self.sbatchOptions, shlex.quote(scriptPath)), shell=True,
+                              stdout=subprocess.PIPE, text=True)
+      if output.returncode == 0:
+        manifest.setState(unit, "submitted", jobId=output.stdout.strip().split(";")[0])
+      else:
+        failed += 1
+        print("[jobPlanner] sbatch of %s failed with status %d" % (unit["unit"], output.returncode))
+    return failed
@@ -10,6 +10,7 @@ from math import acos as acos
 from math import pi
 import ctypes
 import os
+import numpy as np
 
 
 def getFiles(mdlTag, kpsfiles, mdlfiles):
@@ -45,18 +46,8 @@ def isFiducialBig(p):
 def isInDetector(p):
   return (inRange(p.X(),detCrds[0]) and inRange(p.Y(),detCrds[1]) and inRange(p.Z(),detCrds[2]))
 
-class WCFiducial(ctypes.Structure):
-  pass
-libpath = os.path.dirname(os.path.realpath(__file__))
-libwc = ctypes.cdll.LoadLibrary("%s/lib_wirecell_fiducial_volume.so"%libpath)
-libwc.WCFiducial_new.argtypes = ()
-libwc.WCFiducial_new.restype = ctypes.POINTER(WCFiducial)
-libwc.WCFiducial_insideFV.argtypes = ctypes.POINTER(WCFiducial), ctypes.c_double, ctypes.c_double, ctypes.c_double
-libwc.WCFiducial_insideFV.restype = ctypes.c_bool
-WCFiducialClass = libwc.WCFiducial_new()
-
-def isFiducialWCSCE(p):
-  return libwc.WCFiducial_insideFV(WCFiducialClass, p.X(), p.Y(), p.Z())
+#The Wire-Cell space-charge fiducial volume is bound in helpers/wirecellFiducial.py, which needs no larlite/larcv
+from helpers.wirecellFiducial import WCFiducial, libwc, WCFiducialClass, getWCFiducial, isFiducialWCSCE, getWCBoundary, isFiducialWCSCEArray
 
 def getVertexDistance(pos3v, recoVtx):
   xdiffSq = (pos3v.X() - recoVtx.pos[0])**2
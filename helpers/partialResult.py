@@ -0,0 +1,171 @@
+#Mergeable partial results
+#A job that covers only part of the input (one file, or one file of many) saves a PartialResult instead of plots. It holds
+#the unscaled sum of weights and sum of squared weights of each histogram, the raw counters, the POT of every input file
+#the job read (per sample), and its event lists. Partials add up: merge() sums the arrays, counters and POT and joins the
+#event lists, so any number of shards reduce to one partial. POT scaling and stacking are applied to the merged result
+#only, once (reducePartials.py); scaling each shard would divide by the shard's POT instead of the total
+#Some inputs are read whole by every shard (the cosmic file next to each overlay shard). What comes from such an input
+#alone is marked with addShared(path, ...): merge() takes it, and the POT of the file, once per distinct path, so N shards
+#of one overlay sample count the cosmic histograms, POT, counters and event lists once rather than N times
+#The stacks a script draws are recorded with addStack(), so the reducer can make the same plots from the merged histograms
+#Saved as one .npz: a JSON header plus one sumw / sumw2 array per histogram
+import json
+import numpy as np
+
+from helpers.histograms import Histogram1D
+
+
+def histogramArrays(hist):
+  #(title, nBins, low, high, sumw, sumw2, entries) of a Histogram1D or a ROOT TH1 (underflow and overflow included)
+  if isinstance(hist, Histogram1D):
+    hist._sync()
+    return hist.title, hist.nBins, hist.low, hist.high, hist.sumw.copy(), hist.sumw2.copy(), hist.entries
+  nBins = hist.GetNbinsX()
+  axis = hist.GetXaxis()
+  sumw = np.array([hist.GetBinContent(i) for i in range(nBins + 2)])
+  sumw2 = np.array([hist.GetBinError(i)**2 for i in range(nBins + 2)])
+  return hist.GetTitle(), nBins, axis.GetXmin(), axis.GetXmax(), sumw, sumw2, int(hist.GetEntries())
+
+
+class PartialResult:
+
+  def __init__(self, label):
+    self.label = label
+    self.histograms = {}
+    self.counters = {}
+    self.pot = {}
+    self.eventLists = {}
+    self.stacks = []
+    self.targetPOT = None
+    self.sources = []
+    #path of a shared input -> {"histograms": keys, "counters": names, "eventLists": names} that come from it alone
+    self.shared = {}
+
+  def addHistogram(self, key, hist):
+    #key identifies the histogram across shards; the ROOT name goes with it
+    title, nBins, low, high, sumw, sumw2, entries = histogramArrays(hist)
+    self.histograms[key] = {"name": hist.GetName(), "title": title, "nBins": nBins, "low": low, "high": high,
+                            "sumw": sumw, "sumw2": sumw2, "entries": entries}
+
+  def addCategoryHistogram(self, hists):
+    #Every category of a CategoryHistogram, under its key
+    for key in hists.keys:
+      self.addHistogram(key, hists.histogram(key))
+
+  def addPOT(self, sample, path, pot):
+    #POT of one input file of a sample ("ntuple", "cosmic", ...)
+    self.pot.setdefault(sample, {})[path] = pot
+
+  def totalPOT(self, sample):
+    #Sum over the distinct input files of a sample
+    return sum(self.pot.get(sample, {}).values())
+
+  def addShared(self, path, histograms=(), counters=(), eventLists=()):
+    #Marks the histograms (keys), counters and event lists filled from the input at path alone
+    shared = self.shared.setdefault(path, {"histograms": [], "counters": [], "eventLists": []})
+    shared["histograms"].extend(histograms)
+    shared["counters"].extend(counters)
+    shared["eventLists"].extend(eventLists)
+
+  def addStack(self, kind, name, title, keys, cosmic=None, beam=None, xTitle=None, yTitle=None):
+    #kind "purity": cuts.histStackTwoSignal of keys plus the POT-scaled cosmic histogram, with the beam data on top
+    #kind "efficiency": cuts.histStack of keys
+    self.stacks.append({"kind": kind, "name": name, "title": title, "keys": list(keys), "cosmic": cosmic, "beam": beam,
+                        "xTitle": xTitle, "yTitle": yTitle})
+
+  def histogram(self, key):
+    #Histogram1D with the (unscaled) contents of one histogram
+    stored = self.histograms[key]
+    hist = Histogram1D(stored["name"], stored["title"], stored["nBins"], stored["low"], stored["high"])
+    hist.sumw[:] = stored["sumw"]
+    hist.sumw2[:] = stored["sumw2"]
+    hist.entries = stored["entries"]
+    return hist
+
+  def merge(self, other):
+    #Adds other into this partial; what other has from a shared input this partial already holds is left out
+    repeated = set(self.sources) & set(other.sources)
+    if repeated:
+      raise ValueError("cannot merge the shard of %s twice" % ", ".join(sorted(repeated)))
+    skip = {"histograms": set(), "counters": set(), "eventLists": set()}
+    for path, shared in other.shared.items():
+      if path in self.shared:
+        for field in skip:
+          skip[field].update(shared[field])
+      else:
+        self.shared[path] = dict((field, list(names)) for field, names in shared.items())
+    for key, stored in other.histograms.items():
+      if key in skip["histograms"]:
+        continue
+      if key not in self.histograms:
+        self.histograms[key] = dict(stored, sumw=stored["sumw"].copy(), sumw2=stored["sumw2"].copy())
+        continue
+      mine = self.histograms[key]
+      if (mine["nBins"], mine["low"], mine["high"]) != (stored["nBins"], stored["low"], stored["high"]):
+        raise ValueError("cannot merge histogram '%s': different binning in %s" % (key, ", ".join(other.sources)))
+      mine["sumw"] += stored["sumw"]
+      mine["sumw2"] += stored["sumw2"]
+      mine["entries"] += stored["entries"]
+    for name, value in other.counters.items():
+      if name not in skip["counters"]:
+        self.counters[name] = self.counters.get(name, 0) + value
+    for sample, files in other.pot.items():
+      for path, pot in files.items():
+        #A file read by several shards has its POT counted once
+        self.pot.setdefault(sample, {}).setdefault(path, pot)
+    for name, events in other.eventLists.items():
+      if name in skip["eventLists"]:
+        continue
+      merged = self.eventLists.setdefault(name, [])
+      if any(name in shared["eventLists"] for shared in self.shared.values()):
+        #Events of a shared list are listed once even if two paths name the same file
+        seen = set(tuple(event) for event in merged)
+        events = [event for event in events if tuple(event) not in seen]
+      merged.extend(events)
+    if not self.stacks:
+      self.stacks = other.stacks
+    if self.targetPOT is None:
+      self.targetPOT = other.targetPOT
+    self.sources.extend(other.sources)
+
+  def save(self, path):
+    keys = sorted(self.histograms)
+    header = {"label": self.label, "counters": self.counters, "pot": self.pot, "eventLists": self.eventLists,
+              "stacks": self.stacks, "targetPOT": self.targetPOT, "sources": self.sources, "shared": self.shared,
+              "histograms": [dict((field, self.histograms[key][field]) for field in ["name", "title", "nBins", "low", "high", "entries"]) for key in keys],
+              "keys": keys}
+    arrays = {}
+    for k, key in enumerate(keys):
+      arrays["sumw%d" % k] = self.histograms[key]["sumw"]
+      arrays["sumw2%d" % k] = self.histograms[key]["sumw2"]
+    np.savez(path, header=json.dumps(header), **arrays)
+
+  @classmethod
+  def load(cls, path):
+    stored = np.load(path)
+    header = json.loads(str(stored["header"]))
+    partial = cls(header["label"])
+    partial.counters = header["counters"]
+    partial.pot = header["pot"]
+    partial.eventLists = dict((name, [tuple(event) for event in events]) for name, events in header["eventLists"].items())
+    partial.stacks = header["stacks"]
+    partial.targetPOT = header["targetPOT"]
+    partial.sources = header["sources"]
+    partial.shared = header["shared"]
+    for k, (key, info) in enumerate(zip(header["keys"], header["histograms"])):
+      partial.histograms[key] = dict(info, sumw=stored["sumw%d" % k], sumw2=stored["sumw2%d" % k])
+    return partial
+
+
+def mergePartials(paths):
+  #One PartialResult with the sum of the partials saved at paths, merged in the order given
+  merged = None
+  for path in paths:
+    partial = PartialResult.load(path)
+    if merged is None:
+      merged = partial
+    else:
+      if partial.label != merged.label:
+        raise ValueError("cannot merge a '%s' partial (%s) into '%s' partials" % (partial.label, path, merged.label))
+      merged.merge(partial)
+  return merged
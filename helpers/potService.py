@@ -0,0 +1,161 @@
+#POT accounting shared by the analysis scripts
+#sumPOT replaces the per-entry potTree loop with one bulk RDataFrame Sum, and remembers the answer per input file
+#(in memory for this process, and on disk next to the column cache so later runs skip it entirely)
+#cosmicPOT derives the POT-equivalent of a cosmic/EXT ntuple from the bookkeeping_files fileinfo tables
+import os, json
+import numpy as np
+import ROOT as rt
+
+from helpers.columnCache import defaultCacheDir, sourceStamp
+
+bookkeepingDir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "bookkeeping_files")
+defaultExtFileInfo = os.path.join(bookkeepingDir, "fileinfo_mcc9_v29e_dl_run3_G1_extbnb_dlana.txt")
+
+#BNB POT equivalent of one EXT trigger for each fileinfo table (BNB POT over BNB triggers, from the run database)
+#The tables do not record it. Until a table's number is filled in here, give it for that table through
+#UBPHOTON_POT_PER_EXT_TRIGGER ("fileinfo_a.txt=2.1e11,fileinfo_b.txt=...") or the potPerTrigger argument of cosmicPOT;
+#without one, cosmicPOT returns the caller's fallbackPOT (the cosmic POT the script used before), or raises
+potPerExtTrigger = {"fileinfo_mcc9_v29e_dl_run3_G1_extbnb_dlana.txt": None}
+
+_memo = {}
+
+
+def _diskCachePath():
+  return os.path.join(defaultCacheDir, "pot_sums.json")
+
+
+def _readDiskCache():
+  if os.path.exists(_diskCachePath()):
+    with open(_diskCachePath()) as cacheFile:
+      return json.load(cacheFile)
+  return {}
+
+
+def _writeDiskCache(key, value):
+  try:
+    os.makedirs(defaultCacheDir, exist_ok=True)
+    cache = _readDiskCache()
+    cache[key] = value
+    tmpPath = _diskCachePath() + ".tmp"
+    with open(tmpPath, "w") as cacheFile:
+      json.dump(cache, cacheFile, indent=1, sort_keys=True)
+    os.replace(tmpPath, _diskCachePath())
+  except OSError:
+    pass
+
+
+def _memoKey(kind, paths):
+  #Files are identified by path, size and mtime, so a rewritten file is recounted
+  parts = [kind]
+  for path in paths:
+    if not os.path.exists(path):
+      return None
+    stamp = sourceStamp(path)
+    parts.append("%s|%d|%r" % (stamp["path"], stamp["size"], stamp["mtime"]))
+  return "||".join(parts)
+
+
+def _remember(key, compute):
+  if key is not None:
+    if key in _memo:
+      return _memo[key]
+    diskCache = _readDiskCache()
+    if key in diskCache:
+      _memo[key] = diskCache[key]
+      return diskCache[key]
+  value = compute()
+  if key is not None:
+    _memo[key] = value
+    _writeDiskCache(key, value)
+  return value
+
+
+def treeFilePath(tree):
+  rootFile = tree.GetCurrentFile()
+  if rootFile:
+    return rootFile.GetName()
+  return None
+
+
+def sumPOT(potTree, branch="totGoodPOT"):
+  #Total POT of an ntuple from its potTree, read in a single pass
+  path = treeFilePath(potTree)
+  key = _memoKey("pot:" + potTree.GetName() + ":" + branch, [path]) if path is not None else None
+  return _remember(key, lambda: float(rt.RDataFrame(potTree).Sum(branch).GetValue()))
+
+
+def ntuplePOT(path, treeName="potTree"):
+  #Same as sumPOT, but starting from a file path; a memoized file is not even opened
+  key = _memoKey("pot:" + treeName + ":totGoodPOT", [path])
+  def compute():
+    rootFile = rt.TFile(path)
+    value = float(rt.RDataFrame(rootFile.Get(treeName)).Sum("totGoodPOT").GetValue())
+    rootFile.Close()
+    return value
+  return _remember(key, compute)
+
+
+def readFileInfo(path=defaultExtFileInfo):
+  #fileinfo tables have one row per merged_dlana file: fileid, a column of subrun counts, the entry (trigger) count
+  #of the file twice, four further per-file counts, and the file name
+  fileids = np.loadtxt(path, usecols=0, dtype=np.int64, ndmin=1)
+  counts = np.loadtxt(path, usecols=range(1, 8), dtype=np.int64, ndmin=2)
+  fileNames = np.loadtxt(path, usecols=8, dtype=str, ndmin=1)
+  return {"fileid": fileids, "nSubruns": counts[:, 0], "nEntries": counts[:, 1], "counts": counts, "fileName": fileNames}
+
+
+def extTriggers(fileInfoPath=defaultExtFileInfo, fileids=None):
+  #Number of EXT triggers in the listed files (all of them if fileids is None)
+  info = readFileInfo(fileInfoPath)
+  if fileids is None:
+    return int(info["nEntries"].sum())
+  used = np.isin(info["fileid"], np.asarray(fileids))
+  if not used.any():
+    #A cosmic sample from another table would otherwise get a POT of 0 (and an infinite scale factor)
+    raise ValueError("none of the fileids %s are in %s" % (list(np.unique(fileids))[:10], os.path.basename(fileInfoPath)))
+  return int(info["nEntries"][used].sum())
+
+
+def envPOTPerTrigger():
+  #{table name: POT per EXT trigger} from UBPHOTON_POT_PER_EXT_TRIGGER, "fileinfo_a.txt=2.1e11,fileinfo_b.txt=..."
+  text = os.environ.get("UBPHOTON_POT_PER_EXT_TRIGGER", "")
+  values = {}
+  for item in text.split(","):
+    if item.strip() == "":
+      continue
+    table, _, value = item.partition("=")
+    if value == "":
+      raise ValueError("UBPHOTON_POT_PER_EXT_TRIGGER takes table=value pairs (e.g. %s=2.1e11), not '%s'"
+                       % (os.path.basename(defaultExtFileInfo), item))
+    values[table.strip()] = float(value)
+  return values
+
+
+def extPOTPerTrigger(fileInfoPath=defaultExtFileInfo, potPerTrigger=None):
+  #The argument if given, then the table's entry in UBPHOTON_POT_PER_EXT_TRIGGER, then its potPerExtTrigger entry;
+  #None if none of them is set
+  table = os.path.basename(fileInfoPath)
+  if potPerTrigger is None:
+    potPerTrigger = envPOTPerTrigger().get(table)
+  if potPerTrigger is None:
+    potPerTrigger = potPerExtTrigger.get(table)
+  return potPerTrigger
+
+
+def cosmicPOT(cosmicTree, fileInfoPath=defaultExtFileInfo, potPerTrigger=None, fallbackPOT=None):
+  #POT-equivalent of a cosmic/EXT ntuple: EXT triggers in the files it was made from (matched by fileid) times the
+  #POT per EXT trigger for that table (extPOTPerTrigger). While that is not known, fallbackPOT (the value the script
+  #used before) is returned with a note; without it, ValueError
+  potPerTrigger = extPOTPerTrigger(fileInfoPath, potPerTrigger)
+  if potPerTrigger is None:
+    if fallbackPOT is None:
+      raise ValueError("no POT per EXT trigger known for %s: fill it in potPerExtTrigger (helpers/potService.py), set it "
+                       "in UBPHOTON_POT_PER_EXT_TRIGGER or pass fallbackPOT" % os.path.basename(fileInfoPath))
+    print("[potService] no POT per EXT trigger known for %s, using the cosmic POT %.4g" % (os.path.basename(fileInfoPath), fallbackPOT))
+    return fallbackPOT
+  path = treeFilePath(cosmicTree)
+  key = _memoKey("exttriggers:" + cosmicTree.GetName(), [path, fileInfoPath]) if path is not None else None
+  def compute():
+    fileids = np.unique(rt.RDataFrame(cosmicTree).AsNumpy(["fileid"])["fileid"])
+    return extTriggers(fileInfoPath, fileids)
+  return potPerTrigger*_remember(key, compute)
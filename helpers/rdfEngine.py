@@ -0,0 +1,148 @@
+#RDataFrame engine for the common single-photon selection
+#RDFSelection builds the reco selection of the evaluator scripts as a chain of RDataFrame Filter/Define nodes: vertex,
+#CC veto (recoCutMuons and recoCutElectrons), cosmic fraction, fiducial vertex, pion veto, at most one proton, and at least
+#one photon candidate, with the leading photon energy defined on the selected events. The per-object work runs in the
+#C++ helpers of rdf_selection_helpers.h, compiled by the ROOT interpreter when the first selection is made, so Python only
+#builds the graph and reads the results
+#Everything is booked lazily: the cut-flow sums and every breakdown histogram (leading photon energy per reco proton
+#count and, for overlay, per true outcome) are filled by one event loop, which runs when the first result is read (or
+#for several selections at once with runAll). With enableThreads the loop runs over all cores (ROOT implicit MT)
+#The single-photon score cuts of selection_1g1p (shower-from-charged, primary score, long tracks, ...) are not part of
+#this chain
+import os
+import ROOT as rt
+
+helperHeader = os.path.join(os.path.dirname(os.path.realpath(__file__)), "rdf_selection_helpers.h")
+_declared = False
+
+#True outcomes of the selected overlay events, in the order generalEvaluator.py sorts them: (key, histogram title)
+outcomeCategories = [("Muon", "Muon"),
+                     ("Electron", "Electron"),
+                     ("Fiducials", "Out of Fiducial"),
+                     ("PionProton", "Pions or Protons"),
+                     ("NoPhotons", "No Real Photons"),
+                     ("OnePhoton", "1 Photon (Signal)"),
+                     ("TwoPhotons", "2 Photons"),
+                     ("ManyPhotons", "3+ Photons")]
+
+#Reco samples the breakdown is split into: (key, reco proton count, title)
+protonSamples = [("0p", 0, "1 Gamma + 0"), ("1p", 1, "1 Gamma + 1P")]
+
+
+def declareHelpers():
+  global _declared
+  if not _declared:
+    with open(helperHeader) as header:
+      if not rt.gInterpreter.Declare(header.read()):
+        raise RuntimeError("the ROOT interpreter could not compile %s" % helperHeader)
+    _declared = True
+
+
+def enableThreads(threads):
+  #Multithreaded event loops for the RDataFrames made after this call: 0 for every core, 1 to stay single-threaded
+  if threads == 1:
+    return
+  if threads > 0:
+    rt.EnableImplicitMT(threads)
+  else:
+    rt.EnableImplicitMT()
+  print("[rdfEngine] implicit multithreading with %d threads" % rt.GetThreadPoolSize())
+
+
+def fiducialBox(fiducial):
+  #C++ ubphoton::Fiducial with the box of a fiducialData dict
+  return "ubphoton::Fiducial{%r, %r, %r, %r, %r, %r}" % tuple(float(fiducial[name]) for name in ["xMin", "xMax", "yMin", "yMax", "zMin", "zMax"])
+
+
+class RDFSelection:
+  #files: ntuple path (or list of paths); fiducial: fiducialData dict with "width" and "photonWidth"
+  #weight: weight branch or expression ("xsecWeight" for overlay, "1.0" for data and cosmics)
+  #truth: define the true outcome of each event (overlay only)
+
+  def __init__(self, files, fiducial, classificationThreshold=0, weight="1.0", truth=False, treeName="EventTree"):
+    declareHelpers()
+    self.truth = truth
+    self.frame = rt.RDataFrame(treeName, files)
+    box = fiducialBox(fiducial)
+    threshold = repr(float(classificationThreshold))
+    photonWidth = repr(float(fiducial.get("photonWidth", fiducial["width"])))
+    self.cutFlow = []
+
+    node = self.frame.Define("weight", weight)
+    self.cutFlow.append(("all events", node.Sum("weight")))
+    node = self.cut(node, "vertex", "foundVertex == 1")
+    primary = "ubphoton::primaryFound(%sClassified, %sSize, %sProcess, %sPID, %sRecoE, " + threshold + ", %d, %d)"
+    node = self.cut(node, "CC veto", " && ".join("!" + primary % (kind, kind, kind, kind, kind, pid, energy)
+                                                  for pid, energy in [(13, 100), (11, 10)] for kind in ["track", "shower"]))
+    node = self.cut(node, "cosmic fraction", "vtxFracHitsOnCosmic < 1")
+    node = self.cut(node, "fiducial", "ubphoton::insideFiducial(vtxX, vtxY, vtxZ, %s, %r)" % (box, float(fiducial["width"])))
+    node = self.cut(node, "pion veto", " && ".join("!ubphoton::pionFound(%sPID, %sRecoE, %sSize, %s)" % (kind, kind, kind, threshold)
+                                                   for kind in ["track", "shower"]))
+    node = node.Define("recoProtonCount", "ubphoton::protonCount(trackPID, trackRecoE, trackSize, %s)" % threshold)
+    node = self.cut(node, "at most one proton", "recoProtonCount <= 1")
+    node = node.Define("photonShowerIDs", "ubphoton::photonShowers(showerClassified, showerPID, showerRecoE, showerStartPosX, showerStartPosY, showerStartPosZ, %s, %s, %s)"
+                       % (threshold, box, photonWidth))
+    node = node.Define("photonTrackIDs", "ubphoton::photonTracks(trackClassified, trackSize, trackPID, trackStartPosX, trackStartPosY, trackStartPosZ, %s, %s, %s)"
+                       % (threshold, box, photonWidth))
+    node = node.Define("nRecoPhotons", "int(photonShowerIDs.size() + photonTrackIDs.size())")
+    node = self.cut(node, "photon candidate", "nRecoPhotons > 0")
+    node = node.Define("leadingPhotonE", "ubphoton::leadingPhotonEnergy(showerRecoE, photonShowerIDs, trackRecoE, photonTrackIDs)")
+
+    if truth:
+      primaries = "truePrimPartPDG, truePrimPartE, truePrimPartPx, truePrimPartPy, truePrimPartPz"
+      node = node.Define("truePionProton", "ubphoton::truePionProtonCounts(%s)" % primaries)
+      node = node.Define("nTruePhotons", "ubphoton::truePhotonCount(trueSimPartPDG, trueSimPartTID, trueSimPartMID, "
+                         "trueSimPartX, trueSimPartY, trueSimPartZ, trueVtxX, trueVtxY, trueVtxZ, "
+                         "trueSimPartEDepX, trueSimPartEDepY, trueSimPartEDepZ, "
+                         "trueSimPartPixelSumUplane, trueSimPartPixelSumVplane, trueSimPartPixelSumYplane, %s, %s)" % (box, photonWidth))
+      #Code of the first outcome in outcomeCategories the event belongs to
+      tests = ["ubphoton::truePrimaryFound(%s, 13, 0.1)" % primaries,
+               "ubphoton::truePrimaryFound(%s, 11, 0.01)" % primaries,
+               "!ubphoton::insideFiducial(trueVtxX, trueVtxY, trueVtxZ, %s, %r)" % (box, float(fiducial["width"])),
+               "truePionProton[0] > 0 || truePionProton[1] > 1",
+               "nTruePhotons == 0",
+               "nTruePhotons == 1",
+               "nTruePhotons == 2"]
+      outcome = "".join("(%s) ? %d : " % (test, code) for code, test in enumerate(tests)) + str(len(tests))
+      node = node.Define("outcome", outcome)
+    self.selected = node
+    self.histograms = {}
+
+  def cut(self, node, name, expression):
+    #Filter node plus its weighted count for the cut-flow
+    node = node.Filter(expression, name)
+    self.cutFlow.append((name, node.Sum("weight")))
+    return node
+
+  def book(self, prefix, nBins=60, low=0, high=2):
+    #Leading photon energy histograms of the selected events, keyed (sample, outcome) with outcome "all" for the sample as
+    #a whole; booked only, filled by the next event loop
+    for sample, protons, title in protonSamples:
+      node = self.selected.Filter("recoProtonCount == %d" % protons)
+      self.histograms[(sample, "all")] = node.Histo1D(("%s%sAll" % (prefix, sample), title, nBins, low, high), "leadingPhotonE", "weight")
+      if self.truth:
+        for code, (outcome, outcomeTitle) in enumerate(outcomeCategories):
+          model = ("%s%s%s" % (prefix, sample, outcome), outcomeTitle, nBins, low, high)
+          self.histograms[(sample, outcome)] = node.Filter("outcome == %d" % code).Histo1D(model, "leadingPhotonE", "weight")
+    return self.histograms
+
+  def histogram(self, sample, outcome="all"):
+    #The filled TH1D (runs the event loop if it has not run yet)
+    return self.histograms[(sample, outcome)].GetValue()
+
+  def cutFlowCounts(self):
+    return [(name, result.GetValue()) for name, result in self.cutFlow]
+
+  def printCutFlow(self, label, scale=1.0):
+    for name, count in self.cutFlowCounts():
+      print("[%s] %-20s %12.2f" % (label, name, scale*count))
+
+
+def runAll(selections):
+  #Runs the event loops of several selections at the same time (each still a single pass over its own input)
+  handles = [selection.cutFlow[0][1] for selection in selections]
+  if hasattr(rt.RDF, "RunGraphs"):
+    rt.RDF.RunGraphs(handles)
+  else:
+    for handle in handles:
+      handle.GetValue()
@@ -0,0 +1,175 @@
+// C++ versions of the common cuts.py selections, for the RDataFrame engine in helpers/rdfEngine.py
+// Declared to the ROOT interpreter at run time (gInterpreter.Declare), so Filter/Define expressions can call them on the
+// per-object branches, which RDataFrame hands over as ROOT::RVec. Each function gives for one event what the cuts.py
+// function named in its comment gives; values are compared in double precision, as they are in PyROOT
+#include <cmath>
+#include <cstdlib>
+#include <set>
+#include "ROOT/RVec.hxx"
+
+namespace ubphoton {
+
+  using ROOT::RVec;
+
+  struct Fiducial {
+    double xMin, xMax, yMin, yMax, zMin, zMax;
+  };
+
+  // fiducial.insideFiducial: strictly inside the box shrunk by width on every side (the bottom face skipped when bottomless)
+  inline bool insideFiducial(double x, double y, double z, const Fiducial& box, double width, bool bottomless = false) {
+    bool inside = x > box.xMin + width && x < box.xMax - width && y < box.yMax - width
+      && z > box.zMin + width && z < box.zMax - width;
+    return bottomless ? inside : inside && y > box.yMin + width;
+  }
+
+  // The object preselection the reco cuts share: classified objects when threshold is 0, otherwise objects over threshold in size
+  template <class C, class S>
+  inline bool objectSelected(const RVec<C>& classified, const RVec<S>& size, size_t x, double threshold) {
+    return threshold == 0 ? classified[x] == 1 : size[x] > threshold;
+  }
+
+  // cuts.recoCutMuons / cuts.recoCutElectrons, for tracks or showers: is there a primary (process 0) object with this PID
+  // above energy (MeV)?
+  template <class C, class S, class P, class I, class E>
+  bool primaryFound(const RVec<C>& classified, const RVec<S>& size, const RVec<P>& process, const RVec<I>& pid,
+                    const RVec<E>& recoE, double threshold, int wantedPID, double energy) {
+    for (size_t x = 0; x < pid.size(); ++x) {
+      if (objectSelected(classified, size, x, threshold) && process[x] == 0 && pid[x] == wantedPID && double(recoE[x]) > energy)
+        return true;
+    }
+    return false;
+  }
+
+  // cuts.recoPion, for tracks or showers: is there a charged pion of at least 50 MeV?
+  template <class I, class E, class S>
+  bool pionFound(const RVec<I>& pid, const RVec<E>& recoE, const RVec<S>& size, double threshold) {
+    for (size_t x = 0; x < pid.size(); ++x) {
+      if (threshold != 0 && size[x] < threshold)
+        continue;
+      if (std::abs(int(pid[x])) == 211 && double(recoE[x]) >= 50)
+        return true;
+    }
+    return false;
+  }
+
+  // cuts.recoProton: number of tracks identified as protons above 50 MeV
+  template <class I, class E, class S>
+  int protonCount(const RVec<I>& pid, const RVec<E>& recoE, const RVec<S>& size, double threshold) {
+    int count = 0;
+    for (size_t x = 0; x < pid.size(); ++x) {
+      if (pid[x] == 2212 && (threshold == 0 || size[x] >= threshold) && double(recoE[x]) > 50)
+        ++count;
+    }
+    return count;
+  }
+
+  // cuts.recoPhotonListFiducial: indices of the showers identified as photons that start inside the photon fiducial volume
+  template <class C, class I, class E, class X>
+  RVec<int> photonShowers(const RVec<C>& classified, const RVec<I>& pid, const RVec<E>& recoE,
+                          const RVec<X>& startX, const RVec<X>& startY, const RVec<X>& startZ,
+                          double threshold, const Fiducial& box, double photonWidth) {
+    RVec<int> ids;
+    for (size_t x = 0; x < pid.size(); ++x) {
+      bool selected = threshold == 0 ? classified[x] == 1 : double(recoE[x]) > threshold;
+      if (selected && pid[x] == 22 && insideFiducial(startX[x], startY[x], startZ[x], box, photonWidth))
+        ids.push_back(x);
+    }
+    return ids;
+  }
+
+  // cuts.recoPhotonListTracks: the same for tracks identified as photons
+  template <class C, class S, class I, class X>
+  RVec<int> photonTracks(const RVec<C>& classified, const RVec<S>& size, const RVec<I>& pid,
+                         const RVec<X>& startX, const RVec<X>& startY, const RVec<X>& startZ,
+                         double threshold, const Fiducial& box, double photonWidth) {
+    RVec<int> ids;
+    for (size_t x = 0; x < pid.size(); ++x) {
+      if (objectSelected(classified, size, x, threshold) && pid[x] == 22 && insideFiducial(startX[x], startY[x], startZ[x], box, photonWidth))
+        ids.push_back(x);
+    }
+    return ids;
+  }
+
+  // cuts.scaleRecoEnergy: energy of the leading photon candidate in GeV (0 when there is none)
+  template <class E, class F>
+  double leadingPhotonEnergy(const RVec<E>& showerRecoE, const RVec<int>& showerIDs, const RVec<F>& trackRecoE, const RVec<int>& trackIDs) {
+    bool found = false;
+    double leading = 0;
+    for (int x : showerIDs) {
+      double energy = double(showerRecoE[x])/1000;
+      if (!found || energy > leading)
+        leading = energy;
+      found = true;
+    }
+    for (int x : trackIDs) {
+      double energy = double(trackRecoE[x])/1000;
+      if (!found || energy > leading)
+        leading = energy;
+      found = true;
+    }
+    return leading;
+  }
+
+  // Kinetic energy (GeV) of a true primary particle, as cuts.py works it out from E and p: trueCutMuons/trueCutElectrons
+  // take the absolute value of E^2 - p^2, trueCutPionProton does not (a negative one gives NaN, which passes no threshold)
+  template <class E>
+  inline double kineticEnergy(const RVec<E>& energy, const RVec<E>& px, const RVec<E>& py, const RVec<E>& pz, size_t x, bool absolute) {
+    double e = energy[x];
+    double mass2 = e*e - (double(px[x])*px[x] + double(py[x])*py[x] + double(pz[x])*pz[x]);
+    return e - std::sqrt(absolute ? std::abs(mass2) : mass2);
+  }
+
+  // cuts.trueCutMuons / cuts.trueCutElectrons: is there a true primary with this PDG code of at least minKE (GeV)?
+  template <class I, class E>
+  bool truePrimaryFound(const RVec<I>& pdg, const RVec<E>& energy, const RVec<E>& px, const RVec<E>& py, const RVec<E>& pz,
+                        int wantedPDG, double minKE) {
+    for (size_t x = 0; x < pdg.size(); ++x) {
+      if (pdg[x] == wantedPDG && kineticEnergy(energy, px, py, pz, x, true) >= minKE)
+        return true;
+    }
+    return false;
+  }
+
+  // cuts.trueCutPionProton: charged pions above 50 MeV and protons above 100 MeV, as {pions, protons}
+  template <class I, class E>
+  RVec<int> truePionProtonCounts(const RVec<I>& pdg, const RVec<E>& energy, const RVec<E>& px, const RVec<E>& py, const RVec<E>& pz) {
+    RVec<int> counts = {0, 0};
+    for (size_t x = 0; x < pdg.size(); ++x) {
+      if (std::abs(int(pdg[x])) == 211 && kineticEnergy(energy, px, py, pz, x, false) > 0.05)
+        ++counts[0];
+      else if (pdg[x] == 2212 && kineticEnergy(energy, px, py, pz, x, false) > 0.1)
+        ++counts[1];
+    }
+    return counts;
+  }
+
+  // cuts.truePhotonList: number of true photons from a primary (or starting at the vertex) that deposit inside the photon
+  // fiducial volume and more than threshold MeV on at least minPlanes wire planes
+  template <class I, class T, class X, class D, class P>
+  int truePhotonCount(const RVec<I>& pdg, const RVec<T>& tid, const RVec<T>& mid,
+                      const RVec<X>& startX, const RVec<X>& startY, const RVec<X>& startZ,
+                      double vtxX, double vtxY, double vtxZ,
+                      const RVec<D>& edepX, const RVec<D>& edepY, const RVec<D>& edepZ,
+                      const RVec<P>& pixelU, const RVec<P>& pixelV, const RVec<P>& pixelY,
+                      const Fiducial& box, double photonWidth, double threshold = 5.0, int minPlanes = 2) {
+    std::set<long> primaryTIDs;
+    for (size_t x = 0; x < tid.size(); ++x) {
+      if (tid[x] == mid[x])
+        primaryTIDs.insert(tid[x]);
+    }
+    int count = 0;
+    for (size_t x = 0; x < pdg.size(); ++x) {
+      if (pdg[x] != 22)
+        continue;
+      bool fromVertex = primaryTIDs.count(mid[x]) > 0 || (std::abs(startX[x] - vtxX) <= 0.15
+        && std::abs(startY[x] - vtxY) <= 0.15 && std::abs(startZ[x] - vtxZ) <= 0.15);
+      if (!fromVertex || !insideFiducial(edepX[x], edepY[x], edepZ[x], box, photonWidth))
+        continue;
+      int planes = (pixelU[x]*0.0126 > threshold) + (pixelV[x]*0.0126 > threshold) + (pixelY[x]*0.0126 > threshold);
+      if (planes >= minPlanes)
+        ++count;
+    }
+    return count;
+  }
+
+}
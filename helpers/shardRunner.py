@@ -0,0 +1,156 @@
+#Entry-range sharding of the per-entry event loops over a pool of forked worker processes
+#A script keeps its loop as it is and only changes where the entry numbers come from:
+#  shards = ShardRunner(args.workers, globals(), counters=["passTruth", ...], lists=["cosmicEvents"], reopen=openInputs)
+#  for i in shards.entries(eventTree.GetEntries()):    (or shards.entries(n, [cutMaskWriter]) with per-entry records)
+#    eventTree.GetEntry(i)
+#    ... selection and fills unchanged ...
+#With more than one worker, entries() forks one process per contiguous entry range. Each worker calls reopen() so it reads
+#through its own TFile, runs the loop body over its range and hands back what the body did: the Fill calls of every
+#histogram (TH1, Histogram1D, CategoryHistogram) among the script's globals, the change of each named counter, the items
+#appended to each named list and the shard of each accumulator given to entries(). Filling any other histogram in a worker
+#(one held only in a dict, a list or an object) is an error, since the parent would never see those fills. The parent
+#applies these in entry order: the fills are replayed into its own histograms one by one, so bin contents come out
+#bit-identical to a serial run (adding up partial histograms would round differently)
+#With one worker entries() is plain range(), so a serial run is unchanged
+#The loop body must run to the end of the range: a worker that leaves its loop early (an exception in the body, or a
+#break) fails the whole run; run with one worker to see the traceback
+#With a helpers.checkpoint.Checkpoint the runner saves the loop state as it goes, and a resumed run starts each loop where
+#the checkpoint left it
+import os, sys, pickle
+import ROOT as rt
+
+from helpers.histograms import Histogram1D, CategoryHistogram
+
+
+def entryRanges(nEntries, nShards):
+  #Contiguous [start, stop) ranges covering nEntries, as equal as possible, none empty
+  nShards = max(1, min(nShards, nEntries))
+  bounds = [nEntries*k//nShards for k in range(nShards + 1)]
+  return [(bounds[k], bounds[k+1]) for k in range(nShards) if bounds[k+1] > bounds[k]]
+
+
+def isHistogram(value):
+  rootHist = getattr(rt, "TH1", None)
+  return isinstance(value, (Histogram1D, CategoryHistogram)) or (rootHist is not None and isinstance(value, rootHist))
+
+
+class ShardRunner:
+  #workers: number of processes (1 or less runs serially)
+  #namespace: the script's globals(), where its histograms, counters and lists live
+  #counters: names of int counters the loops increment; lists: names of lists the loops append to
+  #reopen: called first thing in each worker, to open the input files again and rebuild the trees in namespace
+  #checkpoint: helpers.checkpoint.Checkpoint, or None for no checkpoints
+
+  def __init__(self, workers, namespace, counters=(), lists=(), reopen=None, checkpoint=None):
+    self.workers = workers
+    self.namespace = namespace
+    self.counters = list(counters)
+    self.lists = list(lists)
+    self.reopen = reopen
+    self.checkpoint = checkpoint
+    self.loops = 0
+
+  def entries(self, nEntries, accumulators=()):
+    #accumulators: objects filled per entry of this loop, with shardState(start, stop) -> picklable state and
+    #mergeShard(start, stop, state) (e.g. helpers.cutMaskStore.CutMaskWriter); None entries are skipped
+    accumulators = [accumulator for accumulator in accumulators if accumulator is not None]
+    loop = self.loops
+    self.loops += 1
+    first = 0 if self.checkpoint is None else self.checkpoint.startLoop(self, loop, nEntries)
+    if self.workers <= 1 or nEntries - first <= 1:
+      for i in range(first, nEntries):
+        yield i
+        #Reached once the loop body of entry i has finished
+        if self.checkpoint is not None:
+          self.checkpoint.entryDone(self, loop, i)
+      if self.checkpoint is not None:
+        self.checkpoint.loopDone(self, loop)
+      return
+
+    histograms = [value for value in self.namespace.values() if isHistogram(value)]
+    counterStart = dict((name, self.namespace[name]) for name in self.counters)
+    listStart = dict((name, len(self.namespace[name])) for name in self.lists)
+    ranges = [(first + start, first + stop) for start, stop in entryRanges(nEntries - first, self.workers)]
+    #Anything still buffered would otherwise be written once by the parent and again by every worker
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    workers = []
+    for start, stop in ranges:
+      readEnd, writeEnd = os.pipe()
+      pid = os.fork()
+      if pid == 0:
+        os.close(readEnd)
+        if self.reopen is not None:
+          self.reopen()
+        journal = self.recordFills(histograms)
+        #Single fills a CategoryHistogram held before the fork stay with the parent; a worker flushing them would record
+        #them again (flushing in the parent instead would change when they are added up, and so the rounding)
+        for hist in histograms:
+          if isinstance(hist, CategoryHistogram):
+            hist._pending = ([], [], [])
+        try:
+          for i in range(start, stop):
+            yield i
+        except GeneratorExit:
+          #The loop body raised or broke out of the loop; in either case the rest of the script must not run here
+          print("[shardRunner] worker for entries [%d, %d) left its loop at entry %d" % (start, stop, i), file=sys.stderr)
+          sys.stderr.flush()
+          os._exit(1)
+        else:
+          state = {"fills": journal,
+                   "counters": dict((name, self.namespace[name] - counterStart[name]) for name in self.counters),
+                   "lists": dict((name, self.namespace[name][listStart[name]:]) for name in self.lists),
+                   "accumulators": [accumulator.shardState(start, stop) for accumulator in accumulators]}
+          with os.fdopen(writeEnd, "wb") as pipe:
+            pickle.dump(state, pipe, pickle.HIGHEST_PROTOCOL)
+          sys.stdout.flush()
+          os._exit(0)
+      os.close(writeEnd)
+      workers.append((pid, readEnd, start, stop))
+
+    print("[shardRunner] %d entries over %d workers" % (nEntries - first, len(workers)))
+    #Results are taken in entry order, so the merge does not depend on which worker finishes first
+    states = []
+    for pid, readEnd, start, stop in workers:
+      with os.fdopen(readEnd, "rb") as pipe:
+        data = pipe.read()
+      os.waitpid(pid, 0)
+      if len(data) == 0:
+        raise RuntimeError("worker for entries [%d, %d) failed (run with one worker to see why)" % (start, stop))
+      states.append((start, stop, pickle.loads(data)))
+    for start, stop, state in states:
+      self.merge(histograms, accumulators, start, stop, state)
+    if self.checkpoint is not None:
+      self.checkpoint.loopDone(self, loop)
+
+  def recordFills(self, histograms):
+    #In a worker: every Fill (and array fill) of a registered histogram is appended to the journal instead of filling it
+    #(the patch is on the classes of the worker's own copy of the interpreter, so the parent never sees it)
+    #Any other histogram filled in a worker raises: its fills would stay in the worker and be lost without a word
+    journal = []
+    index = dict((id(hist), k) for k, hist in enumerate(histograms))
+    histClasses = set(type(hist) for hist in histograms) | set([Histogram1D, CategoryHistogram])
+    histClasses |= set(getattr(rt, name) for name in ("TH1F", "TH1D") if hasattr(rt, name))
+    for histClass in histClasses:
+      for method in ("Fill", "fill"):
+        if not hasattr(histClass, method):
+          continue
+        def recordingFill(hist, *args, method=method):
+          if id(hist) not in index:
+            name = hist.GetName() if hasattr(hist, "GetName") else type(hist).__name__
+            raise RuntimeError("histogram %s is filled inside a sharded loop but is not a global of the script, so its "
+                               "fills would be lost (make it a top-level global, or run with one worker)" % name)
+          journal.append((index[id(hist)], method, args))
+        setattr(histClass, method, recordingFill)
+    return journal
+
+  def merge(self, histograms, accumulators, start, stop, state):
+    for k, method, args in state["fills"]:
+      getattr(histograms[k], method)(*args)
+    for name, change in state["counters"].items():
+      self.namespace[name] += change
+    for name, items in state["lists"].items():
+      self.namespace[name].extend(items)
+    for accumulator, accumulatorState in zip(accumulators, state["accumulators"]):
+      accumulator.mergeShard(start, stop, accumulatorState)
@@ -0,0 +1,119 @@
+#Truth-particle lookup tables
+#The trueSimPart lists are not ordered by TID, and both reco-to-truth matching (trackTrueTID, showerTrueTID) and mother
+#links (trueSimPartMID) refer to particles by TID, so a lookup used to mean scanning the whole list for every object
+#EventTruth indexes one entry's TIDs in a dict for the per-entry cuts.py functions; TruthTable sorts the TIDs of a whole
+#EventColumns batch once and answers the same queries for every object of the batch with one searchsorted join
+#If a TID appears more than once in an entry, the last row carrying it is the match, as it was for the scanning loops
+import numpy as np
+
+
+class EventTruth:
+  #TID index of the current entry of a PyROOT tree (or ColumnTree); rows are positions in the trueSimPart branches
+
+  def __init__(self, ntuple):
+    self.tids = list(ntuple.trueSimPartTID)
+    self.mids = list(ntuple.trueSimPartMID)
+    self.rowOfTID = dict((tid, row) for row, tid in enumerate(self.tids))
+    self.primaryTIDs = set(tid for tid, mid in zip(self.tids, self.mids) if tid == mid)
+
+  def __len__(self):
+    return len(self.tids)
+
+  def hasTID(self, tid):
+    return tid in self.rowOfTID
+
+  def row(self, tid):
+    #trueSimPart row with this TID, -1 if there is none
+    return self.rowOfTID.get(tid, -1)
+
+  def rows(self, tids):
+    #Matched row for each TID of a list (e.g. ntuple.trackTrueTID), -1 where unmatched
+    return np.array([self.rowOfTID.get(tid, -1) for tid in tids], dtype=np.int64)
+
+  def isPrimary(self, row):
+    return self.tids[row] == self.mids[row]
+
+  def motherRow(self, row):
+    return self.rowOfTID.get(self.mids[row], -1)
+
+  def hasMother(self, row):
+    return self.mids[row] in self.rowOfTID
+
+  def motherIsPrimary(self, row):
+    #True when the particle's mother is a primary (TID == MID) particle of the event
+    return self.mids[row] in self.primaryTIDs
+
+
+def _keys(entries, tids):
+  #One sortable int64 per (entry, TID) pair; TIDs are 32-bit, so the entry number goes in the high word
+  return (np.asarray(entries, dtype=np.int64) << 32) | (np.asarray(tids).astype(np.int64) & 0xffffffff)
+
+
+def _lastMatch(sortedKeys, keys):
+  #Position in sortedKeys of the last element equal to each key, -1 where the key is absent
+  position = np.searchsorted(sortedKeys, keys, side="right") - 1
+  found = position >= 0
+  found[found] = sortedKeys[position[found]] == keys[found]
+  return np.where(found, position, -1)
+
+
+class TruthTable:
+  #TID index of every entry of an EventColumns batch
+  #Rows are global positions in the content of the trueSimPart JaggedArrays; localRow turns them into ntuple.branch[x] indices
+
+  def __init__(self, tid, mid):
+    self.tid = tid
+    self.mid = mid
+    keys = _keys(tid.parents, tid.content)
+    #A stable sort keeps repeated TIDs in row order, so _lastMatch picks the last of them
+    self.order = np.argsort(keys, kind="stable")
+    self.sortedKeys = keys[self.order]
+    self.primaryKeys = np.sort(keys[tid.content == mid.content])
+
+  @classmethod
+  def fromBatch(cls, batch):
+    return cls(batch["trueSimPartTID"], batch["trueSimPartMID"])
+
+  def __len__(self):
+    return len(self.tid)
+
+  def rowOf(self, entries, tids):
+    #Global trueSimPart row of each (entry, TID) pair, -1 where the entry has no particle with that TID
+    position = _lastMatch(self.sortedKeys, _keys(entries, tids))
+    return np.where(position >= 0, self.order[np.maximum(position, 0)], -1)
+
+  def contains(self, entries, tids):
+    return _lastMatch(self.sortedKeys, _keys(entries, tids)) >= 0
+
+  def matchObjects(self, objectTIDs):
+    #JaggedArray of matched global rows for a per-object TID branch (batch["trackTrueTID"], batch["showerTrueTID"])
+    return objectTIDs.withContent(self.rowOf(objectTIDs.parents, objectTIDs.content))
+
+  def localRow(self, rows):
+    #Position of each global row within its own entry, -1 stays -1
+    rows = np.asarray(rows)
+    return np.where(rows >= 0, rows - self.tid.offsets[self.tid.parents[np.maximum(rows, 0)]], -1)
+
+  def gather(self, column, rows, fill=0):
+    #Values of a trueSimPart branch (JaggedArray or its content) at global rows, fill where the row is -1
+    content = np.asarray(getattr(column, "content", column))
+    rows = np.asarray(rows)
+    if len(content) == 0:
+      return np.full(len(rows), fill, dtype=np.result_type(content.dtype, type(fill)))
+    return np.where(rows >= 0, content[np.maximum(rows, 0)], fill)
+
+  def isPrimary(self):
+    #Per-particle JaggedArray mask of primaries (TID == MID)
+    return self.tid.withContent(self.tid.content == self.mid.content)
+
+  def motherRows(self):
+    #Per-particle JaggedArray of the mother's global row, -1 when the mother is not in the list
+    return self.tid.withContent(self.rowOf(self.tid.parents, self.mid.content))
+
+  def hasMother(self):
+    return self.tid.withContent(self.contains(self.tid.parents, self.mid.content))
+
+  def motherIsPrimary(self):
+    #Per-particle JaggedArray mask: the mother is a primary particle of the same entry
+    found = _lastMatch(self.primaryKeys, _keys(self.tid.parents, self.mid.content)) >= 0
+    return self.tid.withContent(found)
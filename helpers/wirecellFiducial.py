@@ -0,0 +1,58 @@
+#ctypes bindings of the Wire-Cell space-charge fiducial volume (wirecell_fiducial_volume.cxx, built into
+#lib_wirecell_fiducial_volume.so by compile_wirecell_fiducial_volume.sh)
+#Kept apart from larflowreco_ana_funcs, which re-exports them, so the fiducial tests load without larlite/larcv
+import ctypes
+import os
+import numpy as np
+
+class WCFiducial(ctypes.Structure):
+  pass
+libpath = os.path.dirname(os.path.realpath(__file__))
+libwc = ctypes.cdll.LoadLibrary("%s/lib_wirecell_fiducial_volume.so"%libpath)
+libwc.WCFiducial_new.argtypes = ()
+libwc.WCFiducial_new.restype = ctypes.POINTER(WCFiducial)
+libwc.WCFiducial_insideFV.argtypes = ctypes.POINTER(WCFiducial), ctypes.c_double, ctypes.c_double, ctypes.c_double
+libwc.WCFiducial_insideFV.restype = ctypes.c_bool
+libwc.WCFiducialCustom_new.argtypes = (ctypes.c_double,)
+libwc.WCFiducialCustom_new.restype = ctypes.POINTER(WCFiducial)
+_doublePtr = ctypes.POINTER(ctypes.c_double)
+libwc.WCFiducial_insideFV_batch.argtypes = ctypes.POINTER(WCFiducial), _doublePtr, _doublePtr, _doublePtr, ctypes.c_long, ctypes.POINTER(ctypes.c_ubyte)
+libwc.WCFiducial_insideFV_batch.restype = None
+libwc.WCFiducial_getBoundary.argtypes = ctypes.POINTER(WCFiducial), ctypes.c_int, _doublePtr, _doublePtr, ctypes.c_int
+libwc.WCFiducial_getBoundary.restype = ctypes.c_int
+WCFiducialClass = libwc.WCFiducial_new()
+
+#One WCFiducial per boundary distance, built on first use (the default instance uses 3 cm)
+_wcFiducialByBoundary = {3.0: WCFiducialClass}
+def getWCFiducial(boundary=3.0):
+  boundary = float(boundary)
+  if boundary not in _wcFiducialByBoundary:
+    _wcFiducialByBoundary[boundary] = libwc.WCFiducialCustom_new(boundary)
+  return _wcFiducialByBoundary[boundary]
+
+def isFiducialWCSCE(p):
+  return libwc.WCFiducial_insideFV(WCFiducialClass, p.X(), p.Y(), p.Z())
+
+def getWCBoundary(boundary=3.0, plane=0, maxn=64):
+  #Boundary polygon used by WCFiducial for one projection: plane 0 is x-y, plane 1 is x-z. Returns (u, v) vertex arrays
+  #The library copies at most maxn vertices but returns the full count, so a longer polygon is fetched again in full
+  while True:
+    u = np.zeros(maxn, dtype=np.float64)
+    v = np.zeros(maxn, dtype=np.float64)
+    n = libwc.WCFiducial_getBoundary(getWCFiducial(boundary), plane, u.ctypes.data_as(_doublePtr), v.ctypes.data_as(_doublePtr), maxn)
+    if n <= maxn:
+      return u[:n], v[:n]
+    maxn = n
+
+def isFiducialWCSCEArray(x, y, z, boundary=3.0):
+  #Space-charge-aware fiducial test for whole arrays of points in a single native call; returns a boolean array
+  #float64 contiguous inputs are passed to the library without copying
+  x = np.ascontiguousarray(x, dtype=np.float64)
+  y = np.ascontiguousarray(y, dtype=np.float64)
+  z = np.ascontiguousarray(z, dtype=np.float64)
+  if not (x.shape == y.shape == z.shape):
+    raise ValueError("x, y and z must have the same shape")
+  out = np.zeros(x.shape, dtype=np.uint8)
+  libwc.WCFiducial_insideFV_batch(getWCFiducial(boundary), x.ctypes.data_as(_doublePtr), y.ctypes.data_as(_doublePtr),
+                                  z.ctypes.data_as(_doublePtr), x.size, out.ctypes.data_as(ctypes.POINTER(ctypes.c_ubyte)))
+  return out.view(np.bool_)
@@ -0,0 +1,118 @@
+#Rasterized lookup grid for the Wire-Cell space-charge fiducial volume (helpers/wirecell_fiducial_volume.cxx)
+#WCFiducial accepts a point when it is inside both its x-y and its x-z boundary polygon, so the grid is two 2D occupancy maps.
+#Each cell is marked outside (0), inside (1) or straddling the polygon edge (2). Queries are array lookups; only points
+#that land in a straddling cell go through the exact polygon test (isFiducialWCSCEArray), so results are identical to WCFiducial.
+#Grids are built once per (boundary_dis_cut, resolution) and kept on disk in the column cache directory.
+import os, hashlib
+import numpy as np
+
+from helpers.wirecellFiducial import getWCBoundary, isFiducialWCSCEArray
+from helpers.columnCache import defaultCacheDir
+
+OUTSIDE, INSIDE, STRADDLE = 0, 1, 2
+
+
+def pnpoly(vertu, vertv, u, v):
+  #Same crossing-number test as WCFiducial::pnpoly, for arrays of points
+  inside = np.zeros(np.shape(u), dtype=bool)
+  j = len(vertu) - 1
+  with np.errstate(divide="ignore", invalid="ignore"):
+    for i in range(len(vertu)):
+      crosses = ((vertv[i] > v) != (vertv[j] > v)) & (u < (vertu[j]-vertu[i]) * (v-vertv[i]) / (vertv[j]-vertv[i]) + vertu[i])
+      inside ^= crosses
+      j = i
+  return inside
+
+
+def rasterizePolygon(vertu, vertv, resolution):
+  #Returns (origin, codes): codes[iu, iv] describes the cell [u0+iu*res, u0+(iu+1)*res) x [v0+iv*res, v0+(iv+1)*res)
+  u0 = np.floor(vertu.min()/resolution)*resolution - resolution
+  v0 = np.floor(vertv.min()/resolution)*resolution - resolution
+  nu = int(np.ceil((vertu.max() - u0)/resolution)) + 2
+  nv = int(np.ceil((vertv.max() - v0)/resolution)) + 2
+  codes = np.zeros((nu, nv), dtype=np.uint8)
+
+  #Mark every cell that a polygon edge touches: the edge's line has the cell's corners on both sides (or on it)
+  straddle = np.zeros((nu, nv), dtype=bool)
+  j = len(vertu) - 1
+  for i in range(len(vertu)):
+    ua, va, ub, vb = vertu[j], vertv[j], vertu[i], vertv[i]
+    iuLo, iuHi = int(np.floor((min(ua, ub) - u0)/resolution)), int(np.floor((max(ua, ub) - u0)/resolution))
+    ivLo, ivHi = int(np.floor((min(va, vb) - v0)/resolution)), int(np.floor((max(va, vb) - v0)/resolution))
+    iu, iv = np.meshgrid(np.arange(iuLo, iuHi+1), np.arange(ivLo, ivHi+1), indexing="ij")
+    sides = []
+    for du in (0, 1):
+      for dv in (0, 1):
+        cornerU = u0 + (iu + du)*resolution
+        cornerV = v0 + (iv + dv)*resolution
+        sides.append((ub - ua)*(cornerV - va) - (vb - va)*(cornerU - ua))
+    sides = np.array(sides)
+    straddle[iu, iv] |= (sides.min(axis=0) <= 0) & (sides.max(axis=0) >= 0)
+    j = i
+
+  #Every other cell lies wholly on one side of the boundary, so its centre decides it
+  iu, iv = np.meshgrid(np.arange(nu), np.arange(nv), indexing="ij")
+  centreInside = pnpoly(vertu, vertv, u0 + (iu + 0.5)*resolution, v0 + (iv + 0.5)*resolution)
+  codes[centreInside] = INSIDE
+  codes[straddle] = STRADDLE
+  return np.array([u0, v0]), codes
+
+
+class WCFiducialGrid:
+
+  def __init__(self, boundary=3.0, resolution=1.0, cacheDir=None):
+    self.boundary = float(boundary)
+    self.resolution = float(resolution)
+    self.polygons = [getWCBoundary(self.boundary, plane) for plane in (0, 1)]
+    self.cacheDir = cacheDir if cacheDir is not None else defaultCacheDir
+    self.load()
+
+  def cachePath(self):
+    #The polygon vertices are part of the name, so a change to the C++ geometry makes a new grid
+    digest = hashlib.sha1(b"".join(u.tobytes() + v.tobytes() for u, v in self.polygons)).hexdigest()[:12]
+    return os.path.join(self.cacheDir, "wcfid_grid_b%g_r%g_%s.npz" % (self.boundary, self.resolution, digest))
+
+  def load(self):
+    path = self.cachePath()
+    if os.path.exists(path):
+      stored = np.load(path)
+      self.origins = [stored["originXY"], stored["originXZ"]]
+      self.codes = [stored["codesXY"], stored["codesXZ"]]
+      return
+    self.origins, self.codes = [], []
+    for vertu, vertv in self.polygons:
+      origin, codes = rasterizePolygon(vertu, vertv, self.resolution)
+      self.origins.append(origin)
+      self.codes.append(codes)
+    try:
+      os.makedirs(self.cacheDir, exist_ok=True)
+      tmpPath = path + ".tmp.npz"
+      np.savez(tmpPath, originXY=self.origins[0], originXZ=self.origins[1], codesXY=self.codes[0], codesXZ=self.codes[1])
+      os.replace(tmpPath, path)
+    except OSError:
+      pass
+
+  def lookup(self, plane, u, v):
+    origin, codes = self.origins[plane], self.codes[plane]
+    iu = np.floor((u - origin[0])/self.resolution).astype(np.int64)
+    iv = np.floor((v - origin[1])/self.resolution).astype(np.int64)
+    onGrid = (iu >= 0) & (iu < codes.shape[0]) & (iv >= 0) & (iv < codes.shape[1])
+    out = np.full(np.shape(u), OUTSIDE, dtype=np.uint8)
+    out[onGrid] = codes[iu[onGrid], iv[onGrid]]
+    return out
+
+  def inside(self, x, y, z):
+    #Boolean array, identical to isFiducialWCSCEArray(x, y, z, boundary)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    codeXY = self.lookup(0, x, y)
+    codeXZ = self.lookup(1, x, z)
+    result = (codeXY == INSIDE) & (codeXZ == INSIDE)
+    exact = ((codeXY == STRADDLE) | (codeXZ == STRADDLE)) & (codeXY != OUTSIDE) & (codeXZ != OUTSIDE)
+    if exact.any():
+      result[exact] = isFiducialWCSCEArray(x[exact], y[exact], z[exact], self.boundary)
+    return result
+
+  def straddleFraction(self):
+    return [float(np.mean(codes == STRADDLE)) for codes in self.codes]
@@ -101,6 +101,25 @@ class WCFiducial {
 
     }
 
+    // copy out the boundary polygon of one projection (plane 0: x-y, plane 1: x-z); returns the number of vertices
+    int boundary(int plane, double* u, double* v, int maxn){
+      std::vector<double>& bu = (plane==0) ? boundary_xy_x : boundary_xz_x;
+      std::vector<double>& bv = (plane==0) ? boundary_xy_y : boundary_xz_z;
+      int n = int(bu.size());
+      for (int i = 0; i < n && i < maxn; i++) {
+        u[i] = bu[i];
+        v[i] = bv[i];
+      }
+      return n;
+    }
+
+    // evaluate n points in one call; out[i] is set to 1 if point i is inside, 0 otherwise
+    void insideFV_batch(const double* x, const double* y, const double* z, long n, unsigned char* out){
+      for (long i = 0; i < n; i++) {
+        out[i] = ( pnpoly(boundary_xy_x, boundary_xy_y, x[i], y[i]) && pnpoly(boundary_xz_x, boundary_xz_z, x[i], z[i]) ) ? 1 : 0;
+      }
+    }
+
 };
 
 
@@ -115,6 +134,15 @@ extern "C" {
   bool WCFiducial_insideFV(WCFiducial* wcfid, double x, double y, double z){
     return wcfid->insideFV(x, y, z);
   }
+  void WCFiducial_insideFV_batch(WCFiducial* wcfid, const double* x, const double* y, const double* z, long n, unsigned char* out){
+    wcfid->insideFV_batch(x, y, z, n, out);
+  }
+  int WCFiducial_getBoundary(WCFiducial* wcfid, int plane, double* u, double* v, int maxn){
+    return wcfid->boundary(plane, u, v, maxn);
+  }
+  void WCFiducial_delete(WCFiducial* wcfid){
+    delete wcfid;
+  }
 
 }
 
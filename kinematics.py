@@ -0,0 +1,120 @@
+#Four-vector kinematics for the 1p2g (Delta+ -> p pi0 -> p gamma gamma) studies
+#A four-vector is an (E, px, py, pz) tuple in MeV. Every function works element-wise, so the same code serves one event
+#(scalars, as the cuts.py functions pass them) and a whole column batch (arrays with one value per candidate or per pair)
+import numpy as np
+
+import batchCuts
+
+protonMass = 938.272089
+
+
+#FOUR-VECTORS
+def fourVectorSum(*vectors):
+  return tuple(sum(components[1:], components[0]) for components in zip(*vectors))
+
+
+def invariantMass(vector):
+  E, px, py, pz = vector
+  return np.sqrt(np.square(E) - (np.square(px) + np.square(py) + np.square(pz)))
+
+
+def momentum(vector):
+  E, px, py, pz = vector
+  return np.sqrt(np.square(px) + np.square(py) + np.square(pz))
+
+
+def recoProtonFourVector(kineticEnergy, dirX, dirY, dirZ, mass=protonMass):
+  #Reco tracks give kinetic energy and a start direction; the momentum follows from the proton mass
+  E = kineticEnergy + mass
+  pNorm = np.sqrt(np.square(E) - np.square(mass))
+  return E, pNorm * dirX, pNorm * dirY, pNorm * dirZ
+
+
+def recoPhotonFourVector(energy, dirX, dirY, dirZ):
+  return energy, energy * dirX, energy * dirY, energy * dirZ
+
+
+def openingAngle(vector1, vector2):
+  #Angle between the momenta in degrees (with the 3.14159 of cuts.trueTwoPhotonOpeningAngle); the raw dot product is used
+  #as the cosine when either momentum is zero
+  p1, p2 = vector1[1:], vector2[1:]
+  norm1 = p1[0]*p1[0] + p1[1]*p1[1] + p1[2]*p1[2]
+  norm2 = p2[0]*p2[0] + p2[1]*p2[1] + p2[2]*p2[2]
+  cosOpen = p1[0]*p2[0] + p1[1]*p2[1] + p1[2]*p2[2]
+  cosNorm = norm1*norm2
+  cosOpen = np.where(cosNorm > 0, cosOpen/np.sqrt(np.where(cosNorm > 0, cosNorm, 1.)), cosOpen)
+  angle = np.arccos(cosOpen)*180.0/3.14159
+  #np.where makes a 0-d array out of scalars; one pair of vectors gives a plain float, as the per-event code expects
+  return float(angle) if np.ndim(angle) == 0 else angle
+
+
+def deltaKinematics(proton, photon1, photon2):
+  #Masses, momenta and the photon opening angle of a proton + two photon system
+  piZero = fourVectorSum(photon1, photon2)
+  delta = fourVectorSum(proton, photon1, photon2)
+  return {"protonMass": invariantMass(proton), "piZeroMass": invariantMass(piZero), "deltaMass": invariantMass(delta),
+          "protonMomentum": momentum(proton), "piZeroMomentum": momentum(piZero), "deltaMomentum": momentum(delta),
+          "openingAngle": openingAngle(photon1, photon2)}
+
+
+#BATCHES
+#Candidates are given as per-event local indices (the i of eventTree.branch[i]); photonPairs turns a per-object photon
+#mask into every pair of candidates of each event, so events with more than two photons contribute all of their pairs
+#The proton index is used as given, so mask out the photons of events without a proton candidate first
+def photonPairs(photonMask):
+  #(event, first, second) local indices of every pair of masked objects, pairs of an event in (0,1), (0,2), (1,2) order
+  counts = photonMask.countTrue()
+  local = batchCuts.selectObjects(photonMask.withContent(photonMask.localIndex), photonMask.content.astype(bool))
+  events, first, second = [], [], []
+  for n in np.unique(counts[counts >= 2]):
+    withN = np.nonzero(counts == n)[0]
+    i, j = np.triu_indices(n, 1)
+    starts = local.offsets[withN]
+    events.append(np.repeat(withN, len(i)))
+    first.append(local.content[(starts[:, None] + i[None, :]).ravel()])
+    second.append(local.content[(starts[:, None] + j[None, :]).ravel()])
+  if len(events) == 0:
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+  events, first, second = np.concatenate(events), np.concatenate(first), np.concatenate(second)
+  order = np.argsort(events, kind="stable")
+  return events[order], first[order], second[order]
+
+
+def globalRows(jagged, events, localIndex):
+  #Positions in jagged.content of object localIndex of each event
+  return jagged.offsets[np.asarray(events)] + np.asarray(localIndex)
+
+
+def trueFourVectors(batch, events, localIndex):
+  rows = globalRows(batch["trueSimPartE"], events, localIndex)
+  return tuple(batchCuts.values(batch, "trueSimPart"+name)[rows] for name in ["E", "Px", "Py", "Pz"])
+
+
+def recoProtonFourVectors(batch, events, localIndex):
+  rows = globalRows(batch["trackRecoE"], events, localIndex)
+  return recoProtonFourVector(*[batchCuts.values(batch, "track"+name)[rows] for name in ["RecoE", "StartDirX", "StartDirY", "StartDirZ"]])
+
+
+def recoPhotonFourVectors(batch, events, localIndex):
+  rows = globalRows(batch["showerRecoE"], events, localIndex)
+  return recoPhotonFourVector(*[batchCuts.values(batch, "shower"+name)[rows] for name in ["RecoE", "StartDirX", "StartDirY", "StartDirZ"]])
+
+
+def trueDeltaKinematics(batch, protonIndex, photonMask):
+  #deltaKinematics for every photon pair of every event, from the trueSimPart branches
+  #protonIndex is the per-event local index of the proton (trueProtonSelection), photonMask a per-trueSimPart mask
+  events, first, second = photonPairs(photonMask)
+  result = deltaKinematics(trueFourVectors(batch, events, np.asarray(protonIndex)[events]),
+                           trueFourVectors(batch, events, first), trueFourVectors(batch, events, second))
+  result.update({"event": events, "photon1": first, "photon2": second})
+  return result
+
+
+def recoDeltaKinematics(batch, protonIndex, photonMask):
+  #deltaKinematics for every photon pair of every event, from a proton track and shower photons
+  #protonIndex is the per-event local track index (recoProtonSelection), photonMask a per-shower mask
+  events, first, second = photonPairs(photonMask)
+  result = deltaKinematics(recoProtonFourVectors(batch, events, np.asarray(protonIndex)[events]),
+                           recoPhotonFourVectors(batch, events, first), recoPhotonFourVectors(batch, events, second))
+  result.update({"event": events, "photon1": first, "photon2": second})
+  return result
@@ -5,8 +5,10 @@ rt.PyConfig.IgnoreCommandLineOptions = True
 rt.gROOT.SetBatch(True)
 
 from cuts import trueCutNC, trueCutFiducials, trueCutCosmic, truePhotonList, trueCutPionProton, histStack, recoNoVertex, recoFiducials, recoPhotonList, recoPionProton, recoNeutralCurrent, scaleRecoEnergy, scaleTrueEnergy, recoCutLowEnergy, recoPion, recoProton, trueCutBottomlessFiducial, recoBottomlessFiducials, trueBottomlessPhotonList
+from fiducial import fiducialSpec, wallDistance, scanPhotonWidths
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from helpers.columnLoader import JaggedArray
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -143,171 +145,65 @@ def countIncrease(photonList, countList):
 
 #Variables for program function
 
+#Every fiducial cut in this study is "distance to the nearest wall > width", so instead of re-running the event loop for
+#each width from 1-50 we record each event's wall distances once and let fiducial.scanPhotonWidths count every width at once
+widths = np.arange(1, 51)
+bottomlessWalls = fiducialSpec(0, bottomless=True)
+#A width of -inf makes the deposit test pass for every photon, leaving just the primary/vertex test of trueBottomlessPhotonList
+allPhotonCandidates = fiducialSpec(-np.inf, bottomless=True)
 
-#We run the entire program once for each fiducial measurement from 1-50. The Login Node is going to love it
-for z in range(1, 51):
-  fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":z}
-  
-  #Defining/resetting the graphing variables
-  signalList = [0, 0, 0]
-  backgroundList = [0, 0, 0]
-  cosmicList = [0, 0, 0]
-
-  #BEGINNING EVENT LOOP FOR DEFAULT PURITY
-  for i in range(eventTree.GetEntries()):
-    eventTree.GetEntry(i)
-
-    #Selecting events with reco
-    #See if the event has a vertex
-    if recoNoVertex(eventTree) == False:
-      continue
-
-    #See if the event is neutral current
-    if recoNeutralCurrent(eventTree) == False:
-      continue
-
-    #Make sure the event is within the fiducial volume
-    if recoBottomlessFiducials(eventTree, fiducialData) == False:
-      continue
-
-    #Cut events with suitably energetic protons or charged pions 
-    if recoPionProton(eventTree) == False:
-      continue
-
-    #See if there are any photons in the event - if so, list them
-    recoList = recoPhotonList(eventTree)
-    if len(recoList) == 0:
-      continue
-  
-    #PURITY - GRAPHING BASED ON TRUTH
-    #Neutral current!
-    if trueCutNC(eventTree) == False:
-      countIncrease(recoList, backgroundList)
-      continue
-
-    #Fiducials!
-    if trueCutBottomlessFiducial(eventTree, fiducialData) == False:
-      countIncrease(recoList, backgroundList)
-      continue
-
-    #pions and protons!
-    if trueCutPionProton(eventTree) == False:
-      countIncrease(recoList, backgroundList)
-      continue
-
-    #Now we make a list of the actual photons!
-    truePhotonIDs = trueBottomlessPhotonList(eventTree, fiducialData)
-
-    #Are there actually any photons?
-    if len(truePhotonIDs) == 0:
-      countIncrease(recoList, backgroundList)
-      continue
-  
-    #Is the number of photons correct?
-    if len(recoList) == len(truePhotonIDs):
-      countIncrease(recoList, signalList)
-    else:
-      countIncrease(recoList, backgroundList)
-
-  #BEGINNING EVENT LOOP FOR COSMICS
-  for i in range(cosmicTree.GetEntries()):
-    cosmicTree.GetEntry(i)
-
-    #COSMICS - SELECTING EVENTS BASED ON RECO
-    #See if the event has a vertex
-    if recoNoVertex(cosmicTree) == False:
-      continue
-
-    #See if the event is neutral current                                                                                                  
-    if recoNeutralCurrent(cosmicTree) == False:
-      continue
-
-    #Make sure the event is within the fiducial volume
-    if recoBottomlessFiducials(cosmicTree, fiducialData) == False:
-      continue
-
-    #Cut events with suitably energetic protons or charged pions
-    if recoPionProton(cosmicTree) == False:
-      continue
-
-    #See if there are any photons in the event - if so, list them
-    recoList = recoPhotonList(cosmicTree)
-    if len(recoList) == 0:
-      continue
-
-    #graphing based on photon count
-    #Calculating graphing values
-    countIncrease(recoList, cosmicList)
-
-  #Fill histograms for purity
-  for n in range(3):
-    signalHistList[n].SetBinContent(z, signalList[n])
-    backgroundHistList[n].SetBinContent(z, backgroundList[n])
-    cosmicHistList[n].SetBinContent(z, cosmicList[n])
-
-  #BEGINNING EVENT LOOP FOR EFFICIENCY
-  #Reset variables 
-  signalList = [0, 0, 0]
-  backgroundList = [0, 0, 0]
-
-  for i in range(eventTree.GetEntries()):
-    eventTree.GetEntry(i)
-
-    #Selecting events using truth
-    if trueCutNC(eventTree) == False:
-      continue
-
-    if trueCutBottomlessFiducial(eventTree, fiducialData) == False:
-      continue
-    
-    if trueCutCosmic(eventTree) == False:
-      continue
-    
-    if trueCutPionProton(eventTree) == False:
-      continue
-  
-    truePhotonIDs = trueBottomlessPhotonList(eventTree, fiducialData)
-
-    if len(truePhotonIDs) == 0:
-      continue
-
-  
-    #EFFICIENCY - GRAPHING BASED ON RECO
-
-    if recoNoVertex(eventTree) == False:
-      countIncrease(truePhotonIDs, backgroundList)
-      continue
-
-    #See if the event is neutral current                                                                                                  
-    if recoNeutralCurrent(eventTree) == False:
-      countIncrease(truePhotonIDs, backgroundList)
-      continue
-
-    #Cut events with vertexes outside the fiducial
-    if recoBottomlessFiducials(eventTree, fiducialData) == False:
-      countIncrease(truePhotonIDs, backgroundList)
-      continue
-
-    #Cut events with suitably energetic protons or charged pions
-    if recoProton(eventTree) == False:
-      countIncrease(truePhotonIDs, backgroundList)
-      continue
-
-    if recoPion(eventTree) == False:
-      countIncrease(truePhotonIDs, backgroundList)
-      continue
-
-    #See if there are any photons in the event - if so, list them
-    recoList = recoPhotonList(eventTree)
-    if len(recoList) == len(truePhotonIDs):
-      countIncrease(truePhotonIDs, signalList)
-    else:
-      countIncrease(truePhotonIDs, backgroundList)
-
-  #Fill Efficiency Histograms
+events = {"recoDistance": [], "trueDistance": [], "photonDistances": [], "nReco": [], "recoPass": [], "truePass": [], "effTruePass": [], "effRecoPass": []}
+
+#SINGLE EVENT LOOP FOR PURITY AND EFFICIENCY
+for i in range(eventTree.GetEntries()):
+  eventTree.GetEntry(i)
+
+  hasVertex = recoNoVertex(eventTree) != False
+  if hasVertex:
+    events["recoDistance"].append(wallDistance(eventTree.vtxX, eventTree.vtxY, eventTree.vtxZ, bottomlessWalls, bottomless=True))
+  else:
+    events["recoDistance"].append(-np.inf)
+  events["trueDistance"].append(wallDistance(eventTree.trueVtxX, eventTree.trueVtxY, eventTree.trueVtxZ, bottomlessWalls, bottomless=True))
+
+  photonCandidates = trueBottomlessPhotonList(eventTree, allPhotonCandidates)
+  events["photonDistances"].append([wallDistance(eventTree.trueSimPartEDepX[x], eventTree.trueSimPartEDepY[x], eventTree.trueSimPartEDepZ[x], bottomlessWalls, bottomless=True) for x in photonCandidates])
+
+  recoNC = hasVertex and recoNeutralCurrent(eventTree) != False
+  recoList = recoPhotonList(eventTree)
+  events["nReco"].append(len(recoList))
+
+  #Width-independent parts of the purity selection (reco) and signal definition (truth)
+  events["recoPass"].append(recoNC and recoPionProton(eventTree) != False)
+  events["truePass"].append(trueCutNC(eventTree) != False and trueCutPionProton(eventTree) != False)
+
+  #Width-independent parts of the efficiency selection (truth) and signal definition (reco)
+  events["effTruePass"].append(events["truePass"][-1] and trueCutCosmic(eventTree) != False)
+  events["effRecoPass"].append(recoNC and recoProton(eventTree) != False and recoPion(eventTree) != False)
+
+#COSMIC EVENT LOOP
+cosmics = {"recoDistance": [], "nReco": [], "recoPass": []}
+for i in range(cosmicTree.GetEntries()):
+  cosmicTree.GetEntry(i)
+
+  hasVertex = recoNoVertex(cosmicTree) != False
+  if hasVertex:
+    cosmics["recoDistance"].append(wallDistance(cosmicTree.vtxX, cosmicTree.vtxY, cosmicTree.vtxZ, bottomlessWalls, bottomless=True))
+  else:
+    cosmics["recoDistance"].append(-np.inf)
+  cosmics["nReco"].append(len(recoPhotonList(cosmicTree)))
+  cosmics["recoPass"].append(hasVertex and recoNeutralCurrent(cosmicTree) != False and recoPionProton(cosmicTree) != False)
+
+events["photonDistances"] = JaggedArray.fromLists(events["photonDistances"], dtype=np.float64)
+scan = scanPhotonWidths(widths, events, cosmics)
+
+#Fill histograms for purity and efficiency; bin z holds width z
+for z in widths:
   for n in range(3):
-    effSignalHistList[n].SetBinContent(z, signalList[n])
-    effBackgroundHistList[n].SetBinContent(z, backgroundList[n])
+    signalHistList[n].SetBinContent(int(z), scan["signal"][n][z-1])
+    backgroundHistList[n].SetBinContent(int(z), scan["background"][n][z-1])
+    cosmicHistList[n].SetBinContent(int(z), scan["cosmic"][n][z-1])
+    effSignalHistList[n].SetBinContent(int(z), scan["effSignal"][n][z-1])
+    effBackgroundHistList[n].SetBinContent(int(z), scan["effBackground"][n][z-1])
 
 #CALCULATING EFFICIENCY
 for x in range(1, 50):
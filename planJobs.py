@@ -0,0 +1,52 @@
+import sys, os, argparse
+
+from helpers.jobPlanner import planUnits, printPlan, JobManifest, LocalExecutor, SlurmExecutor
+from helpers.potService import defaultExtFileInfo
+
+parser = argparse.ArgumentParser("Split the files of a bookkeeping fileinfo table into balanced work units and run them, restartably")
+parser.add_argument("-d", "--workdir", type=str, required=True, help="work directory: manifest.json, per-unit file lists, logs")
+parser.add_argument("-f", "--fileinfo", type=str, default=defaultExtFileInfo, help="fileinfo table to plan over")
+parser.add_argument("-n", "--units", type=int, default=None, help="number of work units")
+parser.add_argument("-e", "--eventsPerUnit", type=int, default=500000, help="events per work unit (when --units is not given)")
+parser.add_argument("--inputDir", type=str, default=None, help="directory the files of the table are in")
+parser.add_argument("--command", type=str, default=None, help="shell command of one unit, with {unit}, {filelist}, {files} and {workdir} filled in (plans only if not given)")
+parser.add_argument("-j", "--processes", type=int, default=os.cpu_count(), help="units run at the same time by the local executor")
+parser.add_argument("--slurm", action="store_true", help="submit one sbatch job per unit instead of running locally")
+parser.add_argument("--sbatchOptions", type=str, default="", help="extra sbatch options, e.g. \"--time=02:00:00 --mem=4G\"")
+parser.add_argument("--slurmTimeout", type=float, default=72., help="hours after which a submitted unit is submitted again if squeue cannot be run")
+parser.add_argument("--maxUnits", type=int, default=None, help="run at most this many of the remaining units")
+parser.add_argument("--replan", action="store_true", help="throw away the manifest in the work directory and plan again")
+args = parser.parse_args()
+
+manifest = JobManifest(args.workdir)
+if args.replan and manifest.plan is not None:
+  os.remove(manifest.path)
+  manifest = JobManifest(args.workdir)
+
+plan = {"fileinfo": os.path.basename(args.fileinfo), "units": args.units,
+        "eventsPerUnit": None if args.units is not None else args.eventsPerUnit, "inputDir": args.inputDir}
+if manifest.plan is None:
+  units = planUnits(args.fileinfo, plan["units"], plan["eventsPerUnit"])
+  printPlan(units, "planJobs")
+  manifest.create(plan, units)
+else:
+  manifest.create(plan, manifest.units)
+
+#Submitted units whose jobs died are failed again here; those still queued are left alone
+executor = SlurmExecutor(args.sbatchOptions, args.slurmTimeout*3600.) if args.slurm else LocalExecutor(args.processes)
+queued = executor.refresh(manifest) if args.slurm else 0
+pending = manifest.pending(("done", "submitted") if args.slurm else ("done",))
+print("[planJobs] %s: %d units, %s" % (manifest.path, len(manifest.units), ", ".join("%d %s" % (n, state) for state, n in sorted(manifest.counts().items()))))
+if args.command is None or len(pending) == 0:
+  sys.exit(0)
+
+if args.maxUnits is not None:
+  pending = pending[:args.maxUnits]
+failed = executor.run(manifest, pending, args.command)
+#Only the units started by this call; units still queued from an earlier call are reported apart
+print("[planJobs] %d of %d units %s, %d failed" % (len(pending) - failed, len(pending), "submitted" if args.slurm else "done", failed))
+if queued > 0:
+  print("[planJobs] %d units submitted earlier are still in the queue" % queued)
+if failed > 0:
+  print("[planJobs] run the same command again to retry the failed units")
+sys.exit(1 if failed > 0 else 0)
@@ -0,0 +1,66 @@
+import argparse
+import ROOT as rt
+rt.PyConfig.IgnoreCommandLineOptions = True
+rt.gROOT.SetBatch(True)
+
+from cuts import histStack
+from helpers.rdfEngine import RDFSelection, enableThreads, runAll, outcomeCategories, protonSamples
+from helpers.potService import ntuplePOT, cosmicPOT
+
+parser = argparse.ArgumentParser("Single-photon selection and outcome breakdown with RDataFrame, in one multithreaded pass per sample")
+parser.add_argument("-i", "--infile", type=str, required=True, help="input overlay ntuple file")
+parser.add_argument("-c", "--cosmicFile", type=str, default=None, help="input cosmic/EXT ntuple file")
+parser.add_argument("-o", "--outfile", type=str, default="rdfEvaluator_output.root", help="output root file name")
+parser.add_argument("-j", "--threads", type=int, default=0, help="threads for the event loops (0: every core, 1: single-threaded)")
+parser.add_argument("--nBins", type=int, default=60, help="bins of the leading photon energy histograms (0 to 2 GeV)")
+args = parser.parse_args()
+
+fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":15, "photonWidth":3}
+classificationThreshold = 0
+targetPOT = 4.4e+19
+
+#EnableImplicitMT has to come before the data frames are made
+enableThreads(args.threads)
+
+#Book everything first: each sample is then read once, filling all of its histograms and cut-flow counts together
+overlay = RDFSelection(args.infile, fiducialData, classificationThreshold, weight="xsecWeight", truth=True)
+overlay.book("mc", args.nBins)
+selections = [overlay]
+cosmics = None
+if args.cosmicFile is not None:
+  cosmics = RDFSelection(args.cosmicFile, fiducialData, classificationThreshold)
+  cosmics.book("cosmic", args.nBins)
+  selections.append(cosmics)
+runAll(selections)
+
+ntuplePOTsum = ntuplePOT(args.infile)
+print("[rdfEvaluator] overlay POT: %.4g; cut flow per %.3g POT:" % (ntuplePOTsum, targetPOT))
+overlay.printCutFlow("rdfEvaluator", targetPOT/ntuplePOTsum)
+if cosmics is not None:
+  cosmicFile = rt.TFile(args.cosmicFile)
+  cosmicPOTsum = cosmicPOT(cosmicFile.Get("EventTree"), fallbackPOT=1.1e20)
+  print("[rdfEvaluator] cosmic POT: %.4g; cut flow per %.3g POT:" % (cosmicPOTsum, targetPOT))
+  cosmics.printCutFlow("rdfEvaluator", targetPOT/cosmicPOTsum)
+
+#Stacks: signal first, then the other outcomes from the last one sorted out to the first, then cosmics. The cosmic
+#histogram is scaled to the overlay POT, so the target/overlay POT factor of histStack takes it to the target POT
+stackOrder = ["OnePhoton"] + [outcome for outcome, title in reversed(outcomeCategories) if outcome != "OnePhoton"]
+outFile = rt.TFile(args.outfile, "RECREATE")
+keep = []
+for sample, protons, title in protonSamples:
+  hists = [overlay.histogram(sample, outcome) for outcome in stackOrder]
+  if cosmics is not None:
+    cosmicHist = cosmics.histogram(sample)
+    cosmicHist.SetTitle("Cosmic Background")
+    cosmicHist.Scale(ntuplePOTsum/cosmicPOTsum)
+    hists.append(cosmicHist)
+  canvas, stack, legend, histInt = histStack("rdf" + sample, title + " Sample", hists, ntuplePOTsum)
+  stack.GetXaxis().SetTitle("Reconstructed Leading Photon Energy (GeV)")
+  stack.GetYaxis().SetTitle("Events per 4.4e19 POT")
+  keep.append((canvas, stack, legend, hists))
+  outFile.cd()
+  canvas.Write()
+  for hist in hists:
+    hist.Write()
+outFile.Close()
+print("[rdfEvaluator] wrote %s (%d event loop(s) over the overlay)" % (args.outfile, overlay.frame.GetNRuns()))
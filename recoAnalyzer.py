@@ -6,6 +6,7 @@ from helpers.larflowreco_ana_funcs import getCosThetaGravVector
 
 #Import some functions of our own
 from cuts import trueSignalFinder
+from helpers.potService import sumPOT
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -28,9 +29,7 @@ targetPOTstring = "6.67e+20"
 
 #calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 #define histograms to fill
 #we will write histograms to output file for:
@@ -0,0 +1,73 @@
+import argparse
+import ROOT as rt
+rt.PyConfig.IgnoreCommandLineOptions = True
+rt.gROOT.SetBatch(True)
+
+from cuts import histStack, histStackTwoSignal
+from helpers.partialResult import mergePartials
+
+parser = argparse.ArgumentParser("Merge partial results (separateEvaluator.py --partial) and make the scaled, stacked plots once")
+parser.add_argument("partials", type=str, nargs="+", help="partial result files (.npz), one per shard")
+parser.add_argument("-o", "--outfile", type=str, default="reduced_output.root", help="output root file for the stacked canvases")
+parser.add_argument("--histfile", type=str, default=None, help="also write the merged, unscaled histograms here")
+parser.add_argument("--merged", type=str, default=None, help="also save the merged partial result here (to add more shards to later)")
+parser.add_argument("-l", "--eventListDir", type=str, default=".", help="directory the merged event lists are written to, one <name>.txt each")
+parser.add_argument("-t", "--targetPOT", type=float, default=None, help="POT the stacks are scaled to (default: the one the partials were made with)")
+args = parser.parse_args()
+
+merged = mergePartials(args.partials)
+targetPOT = merged.targetPOT if args.targetPOT is None else args.targetPOT
+ntuplePOTsum = merged.totalPOT("ntuple")
+cosmicPOTsum = merged.totalPOT("cosmic")
+print("[reducePartials] merged %d partials (%d inputs): %.4g overlay POT, %.4g cosmic POT from %d cosmic files"
+      % (len(args.partials), len(merged.sources), ntuplePOTsum, cosmicPOTsum, len(merged.pot.get("cosmic", {}))))
+if args.merged is not None:
+  merged.save(args.merged)
+
+if args.histfile is not None:
+  histFile = rt.TFile(args.histfile, "RECREATE")
+  for key in sorted(merged.histograms):
+    merged.histogram(key).Write()
+  histFile.Close()
+
+#The cosmic histograms get the same factor as in a single run, with the overlay POT of all shards and the POT of each
+#distinct cosmic file once: scaled to the overlay POT here, so the target/overlay POT factor of histStackTwoSignal takes them to the target POT
+writeList = []
+stacks = []
+for recipe in merged.stacks:
+  hists = [merged.histogram(key) for key in recipe["keys"]]
+  if recipe["kind"] == "purity":
+    cosmicHist = merged.histogram(recipe["cosmic"])
+    cosmicHist.scale((targetPOT/cosmicPOTsum)*(ntuplePOTsum/targetPOT))
+    beamHist = merged.histogram(recipe["beam"]) if recipe["beam"] in merged.histograms else None
+    canvas, stack, legend, total = histStackTwoSignal(recipe["title"], hists + [cosmicHist], ntuplePOTsum, targetPOT, beamHist)
+  elif recipe["kind"] == "efficiency":
+    canvas, stack, legend, total = histStack(recipe["name"], recipe["title"], hists, ntuplePOTsum)
+  else:
+    raise ValueError("unknown stack kind '%s' in %s" % (recipe["kind"], ", ".join(args.partials)))
+  if recipe["xTitle"] is not None:
+    stack.GetXaxis().SetTitle(recipe["xTitle"])
+  if recipe["yTitle"] is not None:
+    stack.GetYaxis().SetTitle(recipe["yTitle"])
+  print("[reducePartials] %s: %.1f events" % (recipe["name"], total))
+  #Keep the stacks, legends and histograms alive until the canvases are written
+  stacks.append((stack, legend, hists))
+  writeList.append(canvas)
+
+outFile = rt.TFile(args.outfile, "RECREATE")
+for canvas in writeList:
+  canvas.cd()
+  canvas.Update()
+  canvas.Write()
+outFile.Close()
+print("[reducePartials] wrote %d canvases to %s" % (len(writeList), args.outfile))
+
+for name, events in merged.eventLists.items():
+  listPath = "%s/%s.txt" % (args.eventListDir, name)
+  with open(listPath, "w") as listFile:
+    for ids in events:
+      print(" ".join(str(value) for value in ids), file=listFile)
+  print("[reducePartials] wrote %d events to %s" % (len(events), listPath))
+
+for name, value in merged.counters.items():
+  print("[reducePartials] %s: %s" % (name, value))
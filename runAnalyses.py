@@ -0,0 +1,34 @@
+import sys, os, argparse
+import ROOT as rt
+rt.PyConfig.IgnoreCommandLineOptions = True
+rt.gROOT.SetBatch(True)
+
+import analyses
+from helpers.analysisRunner import analysisRegistry, runAnalyses
+
+parser = argparse.ArgumentParser("Run several analyses over one read of a bnb nu overlay ntuple file")
+parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
+parser.add_argument("-a", "--analyses", type=str, nargs="+", default=None, help="analyses to run (default: all registered)")
+parser.add_argument("-d", "--outdir", type=str, default=".", help="directory for the output root files (one per analysis)")
+parser.add_argument("-bs", "--batchSize", type=int, default=100000, help="entries read per batch")
+parser.add_argument("--columnCache", action="store_true", help="memory-map the branches from the column cache instead of reading through ROOT")
+parser.add_argument("-l", "--list", action="store_true", help="list the registered analyses and exit")
+args = parser.parse_args()
+
+if args.list:
+  for name in sorted(analysisRegistry):
+    print(name, "->", analysisRegistry[name].defaultOutfile)
+  sys.exit(0)
+
+names = args.analyses if args.analyses is not None else sorted(analysisRegistry)
+unknown = [name for name in names if name not in analysisRegistry]
+if len(unknown) > 0:
+  sys.exit("unknown analyses: " + ", ".join(unknown) + " (registered: " + ", ".join(sorted(analysisRegistry)) + ")")
+
+os.makedirs(args.outdir, exist_ok=True)
+selected = []
+for name in names:
+  analysisClass = analysisRegistry[name]
+  selected.append(analysisClass(outfile=os.path.join(args.outdir, analysisClass.defaultOutfile)))
+
+runAnalyses(args.infile, selected, batchSize=args.batchSize, useColumnCache=args.columnCache)
@@ -1,131 +1,97 @@
 import os,sys
 from cuts import *
+import batchCuts
+from helpers.cutFlow import CutFlow, Cut, Define
+
+def reco_1g1p_cutflow( classificationThreshold, fiducialData ):
+    # The 1g1p reco selection as an ordered list of named cuts. Each step has the per-entry function (cuts.py)
+    # and the column-batch function (batchCuts.py); v holds the Define results computed so far
+    return CutFlow([
+        #See if the event has a vertex
+        Cut("novertex",
+            lambda t, v: recoNoVertex(t),
+            lambda b, v: batchCuts.recoNoVertex(b)),
+        #See if the event is neutral current
+        Cut("noPrimaryMuon",
+            lambda t, v: recoCutMuons(t, classificationThreshold),
+            lambda b, v: batchCuts.recoCutMuons(b, classificationThreshold)),
+        Cut("noPrimaryElectron",
+            lambda t, v: recoCutElectrons(t, classificationThreshold),
+            lambda b, v: batchCuts.recoCutElectrons(b, classificationThreshold)),
+        #Use Matt's Cosmic Cut
+        Cut("cutCosmicPixels",
+            lambda t, v: trueCutCosmic(t),
+            lambda b, v: batchCuts.trueCutCosmic(b)),
+        #Make sure the event is within the fiducial volume
+        Cut("vertexInFV",
+            lambda t, v: recoFiducials(t, fiducialData),
+            lambda b, v: batchCuts.recoFiducials(b, fiducialData)),
+        #Cut events with suitably energetic charged pions
+        Cut("noChargedPion",
+            lambda t, v: recoPion(t, classificationThreshold),
+            lambda b, v: batchCuts.recoPion(b, classificationThreshold)),
+        #Cut events with far-travelling protons
+        Define("recoProtonCount",
+               lambda t, v: recoProton(t, classificationThreshold),
+               lambda b, v: batchCuts.recoProton(b, classificationThreshold),
+               default=0),
+        Cut("noMoreThan1Proton",
+            lambda t, v: v["recoProtonCount"] <= 1,
+            lambda b, v: v["recoProtonCount"] <= 1),
+        #See if there are any photons in the event - if so, list them
+        Define("recoList",
+               lambda t, v: recoPhotonListFiducial(fiducialData, t, 10.0),
+               lambda b, v: batchCuts.recoPhotonListFiducial(fiducialData, b, 10.0),
+               default=[]),
+        #List all photons classified as tracks
+        Define("recoTrackList",
+               lambda t, v: recoPhotonListTracks(fiducialData, t, classificationThreshold),
+               lambda b, v: batchCuts.recoPhotonListTracks(fiducialData, b, classificationThreshold),
+               default=[]),
+        Cut("only1Photon",
+            lambda t, v: len(v["recoList"]) + len(v["recoTrackList"]) == 1,
+            lambda b, v: v["recoList"].countTrue() + v["recoTrackList"].countTrue() == 1),
+        #Try cutting based on data for Shower from Charged
+        Cut("showerFromCharge",
+            lambda t, v: recoCutShowerFromChargeScore(t, v["recoList"], v["recoTrackList"]),
+            lambda b, v: batchCuts.recoCutShowerFromChargeScore(b, v["recoList"], v["recoTrackList"])),
+        #Cut based on primary score
+        Cut("primaryScore",
+            lambda t, v: recoCutPrimary(t, v["recoList"], v["recoTrackList"]),
+            lambda b, v: batchCuts.recoCutPrimary(b, v["recoList"], v["recoTrackList"])),
+        #Cut based on the presence of tracks over 20 cm
+        Cut("cutLongTracks",
+            lambda t, v: recoCutLongTracks(t, fiducialData),
+            lambda b, v: batchCuts.recoCutLongTracks(b, fiducialData)),
+        #Cut based on the completeness of known Muons
+        Cut("cutMuonCompleteness",
+            lambda t, v: recoCutMuonCompleteness(t),
+            lambda b, v: batchCuts.recoCutMuonCompleteness(b)),
+        Cut("maxVertexIntimePixels",
+            lambda t, v: recoCutMaxInTime(t, v["recoProtonCount"]),
+            lambda b, v: batchCuts.recoCutMaxInTime(b, v["recoProtonCount"])),
+        # Cut based on completeness
+        Cut("cutShowerCompleteness",
+            lambda t, v: recoCutCompleteness(t, v["recoList"], v["recoTrackList"]),
+            lambda b, v: batchCuts.recoCutCompleteness(b, v["recoList"], v["recoTrackList"])),
+    ])
+
+# One cut flow per (threshold, fiducial volume), built on first use; it keeps its own copy of fiducialData so a caller
+# changing its dict afterwards gets a new flow instead of changing this one
+_cutflows = {}
+def get_1g1p_cutflow( classificationThreshold, fiducialData ):
+    key = (classificationThreshold, tuple(sorted(fiducialData.items())))
+    if key not in _cutflows:
+        _cutflows[key] = reco_1g1p_cutflow( classificationThreshold, dict(fiducialData) )
+    return _cutflows[key]
 
 def run_1g1p_reco_selection_cuts( eventTree, classificationThreshold, fiducialData, return_on_fail=True ):
-    passes = True
-    recoList = []
-    recoTrackList = []
-    recoProtonCount = 0
-    cuts_passed = {"novertex":True,
-                   "noPrimaryMuon":True,
-                   "noPrimaryElectron":True,
-                   "cutCosmicPixels":True,
-                   "vertexInFV":True,
-                   "noChargedPion":True,
-                   "noMoreThan1Proton":True,
-                   "only1Photon":True,
-                   "showerFromCharge":True,
-                   "primaryScore":True,
-                   "cutLongTracks":True,
-                   "cutMuonCompleteness":True,
-                   "maxVertexIntimePixels":True,
-                   "cutShowerCompleteness":True,
-                   "AllCuts":True}
-
-    #Selecting events with reco
-    #See if the event has a vertex
-    if recoNoVertex(eventTree) == False:
-        cuts_passed["noVertex"] = False
-        passes = False
-        if return_on_fail:
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    #See if the event is neutral current
-    if recoCutMuons(eventTree, classificationThreshold) == False:
-        cuts_passed["noPrimaryMuon"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    if recoCutElectrons(eventTree, classificationThreshold) == False:
-        cuts_passed["noPrimaryElectron"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    #Use Matt's Cosmic Cut
-    if trueCutCosmic(eventTree) == False:
-        cuts_passed["cutCosmicPixels"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    #Make sure the event is within the fiducial volume
-    if recoFiducials(eventTree, fiducialData) == False:
-        cuts_passed["vertexInFV"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    #Cut events with suitably energetic charged pions 
-    if recoPion(eventTree, classificationThreshold) == False:
-        cuts_passed["noChargedPion"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-        
-    #Cut events with far-travelling protons
-    recoProtonCount = recoProton(eventTree, classificationThreshold)
-    if recoProtonCount > 1:
-        cuts_passed["noMoreThan1Proton"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    #See if there are any photons in the event - if so, list them
-    recoList = recoPhotonListFiducial(fiducialData, eventTree, 10.0)
-
-    #List all photons classified as tracks
-    recoTrackList = recoPhotonListTracks(fiducialData, eventTree, classificationThreshold)
-    #recoTrackList = []
-
-    if len(recoList) + len(recoTrackList) != 1:
-        cuts_passed["only1Photon"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    #Try cutting based on data for Shower from Charged
-    if recoCutShowerFromChargeScore(eventTree, recoList, recoTrackList) == False:
-        cuts_passed["showerFromCharge"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-  
-    #Cut based on primary score
-    if recoCutPrimary(eventTree, recoList, recoTrackList) == False:
-        cuts_passed["primaryScore"] = False
-        passes = False
-        if return_on_fail:
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount
-
-    #Cut based on the presence of tracks over 20 cm
-    if recoCutLongTracks(eventTree, fiducialData) == False:
-        cuts_passed["cutLongTracks"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    #Cut based on the completeness of known Muons
-    if recoCutMuonCompleteness(eventTree) == False:
-        cuts_passed["cutMuonCompleteness"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount        
-
-    if recoCutMaxInTime(eventTree, recoProtonCount) == False:
-        cuts_passed["maxVertexIntimePixels"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount
-
-    # Cut based on completeness
-    if recoCutCompleteness(eventTree, recoList, recoTrackList)==False:
-        cuts_passed["cutShowerCompleteness"] = False
-        passes = False
-        if return_on_fail:        
-            return passes, cuts_passed, recoList, recoTrackList, recoProtonCount
-    
-    cuts_passed["AllCuts"] = passes
-    return passes, cuts_passed, recoList, recoTrackList, recoProtonCount
-
+    cutflow = get_1g1p_cutflow( classificationThreshold, fiducialData )
+    passes, cuts_passed, values = cutflow.runEvent( eventTree, return_on_fail )
+    return passes, cuts_passed, values["recoList"], values["recoTrackList"], values["recoProtonCount"]
+
+def run_1g1p_reco_selection_batch( batch, classificationThreshold, fiducialData, weights=None ):
+    # Runs every cut once over a column batch (helpers/columnLoader.py). The CutFlowResult gives the per-cut masks,
+    # cutsPassed(return_on_fail) for either mode, and the cut-flow / N-1 counts (see helpers/cutFlow.CutFlowTable)
+    # recoList and recoTrackList come back as per-object JaggedArray masks over showers and tracks
+    return get_1g1p_cutflow( classificationThreshold, fiducialData ).runBatch( batch, weights )
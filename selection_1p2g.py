@@ -0,0 +1,77 @@
+import os,sys
+from cuts import *
+
+class SelectionCache:
+    # Truth and reco selections of the current entry. Each selection function runs the first time it is asked for and
+    # later requests reuse the result, so an efficiency pass and a purity pass over the same entry share the work
+    def __init__( self, eventTree, fiducialWidth, truePhotonFunction=truePhotonSelection, recoPhotonFunction=recoPhotonSelection ):
+        self.eventTree = eventTree
+        self.fiducialWidth = fiducialWidth
+        self.truePhotonFunction = truePhotonFunction
+        self.recoPhotonFunction = recoPhotonFunction
+        self.results = {}
+        self.nEvaluated = 0
+        self.nReused = 0
+
+    def get( self, name, function, *args ):
+        if name in self.results:
+            self.nReused += 1
+        else:
+            self.results[name] = function( self.eventTree, *args )
+            self.nEvaluated += 1
+        return self.results[name]
+
+    # truth
+    def trueCC( self ):
+        return self.get( "trueCC", trueCCCut )
+
+    def trueOutsideFiducial( self ):
+        return self.get( "trueOutsideFiducial", trueFiducialCut, self.fiducialWidth )
+
+    def truePiPlus( self ):
+        return self.get( "truePiPlus", truePiPlusCut )
+
+    def trueProtons( self ):
+        # (nTrueProtons, trueProtonTID, trueProtonIndex)
+        return self.get( "trueProtons", trueProtonSelection )
+
+    def truePhotons( self ):
+        # whatever truePhotonFunction returns, starting with (truePhotonTIDList, trueLeadingPhotonEnergy)
+        return self.get( "truePhotons", self.truePhotonFunction, self.fiducialWidth )
+
+    # reco
+    def recoCC( self ):
+        return self.get( "recoCC", recoCCCut )
+
+    def recoOutsideFiducial( self ):
+        return self.get( "recoOutsideFiducial", recoFiducialCut, self.fiducialWidth )
+
+    def recoPiPlus( self ):
+        return self.get( "recoPiPlus", recoPiPlusCut )
+
+    def recoProtons( self ):
+        # (nRecoProtons, recoProtonTID, recoProtonIndex)
+        return self.get( "recoProtons", recoProtonSelection )
+
+    def recoPhotons( self ):
+        # whatever recoPhotonFunction returns, starting with (recoPhotonTIDList, recoLeadingPhotonEnergy)
+        return self.get( "recoPhotons", self.recoPhotonFunction, self.fiducialWidth )
+
+def run_1p2g_fused_loop( eventTree, fiducialWidth, passes, truePhotonFunction=truePhotonSelection, recoPhotonFunction=recoPhotonSelection ):
+    # Reads every entry of eventTree once and hands its SelectionCache to each function in passes (e.g. an efficiency
+    # breakdown and a purity breakdown). Returns how many selection calls were made and how many were served from the cache
+    stats = {"entries":0, "evaluated":0, "reused":0}
+    for i in range(eventTree.GetEntries()):
+        eventTree.GetEntry(i)
+        selections = SelectionCache( eventTree, fiducialWidth, truePhotonFunction, recoPhotonFunction )
+        for fillPass in passes:
+            fillPass( selections )
+        stats["entries"] += 1
+        stats["evaluated"] += selections.nEvaluated
+        stats["reused"] += selections.nReused
+    return stats
+
+def print_fused_loop_stats( stats ):
+    total = stats["evaluated"] + stats["reused"]
+    if total > 0:
+        print("[1p2g] %d entries read once: %d selection calls, %d of %d requests (%.1f percent) reused" % (stats["entries"], stats["evaluated"], stats["reused"], total, 100.*stats["reused"]/total))
@@ -8,8 +8,19 @@ rt.gROOT.SetBatch(True)
 from cuts import trueCutNC, trueCutFiducials,trueCutCosmic, truePhotonList, trueCutPionProton, histStack, recoNoVertex, recoFiducials, recoPhotonList, recoPionProton, recoNeutralCurrent, scaleRecoEnergy, scaleTrueEnergy, recoPion, recoProton, recoCutShowerFromChargeScore, recoCutLongTracks, recoPhotonListFiducial, recoCutPrimary, recoCutShortTracks, recoPhotonListTracks, recoCutFarShowers, trueCutMuons, trueCutElectrons, recoCutMuons, recoCutElectrons, recoCutManyTracks, recoCutCompleteness, recoCutMuonCompleteness, histStackTwoSignal, recoCutMaxInTime, trueTwoPhotonOpeningAngle
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
-from selection_1g1p import run_1g1p_reco_selection_cuts
-from truthdef import truthdef_1gamma_cuts
+from selection_1g1p import run_1g1p_reco_selection_cuts, reco_1g1p_cutflow
+from truthdef import truthdef_1gamma_cuts, truthdef_1gamma_cut_names
+from helpers.branchTracer import traceBranches, activateBranches, printBranchReport, BranchGuard
+from helpers.columnLoader import ColumnTree, listBranches
+from helpers.columnCache import loadCachedColumns
+from helpers.potService import sumPOT, cosmicPOT
+from helpers.eventCache import CachedTree
+from helpers.histograms import CategoryHistogram
+from helpers.cutMaskStore import CutMaskWriter, storePath
+from helpers.shardRunner import ShardRunner
+from helpers.partialResult import PartialResult
+from helpers.checkpoint import Checkpoint, parseInterval
+from helpers.columnCache import sourceStamp
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -18,23 +29,37 @@ parser.add_argument("-b", "--beamFile",type=str,default="__none__",help="[option
 parser.add_argument("-o", "--outfile", type=str, default="example_ntuple_analysis_script_output.root", help="output root file name")
 parser.add_argument("-fc", "--fullyContained", action="store_true", help="only consider fully contained events")
 parser.add_argument("-ncc", "--noCosmicCuts", action="store_true", help="don't apply cosmic rejection cuts")
+parser.add_argument("-tb", "--traceBranches", type=int, default=0, help="sample this many entries to find the branches the cuts read and switch all other branches off (default 0: read every branch)")
+parser.add_argument("--columnCache", action="store_true", help="memory-map the needed branches from the column cache (built on first use) instead of reading them through ROOT")
+parser.add_argument("-w", "--workers", type=int, default=1, help="split each event loop by entry range over this many processes (same output as one process)")
+parser.add_argument("--partial", type=str, default=None, help="save the unscaled histograms, counters, POT and event lists to this .npz instead of plotting (merge shards with reducePartials.py)")
+parser.add_argument("--checkpoint", type=str, default=None, help="save the loop state to this file as the loops go (default with --resume: <outfile>.checkpoint)")
+parser.add_argument("--checkpointEvery", type=str, default="10m", help="checkpoint interval: entries (100000) or time (900s, 15m, 1h)")
+parser.add_argument("--resume", action="store_true", help="reload the checkpoint and carry on from the entry after the last one saved")
+parser.add_argument("--cutMasks", action="store_true", help="evaluate every cut on every event and save the per-event cut bitmasks next to each input file (helpers/cutMaskStore.py)")
 
 args = parser.parse_args()
 
 #open input file and get event and POT trees
-ntuple_file = rt.TFile(args.infile)
-eventTree = ntuple_file.Get("EventTree")
-potTree = ntuple_file.Get("potTree")
-
-cosmic_file = rt.TFile(args.cosmicFile)
-cosmicTree = cosmic_file.Get("EventTree")
-#cosmicPotTree = ntuple_file.Get("cosmicPotTree")
-
-beamTree = None
+def openInputs():
+  #With --workers every worker calls this again (see reopenTrees), so each process reads through its own TFile
+  global ntuple_file, eventTree, potTree, cosmic_file, cosmicTree, beam_file, beamTree
+  ntuple_file = rt.TFile(args.infile)
+  eventTree = ntuple_file.Get("EventTree")
+  potTree = ntuple_file.Get("potTree")
+
+  cosmic_file = rt.TFile(args.cosmicFile)
+  cosmicTree = cosmic_file.Get("EventTree")
+  #cosmicPotTree = ntuple_file.Get("cosmicPotTree")
+
+  beamTree = None
+  if args.beamFile != "__none__":
+    beam_file = rt.TFile(args.beamFile)
+    beamTree = beam_file.Get("EventTree")
+
+openInputs()
 nBeamEntries = 0
-if args.beamFile != "__none__":
-  beam_file = rt.TFile(args.beamFile)
-  beamTree = beam_file.Get("EventTree")
+if beamTree is not None:
   nBeamEntries = beamTree.GetEntries()
 
 #we will scale histograms to expected event counts from POT in runs 1-3: 6.67e+20
@@ -42,9 +67,7 @@ targetPOT = 4.4e+19
 targetPOTstring = "4.4e+19"
 ntuplePOTsum = 0
 
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 #For the old cosmic file
 #cosmicPOTsum = 3.2974607516739725e+20
@@ -53,7 +76,7 @@ for i in range(potTree.GetEntries()):
 #For the new cosmic file
 #cosmicPOTsum = 5.28e+19
 #cosmicWeight = 0.4
-cosmicPOTsum = 1.1e20
+cosmicPOTsum = cosmicPOT(cosmicTree, fallbackPOT=1.1e20)
 cosmicWeight = 1.0
 
 # ROOT FILE TO SAVE Histograms
@@ -75,185 +98,119 @@ histXmax = 2.0
 #histNbins = 25
 #histXmax = 1.0
 
-puritySignal = rt.TH1F("PSignal1", "Signal",histNbins,0,histXmax)
-purityOffSignal = rt.TH1F("POffSignal1", "Signal, One Undetected Proton",histNbins,0,histXmax)
-purityMuon = rt.TH1F("PMuon1", "Over-threshold Muon",histNbins,0,histXmax)
-purityElectron = rt.TH1F("PElectron1", "Over-threshold Electron",histNbins,0,histXmax)
-purityFiducials = rt.TH1F("PFiducial1", "Out of Fiducial (1g)",histNbins,0,histXmax)
-purityFiducials2g = rt.TH1F("PFiducials2g1", "Out of Fiducial (2g)",histNbins,0,histXmax)
-purityPion = rt.TH1F("PPion1", "Charged Pion",histNbins,0,histXmax)
-purityProton = rt.TH1F("PProton1", "2+ Protons",histNbins,0,histXmax)
-purityNoPhotons = rt.TH1F("PNoPhoton1", "No Real Photons",histNbins,0,histXmax)
-purityTwoPhotons = rt.TH1F("PTwoPhoton1", "2 Real Photons",histNbins,0,histXmax)
-purityManyPhotons = rt.TH1F("PMorePhoton1", "3+ Real Photons",histNbins,0,histXmax)
-
-#1 GAMMA + 1P HISTS
-protonPuritySignal = rt.TH1F("ProtonPSignal1", "Signal",histNbins,0,histXmax)
-protonPurityOffSignal = rt.TH1F("ProtonPOffSignal1", "Signal, No Real Protons",histNbins,0,histXmax)
-protonPurityMuon = rt.TH1F("ProtonPMuon1", "Over-threshold Muon",histNbins,0,histXmax)
-protonPurityElectron = rt.TH1F("ProtonPElectron1", "Over-threshold Electron",histNbins,0,histXmax)
-protonPurityFiducials = rt.TH1F("ProtonPFiducial1", "Out of Fiducial (1g)",histNbins,0,histXmax)
-protonPurityFiducials2g = rt.TH1F("ProtonPFiducial2g1", "Out of Fiducial (2g)",histNbins,0,histXmax)
-protonPurityPion = rt.TH1F("ProtonPPion1", "Charged Pion",histNbins,0,histXmax)
-protonPurityProton = rt.TH1F("ProtonPProton1", "2+ Protons",histNbins,0,histXmax)
-protonPurityNoPhotons = rt.TH1F("ProtonPNoPhoton1", "No Real Photons",histNbins,0,histXmax)
-protonPurityTwoPhotons = rt.TH1F("ProtonPTwoPhoton1", "2 Real Photons",histNbins,0,histXmax)
-protonPurityManyPhotons = rt.TH1F("ProtonPMorePhoton1", "3+ Real Photons",histNbins,0,histXmax)
-
+#Each purity category has a 1 gamma + 0 (reco proton count 0) and a 1 gamma + 1P (reco proton count 1) histogram
+purityHists = CategoryHistogram([("puritySignal", "PSignal1", "Signal"),
+                                 ("purityOffSignal", "POffSignal1", "Signal, One Undetected Proton"),
+                                 ("purityMuon", "PMuon1", "Over-threshold Muon"),
+                                 ("purityElectron", "PElectron1", "Over-threshold Electron"),
+                                 ("purityFiducials", "PFiducial1", "Out of Fiducial (1g)"),
+                                 ("purityFiducials2g", "PFiducials2g1", "Out of Fiducial (2g)"),
+                                 ("purityPion", "PPion1", "Charged Pion"),
+                                 ("purityProton", "PProton1", "2+ Protons"),
+                                 ("purityNoPhotons", "PNoPhoton1", "No Real Photons"),
+                                 ("purityTwoPhotons", "PTwoPhoton1", "2 Real Photons"),
+                                 ("purityManyPhotons", "PMorePhoton1", "3+ Real Photons"),
+                                 #1 GAMMA + 1P HISTS
+                                 ("protonPuritySignal", "ProtonPSignal1", "Signal"),
+                                 ("protonPurityOffSignal", "ProtonPOffSignal1", "Signal, No Real Protons"),
+                                 ("protonPurityMuon", "ProtonPMuon1", "Over-threshold Muon"),
+                                 ("protonPurityElectron", "ProtonPElectron1", "Over-threshold Electron"),
+                                 ("protonPurityFiducials", "ProtonPFiducial1", "Out of Fiducial (1g)"),
+                                 ("protonPurityFiducials2g", "ProtonPFiducial2g1", "Out of Fiducial (2g)"),
+                                 ("protonPurityPion", "ProtonPPion1", "Charged Pion"),
+                                 ("protonPurityProton", "ProtonPProton1", "2+ Protons"),
+                                 ("protonPurityNoPhotons", "ProtonPNoPhoton1", "No Real Photons"),
+                                 ("protonPurityTwoPhotons", "ProtonPTwoPhoton1", "2 Real Photons"),
+                                 ("protonPurityManyPhotons", "ProtonPMorePhoton1", "3+ Real Photons")],
+                                histNbins, 0, histXmax)
 
 #PURITY HISTLISTS
-signalPHistsNoProton = [puritySignal, purityOffSignal]
-signalPHistsProton = [protonPurityOffSignal, protonPuritySignal]
-muonPHists = [purityMuon, protonPurityMuon]
-electronPHists = [purityElectron, protonPurityElectron]
-fiducialPHists   = [purityFiducials,protonPurityFiducials]
-fiducialPHists2g = [purityFiducials2g,protonPurityFiducials2g]
-pionPHists = [purityPion, protonPurityPion]
-protonPHists = [purityProton, protonPurityProton]
-noPhotonPHists = [purityNoPhotons, protonPurityNoPhotons]
-twoPhotonPHists = [purityTwoPhotons, protonPurityTwoPhotons]
-manyPhotonPHists = [purityManyPhotons, protonPurityManyPhotons]
+signalPHistsNoProton = ["puritySignal", "purityOffSignal"]
+signalPHistsProton = ["protonPurityOffSignal", "protonPuritySignal"]
+muonPHists = ["purityMuon", "protonPurityMuon"]
+electronPHists = ["purityElectron", "protonPurityElectron"]
+fiducialPHists   = ["purityFiducials", "protonPurityFiducials"]
+fiducialPHists2g = ["purityFiducials2g", "protonPurityFiducials2g"]
+pionPHists = ["purityPion", "protonPurityPion"]
+protonPHists = ["purityProton", "protonPurityProton"]
+noPhotonPHists = ["purityNoPhotons", "protonPurityNoPhotons"]
+twoPhotonPHists = ["purityTwoPhotons", "protonPurityTwoPhotons"]
+manyPhotonPHists = ["purityManyPhotons", "protonPurityManyPhotons"]
 
 #Cosmics go here, so we can put them on purity
-cosmicOnePhoton = rt.TH1F("cBackground1", "Cosmic Background",histNbins,0,histXmax)
-protonCosmicOnePhoton = rt.TH1F("cProtonBackground1", "Cosmic Background",histNbins,0,histXmax)
-cosmicList = [cosmicOnePhoton, protonCosmicOnePhoton]
+cosmicHists = CategoryHistogram([("cosmicOnePhoton", "cBackground1", "Cosmic Background"),
+                                 ("protonCosmicOnePhoton", "cProtonBackground1", "Cosmic Background")], histNbins, 0, histXmax)
+cosmicList = ["cosmicOnePhoton", "protonCosmicOnePhoton"]
 
 #Beam Data
-if beamTree is not None:
-  beamOnePhoton = rt.TH1F("beam1g0X1", "Cosmic Background",histNbins,0,histXmax)
-  protonBeamOnePhoton = rt.TH1F("beam1g1p1", "Cosmic Background",histNbins,0,histXmax)
-else:
-  beamOnePhoton = None
-  protonBeamOnePhoton = None
-beamList = [beamOnePhoton,protonBeamOnePhoton]
-
-#Big Lists, for Big Plots
-pList1 = [puritySignal,
-          purityOffSignal,
-          purityFiducials,
-          purityFiducials2g,
-          purityMuon,
-          purityElectron,
-          purityPion,
-          purityProton,
-          purityNoPhotons,
-          purityTwoPhotons,
-          purityManyPhotons,
-          cosmicOnePhoton]
-
-pProtonList1 = [protonPuritySignal,
-                protonPurityOffSignal,
-                protonPurityFiducials,
-                protonPurityFiducials2g,                
-                protonPurityMuon,
-                protonPurityElectron,
-                protonPurityPion,
-                protonPurityProton,
-                protonPurityNoPhotons,
-                protonPurityTwoPhotons,
-                protonPurityManyPhotons,
-                protonCosmicOnePhoton]
+beamHists = CategoryHistogram([("beamOnePhoton", "beam1g0X1", "Cosmic Background"),
+                               ("protonBeamOnePhoton", "beam1g1p1", "Cosmic Background")], histNbins, 0, histXmax)
+beamList = ["beamOnePhoton", "protonBeamOnePhoton"]
 
 #EFFICIENCY HISTOGRAMS
-effNoVertex = rt.TH1F("effNoVertex1", "No Vertex Found",histNbins,0,histXmax)
-effMuon = rt.TH1F("effMuon1", "Muon False Positive",histNbins,0,histXmax)
-effElectron = rt.TH1F("effElectron1", "Electron False Positive",histNbins,0,histXmax)
-effCosmicPixel = rt.TH1F("effCosmicPixel1", "No cosmic-tagged pixels",histNbins,0,histXmax)
-effFiducial = rt.TH1F("effFiducial1", "Placed out of Fiducial",histNbins,0,histXmax)
-effPion = rt.TH1F("effPion1", "Pion False Positive",histNbins,0,histXmax)
-effProton =  rt.TH1F("effProton1", "Proton False Positive",histNbins,0,histXmax)
-effNoPhotons = rt.TH1F("effNoPhotons1", "No Photons Found",histNbins,0,histXmax)
-effSignal = rt.TH1F("effSignal 1", "Signal",histNbins,0,histXmax)
-effTwoPhotons = rt.TH1F("effTwoPhotons1", "Two Photons Found",histNbins,0,histXmax)
-effManyPhotons = rt.TH1F("effManyPhotons1", "Many Photons Found",histNbins,0,histXmax)
-effShowerCharge = rt.TH1F("effShowerCharge1", "Shower from Charged Cut",histNbins,0,histXmax)
-effPrimary = rt.TH1F("effPrimary1", "Primary Score Cut",histNbins,0,histXmax)
-effLongTracks = rt.TH1F("effLongTracks1", "Tracks with length > 20 cm",histNbins,0,histXmax)
-effMuonComp = rt.TH1F("effMuonComp1", "Muons with too-low Efficiency",histNbins,0,histXmax)
-effMaxInTime = rt.TH1F("effMaxInTime1", "Likely Incorrect Vertex",histNbins,0,histXmax)
-effShowerComp = rt.TH1F("effShowerComp1", "Shower Completeness",histNbins,0,histXmax)
-
-effProtonNoVertex = rt.TH1F("effProtonNoVertex1", "No Vertex Found",histNbins,0,histXmax)
-effProtonMuon = rt.TH1F("effProtonMuon1", "Muon False Positive",histNbins,0,histXmax)
-effProtonElectron = rt.TH1F("effProtonElectron1", "Electron False Positive",histNbins,0,histXmax)
-effProtonCosmicPixel = rt.TH1F("effProtonCosmicPixel1", "No cosmic-tagged pixels",histNbins,0,histXmax)
-effProtonFiducial = rt.TH1F("effProtonFiducial1", "Placed out of Fiducial",histNbins,0,histXmax)
-effProtonPion = rt.TH1F("effProtonPion1", "Pion False Positive",histNbins,0,histXmax)
-effProtonProton =  rt.TH1F("effProtonProton1", "Proton False Positive",histNbins,0,histXmax)
-effProtonNoPhotons = rt.TH1F("effProtonNoPhotons1", "No Photons Found",histNbins,0,histXmax)
-effProtonSignal = rt.TH1F("effProtonSignal 1", "Signal",histNbins,0,histXmax)
-effProtonTwoPhotons = rt.TH1F("effProtonTwoPhotons1", "Two Photons Found",histNbins,0,histXmax)
-effProtonManyPhotons = rt.TH1F("effProtonManyPhotons1", "Many Photons Found",histNbins,0,histXmax)
-effProtonShowerCharge = rt.TH1F("effProtonShowerCharge1", "Shower from Charged Cut",histNbins,0,histXmax)
-effProtonPrimary = rt.TH1F("effProtonPrimary1", "Primary Score Cut",histNbins,0,histXmax)
-effProtonLongTracks = rt.TH1F("effProtonLongTracks1", "Tracks with length > 20 cm",histNbins,0,histXmax)
-effProtonMuonComp = rt.TH1F("effProtonMuonComp1", "Muons with too-low Efficiency",histNbins,0,histXmax)
-effProtonMaxInTime = rt.TH1F("effProtonMaxInTime1", "Likely Incorrect Vertex",histNbins,0,histXmax)
-effProtonShowerComp = rt.TH1F("effProtonShowerComp1", "Shower Completeness",histNbins,0,histXmax)
+effHists = CategoryHistogram([("effNoVertex", "effNoVertex1", "No Vertex Found"),
+                              ("effMuon", "effMuon1", "Muon False Positive"),
+                              ("effElectron", "effElectron1", "Electron False Positive"),
+                              ("effCosmicPixel", "effCosmicPixel1", "No cosmic-tagged pixels"),
+                              ("effFiducial", "effFiducial1", "Placed out of Fiducial"),
+                              ("effPion", "effPion1", "Pion False Positive"),
+                              ("effProton", "effProton1", "Proton False Positive"),
+                              ("effNoPhotons", "effNoPhotons1", "No Photons Found"),
+                              ("effSignal", "effSignal 1", "Signal"),
+                              ("effTwoPhotons", "effTwoPhotons1", "Two Photons Found"),
+                              ("effManyPhotons", "effManyPhotons1", "Many Photons Found"),
+                              ("effShowerCharge", "effShowerCharge1", "Shower from Charged Cut"),
+                              ("effPrimary", "effPrimary1", "Primary Score Cut"),
+                              ("effLongTracks", "effLongTracks1", "Tracks with length > 20 cm"),
+                              ("effMuonComp", "effMuonComp1", "Muons with too-low Efficiency"),
+                              ("effMaxInTime", "effMaxInTime1", "Likely Incorrect Vertex"),
+                              ("effShowerComp", "effShowerComp1", "Shower Completeness"),
+                              ("effProtonNoVertex", "effProtonNoVertex1", "No Vertex Found"),
+                              ("effProtonMuon", "effProtonMuon1", "Muon False Positive"),
+                              ("effProtonElectron", "effProtonElectron1", "Electron False Positive"),
+                              ("effProtonCosmicPixel", "effProtonCosmicPixel1", "No cosmic-tagged pixels"),
+                              ("effProtonFiducial", "effProtonFiducial1", "Placed out of Fiducial"),
+                              ("effProtonPion", "effProtonPion1", "Pion False Positive"),
+                              ("effProtonProton", "effProtonProton1", "Proton False Positive"),
+                              ("effProtonNoPhotons", "effProtonNoPhotons1", "No Photons Found"),
+                              ("effProtonSignal", "effProtonSignal 1", "Signal"),
+                              ("effProtonTwoPhotons", "effProtonTwoPhotons1", "Two Photons Found"),
+                              ("effProtonManyPhotons", "effProtonManyPhotons1", "Many Photons Found"),
+                              ("effProtonShowerCharge", "effProtonShowerCharge1", "Shower from Charged Cut"),
+                              ("effProtonPrimary", "effProtonPrimary1", "Primary Score Cut"),
+                              ("effProtonLongTracks", "effProtonLongTracks1", "Tracks with length > 20 cm"),
+                              ("effProtonMuonComp", "effProtonMuonComp1", "Muons with too-low Efficiency"),
+                              ("effProtonMaxInTime", "effProtonMaxInTime1", "Likely Incorrect Vertex"),
+                              ("effProtonShowerComp", "effProtonShowerComp1", "Shower Completeness")],
+                             histNbins, 0, histXmax)
 
 #Histogram Lists!
-effNoVertexHists = [effNoVertex, effProtonNoVertex]
-effMuonHists = [effMuon, effProtonMuon]
-effElectronHists = [effElectron, effProtonElectron]
-effCosmicPixelHists = [effCosmicPixel, effProtonCosmicPixel]
-effFiducialHists = [effFiducial, effProtonFiducial]
-effPionHists = [effPion, effProtonPion]
-effProtonHists = [effProton, effProtonProton]
-effNoPhotonHists = [effNoPhotons, effProtonNoPhotons]
-effOnePhotonHists = [effSignal, effProtonSignal] 
-effTwoPhotonHists = [effTwoPhotons, effProtonTwoPhotons]
-effManyPhotonHists = [effManyPhotons, effProtonManyPhotons]
-effShowerChargeHists = [effShowerCharge, effProtonShowerCharge]
-effPrimaryHists = [effPrimary, effProtonPrimary]
-effLongTrackHists = [effLongTracks, effProtonLongTracks]
-effMuonCompHists = [effMuonComp, effProtonMuonComp]
-effMaxInTimeHists = [effMaxInTime, effProtonMaxInTime]
-effShowerCompHists = [effShowerComp,effProtonShowerComp]
-
-#Lists of histograms for stacking. Place with signal first, then put the others in backwards in order of application (so the last one to apply would immediately follow the signal, then the second to last, all the way down to the first)
-effList1 = [effSignal,
-            effShowerComp,
-            effMaxInTime,
-            effMuonComp,
-            effLongTracks,
-            effPrimary,
-            effShowerCharge,            
-            effManyPhotons,
-            effTwoPhotons,
-            effNoPhotons,
-            effProton,
-            effPion,
-            effFiducial,
-            effCosmicPixel,
-            effElectron,
-            effMuon,
-            effNoVertex]
-effProtonList1 = [effProtonSignal,
-                  effProtonShowerComp,
-                  effProtonMaxInTime,
-                  effProtonMuonComp,
-                  effProtonLongTracks,
-                  effProtonPrimary,
-                  effProtonShowerCharge,                  
-                  effProtonManyPhotons,
-                  effProtonTwoPhotons,
-                  effProtonNoPhotons,
-                  effProtonProton,
-                  effProtonPion,
-                  effProtonFiducial,
-                  effProtonCosmicPixel,
-                  effProtonElectron,
-                  effProtonMuon,
-                  effProtonNoVertex]
+effNoVertexHists = ["effNoVertex", "effProtonNoVertex"]
+effMuonHists = ["effMuon", "effProtonMuon"]
+effElectronHists = ["effElectron", "effProtonElectron"]
+effCosmicPixelHists = ["effCosmicPixel", "effProtonCosmicPixel"]
+effFiducialHists = ["effFiducial", "effProtonFiducial"]
+effPionHists = ["effPion", "effProtonPion"]
+effProtonHists = ["effProton", "effProtonProton"]
+effNoPhotonHists = ["effNoPhotons", "effProtonNoPhotons"]
+effOnePhotonHists = ["effSignal", "effProtonSignal"]
+effTwoPhotonHists = ["effTwoPhotons", "effProtonTwoPhotons"]
+effManyPhotonHists = ["effManyPhotons", "effProtonManyPhotons"]
+effShowerChargeHists = ["effShowerCharge", "effProtonShowerCharge"]
+effPrimaryHists = ["effPrimary", "effProtonPrimary"]
+effLongTrackHists = ["effLongTracks", "effProtonLongTracks"]
+effMuonCompHists = ["effMuonComp", "effProtonMuonComp"]
+effMaxInTimeHists = ["effMaxInTime", "effProtonMaxInTime"]
+effShowerCompHists = ["effShowerComp", "effProtonShowerComp"]
 
 
 #Built-in functions here
-def addHist(ntuple, protonNumber, histList, variable, weight):
+def addHist(hists, protonNumber, histList, variable, weight):
+  #histList holds the (0 proton, 1 proton) category keys of hists
   if protonNumber == 0:
-    histList[0].Fill(variable, weight)
+    hists.Fill(histList[0], variable, weight)
   elif protonNumber == 1:
-    histList[1].Fill(variable, weight)
+    hists.Fill(histList[1], variable, weight)
 
 
 def histScale(hist, POTSum):
@@ -306,8 +263,91 @@ classificationThreshold = 0
 showerRecoThreshold = 10.0
 photonEDepThreshold = 10.0
 
+#Only read the branches the selections actually use; the ones the histogram filling reads besides are switched on by
+#BranchGuard when they are first read. The column cache memory-maps every branch (pages are only read when touched)
+if args.traceBranches > 0 and not args.columnCache:
+  recoSelection = lambda tree: run_1g1p_reco_selection_cuts(tree, classificationThreshold, fiducialData, return_on_fail=False)
+  truthSelection = lambda tree: truthdef_1gamma_cuts(tree, photonEDepThreshold, fiducialData, return_on_fail=False)
+  eventBranches = traceBranches(eventTree, [recoSelection, truthSelection], args.traceBranches)
+  cosmicBranches = traceBranches(cosmicTree, [recoSelection], args.traceBranches)
+  if beamTree is not None:
+    beamBranches = traceBranches(beamTree, [recoSelection], args.traceBranches)
+if args.columnCache:
+  eventColumns = listBranches(eventTree, activeOnly=False)
+  cosmicColumns = listBranches(cosmicTree, activeOnly=False)
+  if beamTree is not None:
+    beamColumns = listBranches(beamTree, activeOnly=False)
+
+def prepareTrees(report=True):
+  global eventTree, cosmicTree, beamTree
+  if args.traceBranches > 0 and not args.columnCache:
+    eventActive = activateBranches(eventTree, eventBranches)
+    cosmicActive = activateBranches(cosmicTree, cosmicBranches)
+    if report:
+      printBranchReport(eventActive, "EventTree")
+      printBranchReport(cosmicActive, "cosmic EventTree")
+    eventTree = BranchGuard(eventTree, eventBranches)
+    cosmicTree = BranchGuard(cosmicTree, cosmicBranches)
+    if beamTree is not None:
+      beamActive = activateBranches(beamTree, beamBranches)
+      if report:
+        printBranchReport(beamActive, "beam EventTree")
+      beamTree = BranchGuard(beamTree, beamBranches)
+
+  #Swap the trees for memory-mapped columns; the cuts run on ColumnTree exactly as on a TTree
+  if args.columnCache:
+    eventTree = ColumnTree(loadCachedColumns(args.infile, eventColumns))
+    cosmicTree = ColumnTree(loadCachedColumns(args.cosmicFile, cosmicColumns))
+    if beamTree is not None:
+      beamTree = ColumnTree(loadCachedColumns(args.beamFile, beamColumns))
+
+  #Helpers called more than once on an entry (photon lists, proton counts, leading energies) run once per entry
+  eventTree = CachedTree(eventTree)
+  cosmicTree = CachedTree(cosmicTree)
+  if beamTree is not None:
+    beamTree = CachedTree(beamTree)
+
+def reopenTrees():
+  openInputs()
+  prepareTrees(report=False)
+
+prepareTrees()
+
+#Per-event record of the reco and truth cuts; with --cutMasks the selections run every cut instead of stopping at the first failure
+returnOnFail = not args.cutMasks
+eventMasks, cosmicMasks, beamMasks = None, None, None
+if args.cutMasks:
+  recoCutNames = reco_1g1p_cutflow(classificationThreshold, fiducialData).cutNames() + ["AllCuts"]
+  eventMasks = CutMaskWriter(eventTree.GetEntries(), recoCutNames, truthdef_1gamma_cut_names + ["AllCuts"])
+  cosmicMasks = CutMaskWriter(cosmicTree.GetEntries(), recoCutNames)
+  if beamTree is not None:
+    beamMasks = CutMaskWriter(nBeamEntries, recoCutNames)
+
+#With --checkpoint / --resume the loop state is saved every --checkpointEvery, so a crashed or killed run can carry on
+if args.checkpoint is not None or args.resume:
+  everyEntries, everySeconds = parseInterval(args.checkpointEvery)
+  inputs = [args.infile, args.cosmicFile] + ([args.beamFile] if beamTree is not None else [])
+  checkpoint = Checkpoint(args.checkpoint or args.outfile + ".checkpoint", everyEntries, everySeconds,
+                          stamp=([sourceStamp(path) for path in inputs], args.fullyContained, args.noCosmicCuts, args.cutMasks),
+                          resume=args.resume)
+else:
+  checkpoint = None
+
+#With --workers the loops below run over entry ranges in separate processes; the counters and the cosmic event list are
+#added up in entry order afterwards, and the histogram fills replayed, so the output matches a single-process run
+cosmicEvents = []
+shards = ShardRunner(args.workers, globals(),
+                     counters=["fiducialCount", "NCCount", "noPionCount", "recoCount", "onePhoton", "twoPhotons", "threePhotons",
+                               "untrackedCosmics", "passTruth", "hasVertex", "hasNC", "inFiducial", "pionProtonFine",
+                               "noEffPhotons", "twoEffPhotons", "manyEffPhotons", "survivesCuts", "oneEffPhoton"],
+                     lists=["cosmicEvents"], reopen=reopenTrees, checkpoint=checkpoint)
+
+def recordReco(masks, i, tree, cuts_passed, recoList, recoTrackList, weight):
+  masks.setEvent(i, tree, weight)
+  masks.setReco(i, cuts_passed, scaleRecoEnergy(tree, recoList, recoTrackList) if len(recoList) + len(recoTrackList) > 0 else None)
+
 #BEGINNING EVENT LOOP FOR DEFAULT PURITY
-for i in range(eventTree.GetEntries()):
+for i in shards.entries(eventTree.GetEntries(), [eventMasks]):
 
   if False:
     break
@@ -375,7 +415,9 @@ for i in range(eventTree.GetEntries()):
   # if recoCutMaxInTime(eventTree, recoProtonCount) == False:    
   #   continue
 
-  eventPassAllCuts, cuts_passed, recoList, recoTrackList, recoProtonCount = run_1g1p_reco_selection_cuts( eventTree, classificationThreshold, fiducialData )
+  eventPassAllCuts, cuts_passed, recoList, recoTrackList, recoProtonCount = run_1g1p_reco_selection_cuts( eventTree, classificationThreshold, fiducialData, returnOnFail )
+  if eventMasks is not None:
+    recordReco(eventMasks, i, eventTree, cuts_passed, recoList, recoTrackList, eventTree.xsecWeight)
   if eventPassAllCuts==False:
     #print("entry[",i,"] passes original cuts, but does not pass selection function")
     #for cutname in cuts_passed:
@@ -441,28 +483,28 @@ for i in range(eventTree.GetEntries()):
   # out of fiducial vertex
   if trueCutFiducials(eventTree, fiducialData) == False:
     if nEdepPhotons==1:
-      addHist(eventTree, recoProtonCount, fiducialPHists, leadingPhoton, eventTree.xsecWeight)
+      addHist(purityHists, recoProtonCount, fiducialPHists, leadingPhoton, eventTree.xsecWeight)
     else:
-      addHist(eventTree, recoProtonCount, fiducialPHists2g, leadingPhoton, eventTree.xsecWeight)
+      addHist(purityHists, recoProtonCount, fiducialPHists2g, leadingPhoton, eventTree.xsecWeight)
     continue
   fiducialCount += 1
   
   #Cut muons and electrons
   if trueCutMuons(eventTree) == False:
-    addHist(eventTree, recoProtonCount, muonPHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(purityHists, recoProtonCount, muonPHists, leadingPhoton, eventTree.xsecWeight)
     continue
   if trueCutElectrons(eventTree) == False:
-    addHist(eventTree, recoProtonCount, electronPHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(purityHists, recoProtonCount, electronPHists, leadingPhoton, eventTree.xsecWeight)
     continue
   NCCount += 1
 
   #pions and protons!
   pionCount, protonCount = trueCutPionProton(eventTree)
   if pionCount > 0:
-    addHist(eventTree, recoProtonCount, pionPHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(purityHists, recoProtonCount, pionPHists, leadingPhoton, eventTree.xsecWeight)
     continue
   if protonCount > 1:
-    addHist(eventTree, recoProtonCount, protonPHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(purityHists, recoProtonCount, protonPHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   noPionCount += 1
@@ -470,39 +512,42 @@ for i in range(eventTree.GetEntries()):
 
   #Are there actually any photons?
   if nEdepPhotons==0:
-    addHist(eventTree, recoProtonCount, noPhotonPHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(purityHists, recoProtonCount, noPhotonPHists, leadingPhoton, eventTree.xsecWeight)
     continue
   
   recoCount += 1
   #Is there one Photon?
   if nEdepPhotons==1:
     if protonCount == 0:
-      addHist(eventTree, recoProtonCount, signalPHistsNoProton, leadingPhoton, eventTree.xsecWeight)
+      addHist(purityHists, recoProtonCount, signalPHistsNoProton, leadingPhoton, eventTree.xsecWeight)
     elif protonCount == 1:
-      addHist(eventTree, recoProtonCount, signalPHistsProton, leadingPhoton, eventTree.xsecWeight)
+      addHist(purityHists, recoProtonCount, signalPHistsProton, leadingPhoton, eventTree.xsecWeight)
     onePhoton += 1
     continue
   #Are there two?
   elif nEdepPhotons == 2:
-    addHist(eventTree, recoProtonCount, twoPhotonPHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(purityHists, recoProtonCount, twoPhotonPHists, leadingPhoton, eventTree.xsecWeight)
     twoPhotons += 1
     continue
   
   #In that case, there should be at least three
   else:
-    addHist(eventTree, recoProtonCount, manyPhotonPHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(purityHists, recoProtonCount, manyPhotonPHists, leadingPhoton, eventTree.xsecWeight)
     threePhotons += 1
     continue
 
 #BEGINNING EVENT LOOP FOR COSMICS
-for i in range(cosmicTree.GetEntries()):
+for i in shards.entries(cosmicTree.GetEntries(), [cosmicMasks]):
   if i>0 and i%10000==0:
     print("cosmicTree Entry[",i,"]")
   cosmicTree.GetEntry(i)
 
   cosmicEventPassAllCuts, cosmic_cuts_passed, recoList, recoTrackList, recoProtonCount = run_1g1p_reco_selection_cuts( cosmicTree,
                                                                                                                        classificationThreshold,
-                                                                                                                       fiducialData )
+                                                                                                                       fiducialData,
+                                                                                                                       returnOnFail )
+  if cosmicMasks is not None:
+    recordReco(cosmicMasks, i, cosmicTree, cosmic_cuts_passed, recoList, recoTrackList, 1.0)
   untrackedCosmics += 1
 
   if not cosmicEventPassAllCuts:
@@ -514,18 +559,23 @@ for i in range(cosmicTree.GetEntries()):
   #leadingPhoton = cosmicTree.vtxMaxIntimePixelSum*0.0126 # hack
   #for recoIDX in recoList+recoTrackList:
   #  leadingPhoton = cosmicTree.showerComp[recoIDX]  
-  addHist(cosmicTree, recoProtonCount, cosmicList, leadingPhoton, 1.0)
+  addHist(cosmicHists, recoProtonCount, cosmicList, leadingPhoton, 1.0)
+
+  cosmicEvents.append((cosmicTree.run, cosmicTree.subrun, cosmicTree.event, cosmicTree.fileid))
 
-  print(cosmicTree.run," ",cosmicTree.subrun," ",cosmicTree.event," ",cosmicTree.fileid, file=cosmic_event_list)
+for run, subrun, event, fileid in cosmicEvents:
+  print(run," ",subrun," ",event," ",fileid, file=cosmic_event_list)
 
 
 #BEGINNING EVENT LOOP FOR COSMICS
-for i in range(nBeamEntries):
+for i in shards.entries(nBeamEntries, [beamMasks]):
   if i>0 and i%10000==0:
     print("beamTree Entry[",i,"]")
   beamTree.GetEntry(i)
 
-  beamPass, beam_cutspassed, recoList, recoTrackList, recoProtonCount = run_1g1p_reco_selection_cuts( beamTree, classificationThreshold, fiducialData )
+  beamPass, beam_cutspassed, recoList, recoTrackList, recoProtonCount = run_1g1p_reco_selection_cuts( beamTree, classificationThreshold, fiducialData, returnOnFail )
+  if beamMasks is not None:
+    recordReco(beamMasks, i, beamTree, beam_cutspassed, recoList, recoTrackList, 1.0)
   if not beamPass:
     continue
 
@@ -535,10 +585,10 @@ for i in range(nBeamEntries):
   #leadingPhoton = beamTree.vtxMaxIntimePixelSum*0.0126 # hack
   #for recoIDX in recoList+recoTrackList:
   #  leadingPhoton = beamTree.showerComp[recoIDX]  
-  addHist(beamTree, recoProtonCount, beamList, leadingPhoton, 1.0)
+  addHist(beamHists, recoProtonCount, beamList, leadingPhoton, 1.0)
   
 #BEGINNING EVENT LOOP FOR EFFICIENCY
-for i in range(eventTree.GetEntries()):
+for i in shards.entries(eventTree.GetEntries(), [eventMasks]):
 
   if i>0 and i%10000==0:
     print("eventTree Entry[",i,"]")
@@ -577,7 +627,10 @@ for i in range(eventTree.GetEntries()):
 
   # if nEdepPhotons != 1:
   #   continue
-  passes_truthdef, truthcuts = truthdef_1gamma_cuts( eventTree, photonEDepThreshold, fiducialData, return_on_fail=True )
+  passes_truthdef, truthcuts = truthdef_1gamma_cuts( eventTree, photonEDepThreshold, fiducialData, return_on_fail=returnOnFail )
+  if eventMasks is not None:
+    truthcuts["AllCuts"] = passes_truthdef
+    eventMasks.setTruth(i, truthcuts, scaleTrueEnergy(eventTree, truthcuts["truePhotonIDs"]) if len(truthcuts["truePhotonIDs"]) > 0 else None)
   if not passes_truthdef:
     continue
 
@@ -592,7 +645,7 @@ for i in range(eventTree.GetEntries()):
   passTruth += 1
 
   if recoNoVertex(eventTree) == False:
-    addHist(eventTree, protonCount, effNoVertexHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effNoVertexHists, leadingPhoton, eventTree.xsecWeight)
     continue
   hasVertex += 1
   #See if the event is neutral current                                                                                                  
@@ -602,35 +655,35 @@ for i in range(eventTree.GetEntries()):
 
   #Check for above-threshold muons and electrons 
   if recoCutMuons(eventTree, classificationThreshold) == False:
-    addHist(eventTree, protonCount, effMuonHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effMuonHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   if recoCutElectrons(eventTree, classificationThreshold) == False:
-    addHist(eventTree, protonCount, effElectronHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effElectronHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   hasNC += 1
 
   #Use Matt's Cosmic Cut
   if trueCutCosmic(eventTree) == False:
-    addHist(eventTree, protonCount, effCosmicPixelHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effCosmicPixelHists, leadingPhoton, eventTree.xsecWeight)
   
   #Cut events with vertexes outside the fiducial
   if recoFiducials(eventTree, fiducialData) == False:
-    addHist(eventTree, protonCount, effFiducialHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effFiducialHists, leadingPhoton, eventTree.xsecWeight)
     continue
   inFiducial += 1
 
   #Cut events with pions present
   if recoPion(eventTree, classificationThreshold) == False:
-    addHist(eventTree, protonCount, effPionHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effPionHists, leadingPhoton, eventTree.xsecWeight)
     continue
   pionProtonFine += 1
   
   #Cut events with too many protons
   recoProtonCount = recoProton(eventTree, classificationThreshold)
   if recoProtonCount > 1:
-    addHist(eventTree, protonCount, effProtonHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effProtonHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
 
@@ -642,58 +695,168 @@ for i in range(eventTree.GetEntries()):
   # only 1 photon reco cut happens here
   if len(recoList) + len(recoTrackList) != 1:
     if len(recoList) + len(recoTrackList) == 0:
-      addHist(eventTree, protonCount, effNoPhotonHists, leadingPhoton, eventTree.xsecWeight)
+      addHist(effHists, protonCount, effNoPhotonHists, leadingPhoton, eventTree.xsecWeight)
       noEffPhotons += 1    
       continue
     elif len(recoList) + len(recoTrackList) == 2:
-      addHist(eventTree, protonCount, effTwoPhotonHists, leadingPhoton, eventTree.xsecWeight)
+      addHist(effHists, protonCount, effTwoPhotonHists, leadingPhoton, eventTree.xsecWeight)
       twoEffPhotons += 1
       continue
     else:
-      addHist(eventTree, protonCount, effManyPhotonHists, leadingPhoton, eventTree.xsecWeight)
+      addHist(effHists, protonCount, effManyPhotonHists, leadingPhoton, eventTree.xsecWeight)
       manyEffPhotons += 1
       continue
     
   #Try cutting for Shower from Charged Score 
   if recoCutShowerFromChargeScore(eventTree, recoList, recoTrackList) == False:
-    addHist(eventTree, protonCount, effShowerChargeHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effShowerChargeHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   #Cut based on Primary Score
   if recoCutPrimary(eventTree, recoList, recoTrackList) == False:
-    addHist(eventTree, protonCount, effPrimaryHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effPrimaryHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   #Try cutting based on data for Track Lengths
   if recoCutLongTracks(eventTree, fiducialData) == False:
-    addHist(eventTree, protonCount, effLongTrackHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effLongTrackHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   #Cut based on the completeness of known Muons
   if recoCutMuonCompleteness(eventTree) == False:
-    addHist(eventTree, protonCount, effMuonCompHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effMuonCompHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   # meant to reduce vertices selected when there is a clear in-time muon
   if recoCutMaxInTime(eventTree, protonCount) == False:
-    addHist(eventTree, protonCount, effMaxInTimeHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effMaxInTimeHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   if recoCutCompleteness(eventTree, recoList, recoTrackList)==False:    
-    addHist(eventTree, protonCount, effShowerCompHists, leadingPhoton, eventTree.xsecWeight)
+    addHist(effHists, protonCount, effShowerCompHists, leadingPhoton, eventTree.xsecWeight)
     continue
 
   survivesCuts += 1
 
   #Now we're pretty sure the event is legitimate, so we go ahead and graph based on the number of photons
-  addHist(eventTree, protonCount, effOnePhotonHists, leadingPhoton, eventTree.xsecWeight)
+  addHist(effHists, protonCount, effOnePhotonHists, leadingPhoton, eventTree.xsecWeight)
   oneEffPhoton += 1
 
 #LOOPS OVER - HISTOGRAM ORGANIZING TIME
 
+if args.cutMasks:
+  eventMasks.save(storePath(args.infile), args.infile, ntuplePOTsum)
+  cosmicMasks.save(storePath(args.cosmicFile), args.cosmicFile, cosmicPOTsum)
+  if beamMasks is not None:
+    beamMasks.save(storePath(args.beamFile), args.beamFile)
+
+#Big Lists, for Big Plots
+purityKeys1 = ["puritySignal",
+               "purityOffSignal",
+               "purityFiducials",
+               "purityFiducials2g",
+               "purityMuon",
+               "purityElectron",
+               "purityPion",
+               "purityProton",
+               "purityNoPhotons",
+               "purityTwoPhotons",
+               "purityManyPhotons"]
+
+purityProtonKeys1 = ["protonPuritySignal",
+                     "protonPurityOffSignal",
+                     "protonPurityFiducials",
+                     "protonPurityFiducials2g",
+                     "protonPurityMuon",
+                     "protonPurityElectron",
+                     "protonPurityPion",
+                     "protonPurityProton",
+                     "protonPurityNoPhotons",
+                     "protonPurityTwoPhotons",
+                     "protonPurityManyPhotons"]
+
+#Lists of histograms for stacking. Place with signal first, then put the others in backwards in order of application (so the last one to apply would immediately follow the signal, then the second to last, all the way down to the first)
+effKeys1 = ["effSignal",
+            "effShowerComp",
+            "effMaxInTime",
+            "effMuonComp",
+            "effLongTracks",
+            "effPrimary",
+            "effShowerCharge",
+            "effManyPhotons",
+            "effTwoPhotons",
+            "effNoPhotons",
+            "effProton",
+            "effPion",
+            "effFiducial",
+            "effCosmicPixel",
+            "effElectron",
+            "effMuon",
+            "effNoVertex"]
+effProtonKeys1 = ["effProtonSignal",
+                  "effProtonShowerComp",
+                  "effProtonMaxInTime",
+                  "effProtonMuonComp",
+                  "effProtonLongTracks",
+                  "effProtonPrimary",
+                  "effProtonShowerCharge",
+                  "effProtonManyPhotons",
+                  "effProtonTwoPhotons",
+                  "effProtonNoPhotons",
+                  "effProtonProton",
+                  "effProtonPion",
+                  "effProtonFiducial",
+                  "effProtonCosmicPixel",
+                  "effProtonElectron",
+                  "effProtonMuon",
+                  "effProtonNoVertex"]
+
+#With --partial this job is one shard of a larger sample: save the unscaled histograms, counters, POT and cosmic event
+#list, and leave the scaling and stacking to reducePartials.py once all shards are in
+if args.partial is not None:
+  partial = PartialResult("separateEvaluator")
+  for hists in [purityHists, cosmicHists, effHists] + ([beamHists] if beamTree is not None else []):
+    partial.addCategoryHistogram(hists)
+  partial.counters = dict((name, globals()[name]) for name in shards.counters)
+  partial.addPOT("ntuple", args.infile, ntuplePOTsum)
+  partial.addPOT("cosmic", args.cosmicFile, cosmicPOTsum)
+  partial.eventLists = {"cosmicEvents": cosmicEvents}
+  partial.targetPOT = targetPOT
+  partial.sources = [args.infile]
+  #Every shard reads the whole cosmic (and beam) file, so the reducer takes their histograms and counts once per file
+  partial.addShared(args.cosmicFile, cosmicHists.keys, ["untrackedCosmics"], ["cosmicEvents"])
+  if beamTree is not None:
+    partial.addShared(args.beamFile, beamHists.keys)
+  partial.addStack("purity", "purity1", "1 Gamma + 0 Sample", purityKeys1, "cosmicOnePhoton", "beamOnePhoton",
+                   "Reconstructed Leading Photon Energy (GeV)", "Events per 4.4e19 POT")
+  partial.addStack("purity", "purityProton1", "1 Gamma + 1P Sample", purityProtonKeys1, "protonCosmicOnePhoton", "protonBeamOnePhoton",
+                   "Reconstructed Leading Photon Energy (GeV)", "Events per 4.4e19 POT")
+  partial.addStack("efficiency", "TrueOutcomes1", "True 1 Gamma + 0  Outcomes", effKeys1,
+                   xTitle="True LeadingPhoton Energy (GeV)", yTitle="Events per 4.4e19 POT")
+  partial.addStack("efficiency", "TrueOutcomes1P", "True 1 Gamma + 1P  Outcomes", effProtonKeys1,
+                   xTitle="True LeadingPhoton Energy (GeV)", yTitle="Events per 4.4e19 POT")
+  partial.save(args.partial)
+  print("[separateEvaluator] wrote the partial result to", args.partial)
+  sys.exit(0)
+
 #Scaling the Cosmic Histograms
-for hist in cosmicList:
-  hist.Scale((targetPOT/cosmicPOTsum)*(ntuplePOTsum/targetPOT)) # the second factor is there to get canceled in histstacktwosignal
+cosmicHists.scale((targetPOT/cosmicPOTsum)*(ntuplePOTsum/targetPOT)) # the second factor is there to get canceled in histstacktwosignal
+
+#Make the ROOT histograms in the histogram file, so outrootfile.Write() saves them
+outrootfile.cd()
+for hists in [purityHists, cosmicHists, effHists]:
+  hists.toTH1List()
+cosmicOnePhoton, protonCosmicOnePhoton = cosmicHists.histograms(cosmicList)
+if beamTree is not None:
+  beamOnePhoton, protonBeamOnePhoton = beamHists.toTH1List(beamList)
+else:
+  beamOnePhoton = None
+  protonBeamOnePhoton = None
+
+pList1 = purityHists.histograms(purityKeys1) + [cosmicOnePhoton]
+pProtonList1 = purityHists.histograms(purityProtonKeys1) + [protonCosmicOnePhoton]
+effList1 = effHists.histograms(effKeys1)
+effProtonList1 = effHists.histograms(effProtonKeys1)
 
 
 #Stacking histograms
@@ -761,5 +924,8 @@ print("There were", totalCosmics, "total cosmics")
 print(vertexCosmics, "had a reconstructed vertex")
 print(noVertexCosmics, "had no reconstructed vertex")
 
+eventTree.eventCache.printStats("EventTree helper cache")
+cosmicTree.eventCache.printStats("cosmic helper cache")
+
 
 #print("Average vertex distance:", sum(distList)/len(distList))
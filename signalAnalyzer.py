@@ -3,6 +3,8 @@ import numpy as np
 import ROOT as rt
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from helpers.potService import sumPOT
+from helpers.histograms import CategoryHistogram
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
 parser.add_argument("-i", "--infile", type=str, required=True, help="input ntuple file")
@@ -25,41 +27,39 @@ targetPOTstring = "6.67e+20"
 
 #calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 #define histograms to fill
 #we will write histograms to output file for:
-noVertexHist1 = rt.TH1F("NoVertexHist1", "Only photons" ,60,0,2)
-successHist1 = rt.TH1F("SuccessHist1", "Only photons" ,60,0,2)
-NCFailHist1 = rt.TH1F("NCFailHist1", "Photons and protons",60,0,2)
-tooManyPhotonHist1 = rt.TH1F("photonFailHist1", "Photons and charged pions",60,0,2)
-tooFewPhotonHist1 = rt.TH1F("photonFailHist1", "Photons and charged pions",60,0,2)
-fiducialFailHist1 = rt.TH1F("fiducialFailHist1", "Photons, protons, and charged pions", 60, 0, 2)
-pionProtonFailHist1 = rt.TH1F("pionProtonFailHist1", "Photons, protons, and charged pions", 60, 0, 2)
-noPhotonHist1 =	rt.TH1F("noPhotonHist1", "Photons and charged pions",60,0,2)
-totalHist1 = rt.TH1F("totalHist1", "Photons and charged pions",60,0,2)
-
-noVertexHist2 =	rt.TH1F("NoVertexHist2", "Only photons" ,60,0,2)
-successHist2 = rt.TH1F("SuccessHist1", "Only photons" ,60,0,2)
-NCFailHist2 = rt.TH1F("NCFailHist1", "Photons and protons",60,0,2)
-tooManyPhotonHist2 = rt.TH1F("photonFailHist2", "Photons and charged pions",60,0,2)
-tooFewPhotonHist2 = rt.TH1F("photonFailHist2", "Photons and charged pions",60,0,2)
-fiducialFailHist2 = rt.TH1F("fiducialFailHist1", "Photons, protons, and charged pions", 60, 0, 2)
-pionProtonFailHist2 = rt.TH1F("pionProtonFailHist1", "Photons, protons, and charged pions", 60, 0, 2)
-noPhotonHist2 =	rt.TH1F("noPhotonHist3", "Photons and charged pions",60,0,2)
-totalHist2 = rt.TH1F("totalHist2", "Photons and charged pions",60,0,2)
-
-noVertexHist3 =	rt.TH1F("NoVertexHist3", "Only photons" ,60,0,2)
-successHist3 = rt.TH1F("SuccessHist1", "Only photons" ,60,0,2)
-NCFailHist3 = rt.TH1F("NCFailHist1", "Photons and protons",60,0,2)
-tooManyPhotonHist3 = rt.TH1F("photonFailHist3", "Photons and charged pions",60,0,2)
-tooFewPhotonHist3 = rt.TH1F("photonFailHist3", "Photons and charged pions",60,0,2)
-noPhotonHist3 = rt.TH1F("noPhotonHist3", "Photons and charged pions",60,0,2)
-fiducialFailHist3 = rt.TH1F("fiducialFailHist1", "Photons, protons, and charged pions", 60, 0, 2)
-pionProtonFailHist3 = rt.TH1F("pionProtonFailHist1", "Photons, protons, and charged pions", 60, 0, 2)
-totalHist3 = rt.TH1F("totalHist3", "Photons and charged pions",60,0,2)
+#Outcome categories, keyed by (outcome, number of true photons: 1, 2 or 3 for 3+)
+outcomeHists = CategoryHistogram([(("noVertex", 1), "NoVertexHist1", "Only photons"),
+                                  (("success", 1), "SuccessHist1", "Only photons"),
+                                  (("NCFail", 1), "NCFailHist1", "Photons and protons"),
+                                  (("tooManyPhoton", 1), "photonFailHist1", "Photons and charged pions"),
+                                  (("tooFewPhoton", 1), "photonFailHist1", "Photons and charged pions"),
+                                  (("fiducialFail", 1), "fiducialFailHist1", "Photons, protons, and charged pions"),
+                                  (("pionProtonFail", 1), "pionProtonFailHist1", "Photons, protons, and charged pions"),
+                                  (("noPhoton", 1), "noPhotonHist1", "Photons and charged pions"),
+                                  (("total", 1), "totalHist1", "Photons and charged pions"),
+                                  (("noVertex", 2), "NoVertexHist2", "Only photons"),
+                                  (("success", 2), "SuccessHist1", "Only photons"),
+                                  (("NCFail", 2), "NCFailHist1", "Photons and protons"),
+                                  (("tooManyPhoton", 2), "photonFailHist2", "Photons and charged pions"),
+                                  (("tooFewPhoton", 2), "photonFailHist2", "Photons and charged pions"),
+                                  (("fiducialFail", 2), "fiducialFailHist1", "Photons, protons, and charged pions"),
+                                  (("pionProtonFail", 2), "pionProtonFailHist1", "Photons, protons, and charged pions"),
+                                  (("noPhoton", 2), "noPhotonHist3", "Photons and charged pions"),
+                                  (("total", 2), "totalHist2", "Photons and charged pions"),
+                                  (("noVertex", 3), "NoVertexHist3", "Only photons"),
+                                  (("success", 3), "SuccessHist1", "Only photons"),
+                                  (("NCFail", 3), "NCFailHist1", "Photons and protons"),
+                                  (("tooManyPhoton", 3), "photonFailHist3", "Photons and charged pions"),
+                                  (("tooFewPhoton", 3), "photonFailHist3", "Photons and charged pions"),
+                                  (("noPhoton", 3), "noPhotonHist3", "Photons and charged pions"),
+                                  (("fiducialFail", 3), "fiducialFailHist1", "Photons, protons, and charged pions"),
+                                  (("pionProtonFail", 3), "pionProtonFailHist1", "Photons, protons, and charged pions"),
+                                  (("total", 3), "totalHist3", "Photons and charged pions")], 60, 0, 2)
+outcomeNames = ["noVertex", "success", "NCFail", "tooManyPhoton", "tooFewPhoton", "fiducialFail", "pionProtonFail", "noPhoton", "total"]
 
 #set histogram axis titles and increase line width
 def configureHist(h):
@@ -68,37 +68,6 @@ def configureHist(h):
   h.SetLineWidth(2)
   return h
 
-#Scale the histograms
-noVertexHist1 = configureHist(noVertexHist1)
-totalHist1 = configureHist(totalHist1)
-successHist1 = configureHist(successHist1)
-NCFailHist1  = configureHist(NCFailHist1)
-tooManyPhotonHist1 = configureHist(tooManyPhotonHist1)
-tooFewPhotonHist1 = configureHist(tooFewPhotonHist1)
-fiducialFailHist1 = configureHist(fiducialFailHist1)
-pionProtonFailHist1 = configureHist(pionProtonFailHist1)
-noPhotonHist1 = configureHist(noPhotonHist1)
-
-noVertexHist2 =	configureHist(noVertexHist2)
-totalHist2 = configureHist(totalHist2)
-successHist2 = configureHist(successHist2)
-NCFailHist2  = configureHist(NCFailHist2)
-tooManyPhotonHist2 = configureHist(tooManyPhotonHist2)
-tooFewPhotonHist2 = configureHist(tooFewPhotonHist2)
-fiducialFailHist2 = configureHist(fiducialFailHist2)
-pionProtonFailHist2 = configureHist(pionProtonFailHist2)
-noPhotonHist2 =	configureHist(noPhotonHist2)
-
-noVertexHist3 =	configureHist(noVertexHist3)
-totalHist3 = configureHist(totalHist3)
-successHist3 = configureHist(successHist3)
-NCFailHist3 = configureHist(NCFailHist3)
-tooManyPhotonHist3 = configureHist(tooManyPhotonHist3)
-tooFewPhotonHist3 = configureHist(tooFewPhotonHist3)
-fiducialFailHist3 = configureHist(fiducialFailHist3)
-pionProtonFailHist3 = configureHist(pionProtonFailHist3)
-noPhotonHist3 =	configureHist(noPhotonHist3)
-
 #Set detector min/max and fiducial width (cm)
 xMin, xMax = 0, 256
 yMin, yMax = -116.5, 116.5
@@ -252,46 +221,17 @@ for i in range(eventTree.GetEntries()):
       fiducialFail = True
   
   #NOW WE FILL THE HISTOGRAMS
-  #Fillin the histogram displaying total events
-  if len(truePhotonList) == 1:
-    totalHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-  elif len(truePhotonList) == 2:
-    leadingPhoton = scaledEnergy[0]
-    for x in range(len(scaledEnergy)):
-      if scaledEnergy[x] > leadingPhoton:
-        leadingPhoton = scaledEnergy[x]
-    totalHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-  else:
-    leadingPhoton = scaledEnergy[0]
-    for x in range(len(scaledEnergy)):
-      if scaledEnergy[x] > leadingPhoton:
-        leadingPhoton = scaledEnergy[x]
-    totalHist3.Fill(leadingPhoton, eventTree.xsecWeight)
+  photonSample = min(len(truePhotonList), 3)
+  leadingPhoton = scaledEnergy[0] if len(truePhotonList) == 1 else max(scaledEnergy)
+  outcomes = ["total"]
 
-  #Events with no vertex!                                                                                      
+  #Events with no vertex!
   if eventTree.foundVertex != 1:
     if len(truePhotonList) == 1:
       noVertex += 1
       if len(recoPhotonIDs) == 0:
         makesSense += 1
-    if len(truePhotonList) == 1:
-      noVertexHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      noVertexHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      noVertexHist3.Fill(leadingPhoton, eventTree.xsecWeight)
-
+    outcomes.append("noVertex")
 
   #Filling in the graph for no photons
   if len(recoPhotonIDs) == 0:
@@ -299,145 +239,51 @@ for i in range(eventTree.GetEntries()):
       noPhotons += 1
       if eventTree.foundVertex != 1:
         noVertexNoPhotons += 1
-    if len(truePhotonList) == 1:
-      noPhotonHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      noPhotonHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      noPhotonHist3.Fill(leadingPhoton, eventTree.xsecWeight)
-    
+    outcomes.append("noPhoton")
+
   #Filling graphs for the erroneous detection of charged current
   if chargeCurrent == True:
-    if len(truePhotonList) == 1:
-      NCFailHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      NCFailHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      NCFailHist3.Fill(leadingPhoton, eventTree.xsecWeight)
+    outcomes.append("NCFail")
 
   #Filling graphs for the erroneous detection of protons or pions among the primary particles
   if chargedPionFound == True or protonFound == True:
-    if len(truePhotonList) == 1:
-      pionProtonFailHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      pionProtonFailHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      pionProtonFailHist3.Fill(leadingPhoton, eventTree.xsecWeight)
+    outcomes.append("pionProtonFail")
 
   #Filling graphs for erroneously low nonzero photon counts
   if len(truePhotonList) > len(recoPhotonIDs) and len(recoPhotonIDs) != 0:
-    if len(truePhotonList) == 1:
-      tooFewPhotonHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      tooFewPhotonHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      tooFewPhotonHist3.Fill(leadingPhoton, eventTree.xsecWeight)
+    outcomes.append("tooFewPhoton")
 
   #Filling graphs for erroneously high photon counts
   if len(truePhotonList) < len(recoPhotonIDs):
-    if len(truePhotonList) == 1:
-      tooManyPhotonHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      tooManyPhotonHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      tooManyPhotonHist3.Fill(leadingPhoton, eventTree.xsecWeight)
+    outcomes.append("tooManyPhoton")
 
-  
-      
   #Filling graphs for vertices erroneously placed outside of fiducial
   if fiducialFail == True:
-    if len(truePhotonList) == 1:
-      fiducialFailHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      fiducialFailHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      fiducialFailHist3.Fill(leadingPhoton, eventTree.xsecWeight)
-
+    outcomes.append("fiducialFail")
 
   #Filling the success graph:
   if fiducialFail == False and len(truePhotonList) == len(recoPhotonIDs) and chargedPionFound == False and protonFound == False and chargeCurrent == False:
     successCount += 1
     if notAllPass == True:
       oddSuccessCount += 1
-    if len(truePhotonList) == 1:
-      successHist1.Fill(scaledEnergy[0], eventTree.xsecWeight)
-
-    elif len(truePhotonList) == 2:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      successHist2.Fill(leadingPhoton, eventTree.xsecWeight)
-
-    else:
-      leadingPhoton = scaledEnergy[0]
-      for x in range(len(scaledEnergy)):
-        if scaledEnergy[x] > leadingPhoton:
-          leadingPhoton = scaledEnergy[x]
-      successHist3.Fill(leadingPhoton, eventTree.xsecWeight)
+    outcomes.append("success")
+
+  for outcome in outcomes:
+    outcomeHists.Fill((outcome, photonSample), leadingPhoton, eventTree.xsecWeight)
 
 #----- end of event loop ---------------------------------------------#
 
+#The ROOT histograms the plots below are made from
+for outcome in outcomeNames:
+  for photonSample in [1, 2, 3]:
+    configureHist(outcomeHists.histogram((outcome, photonSample)).toTH1())
+(noVertexHist1, successHist1, NCFailHist1, tooManyPhotonHist1, tooFewPhotonHist1, fiducialFailHist1, pionProtonFailHist1, noPhotonHist1, totalHist1) = \
+  outcomeHists.toTH1List([(outcome, 1) for outcome in outcomeNames])
+(noVertexHist2, successHist2, NCFailHist2, tooManyPhotonHist2, tooFewPhotonHist2, fiducialFailHist2, pionProtonFailHist2, noPhotonHist2, totalHist2) = \
+  outcomeHists.toTH1List([(outcome, 2) for outcome in outcomeNames])
+(noVertexHist3, successHist3, NCFailHist3, tooManyPhotonHist3, tooFewPhotonHist3, fiducialFailHist3, pionProtonFailHist3, noPhotonHist3, totalHist3) = \
+  outcomeHists.toTH1List([(outcome, 3) for outcome in outcomeNames])
+
 #scale histograms to target POT
 successHist1.Scale(targetPOT/ntuplePOTsum)
 NCFailHist1.Scale(targetPOT/ntuplePOTsum)
@@ -3,6 +3,7 @@ import sys, argparse
 import numpy as np
 import ROOT as rt
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from helpers.potService import sumPOT
 
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
@@ -22,9 +23,7 @@ potTree = ntuple_file.Get("potTree")
 
 #calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 #Set detector volumes
 xMin, xMax = 0, 256
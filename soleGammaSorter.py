@@ -4,6 +4,7 @@ import numpy as np
 import ROOT as rt
 
 from helpers.larflowreco_ana_funcs import getCosThetaGravVector
+from helpers.potService import sumPOT
 
 
 parser = argparse.ArgumentParser("Make energy histograms from a bnb nu overlay ntuple file")
@@ -27,9 +28,7 @@ targetPOTstring = "6.67e+20"
 
 #calculate POT represented by full ntuple file after applying cross section weights
 ntuplePOTsum = 0.
-for i in range(potTree.GetEntries()):
-  potTree.GetEntry(i)
-  ntuplePOTsum = ntuplePOTsum + potTree.totGoodPOT
+ntuplePOTsum = sumPOT(potTree)
 
 #define histograms to fill
 #we will write histograms to output file for:
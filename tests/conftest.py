@@ -0,0 +1,5 @@
+#The tests import the scripts' modules (cuts, helpers, ...) from the repository root, as the scripts themselves do
+#Every module needs PyROOT to import; the test files skip themselves where it is not installed
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
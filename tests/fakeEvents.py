@@ -0,0 +1,103 @@
+#Random EventTree-like events for the tests: each FakeEvent carries the branches the cuts.py selections read, as plain
+#Python values (scalars) and lists (per-object branches), rounded to float32 the way the ntuples store them
+#makeBatch turns a list of them into the EventColumns batch the batch selections take, so both can run on the same events
+import numpy as np
+
+from helpers.columnLoader import JaggedArray, EventColumns
+
+ranges = {"X": (-10, 270), "Y": (-125, 125), "Z": (-10, 1050)}
+
+
+class FakeEvent:
+  pass
+
+
+def float32(value):
+  return float(np.float32(value))
+
+
+def makeEvent(rng):
+  event = FakeEvent()
+  event.foundVertex = int(rng.random() < 0.8)
+  for prefix in ["vtx", "trueVtx"]:
+    for axis, (low, high) in ranges.items():
+      setattr(event, prefix + axis, rng.uniform(low, high))
+  nShowers, nTracks, nParts = int(rng.integers(0, 5)), int(rng.integers(0, 5)), int(rng.integers(0, 12))
+  event.nShowers, event.nTracks, event.nTrueSimParts, event.nTruePrimParts = nShowers, nTracks, nParts, nParts
+
+  def uniform(n, low, high):
+    return list(rng.uniform(low, high, n))
+
+  def integers(n, low, high):
+    return [int(x) for x in rng.integers(low, high, n)]
+
+  for prefix, n in [("shower", nShowers), ("track", nTracks)]:
+    for axis, (low, high) in ranges.items():
+      setattr(event, prefix + "StartPos" + axis, uniform(n, low, high))
+      setattr(event, prefix + "EndPos" + axis, uniform(n, low, high))
+      setattr(event, prefix + "StartDir" + axis, uniform(n, -1, 1))
+    setattr(event, prefix + "PID", [int(x) for x in rng.choice([22, 11, 13, 2212, 211, -211], n)])
+    setattr(event, prefix + "Classified", integers(n, 0, 2))
+    setattr(event, prefix + "RecoE", uniform(n, 0, 400))
+    setattr(event, prefix + "Size", integers(n, 0, 1000))
+    setattr(event, prefix + "Process", integers(n, 0, 3))
+    setattr(event, prefix + "IsSecondary", integers(n, 0, 2))
+    setattr(event, prefix + "TrueTID", integers(n, 1, 15))
+    for score in ["FromChargedScore", "PrimaryScore", "ElScore", "MuScore", "FromNeutralScore"]:
+      setattr(event, prefix + score, uniform(n, -8, 8))
+    setattr(event, prefix + "Comp", uniform(n, 0, 1))
+
+  #Some mothers are primaries (TID == MID), about half the particles start at the true vertex
+  event.trueSimPartTID = [int(x) for x in rng.permutation(np.arange(1, nParts + 1))]
+  event.trueSimPartMID = integers(nParts, 0, nParts + 2)
+  for i in range(nParts):
+    if rng.random() < 0.3:
+      event.trueSimPartMID[i] = event.trueSimPartTID[i]
+  event.trueSimPartPDG = [int(x) for x in rng.choice([22, 22, 22, 11, 13, 2212, 211, 111], nParts)]
+  event.trueSimPartProcess = integers(nParts, 0, 2)
+  near = rng.random(nParts) < 0.5
+  for axis in "XYZ":
+    vertex = getattr(event, "trueVtx" + axis)
+    setattr(event, "trueSimPart" + axis, [vertex + (rng.uniform(-0.1, 0.1) if near[i] else rng.uniform(-5, 5)) for i in range(nParts)])
+  for axis, (low, high) in ranges.items():
+    setattr(event, "trueSimPartEDep" + axis, uniform(nParts, low, high))
+    setattr(event, "trueSimPartEnd" + axis, uniform(nParts, low, high))
+  for plane in "UVY":
+    setattr(event, "trueSimPartPixelSum%splane" % plane, uniform(nParts, 0, 5000))
+  event.trueSimPartE = uniform(nParts, 100, 1500)
+  for axis in "xyz":
+    setattr(event, "trueSimPartP" + axis, uniform(nParts, -300, 300))
+  event.truePrimPartPDG = list(event.trueSimPartPDG)
+  event.truePrimPartE = [x/1000 for x in event.trueSimPartE]
+  for axis in "xyz":
+    setattr(event, "truePrimPartP" + axis, [x/1000 for x in getattr(event, "trueSimPartP" + axis)])
+
+  event.vtxFracHitsOnCosmic = rng.uniform(0, 1.2)
+  event.vtxMaxIntimePixelSum = rng.uniform(0, 60000)
+  event.trueNuCCNC = int(rng.integers(0, 2))
+  event.xsecWeight = rng.uniform(0.5, 1.5)
+
+  for name, value in list(vars(event).items()):
+    if isinstance(value, float):
+      setattr(event, name, float32(value))
+    elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], float):
+      setattr(event, name, [float32(x) for x in value])
+  return event
+
+
+def makeEvents(n, seed=0):
+  rng = np.random.default_rng(seed)
+  return [makeEvent(rng) for i in range(n)]
+
+
+def makeBatch(events, entryStart=0):
+  #Per-object branches are float32 if any event has a float in them, int32 otherwise
+  columns = {}
+  for name, value in vars(events[0]).items():
+    if isinstance(value, list):
+      lists = [getattr(event, name) for event in events]
+      isFloat = any(len(x) > 0 and isinstance(x[0], float) for x in lists)
+      columns[name] = JaggedArray.fromLists(lists, dtype=np.float32 if isFloat else np.int32)
+    else:
+      columns[name] = np.array([getattr(event, name) for event in events], dtype=np.float32 if isinstance(value, float) else np.int32)
+  return EventColumns(columns, entryStart)
@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+import analyses
+from cuts import trueCCCut, recoCCCut, trueFiducialCut, recoFiducialCut, truePiPlusCut, recoPiPlusCut, trueProtonSelection, recoProtonSelection, \
+                 truePhotonSelection, recoPhotonSelection
+from helpers.analysisRunner import Analysis, BatchAnalysis, analysisRegistry
+from fakeEvents import makeEvents, makeBatch
+
+context = {"infile": "fake.root", "nEntries": 0, "ntuplePOT": 1e20}
+
+
+def fakeEvents(n, seed):
+  events = makeEvents(n, seed=seed)
+  rng = np.random.default_rng(seed)
+  for event in events:
+    event.showerNHits = [int(x) for x in rng.integers(0, 5000, event.nShowers)]
+  return events
+
+
+def runPlugin(name, events, **options):
+  analysis = analysisRegistry[name](**options)
+  analysis.begin(context)
+  for start in range(0, len(events), 150):
+    analysis.processBatch(makeBatch(events[start:start+150], entryStart=start))
+  return analysis
+
+
+def test_process_methods_are_abstract():
+  class NoEntry(Analysis):
+    name = "noEntry"
+
+  class NoBatch(BatchAnalysis):
+    name = "noBatch"
+
+  with pytest.raises(TypeError):
+    NoEntry()
+  with pytest.raises(TypeError):
+    NoBatch()
+
+
+def test_registered_plugins_instantiate():
+  assert {"ncPiZero", "cutFlow1g1p", "darkSurvey", "npNgReco", "combined1p2g"} <= set(analysisRegistry)
+  for name, analysisClass in analysisRegistry.items():
+    analysis = analysisClass()
+    assert analysis.outfile == analysisClass.defaultOutfile
+
+
+def test_dark_survey_tallies(capsys):
+  events = fakeEvents(400, seed=11)
+  analysis = runPlugin("darkSurvey", events)
+  for singular, plural, pdg in analyses.darkSurvey.particleTypes:
+    trueCounts, recoCounts = [0, 0, 0, 0], [0, 0, 0, 0]
+    for event in events:
+      nTrue = sum(abs(x) == pdg for x in event.trueSimPartPDG)
+      nReco = sum(abs(x) == pdg for x in event.showerPID) + sum(abs(x) == pdg for x in event.trackPID)
+      trueCounts[min(nTrue, 3)] += 1
+      recoCounts[min(nReco, 3)] += 1
+    assert analysis.trueCounts[pdg] == trueCounts, plural
+    assert analysis.recoCounts[pdg] == recoCounts, plural
+  assert analysis.vertexFound == sum(event.foundVertex == 1 for event in events)
+  assert analysis.showerClassified == sum(sum(x != 0 for x in event.showerClassified) for event in events)
+  assert analysis.showerHits.entries == sum(event.nShowers for event in events)
+
+
+def referenceNpNg(event, energyThresholds):
+  #maxPrograms/NpNgReco.py's loop body: (number of reco photons, number of reco protons) or None if the event is cut
+  if event.foundVertex != 1:
+    return None
+  if event.vtxX <= 10 or event.vtxX >= 246 or event.vtxY <= -106.5 or event.vtxY >= 106.5 or event.vtxZ <= 10 or event.vtxZ >= 1026:
+    return None
+  if event.vtxFracHitsOnCosmic >= 1.:
+    return None
+  for i in range(event.nTracks):
+    if event.trackIsSecondary[i] == 0 and abs(event.trackPID[i]) in (11, 13):
+      return None
+  for i in range(event.nTracks):
+    if abs(event.trackPID[i]) == 211 and (event.trackRecoE[i] >= 30 or not energyThresholds):
+      return None
+  nProtons = sum(abs(event.trackPID[i]) == 2212 and (event.trackRecoE[i] >= 60 or not energyThresholds) for i in range(event.nTracks))
+  nPhotons = sum(event.showerPID[i] == 22 for i in range(event.nShowers))
+  if nProtons == 0 or nPhotons == 0:
+    return None
+  return nPhotons, nProtons
+
+
+@pytest.mark.parametrize("energyThresholds", [True, False])
+def test_np_ng_reco_matches_script(energyThresholds):
+  events = fakeEvents(2000, seed=12)
+  analysis = runPlugin("npNgReco", events, nBins=60, energyThresholds=energyThresholds)
+  expected = [np.zeros(62) for hist in analysis.photonHists]
+  for event in events:
+    result = referenceNpNg(event, energyThresholds)
+    if result is not None:
+      nPhotons, nProtons = result
+      expected[min(nPhotons, 3) - 1][analysis.photonHists[0].binIndex([nProtons])[0]] += event.xsecWeight
+  assert sum(hist.entries for hist in analysis.photonHists) > 0
+  for hist, reference in zip(analysis.photonHists, expected):
+    assert hist.sumw == pytest.approx(reference)
+
+
+def makeSignalLike(event):
+  #Turns a fake event with at least 3 true particles, 1 track and 2 showers into a true and reco NC 1p2g candidate; the
+  #other fields stay random, so some still fail a cut
+  event.trueNuCCNC = 1
+  event.vtxFracHitsOnCosmic = 0.5
+  event.vtxMaxIntimePixelSum = 1000.
+  for prefix in ["trueVtx", "vtx"]:
+    event.__dict__.update({prefix + "X": 128., prefix + "Y": 0., prefix + "Z": 500.})
+  event.truePrimPartPDG = [22 if pdg in (211, -211) else pdg for pdg in event.truePrimPartPDG]
+  for i, pdg in enumerate([2212, 22, 22]):
+    event.trueSimPartPDG[i] = pdg
+    event.trueSimPartProcess[i] = 0 if pdg == 2212 else 1
+    event.trueSimPartE[i], event.trueSimPartPx[i], event.trueSimPartPy[i], event.trueSimPartPz[i] = 1200., 0., 0., 800.
+    event.trueSimPartX[i], event.trueSimPartY[i], event.trueSimPartZ[i] = 128., 0., 500.
+    event.trueSimPartEDepX[i], event.trueSimPartEDepY[i], event.trueSimPartEDepZ[i] = 128., 0., 520.
+    event.trueSimPartPixelSumYplane[i] = 3000.
+  for i in range(3, event.nTrueSimParts):
+    if event.trueSimPartPDG[i] == 2212:
+      event.trueSimPartProcess[i] = 1
+  event.trackPID[0], event.trackRecoE[0], event.trackClassified[0] = 2212, 100., 1
+  for i in range(1, event.nTracks):
+    event.trackPID[i], event.trackClassified[i] = 22, 1
+  for i in range(2):
+    event.showerPID[i], event.showerStartPosX[i], event.showerStartPosY[i], event.showerStartPosZ[i] = 22, 128., 0., 500.
+  for i in range(2, event.nShowers):
+    event.showerPID[i] = 11
+    event.showerIsSecondary[i] = 1
+
+
+def test_combined_1p2g_matches_cuts():
+  events = fakeEvents(2000, seed=13)
+  for event in events[::2]:
+    if event.nTrueSimParts >= 3 and event.nTracks >= 1 and event.nShowers >= 2:
+      makeSignalLike(event)
+  analysis = runPlugin("combined1p2g", events)
+  trueTotal, recoTotal = 0., 0.
+  for event in events:
+    if not (trueCCCut(event) or trueFiducialCut(event, 10) or event.vtxFracHitsOnCosmic >= 1. or truePiPlusCut(event)) \
+       and trueProtonSelection(event)[0] == 1 and len(truePhotonSelection(event, 10)[0]) == 2:
+      trueTotal += event.xsecWeight
+    if not (recoCCCut(event) or recoFiducialCut(event, 10) or event.vtxFracHitsOnCosmic >= 1. or recoPiPlusCut(event)) \
+       and recoProtonSelection(event)[0] == 1 and len(recoPhotonSelection(event, 10)[0]) == 2:
+      recoTotal += event.xsecWeight
+  assert trueTotal > 0 and recoTotal > 0
+  assert analysis.trueTotalHist.sumw.sum() == pytest.approx(trueTotal)
+  assert analysis.recoTotalHist.sumw.sum() == pytest.approx(recoTotal)
+  #Every selected event ends up in exactly one category of each breakdown
+  efficiency = [analysis.recoSignalHist, analysis.recoNoVertexHist, analysis.recoNoPhotonHist, analysis.recoOnePhotonHist, analysis.recoManyPhotonHist,
+                analysis.recoCCHist, analysis.recoOutFiducialHist, analysis.recoPiPlusHist, analysis.recoNoProtonHist, analysis.recoPluralProtonHist]
+  purity = [analysis.trueSignalHist, analysis.trueNoPhotonHist, analysis.trueOnePhotonHist, analysis.trueManyPhotonHist, analysis.trueCCHist,
+            analysis.trueOutFiducialHist, analysis.truePiPlusHist, analysis.trueNoProtonHist, analysis.truePluralProtonHist]
+  assert sum(hist.sumw.sum() for hist in efficiency) == pytest.approx(trueTotal)
+  assert sum(hist.sumw.sum() for hist in purity) == pytest.approx(recoTotal)
+  assert analysis.recoSignalHist.entries > 0 and analysis.trueSignalHist.entries > 0
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+import cuts
+import batchCuts
+from fiducial import fiducialSpec
+from fakeEvents import makeEvents, makeBatch
+
+
+def photonEvents(n, seed):
+  #Fake events with a TID repeated now and then, which the TID lookups must resolve to the last row as the scans did
+  events = makeEvents(n, seed=seed)
+  rng = np.random.default_rng(seed)
+  for event in events:
+    if event.nTrueSimParts > 2 and rng.random() < 0.2:
+      event.trueSimPartTID[0] = event.trueSimPartTID[1]
+  return events
+
+
+def localIndices(mask, i):
+  return [int(x) for x in np.nonzero(mask[i])[0]]
+
+
+@pytest.fixture(scope="module")
+def events():
+  return photonEvents(1500, seed=13)
+
+
+@pytest.fixture(scope="module")
+def batch(events):
+  return makeBatch(events)
+
+
+@pytest.mark.parametrize("width, photonWidth", [(10, 3), (20, 10)])
+@pytest.mark.parametrize("threshold, minPlanes", [(5.0, 2), (10., 1), (3., 3)])
+def test_true_photon_list_matches_cuts(events, batch, width, photonWidth, threshold, minPlanes):
+  fiducialData = fiducialSpec(width, photonWidth)
+  mask = batchCuts.truePhotonList(batch, fiducialData, threshold, minPlanes)
+  assert mask.content.any()
+  for i, event in enumerate(events):
+    assert localIndices(mask, i) == cuts.truePhotonList(event, fiducialData, threshold, minPlanes), i
+
+
+@pytest.mark.parametrize("width, photonWidth", [(10, 3), (20, 10)])
+def test_photon_lists_match_cuts(events, batch, width, photonWidth):
+  fiducialData = fiducialSpec(width, photonWidth)
+  bottomless = batchCuts.trueBottomlessPhotonList(batch, fiducialData)
+  overlap = batchCuts.trueCutOverlapPhotonList(batch, fiducialData)
+  for i, event in enumerate(events):
+    assert localIndices(bottomless, i) == cuts.trueBottomlessPhotonList(event, fiducialData), i
+    assert localIndices(overlap, i) == cuts.trueCutOverlapPhotonList(event, fiducialData), i
+
+
+@pytest.mark.parametrize("width", [5, 10, 20])
+def test_photon_selections_match_cuts(events, batch, width):
+  tids, leading, mask = batchCuts.truePhotonSelection(batch, width)
+  piZeroTIDs, piZeroLeading = batchCuts.truePhotonSelectionPiZero(batch, width)
+  oldTIDs, oldLeading = batchCuts.truePhotonSelectionOldNtuple(batch, width)
+  assert tids.counts.sum() > 0 and piZeroTIDs.counts.sum() > 0 and oldTIDs.counts.sum() > 0
+  for i, event in enumerate(events):
+    assert (list(tids[i]), leading[i], localIndices(mask, i)) == tuple(cuts.truePhotonSelection(event, width)), i
+    assert (list(piZeroTIDs[i]), piZeroLeading[i]) == cuts.truePhotonSelectionPiZero(event, width), i
+    assert (list(oldTIDs[i]), oldLeading[i]) == cuts.truePhotonSelectionOldNtuple(event, width), i
+
+
+def test_true_proton_selection_matches_cuts(events, batch):
+  counts, tids, index = batchCuts.trueProtonSelection(batch)
+  with np.errstate(invalid="ignore"):
+    for i, event in enumerate(events):
+      assert (counts[i], tids[i], index[i]) == cuts.trueProtonSelection(event), i
@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("ROOT")
+
+from helpers.branchTracer import BranchTracer, BranchGuard
+
+
+class Branch:
+  def __init__(self, name):
+    self.name = name
+
+  def GetName(self):
+    return self.name
+
+
+class SwitchableTree:
+  #Just enough of a TTree for the tracer and the guard: branches that can be switched off, and a count of the reads
+  def __init__(self, values):
+    self.__dict__["values"] = values
+    self.__dict__["status"] = dict((name, 1) for name in values)
+    self.__dict__["entry"] = -1
+    self.__dict__["reads"] = 0
+
+  def GetListOfBranches(self):
+    return [Branch(name) for name in self.values]
+
+  def GetBranchStatus(self, name):
+    return self.status[name]
+
+  def SetBranchStatus(self, name, status):
+    self.status[name] = status
+
+  def GetBranch(self, name):
+    return None
+
+  def GetEntry(self, i):
+    self.__dict__["entry"] = i
+    self.__dict__["reads"] += 1
+    return 1
+
+  def GetReadEntry(self):
+    return self.entry
+
+  def __getattr__(self, name):
+    return self.__dict__["values"][name]
+
+
+def test_tracer_records_reads():
+  tracer = BranchTracer(SwitchableTree({"vtxX": 1.0, "xsecWeight": 0.5}))
+  tracer.vtxX
+  assert tracer.accessed == set(["vtxX"])
+
+
+def test_guard_switches_untraced_branch_on(capsys):
+  tree = SwitchableTree({"vtxX": 1.0, "xsecWeight": 0.5})
+  tree.SetBranchStatus("xsecWeight", 0)
+  guard = BranchGuard(tree, ["vtxX"])
+  guard.GetEntry(7)
+  assert guard.xsecWeight == 0.5
+  assert tree.status["xsecWeight"] == 1
+  #The entry is read again now that the branch is on, and only the first read warns
+  assert tree.reads == 2 and tree.entry == 7
+  guard.xsecWeight
+  assert tree.reads == 2
+  assert capsys.readouterr().out.count("xsecWeight") == 1
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from helpers.shardRunner import ShardRunner
+from helpers.histograms import Histogram1D, CategoryHistogram
+from helpers.cutMaskStore import CutMaskWriter
+from helpers.checkpoint import Checkpoint, parseInterval
+
+
+class Killed(Exception):
+  pass
+
+
+def runJob(path=None, resume=False, killAt=None, nEntries=20001, workers=1):
+  #A script with two loops over the same entries, in a fresh namespace (a new process); killAt=(loop, entry) stops it
+  #there the way a kill would, without the loop finishing
+  rng = np.random.default_rng(24)
+  data, weights = rng.normal(1, 0.5, nEntries), rng.uniform(0.1, 3, nEntries)
+  namespace = {"hist": Histogram1D("hist", "hist", 60, 0, 3),
+               "categories": CategoryHistogram([("a", "histA", "A"), ("b", "histB", "B")], 60, 0, 3),
+               "masks": CutMaskWriter(nEntries, ["x", "AllCuts"]), "n": 0, "events": []}
+  checkpoint = None if path is None else Checkpoint(path, 2000, None, stamp=("input.root", 1), resume=resume)
+  shards = ShardRunner(workers, namespace, counters=["n"], lists=["events"], checkpoint=checkpoint)
+  for loop in range(2):
+    for i in shards.entries(nEntries, [namespace["masks"]]):
+      if (loop, i) == killAt:
+        raise Killed()
+      x = data[i] + loop
+      namespace["n"] += 1
+      namespace["masks"].setReco(i, {"x": x > 1, "AllCuts": x > 1.5}, x)
+      if x < 0.2:
+        continue
+      namespace["hist"].Fill(x, weights[i])
+      namespace["categories"].Fill("a" if i % 2 else "b", x, weights[i])
+      if x > 2.5:
+        namespace["events"].append(i)
+  return namespace
+
+
+def assertSameOutput(namespace, reference):
+  assert namespace["n"] == reference["n"]
+  assert namespace["events"] == reference["events"]
+  for name in ["hist", "categories"]:
+    assert np.array_equal(namespace[name].sumw, reference[name].sumw)
+    assert np.array_equal(namespace[name].sumw2, reference[name].sumw2)
+  assert np.array_equal(namespace["masks"].recoBits, reference["masks"].recoBits)
+
+
+def test_parse_interval():
+  assert parseInterval("7000") == (7000, None)
+  assert parseInterval("15m") == (None, 900.)
+
+
+@pytest.mark.parametrize("kills", [[(1, 5000)], [(1, 5000), (1, 5500)], [(0, 3000), (1, 5000), (1, 5500)], [(1, 5000), (1, 5000)]])
+def test_killed_runs_resume_to_the_same_output(tmp_path, kills):
+  #Killed again before the next checkpoint of the interrupted loop: the second resume must not start that loop over
+  reference = runJob()
+  path = str(tmp_path / "job.checkpoint")
+  for k, killAt in enumerate(kills):
+    with pytest.raises(Killed):
+      runJob(path, resume=k > 0, killAt=killAt)
+  assertSameOutput(runJob(path, resume=True), reference)
+
+
+def test_resume_with_workers(tmp_path):
+  #With several workers the checkpoints come after each loop; the first loop is not run again
+  reference = runJob()
+  path = str(tmp_path / "job.checkpoint")
+  with pytest.raises(Killed):
+    runJob(path, killAt=(1, 5000))
+  assertSameOutput(runJob(path, resume=True, workers=3), reference)
+
+
+def test_other_stamp_is_rejected(tmp_path):
+  path = str(tmp_path / "job.checkpoint")
+  with pytest.raises(Killed):
+    runJob(path, killAt=(0, 3000))
+  checkpoint = Checkpoint(path, stamp=("other.root", 1), resume=True)
+  with pytest.raises(ValueError):
+    checkpoint.startLoop(ShardRunner(1, {}, checkpoint=checkpoint), 0, 10)
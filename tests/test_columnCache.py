@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+import helpers.columnCache as columnCache
+from fakeEvents import makeEvents, makeBatch
+
+
+class CountedTree:
+  def __init__(self, batch):
+    self.batch = batch
+
+  def GetEntries(self):
+    return len(self.batch)
+
+
+class ClosedFile:
+  def Close(self):
+    pass
+
+
+@pytest.fixture
+def fakeInput(tmp_path, monkeypatch):
+  #The cache reads from a fake tree made of a fake event batch, in chunks as iterateBatches would
+  batch = makeBatch(makeEvents(23, seed=3))
+  reads = []
+
+  def iterateBatches(tree, branches, batchSize):
+    for start in range(0, len(tree.batch), batchSize):
+      stop = min(start + batchSize, len(tree.batch))
+      reads.append((start, stop))
+      yield columnCache.EventColumns(dict((name, tree.batch[name][start:stop]) for name in branches), start, stop - start)
+
+  monkeypatch.setattr(columnCache, "openTree", lambda path, treeName: (ClosedFile(), CountedTree(batch)))
+  monkeypatch.setattr(columnCache, "iterateBatches", iterateBatches)
+  inputPath = tmp_path / "input.root"
+  inputPath.write_bytes(b"ntuple")
+  return str(inputPath), str(tmp_path / "cache"), batch, reads
+
+
+def test_chunked_build_matches_input(fakeInput):
+  inputPath, cacheDir, batch, reads = fakeInput
+  branches = ["vtxX", "nTracks", "trackPID", "showerRecoE", "trueSimPartTID"]
+  cached = columnCache.ColumnCache(inputPath, cacheDir=cacheDir, chunkSize=5).get(branches, verbose=False)
+  assert reads == [(0, 5), (5, 10), (10, 15), (15, 20), (20, 23)]
+  assert len(cached) == len(batch)
+  for name in branches:
+    if isinstance(batch[name], columnCache.JaggedArray):
+      assert cached[name].content.dtype == batch[name].content.dtype
+      assert np.array_equal(cached[name].offsets, batch[name].offsets)
+      assert np.array_equal(cached[name].content, batch[name].content)
+    else:
+      assert cached[name].dtype == batch[name].dtype
+      assert np.array_equal(cached[name], batch[name])
+
+
+def test_second_read_only_loads_missing(fakeInput):
+  inputPath, cacheDir, batch, reads = fakeInput
+  columnCache.ColumnCache(inputPath, cacheDir=cacheDir, chunkSize=10).get(["vtxX"], verbose=False)
+  del reads[:]
+  cache = columnCache.ColumnCache(inputPath, cacheDir=cacheDir, chunkSize=10)
+  cached = cache.get(["vtxX", "trackRecoE"], verbose=False)
+  assert reads == [(0, 10), (10, 20), (20, 23)]
+  assert sorted(cache.cachedBranches()) == ["trackRecoE", "vtxX"]
+  assert cached["trackRecoE"].tolist() == batch["trackRecoE"].tolist()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from helpers.columnLoader import JaggedArray, EventColumns, ColumnTree, _flatten, elementType
+
+
+def test_flatten_keeps_element_type():
+  column = np.empty(3, dtype=object)
+  column[:] = [np.array([1, 2], dtype=np.int32), np.array([], dtype=np.int32), np.array([3], dtype=np.int32)]
+  content = _flatten(column, np.array([2, 0, 1]), elementType("ROOT::VecOps::RVec<int>"))
+  assert content.dtype == np.int32
+  assert content.tolist() == [1, 2, 3]
+
+
+def test_flatten_all_empty():
+  column = np.empty(2, dtype=object)
+  column[:] = [np.array([], dtype=np.float32), np.array([], dtype=np.float32)]
+  assert _flatten(column, np.array([0, 0]), elementType("vector<float>")).dtype == np.float32
+  assert _flatten(column, np.array([0, 0]), elementType("ROOT::VecOps::RVec<unsigned short>")).dtype == np.uint16
+  assert _flatten(column, np.array([0, 0])).dtype == np.float64
+
+
+def test_jagged_slices():
+  jagged = JaggedArray.fromLists([[1, 2], [], [3], [4, 5, 6]], dtype=np.int32)
+  assert jagged[1:3].tolist() == [[], [3]]
+  assert jagged[::2].tolist() == [[1, 2], [3]]
+  assert jagged[np.array([False, True, False, True])].tolist() == [[], [4, 5, 6]]
+  empty = jagged[3:1]
+  assert len(empty) == 0 and len(empty.content) == 0
+  assert len(jagged[10:]) == 0
+
+
+def test_column_tree_offset_batch():
+  batch = EventColumns({"vtxX": np.array([1., 2., 3.]), "trackPID": JaggedArray.fromLists([[13], [], [2212, 22]])}, entryStart=100)
+  tree = ColumnTree(batch)
+  #Entries are numbered within the batch, as in a TTree, so the GetEntries loop works on any batch
+  assert tree.GetEntries() == 3
+  seen = []
+  for i in range(tree.GetEntries()):
+    tree.GetEntry(i)
+    seen.append((tree.GetReadEntry(), tree.GetNtupleEntry(), float(tree.vtxX)))
+  assert seen == [(0, 100, 1.), (1, 101, 2.), (2, 102, 3.)]
+  assert list(tree.trackPID) == [2212, 22]
+  with pytest.raises(IndexError):
+    tree.GetEntry(3)
+  with pytest.raises(IndexError):
+    tree.GetEntry(100)
@@ -0,0 +1,120 @@
+import itertools
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from cutScan import ScanSample, ThresholdGrid, ScanResult, scanCuts, fixedCuts
+from selection_1g1p import reco_1g1p_cutflow
+from truthdef import truthdef_1gamma_cuts
+from fakeEvents import makeEvents, makeBatch, float32
+
+fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":10, "photonWidth":3}
+inf = float("inf")
+
+
+def scanEvents(n, seed):
+  #Fake events, half of them moved towards the selection (a central vertex, no pions, short tracks away from the walls)
+  #so that some pass the whole cut flow
+  events = makeEvents(n, seed=seed)
+  rng = np.random.default_rng(seed)
+  for event in events:
+    if rng.random() < 0.5:
+      continue
+    event.foundVertex = 1
+    event.vtxX, event.vtxY, event.vtxZ = [float32(x) for x in rng.uniform([40, -70, 100], [210, 70, 900])]
+    for prefix, n in [("shower", event.nShowers), ("track", event.nTracks)]:
+      setattr(event, prefix + "PID", [int(x) for x in rng.choice([22, 22, 2212, 13], n)])
+      for axis, (low, high) in [("X", (40, 210)), ("Y", (-70, 70)), ("Z", (100, 900))]:
+        start = rng.uniform(low, high, n)
+        setattr(event, prefix + "StartPos" + axis, [float32(x) for x in start])
+        setattr(event, prefix + "EndPos" + axis, [float32(x) for x in start + rng.uniform(-20, 20, n)])
+  return events
+
+
+@pytest.fixture(scope="module")
+def events():
+  return scanEvents(4000, seed=19)
+
+
+@pytest.fixture(scope="module")
+def sample(events):
+  #Read in two batches, the second starting at entry 2000 as iterateBatches gives them
+  return ScanSample.fromBatches([makeBatch(events[:2000]), makeBatch(events[2000:], entryStart=2000)], 1.0, 0, fiducialData)
+
+
+def test_nominal_thresholds_match_cut_flow(events, sample):
+  batch = makeBatch(events)
+  result = reco_1g1p_cutflow(0, fiducialData).runBatch(batch)
+  allCuts = result.cutsPassed()["AllCuts"]
+  assert allCuts.sum() > 0
+  grid = ThresholdGrid()
+  assert grid.shape == (1,)*len(scanCuts) and grid.nominalIndex() == 0
+  assert grid.passedWeight(sample).ravel()[0] == pytest.approx(batch["xsecWeight"][allCuts].astype(np.float64).sum())
+  assert len(sample) == fixedCuts(batch, result, fiducialData).sum()
+
+
+def test_signal_flags_match_truth_definition(events, sample):
+  batch = makeBatch(events)
+  keep = fixedCuts(batch, reco_1g1p_cutflow(0, fiducialData).runBatch(batch), fiducialData)
+  signal = np.array([truthdef_1gamma_cuts(event, 10.0, fiducialData)[0] for event in events])
+  assert signal[keep].any() and not signal[keep].all()
+  assert np.array_equal(sample["signal"], signal[keep])
+  assert sample.totalSignal == pytest.approx(batch["xsecWeight"][signal].astype(np.float64).sum())
+  assert sample.nEvents == len(events)
+
+
+def test_passed_weight_matches_brute_force(sample):
+  #Thresholds equal to an event's own value check the edges; the +-inf entries of the pixel cuts let every event through
+  #(-inf: only the events the cut does not apply to)
+  thresholds = {"showerFromCharged": [0., 5., sample["showerFromCharged"][0], 7.],
+                "primaryScore": [1.4, 2.2],
+                "completeness": [0.5, sample["completeness"][1], 0.7],
+                "electronScore": [0., 2.],
+                "intimeEnergy0p": [-inf, 150., inf],
+                "intimePixels1p": [-inf, 30000., inf],
+                "longTrack": [20., sample["longTrack"][2], inf]}
+  grid = ThresholdGrid(thresholds)
+  for select in [None, sample["signal"]]:
+    weights = sample["weight"] if select is None else np.where(select, sample["weight"], 0.)
+    passed = grid.passedWeight(sample, select)
+    assert passed.shape == grid.shape
+    for index in itertools.product(*[range(n) for n in grid.shape]):
+      mask = np.ones(len(sample), dtype=bool)
+      for cut, t, i in zip(grid.cuts, grid.thresholds, index):
+        mask &= (sample[cut.name] >= t[i]) if cut.direction == "min" else (sample[cut.name] <= t[i])
+      assert passed[index] == pytest.approx(weights[mask].sum(), abs=1e-9)
+  #Both proton counts are in the sample, so each pixel cut has events it does and does not apply to
+  assert np.isinf(sample["intimeEnergy0p"]).any() and np.isinf(sample["intimePixels1p"]).any()
+
+
+def handBuiltSample(signalValues, backgroundValues):
+  #Events differing only in showerFromCharged; every other scan variable passes its nominal threshold
+  values = np.array(signalValues + backgroundValues, dtype=np.float64)
+  n = len(values)
+  columns = {"weight": np.ones(n), "signal": np.arange(n) < len(signalValues), "showerFromCharged": values,
+             "primaryScore": np.full(n, 5.), "completeness": np.ones(n), "electronScore": np.zeros(n),
+             "intimeEnergy0p": np.full(n, -inf), "intimePixels1p": np.full(n, 100.), "longTrack": np.zeros(n)}
+  return ScanSample(columns, float(len(signalValues)), n, 1e19)
+
+
+def test_pareto_front_and_best_points():
+  #Thresholds 0, 2, 3, 4, 6, 8: efficiency 1, .75, .75, .5, .25, 0 and purity 4/9, 1/2, 1/2, 2/3, 1, 0
+  mc = handBuiltSample([1., 3., 5., 7.], [0.5, 1., 3., 3.5, 5.])
+  result = ScanResult(ThresholdGrid({"showerFromCharged": [0., 2., 3., 4., 6., 8.]}), mc, targetPOT=1e19)
+  assert np.allclose(result.efficiency.ravel(), [1., 0.75, 0.75, 0.5, 0.25, 0.])
+  assert np.allclose(result.purity.ravel(), [4/9., 0.5, 0.5, 2/3., 1., 0.])
+  #Threshold 3 only ties threshold 2, and threshold 8 selects nothing
+  assert list(result.paretoFront()) == [0, 1, 3, 4]
+  assert result.best("significance") == 3
+  assert result.best("purity") == 4
+  assert result.best("purity", minEfficiency=0.5) == 3
+  assert result.best("efficiency") == 0
+  assert result.best("efficiencyPurity") == 0
+  assert result.best("significance", minEfficiency=1.1) is None
+  #Cosmics with twice the POT count half, and lower the purity
+  cosmic = handBuiltSample([], [4., 9.])
+  cosmic.pot = 2e19
+  withCosmics = ScanResult(ThresholdGrid({"showerFromCharged": [0., 2., 3., 4., 6., 8.]}), mc, cosmic, targetPOT=1e19)
+  assert np.allclose(withCosmics.cosmic.ravel(), [1., 1., 1., 1., 0.5, 0.5])
+  assert withCosmics.purity.ravel()[4] == pytest.approx(1/1.5)
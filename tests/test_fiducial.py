@@ -0,0 +1,184 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from cuts import trueCutNC, trueCutCosmic, trueCutPionProton, recoNoVertex, recoPhotonList, recoPionProton, recoNeutralCurrent, \
+  recoPion, recoProton, trueCutBottomlessFiducial, recoBottomlessFiducials, trueBottomlessPhotonList
+from fiducial import fiducialSpec, insideFiducial, wallDistance, scanPhotonWidths, multiplicityRange, sortedDescending, intervalCounts
+from helpers.columnLoader import JaggedArray
+from fakeEvents import makeEvents
+
+#Widths to scan; the boundary events below sit exactly at some of them
+widths = np.array([1., 3., 5., 10., 12.5, 20., 40.])
+boundaryWidths = [3., 5., 10., 20.]
+
+
+def boundaryEvents(n, seed):
+  #Fake events, some with the reco vertex, true vertex or a photon deposit exactly one of the widths away from a wall
+  events = makeEvents(n, seed=seed)
+  for k, event in enumerate(events):
+    width = boundaryWidths[k % len(boundaryWidths)]
+    if k % 3 == 0:
+      event.vtxX = width
+    if k % 4 == 0:
+      event.trueVtxZ = 1036. - width
+    if k % 5 == 0:
+      event.trueVtxY = 116.5 - width
+      event.vtxY = -116.5 + 1.
+    for x in range(event.nTrueSimParts):
+      if k % 2 == 0 and x % 2 == 0:
+        event.trueSimPartEDepX[x] = 256. - boundaryWidths[(k//2) % len(boundaryWidths)]
+  return events
+
+
+def oldCountIncrease(photonList, countList, weight=1.):
+  countList[min(len(photonList), 3) - 1] += weight
+
+
+def oldPurity(events, cosmics, fiducialData):
+  #The per-width purity loops of fiducialRevisor.py before the one-pass scan
+  signal, background, cosmic = [0, 0, 0], [0, 0, 0], [0, 0, 0]
+  for event in events:
+    if recoNoVertex(event) == False or recoNeutralCurrent(event) == False or recoBottomlessFiducials(event, fiducialData) == False \
+       or recoPionProton(event) == False:
+      continue
+    recoList = recoPhotonList(event)
+    if len(recoList) == 0:
+      continue
+    if trueCutNC(event) == False or trueCutBottomlessFiducial(event, fiducialData) == False or trueCutPionProton(event) == False:
+      oldCountIncrease(recoList, background)
+      continue
+    truePhotonIDs = trueBottomlessPhotonList(event, fiducialData)
+    if len(truePhotonIDs) != 0 and len(recoList) == len(truePhotonIDs):
+      oldCountIncrease(recoList, signal)
+    else:
+      oldCountIncrease(recoList, background)
+  for event in cosmics:
+    if recoNoVertex(event) == False or recoNeutralCurrent(event) == False or recoBottomlessFiducials(event, fiducialData) == False \
+       or recoPionProton(event) == False:
+      continue
+    recoList = recoPhotonList(event)
+    if len(recoList) > 0:
+      oldCountIncrease(recoList, cosmic)
+  return signal, background, cosmic
+
+
+def oldEfficiency(events, fiducialData):
+  #The per-width efficiency loop of fiducialRevisor.py before the one-pass scan
+  signal, background = [0, 0, 0], [0, 0, 0]
+  for event in events:
+    if trueCutNC(event) == False or trueCutBottomlessFiducial(event, fiducialData) == False or trueCutCosmic(event) == False \
+       or trueCutPionProton(event) == False:
+      continue
+    truePhotonIDs = trueBottomlessPhotonList(event, fiducialData)
+    if len(truePhotonIDs) == 0:
+      continue
+    if recoNoVertex(event) == False or recoNeutralCurrent(event) == False or recoBottomlessFiducials(event, fiducialData) == False \
+       or recoProton(event) == False or recoPion(event) == False:
+      oldCountIncrease(truePhotonIDs, background)
+      continue
+    if len(recoPhotonList(event)) == len(truePhotonIDs):
+      oldCountIncrease(truePhotonIDs, signal)
+    else:
+      oldCountIncrease(truePhotonIDs, background)
+  return signal, background
+
+
+def scanInputs(events, cosmicEvents):
+  #The single pass of fiducialRevisor.py: wall distances and the width-independent cuts of every event
+  bottomlessWalls = fiducialSpec(0, bottomless=True)
+  allPhotonCandidates = fiducialSpec(-np.inf, bottomless=True)
+  inputs = dict((name, []) for name in ["recoDistance", "trueDistance", "photonDistances", "nReco", "recoPass", "truePass", "effTruePass", "effRecoPass"])
+  for event in events:
+    hasVertex = recoNoVertex(event) != False
+    inputs["recoDistance"].append(wallDistance(event.vtxX, event.vtxY, event.vtxZ, bottomlessWalls, True) if hasVertex else -np.inf)
+    inputs["trueDistance"].append(wallDistance(event.trueVtxX, event.trueVtxY, event.trueVtxZ, bottomlessWalls, True))
+    inputs["photonDistances"].append([wallDistance(event.trueSimPartEDepX[x], event.trueSimPartEDepY[x], event.trueSimPartEDepZ[x], bottomlessWalls, True)
+                                      for x in trueBottomlessPhotonList(event, allPhotonCandidates)])
+    recoNC = hasVertex and recoNeutralCurrent(event) != False
+    inputs["nReco"].append(len(recoPhotonList(event)))
+    inputs["recoPass"].append(recoNC and recoPionProton(event) != False)
+    inputs["truePass"].append(trueCutNC(event) != False and trueCutPionProton(event) != False)
+    inputs["effTruePass"].append(inputs["truePass"][-1] and trueCutCosmic(event) != False)
+    inputs["effRecoPass"].append(recoNC and recoProton(event) != False and recoPion(event) != False)
+  inputs["photonDistances"] = JaggedArray.fromLists(inputs["photonDistances"], dtype=np.float64)
+  cosmics = {"recoDistance": [], "nReco": [], "recoPass": []}
+  for event in cosmicEvents:
+    hasVertex = recoNoVertex(event) != False
+    cosmics["recoDistance"].append(wallDistance(event.vtxX, event.vtxY, event.vtxZ, bottomlessWalls, True) if hasVertex else -np.inf)
+    cosmics["nReco"].append(len(recoPhotonList(event)))
+    cosmics["recoPass"].append(hasVertex and recoNeutralCurrent(event) != False and recoPionProton(event) != False)
+  return inputs, cosmics
+
+
+def photonLikeEvents(n, seed):
+  #Mostly neutral-current-looking events with photon showers, so every multiplicity bin gets entries
+  events = boundaryEvents(n, seed)
+  rng = np.random.default_rng(seed)
+  for event in events:
+    event.trackClassified = [0]*event.nTracks
+    event.showerClassified = [1]*event.nShowers
+    event.showerProcess = [int(x) for x in rng.integers(1, 3, event.nShowers)]
+    event.showerPID = [int(x) for x in rng.choice([22, 22, 22, 11], event.nShowers)]
+    event.trackPID = [int(x) for x in rng.choice([13, 11, 2212], event.nTracks)]
+  return events
+
+
+@pytest.fixture(scope="module")
+def scan():
+  events, cosmicEvents = photonLikeEvents(1500, seed=8), photonLikeEvents(500, seed=80)
+  inputs, cosmics = scanInputs(events, cosmicEvents)
+  #Selected events sit exactly at each boundary width, so a < where the old cuts have <= (or the reverse) shows up
+  for width in boundaryWidths:
+    assert (np.asarray(inputs["recoDistance"])[np.asarray(inputs["recoPass"])] == width).any()
+    assert (np.asarray(inputs["trueDistance"])[np.asarray(inputs["truePass"])] == width).any()
+    assert (inputs["photonDistances"].content == width).any()
+  return events, cosmicEvents, scanPhotonWidths(widths, inputs, cosmics)
+
+
+def test_scan_matches_per_width_loops(scan):
+  events, cosmicEvents, result = scan
+  for k, width in enumerate(widths):
+    fiducialData = fiducialSpec(width, bottomless=True)
+    signal, background, cosmic = oldPurity(events, cosmicEvents, fiducialData)
+    effSignal, effBackground = oldEfficiency(events, fiducialData)
+    assert list(result["signal"][:, k]) == signal, width
+    assert list(result["background"][:, k]) == background, width
+    assert list(result["cosmic"][:, k]) == cosmic, width
+    assert list(result["effSignal"][:, k]) == effSignal, width
+    assert list(result["effBackground"][:, k]) == effBackground, width
+  #Every bin, the 3+ one included, is exercised
+  assert (result["signal"].sum(axis=1) > 0).all() and (result["effSignal"].sum(axis=1) > 0).all()
+  assert (result["cosmic"].sum(axis=1) > 0).all()
+
+
+def test_inside_fiducial_is_wall_distance_above_width():
+  bounds = fiducialSpec(0)
+  for width in [0., 2.5, 10., 30.]:
+    for bottomless in [False, True]:
+      #Points on, just inside and just outside each face of the shrunk box, and on its corners
+      edges = []
+      for x in [bounds["xMin"] + width, bounds["xMax"] - width, 128.]:
+        for y in [bounds["yMin"] + width, bounds["yMax"] - width, 0., bounds["yMin"] - 5.]:
+          for z in [bounds["zMin"] + width, bounds["zMax"] - width, 500.]:
+            for step in [-1e-3, 0., 1e-3]:
+              edges.append((x + step, y + step, z - step))
+      x, y, z = np.array(edges).T
+      distance = wallDistance(x, y, z, bounds, bottomless)
+      assert np.array_equal(insideFiducial(x, y, z, bounds, width=width, bottomless=bottomless), distance > width)
+      for point, d in zip(edges, distance):
+        assert insideFiducial(*point, bounds, width=width, bottomless=bottomless) == (d > width)
+
+
+def test_multiplicity_ranges_are_half_open():
+  #Two photons 10 and 4 from the walls: exactly one above w for 4 <= w < 10, both for w < 4, none from 10 on
+  photons = sortedDescending(JaggedArray.fromLists([[4., 10.], []], dtype=np.float64))
+  lo, hi = multiplicityRange(photons, 1)
+  assert (lo[0], hi[0]) == (4., 10.)
+  assert (lo[1], hi[1]) == (-np.inf, -np.inf)
+  lo, hi = multiplicityRange(photons, 2, atLeast=True)
+  assert (lo[0], hi[0]) == (-np.inf, 4.)
+  lo, hi = multiplicityRange(photons, 0)
+  assert (lo[0], hi[0]) == (10., np.inf) and (lo[1], hi[1]) == (-np.inf, np.inf)
+  assert list(intervalCounts([4., -np.inf], [10., 4.], [3.9, 4., 9.9, 10.])) == [1., 1., 1., 0.]
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+rt = pytest.importorskip("ROOT")
+
+from cuts import trueCutMuons, trueCutElectrons, trueCutFiducials, trueCutPionProton, truePhotonList, recoPhotonListFiducial, recoPhotonListTracks, scaleRecoEnergy
+from helpers.histograms import Histogram1D, CategoryHistogram, scaleHist
+from fakeEvents import makeEvents
+
+needsTH1 = pytest.mark.skipif(not hasattr(rt, "THStack"), reason="needs ROOT histograms")
+
+fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":15, "photonWidth":3}
+outcomeCategories = [("Muon", "PMuon1", "Muon"), ("Electron", "PElectron1", "Electron"), ("Fiducials", "PFiducial1", "Out of Fiducial"),
+                     ("PionProton", "PPionProton1", "Pions or Protons"), ("NoPhotons", "PNoPhoton1", "No Photons"),
+                     ("OnePhoton", "PSignal1", "Signal"), ("TwoPhotons", "PTwoPhotons1", "Two Photons"), ("ManyPhotons", "PMany1", "3+ Photons")]
+
+
+def filled(name, values, weights=None):
+  hist = Histogram1D(name, name, 10, 0, 10)
+  hist.fill(values, weights)
+  return hist
+
+
+def test_add_flushes_pending_category_fills():
+  categories = CategoryHistogram([("a", "histA", "A"), ("b", "histB", "B")], 10, 0, 10)
+  view = categories.histogram("a")
+  #Fill collects single events until the contents are needed; add must see them
+  categories.Fill("a", 2.5, 2.)
+  categories.Fill("a", 7.5)
+  total = Histogram1D("total", "total", 10, 0, 10)
+  total.add(view)
+  assert total.sumw[3] == 2. and total.sumw[8] == 1.
+  assert total.sumw2[3] == 4.
+
+
+def test_add_marks_stale():
+  total = filled("total", [1.5])
+  total._stale = False
+  total.add(filled("other", [1.5, 2.5]), 0.5)
+  assert total._stale
+  assert total.sumw[2] == 1.5 and total.sumw2[2] == 1.25
+
+
+def test_add_rejects_other_binning():
+  with pytest.raises(ValueError):
+    filled("a", [1.]).add(Histogram1D("b", "b", 5, 0, 10))
+
+
+@needsTH1
+def test_scale_survives_refresh():
+  hist = filled("scaled", [1.5, 1.5, 4.5], [1., 2., 3.])
+  th1 = scaleHist(hist, 0.5)
+  assert th1.GetBinContent(2) == pytest.approx(1.5)
+  #A later fill refreshes the ROOT histogram from the arrays, which hold the scaled contents
+  hist.Fill(4.5, 1.)
+  th1 = hist.toTH1()
+  assert th1.GetBinContent(2) == pytest.approx(1.5)
+  assert th1.GetBinContent(5) == pytest.approx(2.5)
+  assert th1.GetBinError(2) == pytest.approx(np.sqrt(0.25*(1. + 4.)))
+
+
+@needsTH1
+def test_scale_hist_matches_th1_scale():
+  values, weights = np.array([0.5, 3.2, 3.7, 9.9, 12.]), np.array([1., 0.5, 2., 1.5, 1.])
+  hist = filled("numpy", values, weights)
+  reference = rt.TH1F("reference", "reference", 10, 0, 10)
+  reference.Sumw2()
+  for x, w in zip(values, weights):
+    reference.Fill(x, w)
+  scaled, referenceScaled = scaleHist(hist, 3.), scaleHist(reference, 3.)
+  assert referenceScaled is reference
+  for i in range(12):
+    assert scaled.GetBinContent(i) == pytest.approx(reference.GetBinContent(i))
+    assert scaled.GetBinError(i) == pytest.approx(reference.GetBinError(i))
+
+
+@needsTH1
+def test_hist_stack_keeps_scaling_after_fill():
+  from cuts import histStack
+  hists = [filled("signal", [0.5, 1.2]), filled("background", [0.7])]
+  canvas, stack, legend, histInt = histStack("test", "test", hists, 8.8e+19)
+  hists[0].Fill(1.5)
+  th1 = hists[0].toTH1()
+  #Scaled by 4.4e19/8.8e19 in the stack, then one more unscaled entry in bin 2
+  assert th1.GetBinContent(1) == pytest.approx(0.5)
+  assert th1.GetBinContent(2) == pytest.approx(1.5)
+
+
+def purityEntries(events):
+  #(outcome key, leading reco photon energy, weight) of every event with a reco photon, the truth outcome sorted with the
+  #cuts.py functions the way the evaluator scripts sort their purity histograms
+  entries = []
+  for event in events:
+    showers, tracks = recoPhotonListFiducial(fiducialData, event, 0), recoPhotonListTracks(fiducialData, event, 0)
+    if len(showers) + len(tracks) == 0:
+      continue
+    if not trueCutMuons(event):
+      key = "Muon"
+    elif not trueCutElectrons(event):
+      key = "Electron"
+    elif not trueCutFiducials(event, fiducialData):
+      key = "Fiducials"
+    elif trueCutPionProton(event)[0] > 0 or trueCutPionProton(event)[1] > 1:
+      key = "PionProton"
+    else:
+      key = ["NoPhotons", "OnePhoton", "TwoPhotons", "ManyPhotons"][min(len(truePhotonList(event, fiducialData)), 3)]
+    entries.append((key, scaleRecoEnergy(event, showers, tracks), event.xsecWeight))
+  return entries
+
+
+def test_category_histogram_matches_separate_histograms():
+  entries = purityEntries(makeEvents(3000, seed=18))
+  assert len(set(key for key, energy, weight in entries)) >= 4
+  separate = dict((key, Histogram1D(name, title, 60, 0, 0.5)) for key, name, title in outcomeCategories)
+  perEntry = CategoryHistogram(outcomeCategories, 60, 0, 0.5)
+  batched = CategoryHistogram(outcomeCategories, 60, 0, 0.5)
+  for key, energy, weight in entries:
+    separate[key].Fill(energy, weight)
+    perEntry.Fill(key, energy, weight)
+  batched.fill([batched.code(key) for key, energy, weight in entries] + [-1], [energy for key, energy, weight in entries] + [0.1],
+               [weight for key, energy, weight in entries] + [5.])
+  for categories in [perEntry, batched]:
+    for hist, (key, name, title) in zip(categories.histograms(), outcomeCategories):
+      assert (hist.name, hist.title) == (name, title)
+      assert hist.sumw == pytest.approx(separate[key].sumw)
+      assert hist.sumw2 == pytest.approx(separate[key].sumw2)
+      assert hist.entries == separate[key].entries
+  #Scaling some categories leaves the others alone
+  perEntry.scale(2., ["OnePhoton"])
+  assert perEntry.histogram("OnePhoton").sumw == pytest.approx(2*separate["OnePhoton"].sumw)
+  assert perEntry.histogram("Muon").sumw == pytest.approx(separate["Muon"].sumw)
+
+
+@needsTH1
+def test_category_th1_matches_th1f():
+  entries = purityEntries(makeEvents(1000, seed=19))
+  categories = CategoryHistogram(outcomeCategories, 60, 0, 0.5)
+  references = dict((key, rt.TH1F("reference" + name, title, 60, 0, 0.5)) for key, name, title in outcomeCategories)
+  for key, energy, weight in entries:
+    categories.Fill(key, energy, weight)
+    references[key].Fill(energy, weight)
+  for th1, (key, name, title) in zip(categories.toTH1List(), outcomeCategories):
+    assert th1.GetName() == name
+    for i in range(62):
+      assert th1.GetBinContent(i) == pytest.approx(references[key].GetBinContent(i), rel=1e-6)
@@ -0,0 +1,83 @@
+import os
+import pytest
+
+pytest.importorskip("ROOT")
+
+from helpers.jobPlanner import JobManifest, SlurmExecutor
+
+
+def writeCommand(binDir, name, body):
+  path = os.path.join(binDir, name)
+  with open(path, "w") as script:
+    print("#!/bin/bash", file=script)
+    print(body, file=script)
+  os.chmod(path, 0o755)
+
+
+@pytest.fixture
+def slurm(tmp_path, monkeypatch):
+  #Stand-ins for sbatch (numbers the jobs), squeue (lists the ids in queue.txt) and sacct on the PATH
+  binDir = str(tmp_path / "bin")
+  os.makedirs(binDir)
+  state = str(tmp_path)
+  writeCommand(binDir, "sbatch", 'n=$(( $(cat %s/lastJob 2>/dev/null || echo 0) + 1 )); echo $n > %s/lastJob; echo $n' % (state, state))
+  writeCommand(binDir, "squeue", 'while read id; do echo "$id RUNNING"; done < %s/queue.txt' % state)
+  writeCommand(binDir, "sacct", 'echo FAILED')
+  monkeypatch.setenv("PATH", binDir + os.pathsep + os.environ["PATH"])
+  def setQueue(jobIds):
+    with open(os.path.join(state, "queue.txt"), "w") as queueFile:
+      for jobId in jobIds:
+        print(jobId, file=queueFile)
+  return binDir, setQueue
+
+
+def makeManifest(workDir):
+  manifest = JobManifest(workDir)
+  units = [{"unit": "unit_%04d" % k, "fileids": [k], "fileNames": ["file%d.root" % k], "nEntries": 10} for k in range(3)]
+  manifest.create({"fileinfo": "test", "units": 3, "eventsPerUnit": None, "inputDir": None}, units)
+  return manifest
+
+
+def jobIds(manifest):
+  return [manifest.states[unit["unit"]].get("jobId") for unit in manifest.units]
+
+
+def test_dead_jobs_are_submitted_again(tmp_path, slurm):
+  binDir, setQueue = slurm
+  workDir = str(tmp_path / "work")
+  manifest = makeManifest(workDir)
+  executor = SlurmExecutor()
+  assert executor.run(manifest, manifest.pending(), "true") == 0
+  assert jobIds(manifest) == ["1", "2", "3"]
+
+  #Job 3 died without its marker: it is failed, and the only unit a rerun submits
+  setQueue(["1", "2"])
+  manifest = JobManifest(workDir)
+  assert executor.refresh(manifest) == 2
+  assert manifest.states["unit_0002"]["state"] == "failed" and manifest.states["unit_0002"]["status"] == "FAILED"
+  pending = manifest.pending(("done", "submitted"))
+  assert [unit["unit"] for unit in pending] == ["unit_0002"]
+  assert executor.run(manifest, pending, "true") == 0
+  assert jobIds(manifest) == ["1", "2", "4"]
+
+  #Job 1 finished and left its marker after the manifest was read: done, not resubmitted
+  setQueue(["2", "4"])
+  manifest = JobManifest(workDir)
+  open(manifest.markerPath(manifest.units[0]), "w").close()
+  assert executor.refresh(manifest) == 2
+  assert manifest.counts() == {"done": 1, "submitted": 2}
+  assert manifest.pending(("done", "submitted")) == []
+
+
+def test_timeout_without_squeue(tmp_path, slurm):
+  binDir, setQueue = slurm
+  workDir = str(tmp_path / "work")
+  manifest = makeManifest(workDir)
+  SlurmExecutor().run(manifest, manifest.pending(), "true")
+  writeCommand(binDir, "squeue", "exit 1")
+  #Without a timeout the units wait; past it they count as lost
+  assert SlurmExecutor(timeout=None).refresh(manifest) == 3
+  assert SlurmExecutor(timeout=3600.).refresh(manifest) == 3
+  assert SlurmExecutor(timeout=0.).refresh(manifest) == 0
+  assert manifest.counts() == {"failed": 3}
+  assert set(state["status"] for state in manifest.states.values()) == set(["timed out"])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+import cuts
+import batchCuts
+import kinematics
+from fakeEvents import makeEvents, makeBatch
+
+
+def referenceOpeningAngle(p1, p2):
+  #The loop cuts.trueTwoPhotonOpeningAngle used before it called kinematics.openingAngle
+  norm1, norm2, cosOpen = 0.0, 0.0, 0.0
+  for vv in range(3):
+    norm1 += p1[vv]*p1[vv]
+    norm2 += p2[vv]*p2[vv]
+    cosOpen += p1[vv]*p2[vv]
+  if norm1*norm2 > 0:
+    cosOpen = cosOpen/np.sqrt(norm1*norm2)
+  return np.arccos(cosOpen)*180.0/3.14159
+
+
+def test_opening_angle_of_scalars_is_float():
+  angle = kinematics.openingAngle((1., 1., 0., 0.), (1., 0., 1., 0.))
+  assert type(angle) is float
+  assert angle == pytest.approx(90*3.14159265358979/3.14159)
+  #A zero momentum uses the raw dot product (0) as the cosine
+  assert type(kinematics.openingAngle((0., 0., 0., 0.), (1., 0., 0., 1.))) is float
+
+
+def test_opening_angle_of_arrays_stays_array():
+  angles = kinematics.openingAngle((np.ones(3), np.array([1., 0., 0.]), np.zeros(3), np.zeros(3)),
+                                   (np.ones(3), np.array([1., 1., 0.]), np.array([0., 1., 1.]), np.zeros(3)))
+  assert isinstance(angles, np.ndarray) and angles.shape == (3,)
+
+
+def test_true_two_photon_opening_angle_matches_loop():
+  events = makeEvents(300, seed=14)
+  n = 0
+  for event in events:
+    for i in range(event.nTrueSimParts):
+      for j in range(i + 1, event.nTrueSimParts):
+        angle = cuts.trueTwoPhotonOpeningAngle(event, i, j)
+        assert type(angle) is float
+        p1 = [event.trueSimPartPx[i], event.trueSimPartPy[i], event.trueSimPartPz[i]]
+        p2 = [event.trueSimPartPx[j], event.trueSimPartPy[j], event.trueSimPartPz[j]]
+        assert angle == pytest.approx(referenceOpeningAngle(p1, p2))
+        n += 1
+  assert n > 0
+
+
+def test_batch_opening_angles_match_per_pair():
+  events = makeEvents(500, seed=15)
+  batch = makeBatch(events)
+  protons = batchCuts.trueProtonSelection(batch)
+  photons = batch["trueSimPartPDG"].withContent(batch["trueSimPartPDG"].content == 22)
+  result = kinematics.trueDeltaKinematics(batch, protons[2], photons)
+  assert len(result["event"]) > 0
+  for event, first, second, angle in zip(result["event"], result["photon1"], result["photon2"], result["openingAngle"]):
+    assert angle == pytest.approx(cuts.trueTwoPhotonOpeningAngle(events[event], first, second), nan_ok=True)
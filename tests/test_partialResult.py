@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from helpers.histograms import CategoryHistogram
+from helpers.partialResult import PartialResult, mergePartials
+
+overlayCategories = [("signal", "PSignal1", "Signal"), ("muon", "PMuon1", "Muon")]
+cosmicCategories = [("cosmicOnePhoton", "cBackground1", "Cosmic Background")]
+
+
+def cosmicSample(path):
+  #What every shard reading the cosmic file at path fills from it
+  rng = np.random.default_rng(len(path))
+  values = rng.uniform(0, 2, 40)
+  events = [(1, 2, int(event), 7) for event in rng.integers(0, 10000, 40)]
+  return values, events, 3.5e19 + len(path)*1e17
+
+
+def shardPartial(overlayPaths, cosmicPath):
+  #A separateEvaluator partial over some overlay files (all in one job) and the whole cosmic file
+  partial = PartialResult("separateEvaluator")
+  overlay = CategoryHistogram(overlayCategories, 20, 0, 2)
+  for path in overlayPaths:
+    rng = np.random.default_rng(int(path[-6]))
+    overlay.fill(rng.integers(0, 2, 100), rng.uniform(0, 2, 100), rng.uniform(0.5, 1.5, 100))
+    partial.addPOT("ntuple", path, 1e19*int(path[-6]))
+  cosmic = CategoryHistogram(cosmicCategories, 20, 0, 2)
+  values, events, pot = cosmicSample(cosmicPath)
+  cosmic.fill(np.zeros(len(values)), values)
+  partial.addCategoryHistogram(overlay)
+  partial.addCategoryHistogram(cosmic)
+  partial.addPOT("cosmic", cosmicPath, pot)
+  partial.counters = {"recoCount": 100*len(overlayPaths), "untrackedCosmics": len(values)}
+  partial.eventLists = {"cosmicEvents": list(events)}
+  partial.sources = list(overlayPaths)
+  partial.addShared(cosmicPath, ["cosmicOnePhoton"], ["untrackedCosmics"], ["cosmicEvents"])
+  return partial
+
+
+def cosmicFactor(partial):
+  #The factor reducePartials.py scales the cosmic histogram by
+  targetPOT = 4.4e19
+  return (targetPOT/partial.totalPOT("cosmic"))*(partial.totalPOT("ntuple")/targetPOT)
+
+
+def test_two_shards_match_one(tmp_path):
+  single = shardPartial(["overlay1.root", "overlay2.root"], "ext.root")
+  paths = []
+  for k, overlayPath in enumerate(["overlay1.root", "overlay2.root"]):
+    paths.append(str(tmp_path / ("part%d.npz" % k)))
+    shardPartial([overlayPath], "ext.root").save(paths[-1])
+  merged = mergePartials(paths)
+  assert merged.totalPOT("ntuple") == single.totalPOT("ntuple")
+  assert merged.totalPOT("cosmic") == single.totalPOT("cosmic")
+  assert cosmicFactor(merged) == pytest.approx(cosmicFactor(single))
+  for key in ["signal", "muon", "cosmicOnePhoton"]:
+    assert np.allclose(merged.histogram(key).sumw, single.histogram(key).sumw)
+    assert merged.histogram(key).entries == single.histogram(key).entries
+  assert merged.counters == single.counters
+  assert merged.eventLists["cosmicEvents"] == single.eventLists["cosmicEvents"]
+
+
+def test_distinct_cosmic_files_add_up():
+  merged = shardPartial(["overlay1.root"], "ext_a.root")
+  merged.merge(shardPartial(["overlay2.root"], "ext_bb.root"))
+  assert merged.totalPOT("cosmic") == cosmicSample("ext_a.root")[2] + cosmicSample("ext_bb.root")[2]
+  assert merged.histogram("cosmicOnePhoton").entries == 80
+  assert merged.counters["untrackedCosmics"] == 80
+
+
+def test_shared_event_lists_are_deduplicated():
+  #The same cosmic file under another path: the events it lists again are dropped
+  merged = shardPartial(["overlay1.root"], "ext.root")
+  other = shardPartial(["overlay2.root"], "ext.root")
+  other.shared = {"./ext.root": other.shared["ext.root"]}
+  merged.merge(other)
+  events = merged.eventLists["cosmicEvents"]
+  assert len(events) == len(set(events)) == len(set(cosmicSample("ext.root")[1]))
+
+
+def test_same_shard_twice_fails():
+  merged = shardPartial(["overlay1.root"], "ext.root")
+  with pytest.raises(ValueError):
+    merged.merge(shardPartial(["overlay1.root"], "ext.root"))
@@ -0,0 +1,83 @@
+import os, ast
+import pytest
+
+pytest.importorskip("ROOT")
+
+import helpers.potService as potService
+
+repoDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+runTable = "fileinfo_mcc9_v29e_dl_run3_G1_extbnb_dlana.txt"
+
+#The cosmic POT each script used before it called cosmicPOT
+scriptCosmicPOT = {"separateEvaluator.py": 1.1e20, "eventMetrics.py": 3.2974607516739725e+20,
+                   "generalEvaluator.py": 3.2974607516739725e+20, "evilEvaluator.py": 3.2974607516739725e+20,
+                   "gamma+ProtonEvaluator.py": 3.2974607516739725e+20, "electronScore.py": 3.2974607516739725e+20,
+                   "CompletenessEvaluator.py": 3.2974607516739725e+20, "1p2gCombined.py": 5.28e+19,
+                   "1aDarkProject/dmSelectionAnalysis.py": 3.2974607516739725e+20, "cutScanner.py": 1.1e20,
+                   "rdfEvaluator.py": 1.1e20}
+
+
+class FakeTree:
+  def GetName(self):
+    return "EventTree"
+
+  def GetCurrentFile(self):
+    return None
+
+
+def fallbackPOTs(path):
+  #fallbackPOT of every cosmicPOT call in a script
+  with open(os.path.join(repoDir, path)) as script:
+    tree = ast.parse(script.read())
+  values = []
+  for node in ast.walk(tree):
+    if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "cosmicPOT":
+      keywords = dict((keyword.arg, keyword.value) for keyword in node.keywords)
+      values.append(ast.literal_eval(keywords["fallbackPOT"]) if "fallbackPOT" in keywords else None)
+  return values
+
+
+@pytest.fixture
+def unknownTable(monkeypatch):
+  monkeypatch.delenv("UBPHOTON_POT_PER_EXT_TRIGGER", raising=False)
+  monkeypatch.setitem(potService.potPerExtTrigger, runTable, None)
+
+
+@pytest.mark.parametrize("path", sorted(scriptCosmicPOT))
+def test_scripts_keep_their_cosmic_pot(unknownTable, path):
+  values = fallbackPOTs(path)
+  assert values == [scriptCosmicPOT[path]]
+  assert potService.cosmicPOT(FakeTree(), fallbackPOT=values[0]) == scriptCosmicPOT[path]
+
+
+def test_unknown_pot_per_trigger_raises(unknownTable):
+  assert potService.extPOTPerTrigger() is None
+  with pytest.raises(ValueError):
+    potService.cosmicPOT(FakeTree())
+
+
+def test_pot_per_trigger_sources(monkeypatch):
+  monkeypatch.setitem(potService.potPerExtTrigger, runTable, 3e11)
+  monkeypatch.delenv("UBPHOTON_POT_PER_EXT_TRIGGER", raising=False)
+  assert potService.extPOTPerTrigger() == 3e11
+  #The environment sets tables one by one; other tables keep their own value
+  monkeypatch.setenv("UBPHOTON_POT_PER_EXT_TRIGGER", "fileinfo_other.txt=5e11")
+  assert potService.extPOTPerTrigger() == 3e11
+  assert potService.extPOTPerTrigger("bookkeeping_files/fileinfo_other.txt") == 5e11
+  monkeypatch.setenv("UBPHOTON_POT_PER_EXT_TRIGGER", "%s=2e11, fileinfo_other.txt=5e11" % runTable)
+  assert potService.extPOTPerTrigger() == 2e11
+  assert potService.extPOTPerTrigger(potPerTrigger=1e11) == 1e11
+  monkeypatch.setenv("UBPHOTON_POT_PER_EXT_TRIGGER", "2e11")
+  with pytest.raises(ValueError):
+    potService.extPOTPerTrigger()
+
+
+def test_ext_triggers_by_fileid():
+  #The first two rows of the run 3 EXT table
+  assert potService.extTriggers(fileids=[0, 1]) == 15892 + 14274
+  assert potService.extTriggers(fileids=[1, 1, 0]) == 15892 + 14274
+
+
+def test_ext_triggers_without_matching_files_raise():
+  with pytest.raises(ValueError):
+    potService.extTriggers(fileids=[-5, -7])
@@ -0,0 +1,107 @@
+#RDFSelection against the same selection written with the cuts.py functions, on a small tree of fake events
+#Needs a ROOT build with RDataFrame and a working interpreter (the C++ helpers are compiled at run time)
+import numpy as np
+import pytest
+
+rt = pytest.importorskip("ROOT")
+if not hasattr(rt, "RDataFrame"):
+  pytest.skip("needs ROOT with RDataFrame", allow_module_level=True)
+
+from cuts import (recoNoVertex, recoCutMuons, recoCutElectrons, trueCutCosmic, recoFiducials, recoPion, recoProton,
+                  recoPhotonListFiducial, recoPhotonListTracks, scaleRecoEnergy, trueCutMuons, trueCutElectrons,
+                  trueCutFiducials, trueCutPionProton, truePhotonList)
+from helpers.rdfEngine import RDFSelection, outcomeCategories, protonSamples
+from fakeEvents import makeEvents, makeBatch
+
+fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":15, "photonWidth":3}
+
+
+def writeTree(path, events):
+  #Scalar branches as float/int leaves, per-object branches as std::vector<float>/std::vector<int>
+  batch = makeBatch(events)
+  outFile = rt.TFile(path, "RECREATE")
+  tree = rt.TTree("EventTree", "EventTree")
+  buffers = {}
+  for name in batch.branches():
+    column = batch[name]
+    if hasattr(column, "content"):
+      buffers[name] = rt.std.vector("float" if column.content.dtype == np.float32 else "int")()
+      tree.Branch(name, buffers[name])
+    else:
+      buffers[name] = np.zeros(1, dtype=column.dtype)
+      tree.Branch(name, buffers[name], name + ("/F" if column.dtype == np.float32 else "/I"))
+  for event in events:
+    for name, buffer in buffers.items():
+      value = getattr(event, name)
+      if isinstance(value, list):
+        buffer.clear()
+        for x in value:
+          buffer.push_back(x)
+      else:
+        buffer[0] = value
+    tree.Fill()
+  tree.Write()
+  outFile.Close()
+
+
+def referenceCuts(event, threshold):
+  #Pass/fail of each RDFSelection cut, in order, evaluated with cuts.py up to the first failure
+  tests = [lambda: recoNoVertex(event),
+           lambda: recoCutMuons(event, threshold) and recoCutElectrons(event, threshold),
+           lambda: trueCutCosmic(event),
+           lambda: recoFiducials(event, fiducialData),
+           lambda: recoPion(event, threshold),
+           lambda: recoProton(event, threshold) <= 1,
+           lambda: len(recoPhotonListFiducial(fiducialData, event, threshold)) + len(recoPhotonListTracks(fiducialData, event, threshold)) > 0]
+  passed = []
+  for test in tests:
+    passed.append(bool(test()))
+    if not passed[-1]:
+      break
+  return passed
+
+
+def referenceOutcome(event):
+  #Key of the first outcomeCategories entry the event belongs to, sorted as generalEvaluator.py does
+  if not trueCutMuons(event):
+    return "Muon"
+  if not trueCutElectrons(event):
+    return "Electron"
+  if not trueCutFiducials(event, fiducialData):
+    return "Fiducials"
+  pions, protons = trueCutPionProton(event)
+  if pions > 0 or protons > 1:
+    return "PionProton"
+  nPhotons = len(truePhotonList(event, fiducialData))
+  return ["NoPhotons", "OnePhoton", "TwoPhotons", "ManyPhotons"][min(nPhotons, 3)]
+
+
+@pytest.mark.parametrize("threshold", [0, 400])
+def test_rdf_selection_matches_cuts(tmp_path, threshold):
+  events = makeEvents(1000, seed=25)
+  path = str(tmp_path / "events.root")
+  writeTree(path, events)
+
+  selection = RDFSelection(path, fiducialData, threshold, weight="xsecWeight", truth=True)
+  selection.book("test", 60)
+
+  counts = np.zeros(8)
+  expected = dict(((sample, outcome), rt.TH1D("reference%d%s%s" % (threshold, sample, outcome), "", 60, 0, 2))
+                  for sample, protons, title in protonSamples for outcome in ["all"] + [key for key, title in outcomeCategories])
+  for event in events:
+    passed = referenceCuts(event, threshold)
+    counts[0] += event.xsecWeight
+    for i, result in enumerate(passed):
+      if result:
+        counts[i+1] += event.xsecWeight
+    if len(passed) == 7 and all(passed):
+      sample = protonSamples[recoProton(event, threshold)][0]
+      energy = scaleRecoEnergy(event, recoPhotonListFiducial(fiducialData, event, threshold), recoPhotonListTracks(fiducialData, event, threshold))
+      expected[(sample, "all")].Fill(energy, event.xsecWeight)
+      expected[(sample, referenceOutcome(event))].Fill(energy, event.xsecWeight)
+
+  assert [count for name, count in selection.cutFlowCounts()] == pytest.approx(list(counts), rel=1e-6)
+  for key, reference in expected.items():
+    hist = selection.histogram(*key)
+    for i in range(hist.GetNbinsX() + 2):
+      assert hist.GetBinContent(i) == pytest.approx(reference.GetBinContent(i), rel=1e-6, abs=1e-9), key
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from cuts import *
+import selection_1g1p
+from selection_1g1p import run_1g1p_reco_selection_cuts, run_1g1p_reco_selection_batch, get_1g1p_cutflow
+from fakeEvents import makeEvents, makeBatch
+
+fiducialData = {"xMin":0, "xMax":256, "yMin":-116.5, "yMax":116.5, "zMin":0, "zMax":1036, "width":10, "photonWidth":3}
+
+
+def referenceSelection(event, threshold, fiducial, returnOnFail=True):
+  #The selection as it was written before the cut flow: the cuts.py calls in order, stopping at the first failure
+  values = {"recoList": [], "recoTrackList": [], "recoProtonCount": 0}
+
+  def protons():
+    values["recoProtonCount"] = recoProton(event, threshold)
+    return values["recoProtonCount"] <= 1
+
+  def photons():
+    values["recoList"] = recoPhotonListFiducial(fiducial, event, 10.0)
+    values["recoTrackList"] = recoPhotonListTracks(fiducial, event, threshold)
+    return len(values["recoList"]) + len(values["recoTrackList"]) == 1
+
+  tests = [("novertex", lambda: recoNoVertex(event)),
+           ("noPrimaryMuon", lambda: recoCutMuons(event, threshold)),
+           ("noPrimaryElectron", lambda: recoCutElectrons(event, threshold)),
+           ("cutCosmicPixels", lambda: trueCutCosmic(event)),
+           ("vertexInFV", lambda: recoFiducials(event, fiducial)),
+           ("noChargedPion", lambda: recoPion(event, threshold)),
+           ("noMoreThan1Proton", protons),
+           ("only1Photon", photons),
+           ("showerFromCharge", lambda: recoCutShowerFromChargeScore(event, values["recoList"], values["recoTrackList"])),
+           ("primaryScore", lambda: recoCutPrimary(event, values["recoList"], values["recoTrackList"])),
+           ("cutLongTracks", lambda: recoCutLongTracks(event, fiducial)),
+           ("cutMuonCompleteness", lambda: recoCutMuonCompleteness(event)),
+           ("maxVertexIntimePixels", lambda: recoCutMaxInTime(event, values["recoProtonCount"])),
+           ("cutShowerCompleteness", lambda: recoCutCompleteness(event, values["recoList"], values["recoTrackList"]))]
+  cutsPassed = dict((name, True) for name, test in tests)
+  passes = True
+  for name, test in tests:
+    if test() == False:
+      cutsPassed[name] = False
+      passes = False
+      if returnOnFail:
+        break
+  cutsPassed["AllCuts"] = passes
+  return passes, cutsPassed, values["recoList"], values["recoTrackList"], values["recoProtonCount"]
+
+
+@pytest.fixture(scope="module")
+def events():
+  return makeEvents(3000, seed=9)
+
+
+@pytest.mark.parametrize("threshold", [0, 400])
+@pytest.mark.parametrize("returnOnFail", [True, False])
+def test_cut_flow_matches_imperative_selection(events, threshold, returnOnFail):
+  for event in events:
+    assert run_1g1p_reco_selection_cuts(event, threshold, fiducialData, returnOnFail) == referenceSelection(event, threshold, fiducialData, returnOnFail)
+
+
+@pytest.mark.parametrize("threshold", [0, 400])
+def test_batch_matches_per_event(events, threshold):
+  batch = makeBatch(events)
+  result = run_1g1p_reco_selection_batch(batch, threshold, fiducialData, weights=batch["xsecWeight"])
+  assert result.reached("showerFromCharge").any()
+  for returnOnFail in [True, False]:
+    cutsPassed = result.cutsPassed(returnOnFail)
+    for i, event in enumerate(events):
+      passes, expected, recoList, recoTrackList, recoProtonCount = run_1g1p_reco_selection_cuts(event, threshold, fiducialData, returnOnFail)
+      assert dict((name, bool(mask[i])) for name, mask in cutsPassed.items()) == expected
+      if not returnOnFail or result.reached("only1Photon")[i]:
+        assert list(np.nonzero(result.values["recoList"][i])[0]) == recoList
+        assert list(np.nonzero(result.values["recoTrackList"][i])[0]) == recoTrackList
+      if not returnOnFail or result.reached("noMoreThan1Proton")[i]:
+        assert result.values["recoProtonCount"][i] == recoProtonCount
+
+
+def test_n_minus_one_counts(events):
+  batch = makeBatch(events)
+  result = run_1g1p_reco_selection_batch(batch, 0, fiducialData, weights=batch["xsecWeight"])
+  for j, name in enumerate(result.cutNames):
+    others = np.ones(len(events), dtype=bool)
+    for k, other in enumerate(result.cutNames):
+      if k != j:
+        others &= result.masks[other]
+    assert np.isclose(others @ result.weights, result.nMinusOneCounts()[j])
+
+
+def test_cut_flow_built_once_per_settings():
+  fiducial = dict(fiducialData)
+  cutflow = get_1g1p_cutflow(0, fiducial)
+  assert get_1g1p_cutflow(0, dict(fiducialData)) is cutflow
+  assert get_1g1p_cutflow(400, fiducial) is not cutflow
+  #Changing the caller's dict gives another flow and leaves the cached one as it was
+  fiducial["width"] = 20
+  assert get_1g1p_cutflow(0, fiducial) is not cutflow
+  event = makeEvents(1, seed=1)[0]
+  event.foundVertex, event.vtxX, event.vtxY, event.vtxZ = 1, 15.0, 0.0, 500.0
+  assert cutflow.steps[4].eventFunction(event, {}) == recoFiducials(event, fiducialData)
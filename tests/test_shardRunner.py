@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from helpers.shardRunner import ShardRunner, entryRanges
+from helpers.histograms import Histogram1D, CategoryHistogram
+from helpers.cutMaskStore import CutMaskWriter
+
+
+def runLoop(workers, nEntries=20001):
+  #The loop of a script, with the script's globals as a dict: counters, a list, single and array fills, a cut mask
+  rng = np.random.default_rng(21)
+  data, weights = rng.normal(1, 0.5, nEntries), rng.uniform(0.1, 3, nEntries)
+  namespace = {"hist": Histogram1D("hist", "hist", 60, 0, 2), "pairs": Histogram1D("pairs", "pairs", 60, 0, 2),
+               "categories": CategoryHistogram([("a", "histA", "A"), (("b", 1), "histB", "B")], 60, 0, 2),
+               "n": 0, "odd": 0, "events": []}
+  masks = CutMaskWriter(nEntries, ["x", "AllCuts"])
+  #Single fills held before the loop must be counted once, not once per worker
+  namespace["categories"].Fill("a", 0.5, 7.)
+  shards = ShardRunner(workers, namespace, counters=["n", "odd"], lists=["events"])
+  for i in shards.entries(nEntries, [masks, None]):
+    x = data[i]
+    namespace["n"] += 1
+    masks.setReco(i, {"x": x > 1, "AllCuts": x > 1.5}, x)
+    if x < 0.2:
+      continue
+    namespace["hist"].Fill(x, weights[i])
+    namespace["pairs"].fill([x, x/2], weights[i])
+    namespace["categories"].Fill("a" if i % 2 else ("b", 1), x, weights[i])
+    if i % 2:
+      namespace["odd"] += 1
+    if x > 2.5:
+      namespace["events"].append(i)
+  return namespace, masks
+
+
+def test_entry_ranges_cover_entries():
+  assert entryRanges(10, 3) == [(0, 3), (3, 6), (6, 10)]
+  assert entryRanges(2, 5) == [(0, 1), (1, 2)]
+  assert entryRanges(0, 4) == []
+
+
+def test_shards_match_serial_run():
+  serial, serialMasks = runLoop(1)
+  for workers in [2, 5]:
+    sharded, shardedMasks = runLoop(workers)
+    assert (sharded["n"], sharded["odd"], sharded["events"]) == (serial["n"], serial["odd"], serial["events"])
+    #Fills are replayed in entry order, so the sums agree to the last bit
+    for name in ["hist", "pairs", "categories"]:
+      assert np.array_equal(sharded[name].sumw, serial[name].sumw)
+      assert np.array_equal(sharded[name].sumw2, serial[name].sumw2)
+    assert sharded["hist"].entries == serial["hist"].entries
+    assert np.array_equal(shardedMasks.recoBits, serialMasks.recoBits)
+    assert np.array_equal(shardedMasks.recoLeadingPhotonE, serialMasks.recoLeadingPhotonE, equal_nan=True)
+
+
+def test_unregistered_histogram_fails_the_run():
+  #A histogram kept only in a dict is not among the globals, so a worker must not fill it
+  namespace = {"n": 0}
+  hidden = {"hist": Histogram1D("hidden", "hidden", 10, 0, 10)}
+  message = None
+  try:
+    for i in ShardRunner(3, namespace, counters=["n"]).entries(30):
+      namespace["n"] += 1
+      hidden["hist"].Fill(i % 10)
+  except RuntimeError as error:
+    message = str(error)
+  assert message is not None and "failed" in message
+  #The parent's own class is untouched, and with one worker the same loop is fine
+  for i in ShardRunner(1, namespace, counters=["n"]).entries(30):
+    hidden["hist"].Fill(i % 10)
+  assert hidden["hist"].entries == 30
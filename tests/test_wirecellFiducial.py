@@ -0,0 +1,54 @@
+import numpy as np
+
+from helpers.wirecellFiducial import libwc, getWCFiducial, isFiducialWCSCE, getWCBoundary, isFiducialWCSCEArray
+
+
+class Point:
+  def __init__(self, x, y, z):
+    self.x, self.y, self.z = x, y, z
+
+  def X(self):
+    return self.x
+
+  def Y(self):
+    return self.y
+
+  def Z(self):
+    return self.z
+
+
+def randomPoints(n, seed=6):
+  #A little beyond the detector on every side, so both sides of the boundary are well covered
+  rng = np.random.default_rng(seed)
+  return rng.uniform(-10, 270, n), rng.uniform(-125, 125, n), rng.uniform(-10, 1050, n)
+
+
+def test_batch_matches_per_point():
+  x, y, z = randomPoints(20000)
+  inside = isFiducialWCSCEArray(x, y, z)
+  assert inside.dtype == bool
+  assert 0 < inside.sum() < len(x)
+  assert inside.tolist() == [bool(isFiducialWCSCE(Point(*p))) for p in zip(x, y, z)]
+
+
+def test_batch_custom_boundary():
+  x, y, z = randomPoints(5000, seed=7)
+  for boundary in [0.0, 10.0]:
+    wcfid = getWCFiducial(boundary)
+    expected = [bool(libwc.WCFiducial_insideFV(wcfid, *p)) for p in zip(x, y, z)]
+    assert isFiducialWCSCEArray(x, y, z, boundary).tolist() == expected
+  assert getWCFiducial(10.0) is getWCFiducial(10)
+
+
+def test_batch_shapes():
+  x, y, z = randomPoints(12)
+  assert isFiducialWCSCEArray(x.reshape(3, 4), y.reshape(3, 4), z.reshape(3, 4)).shape == (3, 4)
+  assert len(isFiducialWCSCEArray([], [], [])) == 0
+
+
+def test_boundary_longer_than_buffer():
+  for plane in (0, 1):
+    u, v = getWCBoundary(3.0, plane)
+    assert len(u) > 4
+    shortU, shortV = getWCBoundary(3.0, plane, maxn=4)
+    assert np.array_equal(shortU, u) and np.array_equal(shortV, v)
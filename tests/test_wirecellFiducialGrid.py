@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip("ROOT")
+
+from helpers.wirecellFiducial import getWCBoundary, isFiducialWCSCEArray
+from helpers.wirecellFiducialGrid import WCFiducialGrid, STRADDLE
+
+
+def edgePoints(boundary, n, seed):
+  #Points within a few mm of the boundary polygons, where the grid has to fall back to the exact test
+  rng = np.random.default_rng(seed)
+  xy, xz = getWCBoundary(boundary, 0), getWCBoundary(boundary, 1)
+  i = rng.integers(0, len(xy[0]), n)
+  j = rng.integers(0, len(xz[0]), n)
+  t = rng.random(n)
+  x = xy[0][i] + t*(xz[0][j] - xy[0][i]) + rng.normal(0, 0.3, n)
+  return x, xy[1][i] + rng.normal(0, 0.3, n), xz[1][j] + rng.normal(0, 0.3, n)
+
+
+@pytest.mark.parametrize("boundary,resolution", [(3.0, 1.0), (3.0, 5.0), (10.0, 2.0)])
+def test_grid_matches_exact_test(tmp_path, boundary, resolution):
+  grid = WCFiducialGrid(boundary, resolution, cacheDir=str(tmp_path))
+  rng = np.random.default_rng(7)
+  edgeX, edgeY, edgeZ = edgePoints(boundary, 5000, 8)
+  x = np.concatenate([rng.uniform(-10, 270, 20000), edgeX])
+  y = np.concatenate([rng.uniform(-125, 125, 20000), edgeY])
+  z = np.concatenate([rng.uniform(-10, 1050, 20000), edgeZ])
+  assert np.array_equal(grid.inside(x, y, z), isFiducialWCSCEArray(x, y, z, boundary))
+
+
+def test_polygon_vertices_are_straddling(tmp_path):
+  grid = WCFiducialGrid(3.0, 1.0, cacheDir=str(tmp_path))
+  for plane, (u, v) in enumerate(grid.polygons):
+    assert (grid.lookup(plane, u, v) == STRADDLE).all()
+  assert all(0 < fraction < 0.1 for fraction in grid.straddleFraction())
+
+
+def test_grid_cache_round_trip(tmp_path):
+  grid = WCFiducialGrid(3.0, 2.0, cacheDir=str(tmp_path))
+  assert os.path.exists(grid.cachePath())
+  reloaded = WCFiducialGrid(3.0, 2.0, cacheDir=str(tmp_path))
+  for plane in (0, 1):
+    assert np.array_equal(reloaded.codes[plane], grid.codes[plane])
+    assert np.array_equal(reloaded.origins[plane], grid.origins[plane])
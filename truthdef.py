@@ -1,6 +1,9 @@
 import os,sys
 from cuts import *
 
+# the True/False entries of the truthcuts dict, in the order they are applied
+truthdef_1gamma_cut_names = ["vertexFV", "muonBelowThreshold", "electronBelowThreshold", "pionsBelowThreshold", "protonsBelowThreshold", "only1Photon"]
+
 def truthdef_1gamma_cuts( eventTree, photonEDepThreshold, fiducialData, return_on_fail=True ):
 
     passes = False
@@ -70,5 +73,6 @@ def truthdef_1gamma_cuts( eventTree, photonEDepThreshold, fiducialData, return_o
     else:
         truthcuts["only1Photon"]=True
     
-    passes = True
+    # with return_on_fail=False every cut has been applied, so the event passes only if all of them did
+    passes = all(truthcuts[name] for name in truthdef_1gamma_cut_names)
     return passes, truthcuts